@@ -9,6 +9,7 @@ from pytz import UTC
 from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearchIndexer
 from contentstore.proctoring import register_special_exams
 from lms.djangoapps.grades.tasks import compute_all_grades_for_course
+from openedx.core.djangoapps.content.block_structure import publish_pipeline
 from openedx.core.djangoapps.credit.signals import on_course_publish
 from openedx.core.lib.gating import api as gating_api
 from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
@@ -41,14 +42,25 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     on_course_publish(course_key)
 
     # Finally call into the course search subsystem
-    # to kick off an indexing action
-    if CoursewareSearchIndexer.indexing_is_enabled():
+    # to kick off an indexing action, unless the publish pipeline does it
+    if CoursewareSearchIndexer.indexing_is_enabled() and not publish_pipeline.is_enabled(course_key):
         # import here, because signal is registered at startup, but items in tasks are not yet able to be loaded
         from contentstore.tasks import update_search_index
 
         update_search_index.delay(unicode(course_key), datetime.now(UTC).isoformat())
 
 
+@publish_pipeline.register_builder('search_index')
+def _build_search_index(course_key, course, published_at):  # pylint: disable=unused-argument
+    """
+    Indexes the published course for search, within the bulk operation of
+    the publish pipeline.  Only the items edited shortly before the course
+    was published are indexed again, unless published_at is None.
+    """
+    if CoursewareSearchIndexer.indexing_is_enabled():
+        CoursewareSearchIndexer.index(modulestore(), course_key, triggered_at=published_at)
+
+
 @receiver(SignalHandler.library_updated)
 def listen_for_library_update(sender, library_key, **kwargs):  # pylint: disable=unused-argument
     """
@@ -8,6 +8,9 @@ import json
 import os
 import shutil
 import tarfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from tempfile import NamedTemporaryFile, mkdtemp
 
@@ -45,7 +48,12 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import (
+    export_course_to_tar,
+    export_course_to_xml,
+    export_library_to_tar,
+    export_library_to_xml
+)
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 
 LOGGER = get_task_logger(__name__)
@@ -75,6 +83,18 @@ def clone_instance(instance, field_values):
     return instance
 
 
+@contextmanager
+def _timed(timings, phase):
+    """
+    Records the time taken by the enclosed block in timings, under the given phase.
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        timings[phase] = time.time() - start
+
+
 @task()
 def rerun_course(source_course_key_string, destination_course_key_string, user_id, fields=None):
     """
@@ -85,6 +105,7 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
 
     source_course_key = CourseKey.from_string(source_course_key_string)
     destination_course_key = CourseKey.from_string(destination_course_key_string)
+    timings = OrderedDict()
     try:
         # deserialize the payload
         fields = deserialize_fields(fields) if fields else None
@@ -92,33 +113,45 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
         # use the split modulestore as the store for the rerun course,
         # as the Mongo modulestore doesn't support multiple runs of the same course.
         store = modulestore()
-        with store.default_store('split'):
-            store.clone_course(source_course_key, destination_course_key, user_id, fields=fields)
+        with _timed(timings, 'course'), store.default_store('split'):
+            store.clone_course(
+                source_course_key, destination_course_key, user_id, fields=fields,
+                share_asset_content=settings.FEATURES.get('SHARE_RERUN_ASSET_CONTENT', False),
+            )
 
         # set initial permissions for the user to access the course.
-        initialize_permissions(destination_course_key, User.objects.get(id=user_id))
+        with _timed(timings, 'permissions'):
+            initialize_permissions(destination_course_key, User.objects.get(id=user_id))
 
         # update state: Succeeded
         CourseRerunState.objects.succeeded(course_key=destination_course_key)
 
         # call edxval to attach videos to the rerun
-        copy_course_videos(source_course_key, destination_course_key)
-
-        # Copy OrganizationCourse
-        organization_course = OrganizationCourse.objects.filter(course_id=source_course_key_string).first()
-
-        if organization_course:
-            clone_instance(organization_course, {'course_id': destination_course_key_string})
-
-        # Copy RestrictedCourse
-        restricted_course = RestrictedCourse.objects.filter(course_key=source_course_key).first()
-
-        if restricted_course:
-            country_access_rules = CountryAccessRule.objects.filter(restricted_course=restricted_course)
-            new_restricted_course = clone_instance(restricted_course, {'course_key': destination_course_key})
-            for country_access_rule in country_access_rules:
-                clone_instance(country_access_rule, {'restricted_course': new_restricted_course})
-
+        with _timed(timings, 'videos'):
+            copy_course_videos(source_course_key, destination_course_key)
+
+        with _timed(timings, 'access'):
+            # Copy OrganizationCourse
+            organization_course = OrganizationCourse.objects.filter(course_id=source_course_key_string).first()
+
+            if organization_course:
+                clone_instance(organization_course, {'course_id': destination_course_key_string})
+
+            # Copy RestrictedCourse
+            restricted_course = RestrictedCourse.objects.filter(course_key=source_course_key).first()
+
+            if restricted_course:
+                country_access_rules = CountryAccessRule.objects.filter(restricted_course=restricted_course)
+                new_restricted_course = clone_instance(restricted_course, {'course_key': destination_course_key})
+                for country_access_rule in country_access_rules:
+                    clone_instance(country_access_rule, {'restricted_course': new_restricted_course})
+
+        LOGGER.info(
+            u'Course Rerun of %s to %s done in %s',
+            source_course_key,
+            destination_course_key,
+            u', '.join(u'{} {:.3f}s'.format(phase, seconds) for phase, seconds in iteritems(timings)),
+        )
         return "succeeded"
 
     except DuplicateCourseError:
@@ -252,10 +285,13 @@ def export_olx(self, user_id, course_key_string, language):
 
     try:
         self.status.set_state(u'Exporting')
-        tarball = create_export_tarball(courselike_module, courselike_key, {}, self.status)
-        artifact = UserTaskArtifact(status=self.status, name=u'Output')
-        artifact.file.save(name=tarball.name, content=File(tarball))  # pylint: disable=no-member
-        artifact.save()
+        if settings.FEATURES.get('STREAM_OLX_EXPORT', False):
+            stream_export_tarball(courselike_module, courselike_key, {}, self.status)
+        else:
+            tarball = create_export_tarball(courselike_module, courselike_key, {}, self.status)
+            artifact = UserTaskArtifact(status=self.status, name=u'Output')
+            artifact.file.save(name=tarball.name, content=File(tarball))  # pylint: disable=no-member
+            artifact.save()
     # catch all exceptions so we can record useful error messages
     except Exception as exception:  # pylint: disable=broad-except
         LOGGER.exception(u'Error exporting course %s', courselike_key)
@@ -287,7 +323,98 @@ def create_export_tarball(course_module, course_key, context, status=None):
         with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
             tar_file.add(root_dir / name, arcname=name)
 
-    except SerializationError as exc:
+    except Exception as exc:
+        _record_export_error(exc, course_key, context, status)
+        raise
+    finally:
+        if os.path.exists(root_dir / name):
+            shutil.rmtree(root_dir / name)
+
+    return export_file
+
+
+def stream_export_tarball(course_module, course_key, context, status):
+    """
+    Generates the export tarball as the output artifact of the given task status.
+
+    Unlike create_export_tarball, the course is exported straight into the compressed tarball,
+    which is written to the artifact storage as it's generated (uploaded in parts to S3), with
+    the static assets read from the contentstore in chunks, without any intermediate directory
+    or file.
+
+    Updates the context with any error information if applicable.
+    """
+    name = course_module.url_name
+    artifact = UserTaskArtifact(status=status, name=u'Output')
+    file_field = artifact.file.field  # pylint: disable=no-member
+    file_name = file_field.storage.get_available_name(file_field.generate_filename(artifact, name + u'.tar.gz'))
+
+    try:
+        LOGGER.debug(u'tar file being streamed to %s', file_name)
+        with _open_for_writing(file_field.storage, file_name) as output:
+            with tarfile.open(fileobj=output, mode='w|gz') as tar_file:
+                if isinstance(course_key, LibraryLocator):
+                    export_library_to_tar(
+                        modulestore(), contentstore(), course_key, tar_file, name,
+                        progress=_export_progress_logger(course_key),
+                    )
+                else:
+                    export_course_to_tar(
+                        modulestore(), contentstore(), course_module.id, tar_file, name,
+                        progress=_export_progress_logger(course_key),
+                    )
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
+    except Exception as exc:
+        _record_export_error(exc, course_key, context, status)
+        file_field.storage.delete(file_name)
+        raise
+
+    artifact.file.name = file_name  # pylint: disable=no-member
+    artifact.save()
+    return artifact
+
+
+def _open_for_writing(storage, name):
+    """
+    Opens the file of the given name in the given storage for writing, creating its directory
+    first if the storage is local.
+    """
+    try:
+        directory = os.path.dirname(storage.path(name))
+    except NotImplementedError:
+        pass
+    else:
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+    return storage.open(name, 'wb')
+
+
+def _export_progress_logger(course_key):
+    """
+    Returns a function logging the progress of the export of the given course, by bytes of
+    static assets, every tenth of them.
+    """
+    logged_tenths = [0]
+
+    def log_progress(exported_bytes, total_bytes):
+        """
+        Logs the progress of the export if another tenth of the static assets was exported.
+        """
+        tenths = exported_bytes * 10 // total_bytes if total_bytes else 10
+        if tenths > logged_tenths[0]:
+            logged_tenths[0] = tenths
+            LOGGER.info(u'Exporting %s: %d of %d bytes of static assets', course_key, exported_bytes, total_bytes)
+
+    return log_progress
+
+
+def _record_export_error(exc, course_key, context, status):
+    """
+    Updates the context and the task status, if any, with the information of the given error
+    raised while exporting the course.
+    """
+    if isinstance(exc, SerializationError):
         LOGGER.exception(u'There was an error exporting %s', course_key)
         parent = None
         try:
@@ -308,8 +435,7 @@ def create_export_tarball(course_module, course_key, context, status=None):
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg'],
                                     'edit_unit_url': context['edit_unit_url']}))
-        raise
-    except Exception as exc:
+    else:
         LOGGER.exception('There was an error exporting %s', course_key)
         context.update({
             'in_err': True,
@@ -317,12 +443,6 @@ def create_export_tarball(course_module, course_key, context, status=None):
             'raw_err_msg': str(exc)})
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
-        raise
-    finally:
-        if os.path.exists(root_dir / name):
-            shutil.rmtree(root_dir / name)
-
-    return export_file
 
 
 class CourseImportTask(UserTask):  # pylint: disable=abstract-method
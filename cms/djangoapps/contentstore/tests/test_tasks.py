@@ -5,6 +5,7 @@ from __future__ import absolute_import, division, print_function
 
 import copy
 import json
+import tarfile
 from uuid import uuid4
 
 import mock
@@ -62,6 +63,34 @@ class ExportCourseTestCase(CourseTestCase):
         result = export_olx.delay(self.user.id, key, u'en')
         self._assert_failed(result, json.dumps({u'raw_error_msg': u'Boom!'}))
 
+    @mock.patch.dict(settings.FEATURES, {'STREAM_OLX_EXPORT': True})
+    def test_streaming_success(self):
+        """
+        Verify that a course export task streaming the tarball succeeds
+        """
+        key = str(self.course.location.course_key)
+        result = export_olx.delay(self.user.id, key, u'en')
+        status = UserTaskStatus.objects.get(task_id=result.id)
+        self.assertEqual(status.state, UserTaskStatus.SUCCEEDED)
+        output = UserTaskArtifact.objects.get(status=status)
+        self.assertEqual(output.name, 'Output')
+        with tarfile.open(fileobj=output.file, mode='r:gz') as tar_file:
+            names = tar_file.getnames()
+        root_dir = self.course.url_name
+        for name in ('course.xml', 'policies/assets.json', 'assets/assets.xml'):
+            self.assertIn(u'{}/{}'.format(root_dir, name), names)
+
+    @mock.patch.dict(settings.FEATURES, {'STREAM_OLX_EXPORT': True})
+    @mock.patch('contentstore.tasks.export_course_to_tar', side_effect=side_effect_exception)
+    def test_streaming_exception(self, mock_export):  # pylint: disable=unused-argument
+        """
+        The export task streaming the tarball should fail gracefully if an exception is thrown
+        """
+        key = str(self.course.location.course_key)
+        result = export_olx.delay(self.user.id, key, u'en')
+        self._assert_failed(result, json.dumps({u'raw_error_msg': u'Boom!'}))
+        self.assertFalse(UserTaskArtifact.objects.exists())
+
     def test_invalid_user_id(self):
         """
         Verify that attempts to export a course as an invalid user fail
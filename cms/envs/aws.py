@@ -208,6 +208,8 @@ if ENV_TOKENS.get('COMPREHENSIVE_THEME_DIR', None):
 
 COMPREHENSIVE_THEME_DIRS = ENV_TOKENS.get('COMPREHENSIVE_THEME_DIRS', COMPREHENSIVE_THEME_DIRS) or []
 
+MAKO_PRECOMPILED_DIR = ENV_TOKENS.get('MAKO_PRECOMPILED_DIR', MAKO_PRECOMPILED_DIR)
+
 # COMPREHENSIVE_THEME_LOCALE_PATHS contain the paths to themes locale directories e.g.
 # "COMPREHENSIVE_THEME_LOCALE_PATHS" : [
 #        "/edx/src/edx-themes/conf/locale"
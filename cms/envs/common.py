@@ -214,6 +214,17 @@ FEATURES = {
     # Enable course reruns, which will always use the split modulestore
     'ALLOW_COURSE_RERUNS': True,
 
+    # Share the content of the assets of course reruns with the rerun courses, instead of copying it
+    'SHARE_RERUN_ASSET_CONTENT': False,
+
+    # Stream course exports straight into the compressed tarball in the export storage,
+    # instead of exporting them to a temporary directory first
+    'STREAM_OLX_EXPORT': False,
+
+    # Initialize the expensive subsystems, such as the tracking backends and the
+    # modulestores, on first use rather than at startup, for workers to start faster.
+    'LAZY_STARTUP_INITIALIZATION': False,
+
     # Certificates Web/HTML Views
     'CERTIFICATES_HTML_VIEW': False,
 
@@ -282,6 +293,9 @@ GEOIPV6_PATH = REPO_ROOT / "common/static/data/geoip/GeoIPv6.dat"
 # TODO: Move the Mako templating into a different engine in TEMPLATES below.
 import tempfile
 MAKO_MODULE_DIR = os.path.join(tempfile.gettempdir(), 'mako_cms')
+# Directory of the templates precompiled by the compile_mako_templates command,
+# loaded from there as is when set.
+MAKO_PRECOMPILED_DIR = None
 MAKO_TEMPLATES = {}
 MAKO_TEMPLATES['main'] = [
     PROJECT_ROOT / 'templates',
@@ -514,6 +528,15 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of warm sandboxes, which import the common libraries once and fork
+    # a fresh process for each execution.  A size of 0 disables the pool.
+    'pool': {
+        # How many idle sandboxes can each process keep?
+        'size': 0,
+        # How many executions before a sandbox is replaced?
+        'max_executions': 100,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
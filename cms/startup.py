@@ -7,10 +7,11 @@ from django.conf import settings
 
 import cms.lib.xblock.runtime
 import xmodule.x_module
+from capa.safe_exec import pool as safe_exec_pool
 from openedx.core.djangoapps.monkey_patch import django_db_models_options
 from openedx.core.djangoapps.theming.core import enable_theming
 from openedx.core.djangoapps.theming.helpers import is_comprehensive_theming_enabled
-from openedx.core.lib.django_startup import autostartup
+from openedx.core.lib.django_startup import autostartup, timed_startup_phase
 from openedx.core.lib.xblock_utils import xblock_local_resource_url
 from openedx.core.release import doc_version
 from startup_configurations.validate_config import validate_cms_config
@@ -31,7 +32,8 @@ def run():
     if is_comprehensive_theming_enabled():
         enable_theming()
 
-    django.setup()
+    with timed_startup_phase('django.setup'):
+        django.setup()
 
     autostartup()
 
@@ -52,6 +54,10 @@ def run():
     settings.HELP_TOKENS_LANGUAGE_CODE = settings.LANGUAGE_CODE
     settings.HELP_TOKENS_VERSION = doc_version()
 
+    # Run sandboxed problem code in a pool of warm sandboxes, if configured.
+    pool_settings = settings.CODE_JAIL.get('pool', {})
+    safe_exec_pool.configure(pool_settings.get('size', 0), pool_settings.get('max_executions', 100))
+
     # validate configurations on startup
     validate_cms_config(settings)
 
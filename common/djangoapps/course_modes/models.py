@@ -610,6 +610,32 @@ class CourseMode(models.Model):
         elif cls.AUDIT in modes_dict:
             return cls.AUDIT
 
+    @classmethod
+    def default_mode_slug(cls, course_id, modes_dict=None):
+        """Return the mode students are enrolled in when no mode is specified.
+
+        This is the default mode if the course offers it, or else its "audit"
+        or "honor" mode, falling back on the default mode.
+
+        Args:
+            course_id (CourseKey): The course to check.
+
+        Keyword Args:
+            modes_dict (dict): If provided, use these course modes.
+                Useful for avoiding unnecessary database queries.
+
+        Returns:
+            str
+
+        """
+        if modes_dict is None:
+            modes_dict = cls.modes_for_course_dict(course_id)
+
+        for slug in (cls.DEFAULT_MODE_SLUG, cls.AUDIT, cls.HONOR):
+            if slug in modes_dict:
+                return slug
+        return cls.DEFAULT_MODE_SLUG
+
     @classmethod
     def is_white_label(cls, course_id, modes_dict=None):
         """Check whether a course is a "white label" (paid) course.
@@ -222,6 +222,18 @@ class CourseModeModelTest(TestCase):
         # Verify that the proper auto enroll mode is returned
         self.assertEqual(CourseMode.auto_enroll_mode(self.course_key, modes), result)
 
+    @ddt.data(
+        ([], "audit"),
+        (["honor", "audit", "verified"], "audit"),
+        (["honor", "verified"], "honor"),
+        (["verified"], "audit"),
+    )
+    @ddt.unpack
+    def test_default_mode_slug(self, modes, result):
+        for mode_slug in modes:
+            self.create_mode(mode_slug, mode_slug.capitalize())
+        self.assertEqual(CourseMode.default_mode_slug(self.course_key), result)
+
     def test_all_modes_for_courses(self):
         now = datetime.now(pytz.UTC)
         future = now + timedelta(days=1)
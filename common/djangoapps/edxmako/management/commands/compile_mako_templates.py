@@ -0,0 +1,99 @@
+"""
+Command to precompile the Mako templates of all lookups, themes included.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from mako.template import Template
+
+from edxmako import LOOKUP
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Compiles the Mako templates found in the directories of every template
+    lookup, including the comprehensive theme directories, into the
+    precompiled template directory, for them to be loaded from there by the
+    workers rather than compiled on their first hits.
+
+    The compiled templates of a lookup are specific to its directories and
+    to the version of mako, so this is meant to be run at build time, once
+    the settings and themes are in place, e.g.:
+
+        $ ./manage.py lms compile_mako_templates --settings=aws
+        $ ./manage.py cms compile_mako_templates --settings=aws
+
+    With --benchmark, it also reports the time taken to load all of the
+    templates from the precompiled directory, and to compile them instead.
+    """
+    help = 'Precompiles the Mako templates of all lookups into MAKO_PRECOMPILED_DIR.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--output_dir',
+            default=None,
+            help='Directory to precompile the templates into, instead of MAKO_PRECOMPILED_DIR.',
+        )
+        parser.add_argument(
+            '--benchmark',
+            action='store_true',
+            default=False,
+            help='Time the loading of the precompiled templates against their compilation.',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir'] or getattr(settings, 'MAKO_PRECOMPILED_DIR', None)
+        if not output_dir:
+            raise CommandError('Either --output_dir or the MAKO_PRECOMPILED_DIR setting is required.')
+
+        for namespace, lookup in sorted(LOOKUP.items()):
+            start = time.time()
+            templates, failed = lookup.precompile(output_dir)
+            log.info(
+                'Precompiled %d templates of the %s lookup in %.1fs; %d files failed to compile.',
+                len(templates),
+                namespace,
+                time.time() - start,
+                len(failed),
+            )
+            if options['benchmark']:
+                self._benchmark(namespace, lookup, output_dir, templates)
+
+    @staticmethod
+    def _benchmark(namespace, lookup, output_dir, templates):
+        """
+        Logs the time taken to load the given templates of the lookup, by
+        uri, from the precompiled directory under output_dir, and to compile
+        them.
+        """
+        precompiled_directory = lookup._precompiled_directory(output_dir)  # pylint: disable=protected-access
+        timings = {}
+        for phase in ('precompiled', 'compiled'):
+            start = time.time()
+            for uri, filename in templates.iteritems():
+                template_args = dict(lookup.template_args, module_directory=None)
+                if phase == 'precompiled':
+                    template_args['module_filename'] = lookup._module_filename(  # pylint: disable=protected-access
+                        precompiled_directory,
+                        uri,
+                    )
+                Template(uri=uri, filename=filename, lookup=lookup, **template_args)
+            timings[phase] = time.time() - start
+        log.info(
+            'Loaded the %d templates of the %s lookup in %.1fs from the precompiled directory, '
+            'against %.1fs compiling them.',
+            len(templates),
+            namespace,
+            timings['precompiled'],
+            timings['compiled'],
+        )
@@ -4,27 +4,46 @@ Set up lookup paths for mako templates.
 
 import contextlib
 import hashlib
+import json
+import logging
 import os
+import posixpath
 
 import pkg_resources
 from django.conf import settings
+from mako import codegen
 from mako.exceptions import TopLevelLookupException
 from mako.lookup import TemplateLookup
+from mako.template import Template
 
 from openedx.core.djangoapps.theming.helpers import get_template as themed_template
 from openedx.core.djangoapps.theming.helpers import get_template_path_with_theme, strip_site_theme_templates_path
 
 from . import LOOKUP
 
+log = logging.getLogger(__name__)
+
+# Extensions of the files compiled by DynamicTemplateLookup.precompile.
+PRECOMPILED_TEMPLATE_EXTENSIONS = ('.html', '.js', '.txt', '.xml')
+
+# Name of the table of the precompiled templates of a lookup, by uri.
+PRECOMPILED_TEMPLATES_TABLE = 'templates.json'
+
 
 class DynamicTemplateLookup(TemplateLookup):
     """
     A specialization of the standard mako `TemplateLookup` class which allows
     for adding directories progressively.
+
+    When MAKO_PRECOMPILED_DIR is set, the templates precompiled there by the
+    compile_mako_templates command are loaded from it as is, without being
+    compiled or written, and found without searching the lookup directories.
     """
     def __init__(self, *args, **kwargs):
         super(DynamicTemplateLookup, self).__init__(*args, **kwargs)
         self.__original_module_directory = self.template_args['module_directory']
+        self.__precompiled_templates = None
+        self.modulename_callable = self._precompiled_module_filename
 
     def __repr__(self):
         return "<{0.__class__.__name__} {0.directories}>".format(self)
@@ -49,6 +68,7 @@ class DynamicTemplateLookup(TemplateLookup):
         # Also clear the internal caches. Ick.
         self._collection.clear()
         self._uri_cache.clear()
+        self.__precompiled_templates = None
 
     def get_template(self, uri):
         """
@@ -69,13 +89,131 @@ class DynamicTemplateLookup(TemplateLookup):
         if not template:
             try:
                 # Try to find themed template, i.e. see if current theme overrides the template
-                template = super(DynamicTemplateLookup, self).get_template(get_template_path_with_theme(uri))
+                template = self._get_template(get_template_path_with_theme(uri))
             except TopLevelLookupException:
                 # strip off the prefix path to theme and look in default template dirs
-                template = super(DynamicTemplateLookup, self).get_template(strip_site_theme_templates_path(uri))
+                template = self._get_template(strip_site_theme_templates_path(uri))
 
         return template
 
+    def precompile(self, precompiled_root):
+        """
+        Compiles the templates of the directories of this lookup into its
+        precompiled directory under `precompiled_root`, along with the table
+        of their files by uri.
+
+        Returns the table of the files of the templates compiled by uri, and
+        the list of the files which failed to compile.
+        """
+        precompiled_directory = self._precompiled_directory(precompiled_root)
+        templates = {}
+        failed = []
+        seen_uris = set()
+        for directory in self.directories:
+            directory = directory.replace(os.path.sep, posixpath.sep)
+            for dirpath, dirnames, filenames in os.walk(directory):
+                dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+                for name in sorted(filenames):
+                    if name.startswith('.') or os.path.splitext(name)[1] not in PRECOMPILED_TEMPLATE_EXTENSIONS:
+                        continue
+                    uri = posixpath.relpath(posixpath.join(dirpath, name), directory)
+                    # As in get_template, the first directory with the uri is the one it is found in.
+                    if uri in seen_uris:
+                        continue
+                    seen_uris.add(uri)
+                    filename = posixpath.normpath(posixpath.join(directory, uri))
+                    try:
+                        Template(
+                            uri=uri,
+                            filename=filename,
+                            lookup=self,
+                            module_filename=self._module_filename(precompiled_directory, uri),
+                            **self.template_args
+                        )
+                    except Exception:  # pylint: disable=broad-except
+                        log.debug(u'Failed to compile %s.', filename, exc_info=True)
+                        failed.append(filename)
+                    else:
+                        templates[uri] = filename
+
+        if not os.path.isdir(precompiled_directory):
+            os.makedirs(precompiled_directory)
+        table_filename = os.path.join(precompiled_directory, PRECOMPILED_TEMPLATES_TABLE)
+        with open(table_filename + '.tmp', 'w') as table_file:
+            json.dump({'templates': templates}, table_file, sort_keys=True)
+        os.rename(table_filename + '.tmp', table_filename)
+        return templates, failed
+
+    def _get_template(self, uri):
+        """
+        Returns the template of the given uri, found in the table of the
+        precompiled templates if it's in there, or else in the directories.
+        """
+        if uri not in self._collection:
+            filename = self._get_precompiled_templates().get(uri.lstrip('/'))
+            if filename is not None and os.path.isfile(filename):
+                return self._load(filename, uri)
+        return super(DynamicTemplateLookup, self).get_template(uri)
+
+    def _get_precompiled_templates(self):
+        """
+        Returns the table of the files of the precompiled templates of this
+        lookup by uri, which is empty unless they were precompiled.
+        """
+        if self.__precompiled_templates is None:
+            templates = {}
+            precompiled_directory = self._precompiled_directory(getattr(settings, 'MAKO_PRECOMPILED_DIR', None))
+            if precompiled_directory:
+                try:
+                    with open(os.path.join(precompiled_directory, PRECOMPILED_TEMPLATES_TABLE)) as table_file:
+                        templates = json.load(table_file)['templates']
+                except IOError:
+                    log.info(u'No precompiled templates for the lookup %r.', self)
+            self.__precompiled_templates = templates
+        return self.__precompiled_templates
+
+    def _precompiled_module_filename(self, filename, uri):
+        """
+        Returns the name of the precompiled module of the template of the
+        given file and uri, or None if it wasn't precompiled or has changed
+        since, for it to be compiled into the module directory instead.
+        """
+        if self._get_precompiled_templates().get(uri.lstrip('/')) != filename:
+            return None
+        module_filename = self._module_filename(
+            self._precompiled_directory(settings.MAKO_PRECOMPILED_DIR),
+            uri.lstrip('/'),
+        )
+        try:
+            if os.stat(module_filename).st_mtime >= os.stat(filename).st_mtime:
+                return module_filename
+        except OSError:
+            pass
+        return None
+
+    def _precompiled_directory(self, precompiled_root):
+        """
+        Returns the directory of the templates of this lookup precompiled
+        under `precompiled_root`, or None if it isn't set.
+
+        Like the module directory, it's specific to the lookup path, and to
+        the version of the code generated by mako.
+        """
+        if not precompiled_root:
+            return None
+        unique = hashlib.md5(
+            ":".join([str(codegen.MAGIC_NUMBER)] + [str(d) for d in self.directories])
+        ).hexdigest()
+        return os.path.join(precompiled_root, unique)
+
+    @staticmethod
+    def _module_filename(precompiled_directory, uri):
+        """
+        Returns the name of the precompiled module of the template of the
+        given uri, laid out as in the module directory.
+        """
+        return os.path.join(precompiled_directory, os.path.normpath(uri) + '.py')
+
 
 def clear_lookups(namespace):
     """
@@ -1,3 +1,4 @@
+import os
 import unittest
 
 import ddt
@@ -10,10 +11,12 @@ from django.test.utils import override_settings
 from mock import Mock, patch
 
 from edxmako import LOOKUP, add_lookup
+from edxmako.paths import DynamicTemplateLookup
 from edxmako.request_context import get_template_request_context
 from edxmako.shortcuts import is_any_marketing_link_set, is_marketing_link_set, marketing_link, render_to_string
 from request_cache.middleware import RequestCache
 from student.tests.factories import UserFactory
+from openedx.core.lib.tempdir import mkdtemp_clean
 from util.testing import UrlResetMixin
 
 
@@ -76,6 +79,50 @@ class AddLookupTests(TestCase):
         self.assertTrue(dirs[0].endswith('management'))
 
 
+class PrecompiledTemplatesTests(TestCase):
+    """
+    Test the loading of the templates precompiled by `DynamicTemplateLookup.precompile`.
+    """
+    def setUp(self):
+        super(PrecompiledTemplatesTests, self).setUp()
+        self.template_dir = mkdtemp_clean()
+        self.precompiled_dir = mkdtemp_clean()
+        for name, source in (('hello.html', u'Hello ${name}'), ('broken.html', u'Hello ${name')):
+            with open(os.path.join(self.template_dir, name), 'w') as template_file:
+                template_file.write(source)
+
+    def create_lookup(self):
+        """
+        Returns a lookup of the test template directory.
+        """
+        lookup = DynamicTemplateLookup(module_directory=mkdtemp_clean(), output_encoding='utf-8')
+        lookup.add_directory(self.template_dir)
+        return lookup
+
+    def test_precompile(self):
+        templates, failed = self.create_lookup().precompile(self.precompiled_dir)
+        self.assertEqual(templates, {'hello.html': os.path.join(self.template_dir, 'hello.html')})
+        self.assertEqual(failed, [os.path.join(self.template_dir, 'broken.html')])
+
+        with override_settings(MAKO_PRECOMPILED_DIR=self.precompiled_dir):
+            with patch('mako.template._compile_module_file') as mock_compile:
+                template = self.create_lookup().get_template('hello.html')
+        self.assertFalse(mock_compile.called)
+        self.assertEqual(template.render(name='precompiled'), 'Hello precompiled')
+
+    def test_changed_after_precompile(self):
+        self.create_lookup().precompile(self.precompiled_dir)
+        filename = os.path.join(self.template_dir, 'hello.html')
+        with open(filename, 'w') as template_file:
+            template_file.write(u'Goodbye ${name}')
+        stat = os.stat(filename)
+        os.utime(filename, (stat.st_atime, stat.st_mtime + 10))
+
+        with override_settings(MAKO_PRECOMPILED_DIR=self.precompiled_dir):
+            template = self.create_lookup().get_template('hello.html')
+        self.assertEqual(template.render(name='changed'), 'Goodbye changed')
+
+
 class MakoRequestContextTest(TestCase):
     """
     Test MakoMiddleware.
@@ -28,7 +28,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.core.cache import cache
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.db import IntegrityError, models
+from django.db import IntegrityError, models, transaction
 from django.db.models import Count
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import Signal, receiver
@@ -122,7 +122,28 @@ class AnonymousUserId(models.Model):
     course_id = CourseKeyField(db_index=True, max_length=255, blank=True)
 
 
-def anonymous_id_for_user(user, course_id, save=True):
+# Number of anonymous ids looked up or created by a single query, see create_anonymous_user_ids
+ANONYMOUS_ID_BATCH_SIZE = 1000
+
+# Seconds for which an anonymous id is remembered as saved, or as about to be saved in the background,
+# for anonymous_id_for_user not to look it up nor save it again while read only
+ANONYMOUS_ID_SAVED_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _compute_anonymous_id(user_id, course_id):
+    """
+    Return the anonymous id of the (user, course) pair, without any caching or saving.
+    """
+    # include the secret key as a salt, and to make the ids unique across different LMS installs.
+    hasher = hashlib.md5()
+    hasher.update(settings.SECRET_KEY)
+    hasher.update(unicode(user_id))
+    if course_id:
+        hasher.update(unicode(course_id).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def anonymous_id_for_user(user, course_id, save=True, read_only=False):
     """
     Return a unique id for a (user, course) pair, suitable for inserting
     into e.g. personalized survey links.
@@ -131,6 +152,10 @@ def anonymous_id_for_user(user, course_id, save=True):
 
     Keyword arguments:
     save -- Whether the id should be saved in an AnonymousUserId object.
+    read_only -- Whether to never write to the database, e.g. while serving a
+        page.  If the id has not been saved yet, it is saved in the background,
+        so it must not be used by anything looking the user up by this id in
+        the same request.
     """
     # This part is for ability to get xblock instance in xblock_noauth handlers, where user is unauthenticated.
     if user.is_anonymous():
@@ -140,13 +165,7 @@ def anonymous_id_for_user(user, course_id, save=True):
     if cached_id is not None:
         return cached_id
 
-    # include the secret key as a salt, and to make the ids unique across different LMS installs.
-    hasher = hashlib.md5()
-    hasher.update(settings.SECRET_KEY)
-    hasher.update(unicode(user.id))
-    if course_id:
-        hasher.update(unicode(course_id).encode('utf-8'))
-    digest = hasher.hexdigest()
+    digest = _compute_anonymous_id(user.id, course_id)
 
     if not hasattr(user, '_anonymous_id'):
         user._anonymous_id = {}  # pylint: disable=protected-access
@@ -156,6 +175,17 @@ def anonymous_id_for_user(user, course_id, save=True):
     if save is False:
         return digest
 
+    if read_only:
+        saved_cache_key = _anonymous_id_saved_cache_key(digest)
+        if cache.get(saved_cache_key):
+            return digest
+        if not AnonymousUserId.objects.filter(anonymous_user_id=digest).exists():
+            # import inline due to cyclic import
+            from student.tasks import create_anonymous_user_ids_task
+            create_anonymous_user_ids_task.delay([user.id], unicode(course_id) if course_id else None)
+        cache.set(saved_cache_key, True, ANONYMOUS_ID_SAVED_CACHE_TIMEOUT)
+        return digest
+
     try:
         AnonymousUserId.objects.get_or_create(
             user=user,
@@ -170,6 +200,85 @@ def anonymous_id_for_user(user, course_id, save=True):
     return digest
 
 
+def _anonymous_id_saved_cache_key(anonymous_id):
+    """
+    Return the key under which the given anonymous id is cached as saved, or as enqueued to be saved.
+    """
+    return u'student.anonymous_user_id.saved.{}'.format(anonymous_id)
+
+
+def anonymous_ids_for_users(users, course_id, save=True):
+    """
+    Return a dict mapping the ids of the given users to their unique ids for
+    the course, like `anonymous_id_for_user`, in bulk.
+
+    The ids are computed in memory.  If `save` is True, the missing
+    AnonymousUserId objects are created, with one query per batch of
+    ANONYMOUS_ID_BATCH_SIZE users to find which ones are missing, and one
+    more to create them.
+    """
+    anonymous_ids = {}
+    for user in users:
+        anonymous_ids[user.id] = anonymous_id_for_user(user, course_id, save=False)
+
+    if save:
+        create_anonymous_user_ids(anonymous_ids.keys(), course_id)
+
+    return anonymous_ids
+
+
+def create_anonymous_user_ids(user_ids, course_id, assume_missing=False):
+    """
+    Create the missing AnonymousUserId objects of the given users for the
+    course, in batches of ANONYMOUS_ID_BATCH_SIZE users.
+
+    Unless `assume_missing` is True, existing objects are looked up first,
+    with one query per batch.
+    """
+    user_ids = list(user_ids)
+    for start in xrange(0, len(user_ids), ANONYMOUS_ID_BATCH_SIZE):
+        batch = {
+            user_id: _compute_anonymous_id(user_id, course_id)
+            for user_id in user_ids[start:start + ANONYMOUS_ID_BATCH_SIZE]
+        }
+        _create_anonymous_user_ids(batch, course_id, assume_missing)
+
+
+def _create_anonymous_user_ids(anonymous_ids, course_id, assume_missing):
+    """
+    Create the missing AnonymousUserId objects for the given dict of user ids
+    to anonymous ids.
+    """
+    existing = set()
+    if not assume_missing:
+        existing.update(AnonymousUserId.objects.filter(
+            anonymous_user_id__in=anonymous_ids.values(),
+        ).values_list('anonymous_user_id', flat=True))
+    missing = [
+        AnonymousUserId(user_id=user_id, course_id=course_id, anonymous_user_id=anonymous_id)
+        for user_id, anonymous_id in anonymous_ids.iteritems()
+        if anonymous_id not in existing
+    ]
+    if not missing:
+        return
+    try:
+        with transaction.atomic():
+            AnonymousUserId.objects.bulk_create(missing)
+    except IntegrityError:
+        # Some of the entries were created in the meantime by another
+        # thread, so create the remaining ones one at a time.
+        for anonymous_user_id in missing:
+            try:
+                with transaction.atomic():
+                    AnonymousUserId.objects.get_or_create(
+                        user_id=anonymous_user_id.user_id,
+                        course_id=course_id,
+                        anonymous_user_id=anonymous_user_id.anonymous_user_id,
+                    )
+            except IntegrityError:
+                pass
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
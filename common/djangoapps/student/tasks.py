@@ -1,5 +1,5 @@
 """
-This file contains celery tasks for sending email
+This file contains celery tasks for sending email and saving anonymous ids
 """
 import logging
 
@@ -8,6 +8,9 @@ from celery.exceptions import MaxRetriesExceededError
 from celery.task import task  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
 from django.core import mail
+from opaque_keys.edx.keys import CourseKey
+
+from student.models import create_anonymous_user_ids
 
 log = logging.getLogger('edx.celery.task')
 
@@ -48,3 +51,14 @@ def send_activation_email(self, subject, message, from_address, dest_addr):
             exc_info=True
         )
         raise Exception
+
+
+@task()
+def create_anonymous_user_ids_task(user_ids, course_id):
+    """
+    Creates the AnonymousUserId objects of the given users for the given
+    course, or for no course if `course_id` is None, which were found missing
+    while serving a request.
+    """
+    course_key = CourseKey.from_string(course_id) if course_id else None
+    create_anonymous_user_ids(user_ids, course_key, assume_missing=True)
@@ -36,10 +36,12 @@ from openedx.core.djangoapps.programs.tests.mixins import ProgramsApiConfigMixin
 from openedx.core.djangoapps.site_configuration.tests.mixins import SiteMixin
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, skip_unless_lms
 from student.models import (
+    AnonymousUserId,
     CourseEnrollment,
     LinkedInAddToProfileConfiguration,
     UserAttribute,
     anonymous_id_for_user,
+    anonymous_ids_for_users,
     unique_id_for_user,
     user_by_anonymous_id
 )
@@ -1060,6 +1062,46 @@ class AnonymousLookupTable(ModuleStoreTestCase):
             self.assertEqual(self.user, user_by_anonymous_id(anonymous_id))
             self.assertEqual(self.user, user_by_anonymous_id(new_anonymous_id))
 
+    def test_read_only(self):
+        anonymous_id = anonymous_id_for_user(self.user, self.course.id, read_only=True)
+        # The missing entry is created by a celery task, run eagerly in tests
+        self.assertEqual(self.user, user_by_anonymous_id(anonymous_id))
+
+        # Once saved, or enqueued to be saved, the id is neither looked up nor saved again
+        user = User.objects.get(pk=self.user.id)
+        with patch('student.tasks.create_anonymous_user_ids_task.delay') as mock_delay:
+            with self.assertNumQueries(0):
+                self.assertEqual(anonymous_id, anonymous_id_for_user(user, self.course.id, read_only=True))
+        self.assertEqual(mock_delay.call_count, 0)
+
+    def test_read_only_enqueues_once(self):
+        with patch('student.tasks.create_anonymous_user_ids_task.delay') as mock_delay:
+            anonymous_id = anonymous_id_for_user(self.user, self.course.id, read_only=True)
+            user = User.objects.get(pk=self.user.id)
+            with self.assertNumQueries(0):
+                self.assertEqual(anonymous_id, anonymous_id_for_user(user, self.course.id, read_only=True))
+        self.assertEqual(mock_delay.call_count, 1)
+        self.assertEqual(mock_delay.call_args[0], ([self.user.id], unicode(self.course.id)))
+        self.assertIsNone(user_by_anonymous_id(anonymous_id))
+
+    def test_bulk(self):
+        users = [self.user] + UserFactory.create_batch(3)
+        anonymous_id_for_user(users[1], self.course.id)
+        with self.assertNumQueries(4):  # one lookup, one insert within a savepoint
+            anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+
+        for user in users:
+            self.assertEqual(anonymous_ids[user.id], anonymous_id_for_user(user, self.course.id, save=False))
+            self.assertEqual(user, user_by_anonymous_id(anonymous_ids[user.id]))
+        self.assertEqual(AnonymousUserId.objects.filter(course_id=self.course.id).count(), len(users))
+
+    def test_bulk_without_saving(self):
+        users = UserFactory.create_batch(2)
+        with self.assertNumQueries(0):
+            anonymous_ids = anonymous_ids_for_users(users, self.course.id, save=False)
+        self.assertEqual(len(anonymous_ids), 2)
+        self.assertFalse(AnonymousUserId.objects.filter(course_id=self.course.id).exists())
+
 
 @attr(shard=3)
 @skip_unless_lms
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 
 import track.tracker as tracker
 from track.backends import BaseBackend
@@ -97,6 +98,17 @@ class TestTrackerDjangoInstantiation(TestCase):
 
         self.assertEqual(len(backends), 1)
 
+    @override_settings(TRACKING_BACKENDS=SIMPLE_SETTINGS.copy())
+    def test_django_lazy_initialization(self):
+        """Test that backends not initialized at startup are on the first event."""
+
+        with patch('track.tracker._backends_initialized', False):
+            with patch.dict(tracker.backends, clear=True):
+                tracker.send({})
+
+                self.assertEqual(len(tracker.backends), 1)
+                self.assertEqual(tracker.backends.values()[0].count, 1)
+
     def _reload_backends(self):
         # pylint: disable=protected-access
 
@@ -19,11 +19,13 @@ below::
 """
 
 import inspect
+import threading
 from importlib import import_module
 
 from django.conf import settings
 from dogapi import dog_stats_api
 
+from openedx.core.lib.django_startup import is_lazy_startup
 from track.backends import BaseBackend
 
 __all__ = ['send']
@@ -31,6 +33,11 @@ __all__ = ['send']
 
 backends = {}
 
+# Whether the backends were initialized, which is deferred until the first
+# event is sent when the startup is lazy, as they may connect to databases.
+_backends_initialized = False
+_backends_lock = threading.Lock()
+
 
 def _initialize_backends_from_django_settings():
     """
@@ -38,6 +45,7 @@ def _initialize_backends_from_django_settings():
     configuration in django settings
 
     """
+    global _backends_initialized  # pylint: disable=global-statement
     backends.clear()
 
     config = getattr(settings, 'TRACKING_BACKENDS', {})
@@ -49,6 +57,8 @@ def _initialize_backends_from_django_settings():
             options = values.get('OPTIONS', {})
             backends[name] = _instantiate_backend_from_name(engine, options)
 
+    _backends_initialized = True
+
 
 def _instantiate_backend_from_name(name, options):
     """
@@ -89,9 +99,15 @@ def send(event):
     """
     dog_stats_api.increment('track.send.count')
 
+    if not _backends_initialized:
+        with _backends_lock:
+            if not _backends_initialized:
+                _initialize_backends_from_django_settings()
+
     for name, backend in backends.iteritems():
         with dog_stats_api.timer('track.send.backend.{0}'.format(name)):
             backend.send(event)
 
 
-_initialize_backends_from_django_settings()
+if not is_lazy_startup():
+    _initialize_backends_from_django_settings()
@@ -13,10 +13,12 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+import hashlib
 import logging
 import os.path
 import re
-from collections import OrderedDict
+import threading
+from collections import OrderedDict, namedtuple
 from copy import deepcopy
 from datetime import datetime
 from xml.sax.saxutils import unescape
@@ -69,8 +71,108 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# How many parsed problem trees to keep, see LoncapaProblem._parse_problem_xml
+PARSED_PROBLEM_CACHE_SIZE = 500
+
 log = logging.getLogger(__name__)
 
+
+# A parsed problem: its element tree, the positions in tree.iter() of its
+# responses and of each response's inputs, and the files it includes.  If
+# it includes files, the tree is the one of the problem definition alone,
+# without the included files, and the responses are not found yet.
+_ParsedProblem = namedtuple('_ParsedProblem', ['tree', 'responses', 'include_files'])
+
+
+class _ParsedProblemCache(object):
+    """
+    A bounded, least-recently-used cache of parsed problems.
+
+    The parsed problems only depend on the problem's definition, not on the
+    learner, so they are shared by all the LoncapaProblem instances, and
+    threads, of a process.  Their trees must never be modified:  callers get
+    copies of them.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._trees = OrderedDict()
+        self._response_xpaths = {}
+        self._input_xpaths = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached parsed problem for `key`, or None.
+        """
+        with self._lock:
+            tree = self._trees.pop(key, None)
+            if tree is not None:
+                self._trees[key] = tree
+            return tree
+
+    def set(self, key, tree):
+        """
+        Caches the parsed problem `tree` for `key`, evicting the least recently used one if the cache is full.
+        """
+        with self._lock:
+            self._trees[key] = tree
+            while len(self._trees) > self.max_size:
+                self._trees.popitem(last=False)
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._trees.clear()
+
+    def response_xpath(self):
+        """
+        Returns a compiled XPath finding the elements of the registered response types.
+        """
+        tags = tuple(responsetypes.registry.registered_tags())
+        xpath = self._response_xpaths.get(tags)
+        if xpath is None:
+            xpath = self._response_xpaths[tags] = etree.XPath('//' + "|//".join(tags))
+        return xpath
+
+    def input_xpath(self):
+        """
+        Returns a compiled XPath finding the elements of the registered input types within a response.
+        """
+        tags = tuple(inputtypes.registry.registered_tags())
+        xpath = self._input_xpaths.get(tags)
+        if xpath is None:
+            xpath = self._input_xpaths[tags] = etree.XPath('.//' + "|.//".join(tags))
+        return xpath
+
+
+PARSED_PROBLEM_CACHE = _ParsedProblemCache(PARSED_PROBLEM_CACHE_SIZE)
+
+
+def _hash_text(*texts):
+    """
+    Returns the hex digest of the SHA-1 hash of the given texts.
+    """
+    digest = hashlib.sha1()
+    for text in texts:
+        digest.update(text.encode('utf-8') if isinstance(text, unicode) else text)
+        digest.update('\0')
+    return digest.hexdigest()
+
+
+def _find_responses(tree):
+    """
+    Returns the positions in tree.iter() of the responses of the given problem tree,
+    and of each response's inputs, as a list of (response position, input positions).
+    """
+    positions = {element: position for position, element in enumerate(tree.iter())}
+    input_xpath = PARSED_PROBLEM_CACHE.input_xpath()
+    return [
+        (positions[response], [positions[entry] for entry in input_xpath(response)])
+        for response in PARSED_PROBLEM_CACHE.response_xpath()(tree)
+    ]
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -176,13 +278,9 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        self.make_xml_compatible(self.tree)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # parse problem XML file into an element tree, with any <include file="foo">
+        # tags handled, and find its responses and their inputs
+        self.tree, responses = self._parse_problem_xml(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -194,7 +292,7 @@ class LoncapaProblem(object):
         # transformations.  This also creates the dict (self.responders) of Response
         # instances for each question in the problem. The dict has keys = xml subtree of
         # Response, values = Response instance
-        self.problem_data = self._preprocess_problem(self.tree, minimal_init)
+        self.problem_data = self._preprocess_problem(self.tree, minimal_init, responses)
 
         if not minimal_init:
             if not self.student_answers:  # True when student_answers is an empty dict
@@ -604,36 +702,88 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
-    def _process_includes(self):
+    def _parse_problem_xml(self, problem_text):
+        """
+        Returns the problem's element tree, made compatible and with its includes processed,
+        and the list of its (response, inputs) elements.
+
+        None of this depends on the seed or the learner, so it is only done once per version
+        of the problem definition, and of the files it includes, and each problem instance
+        gets its own copy of the tree, which is much cheaper than parsing.  The included
+        files are read every time, since they may change independently of the problem
+        definition.
+        """
+        cache_key = _hash_text(problem_text)
+        parsed = PARSED_PROBLEM_CACHE.get(cache_key)
+        if parsed is None:
+            tree = etree.XML(problem_text)
+            self.make_xml_compatible(tree)
+            include_files = tuple(OrderedDict.fromkeys(
+                inc.get('file') for inc in tree.findall('.//include') if inc.get('file') is not None
+            ))
+            parsed = _ParsedProblem(tree, None if include_files else _find_responses(tree), include_files)
+            PARSED_PROBLEM_CACHE.set(cache_key, parsed)
+
+        if parsed.include_files:
+            included_files = self._read_included_files(parsed.include_files)
+            cache_key = _hash_text(cache_key, *(
+                part for filename, contents in included_files.iteritems() for part in (filename, contents or '')
+            ))
+            included = PARSED_PROBLEM_CACHE.get(cache_key)
+            if included is None:
+                tree = deepcopy(parsed.tree)
+                self._process_includes(tree, included_files)
+                included = _ParsedProblem(tree, _find_responses(tree), ())
+                PARSED_PROBLEM_CACHE.set(cache_key, included)
+            parsed = included
+
+        tree = deepcopy(parsed.tree)
+        elements = list(tree.iter())
+        responses = [
+            (elements[response], [elements[entry] for entry in entries])
+            for response, entries in parsed.responses
+        ]
+        return tree, responses
+
+    def _read_included_files(self, filenames):
+        """
+        Returns an OrderedDict of the contents of the given included files, by filename.
+        Fails gracefully if debugging, with None as the contents of the files which can't be read.
+        """
+        included_files = OrderedDict()
+        for filename in filenames:
+            try:
+                # open using LoncapaSystem OSFS filestore
+                ifp = self.capa_system.filestore.open(filename)
+            except Exception as err:
+                log.warning('Error %s in problem xml include: %s', err, filename)
+                log.warning(
+                    'Cannot find file %s in %s', filename, self.capa_system.filestore
+                )
+                # if debugging, don't fail - just log error
+                # TODO (vshnayder): need real error handling, display to users
+                if not self.capa_system.DEBUG:
+                    raise
+                else:
+                    included_files[filename] = None
+                    continue
+            included_files[filename] = ifp.read()
+        return included_files
+
+    def _process_includes(self, tree, included_files):
         """
-        Handle any <include file="foo"> tags by reading in the specified file and inserting it
-        into our XML tree.  Fail gracefully if debugging.
+        Handle any <include file="foo"> tags by inserting the contents of the specified file,
+        as read by _read_included_files, into the XML tree.  Fail gracefully if debugging.
         """
-        includes = self.tree.findall('.//include')
+        includes = tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
             if filename is not None:
+                if included_files[filename] is None:
+                    continue
                 try:
-                    # open using LoncapaSystem OSFS filestore
-                    ifp = self.capa_system.filestore.open(filename)
-                except Exception as err:
-                    log.warning(
-                        'Error %s in problem xml include: %s',
-                        err,
-                        etree.tostring(inc, pretty_print=True)
-                    )
-                    log.warning(
-                        'Cannot find file %s in %s', filename, self.capa_system.filestore
-                    )
-                    # if debugging, don't fail - just log error
-                    # TODO (vshnayder): need real error handling, display to users
-                    if not self.capa_system.DEBUG:
-                        raise
-                    else:
-                        continue
-                try:
-                    # read in and convert to XML
-                    incxml = etree.XML(ifp.read())
+                    # convert to XML
+                    incxml = etree.XML(included_files[filename])
                 except Exception as err:
                     log.warning(
                         'Error %s in problem xml include: %s',
@@ -867,9 +1017,9 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree, minimal_init):  # private
+    def _preprocess_problem(self, tree, minimal_init, responses):  # private
         """
-        Assign IDs to all the responses
+        Assign IDs to all the responses, given as the (response, inputs) elements of the tree
         Assign sub-IDs to all entries (textline, schematic, etc.)
         Annoted correctness and value
         In-place transformation
@@ -881,18 +1031,13 @@ class LoncapaProblem(object):
         response_id = 1
         problem_data = {}
         self.responders = {}
-        for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
+        for response, inputfields in responses:
             responsetype_id = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
             response.set('id', responsetype_id)
             response_id += 1
 
             answer_id = 1
-            input_tags = inputtypes.registry.registered_tags()
-            inputfields = tree.xpath(
-                "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
-                id=responsetype_id
-            )
 
             # assign one answer_id for each input type
             for entry in inputfields:
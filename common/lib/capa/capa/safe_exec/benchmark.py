@@ -0,0 +1,61 @@
+"""
+Benchmark of safe_exec for a typical Python-graded problem, with and without
+the pool of warm sandboxes.
+
+Run it where codejail's sandbox is set up, e.g.:
+
+    python -m capa.safe_exec.benchmark --python-bin /edx/app/edxapp/venvs/edxapp-sandbox/bin/python
+
+"""
+import argparse
+import time
+
+from codejail import jail_code
+
+from capa.safe_exec import pool, safe_exec
+
+# The kind of code a customresponse runs to check an answer.
+CHECK_CODE = """\
+expected = numpy.array([1.0, 2.0, 3.0])
+answer = numpy.array([float(x) for x in submission.split(',')])
+correct = bool(numpy.allclose(expected, answer, rtol=tolerance))
+"""
+
+
+def checks_per_second(num_checks):
+    """
+    Returns the number of checks safe_exec runs per second.
+    """
+    start = time.time()
+    for _ in xrange(num_checks):
+        globals_dict = {"submission": "1.0, 2.0, 3.0001", "tolerance": 0.001}
+        safe_exec(CHECK_CODE, globals_dict, random_seed=1)
+        assert globals_dict["correct"]
+    return num_checks / (time.time() - start)
+
+
+def main():
+    """
+    Runs the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--python-bin", required=True, help="sandboxed Python executable")
+    parser.add_argument("--user", default=None, help="user to run the sandbox as")
+    parser.add_argument("--checks", type=int, default=100, help="number of checks to run")
+    parser.add_argument("--pool-size", type=int, default=1)
+    parser.add_argument("--max-executions", type=int, default=100)
+    args = parser.parse_args()
+
+    jail_code.configure("python", args.python_bin, user=args.user)
+
+    pool.configure(0)
+    print "codejail:  {:.1f} checks/sec".format(checks_per_second(args.checks))
+
+    pool.configure(args.pool_size, args.max_executions)
+    checks_per_second(1)  # start the zygote
+    print "pool:      {:.1f} checks/sec".format(checks_per_second(args.checks))
+    pool.configure(0)
+
+
+if __name__ == "__main__":
+    main()
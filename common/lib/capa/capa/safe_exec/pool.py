@@ -0,0 +1,364 @@
+"""
+A pool of warm sandboxed Python processes for capa's safe_exec.
+
+Running code with codejail starts a fresh sandboxed interpreter for every
+execution, which then has to import numpy, scipy and the like before the
+problem's code can run.  Most of the time of a typical Python-graded check
+is spent doing just that.
+
+Each worker of the pool is a "zygote": a sandboxed interpreter, started with
+the same command, user and AppArmor profile as codejail's, which imports the
+commonly used modules once and then forks a fresh child process for every
+execution.  The code runs in the child, in its own session and private
+temporary directory, with the jail's resource limits applied, and the child
+exits when it is done, so executions never share any state.  The zygote
+kills the child's process group once it responds, or once it exceeds the
+jail's REALTIME limit.  Zygotes are recycled after a number of executions, and whenever one
+of them misbehaves.
+
+The pool is only used once it has been configured with `configure`, and only
+when codejail itself is configured to run sandboxed Python.
+"""
+import json
+import logging
+import os
+import select
+import subprocess
+import threading
+import time
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+
+log = logging.getLogger(__name__)
+
+# Modules imported by the zygotes before forking, so executions find them warm.
+PRELOAD_MODULES = [
+    "numpy",
+    "math",
+    "scipy",
+    "calc",
+    "eia",
+    "chem.chemcalc",
+    "chem.chemtools",
+    "chem.miller",
+    "verifiers.draganddrop",
+]
+
+# The program run by each zygote, inside the sandbox.  It reads one JSON
+# request per line on stdin, and writes one JSON response per line on stdout.
+ZYGOTE_PY = r"""
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+for name in %(preload)r:
+    try:
+        __import__(name)
+    except Exception:
+        pass
+
+OK_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)
+
+# The pid of the child running code, which is also its process group id.
+child = {"pid": None}
+
+
+def json_safe(d):
+    jd = {}
+    for k, v in d.iteritems():
+        if k == "__builtins__" or not isinstance(v, OK_TYPES):
+            continue
+        try:
+            jd[k] = json.loads(json.dumps(v))
+        except Exception:
+            continue
+    return jd
+
+
+def kill_child():
+    if child["pid"] is None:
+        return
+    for kill in (os.killpg, os.kill):
+        try:
+            kill(child["pid"], signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def terminate(signum, frame):
+    kill_child()
+    os._exit(1)
+
+
+def run(request, write_fd, tmpdir):
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = sys.stdout = os.fdopen(devnull, "r+")
+    os.chdir(tmpdir)
+    os.environ["TMPDIR"] = tmpdir
+    limits = request["limits"]
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (limits.get("FSIZE", 0), limits.get("FSIZE", 0)))
+    if limits.get("CPU"):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits["CPU"], limits["CPU"]))
+    if limits.get("VMEM"):
+        resource.setrlimit(resource.RLIMIT_AS, (limits["VMEM"], limits["VMEM"]))
+    globals_dict = request["globals"]
+    try:
+        exec(compile(request["code"], "jailed_code", "exec"), globals_dict)
+        response = {"globals": json_safe(globals_dict)}
+    except BaseException:
+        response = {"error": traceback.format_exc()}
+    with os.fdopen(write_fd, "w") as result:
+        result.write(json.dumps(response))
+
+
+def read_response(read_fd, realtime):
+    chunks = []
+    deadline = time.time() + realtime if realtime else None
+    while True:
+        timeout = max(deadline - time.time(), 0) if deadline is not None else None
+        readable, _, _ = select.select([read_fd], [], [], timeout)
+        if not readable:
+            return None
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            return "".join(chunks)
+        chunks.append(chunk)
+
+
+signal.signal(signal.SIGTERM, terminate)
+sys.stdout.write("ready\n")
+sys.stdout.flush()
+while True:
+    line = sys.stdin.readline()
+    if not line:
+        break
+    request = json.loads(line)
+    tmpdir = tempfile.mkdtemp(prefix="codejail-")
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            run(request, write_fd, tmpdir)
+        finally:
+            os._exit(0)
+    child["pid"] = pid
+    os.close(write_fd)
+    response = read_response(read_fd, request["limits"].get("REALTIME"))
+    os.close(read_fd)
+    # Kill the whole process group, whether the code timed out or left
+    # processes behind.
+    kill_child()
+    _, status = os.waitpid(pid, 0)
+    child["pid"] = None
+    shutil.rmtree(tmpdir, ignore_errors=True)
+    if response is None:
+        response = json.dumps({"error": "process exceeded the real time limit"})
+    elif not response:
+        response = json.dumps({"error": "process exited with status %%d" %% status})
+    sys.stdout.write(response + "\n")
+    sys.stdout.flush()
+"""
+
+# Seconds allowed to a zygote for starting up and importing PRELOAD_MODULES.
+STARTUP_TIMEOUT = 30
+# Seconds added to the jail's REALTIME limit before giving up on a zygote's response.
+RESPONSE_GRACE_TIME = 2
+# Seconds allowed to a zygote for killing its child and exiting when closed.
+CLOSE_TIMEOUT = 2
+
+
+class SandboxWorkerError(Exception):
+    """
+    Raised when a zygote fails, as opposed to the code it executed.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A zygote process, and the number of executions it has served.
+    """
+    def __init__(self, command, preload=None):
+        self.executions = 0
+        self.process = subprocess.Popen(
+            command + ["-c", ZYGOTE_PY % {"preload": preload if preload is not None else PRELOAD_MODULES}],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=open(os.devnull, "w"),
+            env={},
+            close_fds=True,
+        )
+        if self._readline(STARTUP_TIMEOUT) != "ready":
+            self.close()
+            raise SandboxWorkerError("Sandbox worker failed to start")
+
+    def execute(self, code, globals_dict, limits):
+        """
+        Executes `code` in a fresh child of the zygote.  Returns the resulting
+        JSON-safe globals, or raises SafeExecException if the code failed.
+        """
+        self.executions += 1
+        request = {"code": code, "globals": json_safe(globals_dict), "limits": limits}
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except IOError:
+            raise SandboxWorkerError("Sandbox worker is gone")
+
+        timeout = (limits.get("REALTIME") or STARTUP_TIMEOUT) + RESPONSE_GRACE_TIME
+        line = self._readline(timeout)
+        try:
+            response = json.loads(line)
+        except ValueError:
+            raise SandboxWorkerError("Sandbox worker returned an invalid response: {!r}".format(line))
+        if "error" in response:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response["error"]))
+        return response["globals"]
+
+    def close(self):
+        """
+        Terminates the zygote, which kills the process group of the child
+        running code, if any, before exiting.  Kills the zygote if it
+        doesn't exit in time.
+        """
+        if self.process.poll() is None:
+            self.process.terminate()
+            deadline = time.time() + CLOSE_TIMEOUT
+            while self.process.poll() is None and time.time() < deadline:
+                time.sleep(0.01)
+            if self.process.poll() is None:
+                self.process.kill()
+        self.process.wait()
+
+    def _readline(self, timeout):
+        """
+        Reads a line from the zygote, waiting at most `timeout` seconds.
+        """
+        readable, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not readable:
+            raise SandboxWorkerError("Sandbox worker timed out")
+        line = self.process.stdout.readline()
+        if not line:
+            raise SandboxWorkerError("Sandbox worker exited")
+        return line.rstrip("\n")
+
+
+class SandboxPool(object):
+    """
+    A pool of zygotes, started on demand, up to `size` of them.
+
+    Each zygote serves at most `max_executions` executions before being
+    replaced.  `command` defaults to codejail's configured sandboxed Python.
+    """
+    def __init__(self, size, max_executions, command=None, preload=None):
+        self.size = size
+        self.max_executions = max_executions
+        self.command = command
+        self.preload = preload
+        self._lock = threading.Lock()
+        self._idle = []
+        self._pid = os.getpid()
+
+    def execute(self, code, globals_dict):
+        """
+        Executes `code` with access to `globals_dict`, like codejail's safe_exec,
+        updating `globals_dict` with the results.
+        """
+        worker = self._acquire()
+        try:
+            results = worker.execute(code, globals_dict, dict(getattr(jail_code, "LIMITS", {})))
+        except SandboxWorkerError:
+            log.exception("Discarding sandbox worker after %d executions", worker.executions)
+            worker.close()
+            raise SafeExecException("Couldn't execute jailed code: sandbox worker failed")
+        except SafeExecException:
+            self._release(worker)
+            raise
+        self._release(worker)
+        globals_dict.update(results)
+
+    def close(self):
+        """
+        Kills all the idle zygotes.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+    def _acquire(self):
+        """
+        Returns an idle zygote, starting a new one if there is none.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                # The pool was inherited from a parent process, e.g. by a
+                # forking web server:  its zygotes belong to the parent.
+                self._idle = []
+                self._pid = os.getpid()
+            if self._idle:
+                return self._idle.pop()
+        try:
+            return SandboxWorker(self.command or sandbox_command(), self.preload)
+        except (OSError, SandboxWorkerError):
+            log.exception("Unable to start sandbox worker")
+            raise SafeExecException("Couldn't execute jailed code: unable to start sandbox worker")
+
+    def _release(self, worker):
+        """
+        Returns a zygote to the pool, unless it is due to be recycled.
+        """
+        with self._lock:
+            if worker.executions < self.max_executions and len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.close()
+
+
+def sandbox_command():
+    """
+    Returns the command codejail uses to start sandboxed Python.
+    """
+    python = jail_code.COMMANDS["python"]
+    command = []
+    if python["user"]:
+        command.extend(["sudo", "-u", python["user"]])
+    command.extend(python["cmdline_start"])
+    return command
+
+
+_POOL = None
+
+
+def configure(size, max_executions=100):
+    """
+    Configures safe_exec to run sandboxed code in a pool of at most `size`
+    warm zygotes, each recycled after `max_executions` executions.
+    A `size` of 0 disables the pool.
+    """
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is not None:
+        _POOL.close()
+    _POOL = SandboxPool(size, max_executions) if size else None
+
+
+def get_pool():
+    """
+    Returns the configured pool, or None if code should be run by codejail directly.
+    """
+    if _POOL is not None and jail_code.is_configured("python"):
+        return _POOL
+    return None
@@ -4,6 +4,7 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from . import pool
 from dogapi import dog_stats_api
 
 import hashlib
@@ -73,6 +74,20 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def _pool_exec(sandbox_pool):
+    """
+    Returns a function with the signature of codejail's safe_exec, which
+    executes the code in `sandbox_pool`.
+    """
+    @dog_stats_api.timed('capa.safe_exec.pool.time')
+    def exec_fn(code, globals_dict, python_path=None, extra_files=None, slug=None):  # pylint: disable=unused-argument
+        """
+        Executes `code` in a warm sandbox from the pool.
+        """
+        sandbox_pool.execute(code, globals_dict)
+    return exec_fn
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -130,9 +145,13 @@ def safe_exec(
     # Create the complete code we'll run.
     code_prolog = CODE_PROLOG % random_seed
 
-    # Decide which code executor to use.
+    # Decide which code executor to use.  The pool of warm sandboxes can't
+    # provide files to the code, so those executions go through codejail.
+    sandbox_pool = pool.get_pool()
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif sandbox_pool is not None and not python_path and not extra_files:
+        exec_fn = _pool_exec(sandbox_pool)
     else:
         exec_fn = codejail_safe_exec
 
@@ -0,0 +1,73 @@
+"""Test pool.py"""
+
+import os
+import sys
+import time
+import unittest
+
+from codejail.safe_exec import SafeExecException
+from mock import patch
+
+from capa.safe_exec import pool
+from capa.safe_exec.pool import SandboxPool
+
+
+class TestSandboxPool(unittest.TestCase):
+    """
+    Runs the pool's zygotes with the current interpreter, outside of any sandbox.
+    """
+    def setUp(self):
+        super(TestSandboxPool, self).setUp()
+        self.pool = SandboxPool(size=1, max_executions=3, command=[sys.executable], preload=["math"])
+        self.addCleanup(self.pool.close)
+
+    def test_set_values(self):
+        g = {"x": 2}
+        self.pool.execute("a = x * 21", g)
+        self.assertEqual(g["a"], 42)
+
+    def test_printing_is_ignored(self):
+        g = {}
+        self.pool.execute("print 'hello'\na = 1", g)
+        self.assertEqual(g["a"], 1)
+
+    def test_raising_exceptions(self):
+        g = {}
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.execute("1/0", g)
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+        self.assertEqual(g, {})
+
+    def test_executions_are_isolated(self):
+        self.pool.execute("import math\nmath.leaked = True", {})
+        g = {}
+        self.pool.execute("import math\nleaked = hasattr(math, 'leaked')", g)
+        self.assertFalse(g["leaked"])
+
+    def test_zygotes_are_reused_then_recycled(self):
+        self.pool.execute("a = 1", {})
+        worker = self.pool._idle[0]  # pylint: disable=protected-access
+        self.pool.execute("a = 1", {})
+        self.assertIs(self.pool._idle[0], worker)  # pylint: disable=protected-access
+        self.pool.execute("a = 1", {})
+        self.assertEqual(self.pool._idle, [])  # pylint: disable=protected-access
+        self.assertIsNotNone(worker.process.poll())
+
+    def test_realtime_limit(self):
+        with patch.object(pool.jail_code, "LIMITS", {"REALTIME": 1}, create=True):
+            start = time.time()
+            with self.assertRaises(SafeExecException) as cm:
+                self.pool.execute("import signal, time\nsignal.alarm(0)\ntime.sleep(60)", {})
+        self.assertIn("real time limit", cm.exception.message)
+        self.assertLess(time.time() - start, 10)
+
+    def test_runs_in_private_session_and_directory(self):
+        g = {}
+        self.pool.execute("import os\nsid = os.getsid(0)\npid = os.getpid()\ncwd = os.getcwd()", g)
+        self.assertEqual(g["sid"], g["pid"])
+        self.assertIn("codejail-", g["cwd"])
+        self.assertFalse(os.path.exists(g["cwd"]))
+
+    def test_no_file_writes(self):
+        with self.assertRaises(SafeExecException):
+            self.pool.execute("f = open('out.txt', 'w')\nf.write('x' * 10)\nf.close()", {})
@@ -4,9 +4,12 @@ Test capa problem.
 import ddt
 import textwrap
 from lxml import etree
+from mock import Mock, patch
+from StringIO import StringIO
 import unittest
 
-from capa.tests.helpers import new_loncapa_problem
+from capa import capa_problem
+from capa.tests.helpers import new_loncapa_problem, test_capa_system
 
 
 @ddt.ddt
@@ -590,3 +593,71 @@ class CAPAMultiInputProblemTest(unittest.TestCase):
             description_element = multi_inputs_group.xpath('//p[@id="{}"]'.format(description_id))
             self.assertEqual(len(description_element), 1)
             self.assertEqual(description_element[0].text, descriptions[index])
+
+
+class ParsedProblemCacheTest(unittest.TestCase):
+    """
+    Test that parsed problem trees are shared between problem instances.
+    """
+    xml = textwrap.dedent("""
+        <problem>
+            <optionresponse>
+                <optioninput options="('yellow','blue','green')" correct="blue" label="color"/>
+            </optionresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(ParsedProblemCacheTest, self).setUp()
+        capa_problem.PARSED_PROBLEM_CACHE.clear()
+        self.addCleanup(capa_problem.PARSED_PROBLEM_CACHE.clear)
+
+    def test_problem_is_parsed_once(self):
+        with patch.object(capa_problem.etree, 'XML', wraps=etree.XML) as mock_xml:
+            first = new_loncapa_problem(self.xml)
+            second = new_loncapa_problem(self.xml, problem_id='2', seed=1)
+        self.assertEqual(mock_xml.call_count, 1)
+        self.assertIsNot(first.tree, second.tree)
+        self.assertEqual(first.get_question_answers().values(), ['blue'])
+        self.assertEqual(second.get_question_answers().values(), ['blue'])
+
+    def test_instances_do_not_share_trees(self):
+        first = new_loncapa_problem(self.xml)
+        first.tree.find('.//optioninput').set('correct', 'green')
+        second = new_loncapa_problem(self.xml)
+        self.assertEqual(second.tree.find('.//optioninput').get('correct'), 'blue')
+
+    def test_problem_with_includes_is_cached_by_included_contents(self):
+        xml = textwrap.dedent("""
+            <problem>
+                <include file="included.xml"/>
+            </problem>
+        """)
+        capa_system = test_capa_system()
+        capa_system.filestore = Mock()
+        with patch.object(capa_problem.etree, 'XML', wraps=etree.XML) as mock_xml:
+            for correct, num_parsed in (('blue', 2), ('blue', 2), ('green', 3)):
+                included = textwrap.dedent("""
+                    <optionresponse>
+                        <optioninput options="('yellow','blue','green')" correct="{}" label="color"/>
+                    </optionresponse>
+                """.format(correct))
+                capa_system.filestore.open.side_effect = lambda filename, included=included: StringIO(included)
+                problem = new_loncapa_problem(xml, capa_system=capa_system)
+                self.assertEqual(mock_xml.call_count, num_parsed)
+                self.assertEqual(problem.get_question_answers().values(), [correct])
+
+    def test_responses_found_in_copied_tree(self):
+        new_loncapa_problem(self.xml)
+        problem = new_loncapa_problem(self.xml, problem_id='2')
+        response = problem.tree.find('.//optionresponse')
+        self.assertEqual(problem.responders.keys(), [response])
+        self.assertEqual(response.get('id'), '2_1')
+        self.assertEqual(response.find('optioninput').get('id'), '2_2_1')
+
+    def test_cache_is_bounded(self):
+        cache = capa_problem._ParsedProblemCache(max_size=2)  # pylint: disable=protected-access
+        for key in ('a', 'b', 'c'):
+            cache.set(key, etree.Element(key))
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c').tag, 'c')
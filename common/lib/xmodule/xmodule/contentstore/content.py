@@ -380,9 +380,12 @@ class ContentStore(object):
         """
         raise NotImplementedError
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(self, source_course_key, dest_course_key, share_content=False):
         """
         Copy all the course assets from source_course_key to dest_course_key
+
+        If share_content is set, the copies may share the content of the source assets rather than
+        duplicate it.
         """
         raise NotImplementedError
 
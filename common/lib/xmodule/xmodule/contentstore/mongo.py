@@ -2,11 +2,17 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import calendar
 import os
 import json
+import tarfile
+import time
+from cStringIO import StringIO
+from datetime import datetime
+
 import pymongo
 import gridfs
-from gridfs.errors import NoFile
+from gridfs.errors import FileExists, NoFile
 from fs.osfs import OSFS
 from bson.son import SON
 
@@ -19,6 +25,9 @@ from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 from .content import StaticContent, ContentStore, StaticContentStream
 
+# Attributes of assets sharing their content, maintained by the contentstore.
+SHARED_CONTENT_ATTRS = ['content_ref', 'content_refs']
+
 
 class MongoContentStore(ContentStore):
     """
@@ -109,16 +118,67 @@ class MongoContentStore(ContentStore):
         """
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
+        self._release_content(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
 
+    def _release_content(self, content_id):
+        """
+        Releases the content of the given asset before it's deleted.
+
+        Content shared by assets copied with share_content is stored once, in
+        the chunks of the asset it was first uploaded as (its owner), which
+        counts the assets referencing it in content_refs.  Deleting one of the
+        references decrements that count, while deleting the owner hands its
+        chunks over to one of the references, which becomes the new owner.
+        The references are looked up rather than trusting the count, which is
+        only informative.
+        """
+        entry = self.fs_files.find_one({'_id': content_id}, {'content_ref': True})
+        if entry is None:
+            return
+        if entry.get('content_ref') is not None:
+            self.fs_files.update({'_id': self._owner_id(entry['content_ref'])}, {'$inc': {'content_refs': -1}})
+        else:
+            references = [
+                self.make_id_son(reference)
+                for reference in self.fs_files.find({'content_ref': content_id}, {'_id': True})
+            ]
+            if not references:
+                return
+            new_owner_id = references[0]
+            self.chunks.update({'files_id': content_id}, {'$set': {'files_id': new_owner_id}}, multi=True)
+            self.fs_files.update(
+                {'_id': new_owner_id},
+                {'$unset': {'content_ref': ''}, '$set': {'content_refs': len(references) - 1}},
+            )
+            self.fs_files.update({'content_ref': content_id}, {'$set': {'content_ref': new_owner_id}}, multi=True)
+
+    def _owner_id(self, content_ref):
+        """
+        Returns the _id of the asset owning the content referenced by the given
+        content_ref, ordered as stored.
+        """
+        return self.make_id_son({'_id': content_ref})
+
+    def _get_with_content(self, content_id):
+        """
+        Returns the GridOut of the given asset, and the GridOut its content is
+        read from, which is the one of the owner of its content if shared.
+        """
+        fp = self.fs.get(content_id)
+        content_ref = getattr(fp, 'content_ref', None)
+        if content_ref is None:
+            return fp, fp
+        return fp, self.fs.get(self._owner_id(content_ref))
+
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
         content_id, __ = self.asset_db_key(location)
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
+                fp, content_fp = self._get_with_content(content_id)
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
@@ -126,14 +186,15 @@ class MongoContentStore(ContentStore):
                         thumbnail_location[4]
                     )
                 return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                    location, fp.displayname, fp.content_type, content_fp, last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
                     length=fp.length, locked=getattr(fp, 'locked', False),
                     content_digest=getattr(fp, 'md5', None),
                 )
             else:
-                with self.fs.get(content_id) as fp:
+                fp, content_fp = self._get_with_content(content_id)
+                with fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
                     if thumbnail_location:
                         thumbnail_location = location.course_key.make_asset_key(
@@ -141,7 +202,7 @@ class MongoContentStore(ContentStore):
                             thumbnail_location[4]
                         )
                     return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
+                        location, fp.displayname, fp.content_type, content_fp.read(), last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
                         length=fp.length, locked=getattr(fp, 'locked', False),
@@ -182,7 +243,6 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
-        policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
@@ -195,12 +255,61 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+            json.dump(self._export_policy(assets), f, sort_keys=True, indent=4)
+
+    def export_all_for_course_to_tar(self, course_key, tar_file, static_arcname, assets_policy_arcname, progress=None):
+        """
+        Export all of this course's assets to the given tar file, like export_all_for_course, but
+        reading their content from GridFS in chunks, without writing it to disk.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            tar_file (tarfile.TarFile): the tar file, opened for writing
+            static_arcname: the path in the tar file under which to put all the asset files
+            assets_policy_arcname: the path in the tar file of the policy file
+            progress: an optional function called with the number of bytes of asset content
+                exported so far and the total number of bytes of asset content to export,
+                after each asset
+        """
+        assets, __ = self.get_all_content_for_course(course_key)
+        total_bytes = sum(asset['length'] for asset in assets)
+        exported_bytes = 0
+
+        for asset in assets:
+            content_id, __ = self.asset_db_key(asset['asset_key'])
+            fp, content_fp = self._get_with_content(content_id)
+            arcname = escape_invalid_characters(name=fp.displayname, invalid_char_list=['/', '\\'])
+            import_path = getattr(fp, 'import_path', None)
+            if import_path is not None:
+                arcname = os.path.join(os.path.dirname(import_path), arcname)
+            tar_info = tarfile.TarInfo(os.path.join(static_arcname, arcname))
+            tar_info.size = fp.length
+            tar_info.mtime = calendar.timegm(fp.uploadDate.utctimetuple())
+            tar_file.addfile(tar_info, content_fp)
+
+            exported_bytes += fp.length
+            if progress:
+                progress(exported_bytes, total_bytes)
+
+        policy = json.dumps(self._export_policy(assets), sort_keys=True, indent=4)
+        tar_info = tarfile.TarInfo(assets_policy_arcname)
+        tar_info.size = len(policy)
+        tar_info.mtime = time.time()
+        tar_file.addfile(tar_info, StringIO(policy))
+
+    @staticmethod
+    def _export_policy(assets):
+        """
+        Returns the policy of the given assets, mapping their names to their exported attributes.
+        """
+        policy = {}
+        for asset in assets:
+            for attr, value in asset.iteritems():
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key'] + SHARED_CONTENT_ATTRS:
+                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
+        return policy
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
@@ -222,12 +331,11 @@ class MongoContentStore(ContentStore):
                 ('{}.category'.format(prefix), 'asset'),
                 ('{}.name'.format(prefix), {'$regex': ASSET_IGNORE_REGEX}),
             ])
-            items = self.fs_files.find(query)
-            assets_to_delete = assets_to_delete + items.count()
+            # Deleted through delete, since the content of other assets may be shared with them.
+            items = list(self.fs_files.find(query, {'_id': True}))
+            assets_to_delete = assets_to_delete + len(items)
             for asset in items:
-                self.fs.delete(asset[prefix])
-
-            self.fs_files.remove(query)
+                self.delete(self.make_id_son(asset))
         return assets_to_delete
 
     @autoretry_read()
@@ -305,7 +413,7 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.iterkeys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length'] + SHARED_CONTENT_ATTRS:
                 raise AttributeError("{} is a protected attribute.".format(attr))
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
@@ -330,21 +438,25 @@ class MongoContentStore(ContentStore):
             raise NotFoundError(asset_db_key)
         return item
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(self, source_course_key, dest_course_key, share_content=False):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation fairly expensively copies all of the data, unless share_content is set,
+        in which case only the attributes of the assets are copied, and the copies reference the
+        content of the source assets, which is stored once per digest.
         """
         source_query = query_for_course(source_course_key)
+        # owners of the content of the copied assets, by digest and length
+        owners = {}
         # it'd be great to figure out how to do all of this on the db server and not pull the bits over
         for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
+            source_id = self.make_id_son(asset)
             # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, basestring):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
+            if isinstance(source_id, basestring):
+                __, asset_key = self.asset_db_key(AssetKey.from_string(source_id))
+            else:
+                asset_key = SON(source_id)
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -357,32 +469,61 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
+            attrs = dict(
+                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
+                displayname=asset['displayname'], content_son=asset_key,
+                # thumbnail is not technically correct but will be functionally correct as the code
+                # only looks at the name which is not course relative.
+                thumbnail_location=asset['thumbnail_location'],
+                import_path=asset['import_path'],
+                # getattr b/c caching may mean some pickled instances don't have attr
+                locked=asset.get('locked', False)
+            )
             try:
-                self.fs.put(
-                    source_content.read(),
-                    _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                    displayname=asset['displayname'], content_son=asset_key,
-                    # thumbnail is not technically correct but will be functionally correct as the code
-                    # only looks at the name which is not course relative.
-                    thumbnail_location=asset['thumbnail_location'],
-                    import_path=asset['import_path'],
-                    # getattr b/c caching may mean some pickled instances don't have attr
-                    locked=asset.get('locked', False)
-                )
-            except FileExists:
+                if share_content:
+                    owner_id = source_id
+                    if asset.get('content_ref') is not None:
+                        owner_id = self._owner_id(asset['content_ref'])
+                    if asset.get('md5') is not None:
+                        owner_id = owners.setdefault((asset['md5'], asset['length']), owner_id)
+                    self._put_content_reference(owner_id, asset, **attrs)
+                else:
+                    __, content_fp = self._get_with_content(source_id)
+                    self.fs.put(content_fp.read(), **attrs)
+            except (FileExists, pymongo.errors.DuplicateKeyError):
                 pass
 
+    def _put_content_reference(self, owner_id, source, **attrs):
+        """
+        Stores an asset with the given attributes, referencing the content of
+        the given owner instead of storing its own, which must be the same as
+        the content of the given source asset.
+        """
+        entry = SON([
+            ('_id', attrs.pop('_id')),
+            ('contentType', attrs.pop('content_type')),
+            ('length', source['length']),
+            ('chunkSize', source['chunkSize']),
+            ('uploadDate', datetime.utcnow()),
+            ('md5', source.get('md5')),
+        ])
+        entry.update(attrs)
+        entry['content_ref'] = owner_id
+        self.fs_files.insert(entry)
+        self.fs_files.update({'_id': owner_id}, {'$inc': {'content_refs': 1}})
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
-        referenced by other runs or other courses.
+        referenced by other runs or other courses. Content shared with the assets of other courses
+        is kept for them.
         :param course_key:
         """
         course_query = query_for_course(course_key)
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self.delete(asset_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -505,6 +646,13 @@ class MongoContentStore(ContentStore):
             sparse=True,
             background=True
         )
+        # Needed to hand the content of assets over to the assets referencing it when they are deleted
+        create_collection_index(
+            self.fs_files,
+            [('content_ref', pymongo.ASCENDING)],
+            sparse=True,
+            background=True
+        )
 
 
 def query_for_course(course_key, category=None):
@@ -12,6 +12,7 @@ from pytz import UTC
 from collections import defaultdict
 from contextlib import contextmanager
 import threading
+import time
 from operator import itemgetter
 from sortedcontainers import SortedListWithKey
 
@@ -1331,11 +1332,20 @@ class ModuleStoreWriteBase(ModuleStoreReadBase, ModuleStoreWrite):
         """
         This base method just copies the assets. The lower level impls must do the actual cloning of
         content.
+
+        If share_asset_content is passed as True, the copied assets share the content of the source
+        assets instead of duplicating it.
         """
         with self.bulk_operations(dest_course_id):
             # copy the assets
             if self.contentstore:
-                self.contentstore.copy_all_course_assets(source_course_id, dest_course_id)
+                start = time.time()
+                self.contentstore.copy_all_course_assets(
+                    source_course_id, dest_course_id, share_content=kwargs.get('share_asset_content', False)
+                )
+                log.info(
+                    u'Copied the assets of %s to %s in %.3fs', source_course_id, dest_course_id, time.time() - start
+                )
             return dest_course_id
 
     def delete_course(self, course_key, user_id, **kwargs):
@@ -333,36 +333,59 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         :param xblock: the block to check
         :return: True if the draft and published versions differ
         """
-        def get_course(branch_name):
-            return self._lookup_course(xblock.location.course_key.for_branch(branch_name)).structure
+        course_key = xblock.location.course_key
+        draft_course = self._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.draft)).structure
+        published_course = self._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.published)).structure
+        changes = self._get_changes_map(course_key, draft_course, published_course)
 
-        def get_block(course_structure, block_key):
-            return self._get_block_from_structure(course_structure, block_key)
+        def has_changes_subtree(block_key):
+            if block_key not in changes:
+                changes[block_key] = self._block_has_changes(
+                    draft_course, published_course, block_key, has_changes_subtree
+                )
+            return changes[block_key]
 
-        draft_course = get_course(ModuleStoreEnum.BranchName.draft)
-        published_course = get_course(ModuleStoreEnum.BranchName.published)
+        return has_changes_subtree(BlockKey.from_usage_key(xblock.location))
 
-        def has_changes_subtree(block_key):
-            draft_block = get_block(draft_course, block_key)
-            if draft_block is None:  # temporary fix for bad pointers TNL-1141
-                return True
-            published_block = get_block(published_course, block_key)
-            if published_block is None:
-                return True
+    def _block_has_changes(self, draft_course, published_course, block_key, has_changes_subtree):
+        """
+        Returns whether the given block differs between the draft and the
+        published structures, using has_changes_subtree for its children.
+        """
+        draft_block = self._get_block_from_structure(draft_course, block_key)
+        if draft_block is None:  # temporary fix for bad pointers TNL-1141
+            return True
+        published_block = self._get_block_from_structure(published_course, block_key)
+        if published_block is None:
+            return True
 
-            # check if the draft has changed since the published was created
-            if self._get_version(draft_block) != self._get_version(published_block):
-                return True
+        # check if the draft has changed since the published was created
+        if self._get_version(draft_block) != self._get_version(published_block):
+            return True
 
-            # check the children in the draft
-            if 'children' in draft_block.fields:
-                return any(
-                    [has_changes_subtree(child_block_id) for child_block_id in draft_block.fields['children']]
-                )
+        # check the children in the draft
+        if 'children' in draft_block.fields:
+            return any(has_changes_subtree(child_block_id) for child_block_id in draft_block.fields['children'])
 
-            return False
+        return False
 
-        return has_changes_subtree(BlockKey.from_usage_key(xblock.location))
+    def _get_changes_map(self, course_key, draft_course, published_course):
+        """
+        Returns the dict of BlockKey to whether the block has unpublished
+        changes, as computed so far for the given pair of draft and published
+        structures.
+
+        Structures don't change once saved, so the map is kept in the
+        request cache, by the ids of both structures, for the Studio outline
+        and container pages to check each block once rather than walk the
+        subtrees of all its ancestors.  Structures edited in place by an
+        active bulk operation are not cached.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if self.request_cache is None or (bulk_write_record.active and bulk_write_record.dirty_branches):
+            return {}
+        changes_cache = self.request_cache.data.setdefault('has_changes_cache', {})
+        return changes_cache.setdefault((draft_course['_id'], published_course['_id']), {})
 
     def publish(self, location, user_id, blacklist=None, **kwargs):
         """
@@ -196,6 +196,63 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_sharing_content(self, deprecated):
+        """
+        copy_all_course_assets with share_content, and the deletion of the shared content
+        """
+        self.set_up_assets(deprecated)
+        source_data = {}
+        source_chunks_count = 0
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            source_data[filename] = self.contentstore.find(asset_key).data
+            source_chunks_count += self.contentstore.chunks.find(
+                {'files_id': self.contentstore.asset_db_key(asset_key)[0]}
+            ).count()
+        chunks_count = self.contentstore.chunks.count()
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        rerun_course = CourseLocator('test', 'destination', 'rerun')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course, share_content=True)
+        self.contentstore.copy_all_course_assets(dest_course, rerun_course, share_content=True)
+        self.assertEqual(self.contentstore.chunks.count(), chunks_count)
+
+        # the content is kept as long as any asset references it
+        for course_key in (self.course1_key, dest_course):
+            self.contentstore.delete_all_course_assets(course_key)
+            self.assertEqual(self.contentstore.chunks.count(), chunks_count)
+            for filename in self.course1_files:
+                asset_key = rerun_course.make_asset_key('asset', filename)
+                self.assertEqual(self.contentstore.find(asset_key).data, source_data[filename])
+                copied = self.contentstore.find(asset_key, as_stream=True)
+                self.assertEqual(''.join(copied.stream_data()), source_data[filename])
+
+        self.contentstore.delete_all_course_assets(rerun_course)
+        self.assertEqual(self.contentstore.chunks.count(), chunks_count - source_chunks_count)
+
+    @ddt.data(True, False)
+    def test_remove_redundant_shared_content(self, deprecated):
+        """
+        remove_redundant_content_for_courses keeps the content shared with other assets
+        """
+        self.set_up_assets(deprecated)
+        source_course = CourseLocator('test', 'redundant', 'source')
+        for filename in ('._picture1.jpg', 'picture1.jpg'):
+            self.save_asset('picture1.jpg', source_course.make_asset_key('asset', filename), filename, False)
+        dest_course = CourseLocator('test', 'redundant', 'rerun')
+        # the copies of both assets reference the content of the redundant one
+        self.contentstore.copy_all_course_assets(source_course, dest_course, share_content=True)
+
+        self.assertEqual(self.contentstore.remove_redundant_content_for_courses(), 2)
+        for course_key in (source_course, dest_course):
+            with self.assertRaises(NotFoundError):
+                self.contentstore.find(course_key.make_asset_key('asset', '._picture1.jpg'))
+            self.assertEqual(
+                self.contentstore.find(course_key.make_asset_key('asset', 'picture1.jpg')).data,
+                self.contentstore.find(self.course1_key.make_asset_key('asset', 'picture1.jpg')).data,
+            )
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
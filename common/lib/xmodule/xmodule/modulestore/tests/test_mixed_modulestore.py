@@ -783,6 +783,30 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
         for key in locations:
             self.assertFalse(self._has_changes(locations[key]))
 
+    def test_has_changes_memoized(self):
+        """
+        Tests that has_changes() checks each block of a course once per request,
+        and still detects the changes made since.
+        """
+        locations = self.setup_has_changes(ModuleStoreEnum.Type.split)
+        split_store = self.store._get_modulestore_by_type(ModuleStoreEnum.Type.split)  # pylint: disable=protected-access
+
+        with patch.object(split_store, 'request_cache', Mock(data={})):
+            self.assertFalse(self._has_changes(locations['grandparent']))
+            with patch.object(split_store, '_block_has_changes', wraps=split_store._block_has_changes) as mock_check:
+                for key in locations:
+                    self.assertFalse(self._has_changes(locations[key]))
+                self.assertFalse(mock_check.called)
+
+            # Change the child
+            child = self.store.get_item(locations['child'])
+            child.display_name = 'Changed Display Name'
+            self.store.update_item(child, self.user_id)
+
+            self.assertTrue(self._has_changes(locations['grandparent']))
+            self.assertTrue(self._has_changes(locations['parent']))
+            self.assertFalse(self._has_changes(locations['parent_sibling']))
+
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_has_changes_publish_ancestors(self, default_ms):
         """
@@ -13,9 +13,11 @@ from xmodule.modulestore import EdxJSONEncoder, ModuleStoreEnum
 from xmodule.modulestore.inheritance import own_metadata
 from xmodule.modulestore.store_utilities import draft_node_constructor, get_draft_subtree_roots
 from xmodule.modulestore import LIBRARY_ROOT
+from fs.memoryfs import MemoryFS
 from fs.osfs import OSFS
 from json import dumps
-import os
+import tarfile
+import time
 
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
@@ -104,7 +106,7 @@ class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, tar_file=None, progress=None):
         """
         Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
@@ -113,12 +115,19 @@ class ExportManager(object):
         `courselike_key`: The Locator of the Descriptor to export
         `root_dir`: The directory to write the exported xml to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `tar_file`: A `tarfile.TarFile` opened for writing, to write the content to under `target_dir`
+            instead of `root_dir`, which is then ignored. The xml is kept in memory until written to it,
+            while the static assets are written to it from the contentstore as they are read.
+        `progress`: A function called with the number of bytes of static assets written to `tar_file`
+            so far and the total number of bytes of static assets to write
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = target_dir
+        self.tar_file = tar_file
+        self.progress = progress
 
     @abstractmethod
     def get_key(self):
@@ -148,13 +157,50 @@ class ExportManager(object):
         Get the target courselike object for this export.
         """
 
+    def export_static_assets(self, root_courselike_dir):
+        """
+        Export the static assets and their policy from the contentstore.
+        """
+        if self.tar_file is None:
+            self.contentstore.export_all_for_course(
+                self.courselike_key,
+                root_courselike_dir + '/static/',
+                root_courselike_dir + '/policies/assets.json',
+            )
+        else:
+            self.contentstore.export_all_for_course_to_tar(
+                self.courselike_key,
+                self.tar_file,
+                self.target_dir + '/static',
+                self.target_dir + '/policies/assets.json',
+                progress=self.progress,
+            )
+
+    def _add_to_tar_file(self, fsm):
+        """
+        Write the content of the given in-memory filesystem to the tar file.
+        """
+        mtime = time.time()
+        for dir_path in fsm.walkdirs():
+            tar_info = tarfile.TarInfo(self.target_dir + dir_path.rstrip('/'))
+            tar_info.type = tarfile.DIRTYPE
+            tar_info.mode = 0o755
+            tar_info.mtime = mtime
+            self.tar_file.addfile(tar_info)
+        for file_path in fsm.walkfiles():
+            tar_info = tarfile.TarInfo(self.target_dir + file_path)
+            tar_info.size = fsm.getsize(file_path)
+            tar_info.mtime = mtime
+            with fsm.open(file_path, 'rb') as file_obj:
+                self.tar_file.addfile(tar_info, file_obj)
+
     def export(self):
         """
         Perform the export given the parameters handed to this class at init.
         """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
+            fsm = OSFS(self.root_dir) if self.tar_file is None else MemoryFS()
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -171,12 +217,15 @@ class ExportManager(object):
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
+            root_courselike_dir = self.root_dir + '/' + self.target_dir if self.tar_file is None else None
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
             self.post_process(root, export_fs)
 
+            if self.tar_file is not None:
+                self._add_to_tar_file(fsm)
+
 
 class CourseExportManager(ExportManager):
     """
@@ -201,26 +250,20 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makeopendir(AssetMetadata.EXPORTED_ASSET_DIR)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'w') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'w') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file)
 
         # export the static assets
         policies_dir = export_fs.makeopendir('policies')
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(root_courselike_dir)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -235,10 +278,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
+                    output_dir = export_fs.makeopendir('static/images', recursive=True)
+                    with output_dir.open('course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -318,11 +359,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makeopendir('policies')
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(root_courselike_dir)
 
     def post_process(self, root, export_fs):
         """
@@ -351,6 +388,26 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tar(modulestore, contentstore, course_key, tar_file, course_dir, progress=None):
+    """
+    Export all modules from `modulestore` and content from `contentstore` as xml to `course_dir` in `tar_file`,
+    without writing them to disk.
+    """
+    CourseExportManager(
+        modulestore, contentstore, course_key, None, course_dir, tar_file=tar_file, progress=progress
+    ).export()
+
+
+def export_library_to_tar(modulestore, contentstore, library_key, tar_file, library_dir, progress=None):
+    """
+    Export all modules from `modulestore` and content from `contentstore` as xml to `library_dir` in `tar_file`,
+    without writing them to disk.
+    """
+    LibraryExportManager(
+        modulestore, contentstore, library_key, None, library_dir, tar_file=tar_file, progress=progress
+    ).export()
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
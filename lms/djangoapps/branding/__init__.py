@@ -27,24 +27,51 @@ def get_visible_courses(org=None, filter_=None):
         filter_ (dict): Optional parameter that allows custom filtering by
             fields on the course.
     """
-    courses = []
+    site_filters = get_visible_courses_filters(org=org)
+    if site_filters is None:
+        return []
+
+    orgs, visible_ids, excluded_orgs = site_filters
+    courses = CourseOverview.get_all_courses(orgs=orgs, filter_=filter_)
+    courses = sorted(courses, key=lambda course: course.number)
+
+    if visible_ids:
+        return [course for course in courses if course.id in visible_ids]
+    else:
+        return [course for course in courses if course.location.org not in excluded_orgs]
+
+
+def get_visible_courses_filters(org=None):
+    """
+    Return the filters selecting the courses that should be visible in this
+    branded instance, as a tuple of:
+
+        * the orgs the courses must belong to, or None for any org,
+        * the ids of the courses, or None for any course,
+        * the orgs the courses must not belong to.
+
+    Returns None if no course should be visible.
+
+    Arguments:
+        org (string): Optional parameter that allows case-insensitive
+            filtering by organization.
+    """
     current_site_orgs = configuration_helpers.get_current_site_orgs()
 
     if org:
         # Check the current site's orgs to make sure the org's courses should be displayed
-        if not current_site_orgs or org in current_site_orgs:
-            courses = CourseOverview.get_all_courses(orgs=[org], filter_=filter_)
+        if current_site_orgs and org not in current_site_orgs:
+            return None
+        orgs = [org]
     elif current_site_orgs:
         # Only display courses that should be displayed on this site
-        courses = CourseOverview.get_all_courses(orgs=current_site_orgs, filter_=filter_)
+        orgs = current_site_orgs
     else:
-        courses = CourseOverview.get_all_courses(filter_=filter_)
-
-    courses = sorted(courses, key=lambda course: course.number)
+        orgs = None
 
     # Filtering can stop here.
     if current_site_orgs:
-        return courses
+        return orgs, None, frozenset()
 
     # See if we have filtered course listings in this domain
     filtered_visible_ids = None
@@ -57,11 +84,10 @@ def get_visible_courses(org=None, filter_=None):
         )
 
     if filtered_visible_ids:
-        return [course for course in courses if course.id in filtered_visible_ids]
+        return orgs, filtered_visible_ids, frozenset()
     else:
         # Filter out any courses based on current org, to avoid leaking these.
-        orgs = configuration_helpers.get_all_orgs()
-        return [course for course in courses if course.location.org not in orgs]
+        return orgs, None, frozenset(configuration_helpers.get_all_orgs())
 
 
 def get_university_for_request():
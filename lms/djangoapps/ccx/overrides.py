@@ -10,7 +10,7 @@ from django.db import transaction
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
 import request_cache
-from courseware.field_overrides import FieldOverrideProvider
+from courseware.field_overrides import NOTSET, FieldOverrideIndex, FieldOverrideProvider
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
 
 log = logging.getLogger(__name__)
@@ -26,10 +26,29 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
         """
         Just call the get_override_for_ccx method if there is a ccx
         """
+        ccx = self._get_ccx(block)
+        if ccx:
+            return get_override_for_ccx(ccx, block, name, default)
+        return default
+
+    def override_index(self, block):
+        """
+        Return the override index of the ccx, if there is one.
+        """
+        ccx = self._get_ccx(block)
+        if ccx:
+            return get_override_index_for_ccx(ccx)
+        return None
+
+    @staticmethod
+    def _get_ccx(block):
+        """
+        Return the ccx that is active for the course of the given block, if any.
+        """
         # The incoming block might be a CourseKey instance of some type, a
         # UsageKey instance of some type, or it might be something that has a
         # location attribute.  That location attribute will be a UsageKey
-        ccx = course_key = None
+        course_key = None
         identifier = getattr(block, 'id', None)
         if isinstance(identifier, CourseKey):
             course_key = block.id
@@ -41,10 +60,8 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
             msg = "Unable to get course id when calculating ccx overide for block type %r"
             log.error(msg, type(block))
         if course_key is not None:
-            ccx = get_current_ccx(course_key)
-        if ccx:
-            return get_override_for_ccx(ccx, block, name, default)
-        return default
+            return get_current_ccx(course_key)
+        return None
 
     @classmethod
     def enabled_for(cls, block):
@@ -100,6 +117,46 @@ def get_override_for_ccx(ccx, block, name, default=None):
         return default
 
 
+class CcxOverrideIndex(FieldOverrideIndex):
+    """
+    The overrides of a ccx, as returned by `get_override_for_ccx`.
+    """
+    def __init__(self, ccx):
+        super(CcxOverrideIndex, self).__init__()
+        self.overrides = _get_overrides_for_ccx(ccx)
+
+    def get(self, block, name):
+        # CCX courses can't be edited in Studio, see get_override_for_ccx
+        if name == 'course_edit_method':
+            return None
+
+        block_overrides = self.overrides.get(_clean_ccx_key(block.location))
+        if not block_overrides or name not in block_overrides:
+            return NOTSET
+        try:
+            return block.fields[name].from_json(block_overrides[name])
+        except KeyError:
+            return block_overrides[name]
+
+
+def get_override_index_for_ccx(ccx):
+    """
+    Returns the :class:`CcxOverrideIndex` of the `ccx`, which is cached for
+    the duration of the request, or until the overrides of the ccx change.
+    """
+    index_cache = request_cache.get_cache('ccx-override-index')
+    if ccx not in index_cache:
+        index_cache[ccx] = CcxOverrideIndex(ccx)
+    return index_cache[ccx]
+
+
+def _clear_override_index_for_ccx(ccx):
+    """
+    Discards the cached override index of the `ccx`, after its overrides changed.
+    """
+    request_cache.get_cache('ccx-override-index').pop(ccx, None)
+
+
 def _clean_ccx_key(block_location):
     """
     Converts the given BlockUsageKey from a CCX key to the
@@ -174,6 +231,7 @@ def override_field_for_ccx(ccx, block, name, value):
 
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
+    _clear_override_index_for_ccx(ccx)
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -207,6 +265,7 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):  # pylint: disable=inva
         ccx_override_map.pop(name + "_instance")
     except KeyError:
         pass
+    _clear_override_index_for_ccx(ccx)
 
 
 def bulk_delete_ccx_override_fields(ccx, ids):
@@ -217,3 +276,4 @@ def bulk_delete_ccx_override_fields(ccx, ids):
     ids = list(set(ids))
     if ids:
         CcxFieldOverride.objects.filter(ccx=ccx, id__in=ids).delete()
+        _clear_override_index_for_ccx(ccx)
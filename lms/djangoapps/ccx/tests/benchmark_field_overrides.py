@@ -0,0 +1,84 @@
+"""
+Benchmark of field override lookups while rendering a CCX course outline.
+
+Not collected by the test runner; run it explicitly, e.g.:
+
+    paver test_system -t lms/djangoapps/ccx/tests/benchmark_field_overrides.py -s
+
+It reports the time taken to read the fields used by the course outline on
+every block of a CCX course, with and without the override index published
+by `CustomCoursesForEdxOverrideProvider`.
+"""
+import datetime
+import timeit
+
+import mock
+import pytz
+from ccx_keys.locator import CCXLocator
+from django.test.utils import override_settings
+
+from courseware.courses import get_course_by_id
+from courseware.field_overrides import OverrideFieldData, OverrideModulestoreFieldData
+from lms.djangoapps.ccx.overrides import CustomCoursesForEdxOverrideProvider, override_field_for_ccx
+from lms.djangoapps.ccx.tests.factories import CcxFactory
+from lms.djangoapps.ccx.tests.utils import iter_blocks
+from request_cache.middleware import RequestCache
+from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.utils import ProceduralCourseTestMixin
+
+# The fields read for each block when rendering the course outline
+OUTLINE_FIELDS = ('display_name', 'start', 'due', 'format', 'graded', 'visible_to_staff_only', 'days_early_for_beta')
+
+
+@override_settings(
+    XBLOCK_FIELD_DATA_WRAPPERS=['lms.djangoapps.courseware.field_overrides:OverrideModulestoreFieldData.wrap'],
+    MODULESTORE_FIELD_OVERRIDE_PROVIDERS=['ccx.overrides.CustomCoursesForEdxOverrideProvider'],
+)
+class CcxOutlineBenchmark(ProceduralCourseTestMixin, ModuleStoreTestCase):
+    """
+    Times the field reads of a CCX course outline.
+    """
+    MODULESTORE = TEST_DATA_SPLIT_MODULESTORE
+    BRANCHING = 4
+    REPEAT = 5
+
+    def setUp(self):
+        super(CcxOutlineBenchmark, self).setUp()
+        OverrideFieldData.provider_classes = None
+        OverrideModulestoreFieldData.provider_classes = None
+        self.course = CourseFactory.create(enable_ccx=True)
+        self.populate_course(self.BRANCHING)
+        self.ccx = CcxFactory.create(course_id=self.course.id)
+        self.ccx_key = CCXLocator.from_course_locator(self.course.id, self.ccx.id)
+
+        due = datetime.datetime(2015, 1, 1, tzinfo=pytz.UTC)
+        for chapter in get_course_by_id(self.ccx_key, depth=1).get_children():
+            override_field_for_ccx(self.ccx, chapter, 'due', due)
+            override_field_for_ccx(self.ccx, chapter, 'start', due)
+
+    def render_outline(self):
+        """
+        Loads the CCX course, as a new request would, and reads the outline fields of all its blocks.
+        """
+        RequestCache.clear_request_cache()
+        course = get_course_by_id(self.ccx_key, depth=None)
+        for block in iter_blocks(course):
+            for name in OUTLINE_FIELDS:
+                getattr(block, name)
+
+    def time_outline(self):
+        """
+        Returns the best time taken to render the outline.
+        """
+        return min(timeit.repeat(self.render_outline, number=1, repeat=self.REPEAT))
+
+    def test_outline(self):
+        with mock.patch.object(CustomCoursesForEdxOverrideProvider, 'override_index', return_value=None):
+            without_index = self.time_outline()
+        with_index = self.time_outline()
+        print "CCX outline of {} blocks: {:.3f}s without override index, {:.3f}s with override index".format(
+            sum(1 for _ in iter_blocks(get_course_by_id(self.ccx_key, depth=None))),
+            without_index,
+            with_index,
+        )
@@ -170,3 +170,20 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
         vertical = chapter.get_children()[0].get_children()[0]
         self.assertEqual(vertical.due, ccx_due)
+
+    def test_inherited_override_follows_changes(self):
+        """
+        Test that inherited overrides resolved by the override index are
+        updated when the overrides of the ccx change.
+        """
+        ccx_due = datetime.datetime(2015, 1, 1, 00, 00, tzinfo=pytz.UTC)
+        new_ccx_due = datetime.datetime(2015, 2, 1, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        vertical = chapter.get_children()[0].get_children()[0]
+        field_data = vertical._field_data  # pylint: disable=protected-access
+
+        override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
+        self.assertEqual(field_data.default(vertical, 'due'), ccx_due)
+
+        override_field_for_ccx(self.ccx, chapter, 'due', new_ccx_due)
+        self.assertEqual(field_data.default(vertical, 'due'), new_ccx_due)
@@ -0,0 +1,278 @@
+"""
+An index of the course catalog, held in process memory.
+
+Listing the courses of the catalog loads every CourseOverview, checks the
+user's access to each of them, and sorts them.  The index loads the
+CourseOverviews once per process and precomputes their sort orders, their
+orgs, and which of them anonymous users can see, given their dates and
+catalog visibility.  A query on the index only checks the user's access to
+the courses which anonymous users can't see, and only goes through the
+courses up to the requested page.
+
+The index is rebuilt whenever a CourseOverview changes, e.g. when a course
+is published, whenever a course starts, ends, or opens or closes its
+enrollment, and at least every INDEX_TIMEOUT seconds.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import cached_property
+from pytz import UTC
+
+import request_cache
+from branding import get_visible_courses_filters
+from courseware.access import has_access
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+# Sort orders of the courses.
+ORDER_BY_NUMBER = 'number'
+ORDER_BY_ANNOUNCEMENT = 'announcement'
+ORDER_BY_START_DATE = 'start_date'
+
+# Seconds after which the index is rebuilt, even if no change is known.
+INDEX_TIMEOUT = 60 * 60
+
+# Name of the request cache holding the index when it can't be kept in
+# process memory, because changes to CourseOverviews can't be tracked.
+REQUEST_CACHE_NAME = 'courseware.catalog_index'
+
+
+class CatalogIndex(object):
+    """
+    The CourseOverviews of the catalog, indexed.
+
+    Arguments:
+        course_overviews (iterable): All the CourseOverviews.
+        generation (str): The generation of CourseOverviews they were read at.
+    """
+    def __init__(self, course_overviews, generation):
+        self.generation = generation
+        self.built_at = time.time()
+
+        now = datetime.now(UTC)
+        by_number = sorted(course_overviews, key=lambda course: course.number)
+        self.courses = {course.id: course for course in by_number}
+        self.orders = {
+            ORDER_BY_NUMBER: [course.id for course in by_number],
+            ORDER_BY_ANNOUNCEMENT: [course.id for course in sorted(by_number, key=lambda course: course.sorting_score)],
+            ORDER_BY_START_DATE: [
+                course.id for course in sorted(
+                    by_number,
+                    key=lambda course: (course.has_ended(), course.start is None, course.start),
+                )
+            ],
+        }
+
+        self.by_org = defaultdict(set)
+        for course in by_number:
+            self.by_org[course.location.org].add(course.id)
+
+        # Sort orders and anonymous access depend on these dates.
+        upcoming_dates = [
+            date
+            for course in by_number
+            for date in (course.start, course.end, course.enrollment_start, course.enrollment_end)
+            if date is not None and date > now
+        ]
+        self.valid_until = min(upcoming_dates) if upcoming_dates else None
+
+        self._lock = threading.Lock()
+        self._memoized = {}
+
+    def is_current(self, generation):
+        """
+        Returns whether the index is up to date with the given generation of CourseOverviews.
+        """
+        if generation is None or generation != self.generation:
+            return False
+        if self.built_at + INDEX_TIMEOUT < time.time():
+            return False
+        return self.valid_until is None or datetime.now(UTC) < self.valid_until
+
+    def query(self, user, permission, org=None, filter_=None):
+        """
+        Returns the courses visible to the user in this branded instance.
+
+        Arguments:
+            user (User): The user to whom the courses are listed.
+            permission (str): The access the user needs to a course to see it listed.
+            org (str): Optional parameter that allows case-insensitive filtering by organization.
+            filter_ (dict): Optional parameter that allows custom filtering by fields on the course.
+
+        Returns:
+            CatalogQuery, in course number order.
+        """
+        site_filters = get_visible_courses_filters(org=org)
+        if site_filters is None:
+            return CatalogQuery(self, frozenset(), user, permission)
+
+        orgs, visible_ids, excluded_orgs = site_filters
+        orgs = tuple(orgs) if orgs else None
+        course_ids = self._memoize(
+            ('site', orgs, visible_ids, excluded_orgs),
+            lambda: self._get_site_courses(orgs, visible_ids, excluded_orgs),
+        )
+        if filter_:
+            course_ids = course_ids & self._memoize(
+                ('filter',) + tuple(sorted(filter_.items())),
+                lambda: self._get_filtered_courses(filter_),
+            )
+
+        return CatalogQuery(self, course_ids, user, permission)
+
+    def public_courses(self, permission):
+        """
+        Returns the ids of the courses anonymous users have the given access to.
+        """
+        return self._memoize(
+            ('public', permission),
+            lambda: frozenset(
+                course_id for course_id, course in self.courses.iteritems()
+                if has_access(AnonymousUser(), permission, course)
+            ),
+        )
+
+    def _memoize(self, key, compute):
+        """
+        Returns the value computed by `compute`, computing it once per index.
+        """
+        with self._lock:
+            if key in self._memoized:
+                return self._memoized[key]
+        value = compute()
+        with self._lock:
+            return self._memoized.setdefault(key, value)
+
+    def _get_site_courses(self, orgs, visible_ids, excluded_orgs):
+        """
+        Returns the ids of the courses selected by the filters of a branded instance,
+        see branding.get_visible_courses_filters.
+        """
+        if orgs:
+            # Like CourseOverview.get_all_courses, match orgs case-insensitively, and partially.
+            pattern = re.compile(r'(' + '|'.join(orgs) + ')', re.IGNORECASE)
+            course_ids = set()
+            for course_org, org_course_ids in self.by_org.iteritems():
+                if pattern.search(course_org):
+                    course_ids |= org_course_ids
+        else:
+            course_ids = set(self.courses)
+
+        if visible_ids:
+            course_ids &= visible_ids
+        for excluded_org in excluded_orgs:
+            course_ids -= self.by_org.get(excluded_org, set())
+
+        return frozenset(course_ids)
+
+    def _get_filtered_courses(self, filter_):
+        """
+        Returns the ids of the courses matching `filter_`, a dict of CourseOverview
+        field lookups.
+        """
+        if any('__' in lookup for lookup in filter_):
+            return frozenset(CourseOverview.get_all_courses(filter_=filter_).values_list('id', flat=True))
+        return frozenset(
+            course_id for course_id, course in self.courses.iteritems()
+            if all(getattr(course, field) == value for field, value in filter_.iteritems())
+        )
+
+
+class CatalogQuery(object):
+    """
+    The courses of the catalog visible to a user, in a given order.
+
+    Courses are only read from the index as they are iterated over, or
+    sliced, so it can be paginated.
+    """
+    def __init__(self, index, course_ids, user, permission, order=ORDER_BY_NUMBER):
+        self.index = index
+        self.course_ids = course_ids
+        self.user = user
+        self.permission = permission
+        self.order = order
+
+    def order_by(self, order):
+        """
+        Returns the same courses, in the given order.
+        """
+        query = CatalogQuery(self.index, self.course_ids, self.user, self.permission, order)
+        if 'visible_ids' in self.__dict__:
+            query.visible_ids = self.visible_ids
+        return query
+
+    @cached_property
+    def visible_ids(self):
+        """
+        The ids of the courses the user has access to.
+        """
+        public_ids = self.course_ids & self.index.public_courses(self.permission)
+        if self.user is None or not self.user.is_authenticated():
+            return public_ids
+
+        return public_ids | frozenset(
+            course_id for course_id in self.course_ids - public_ids
+            if has_access(self.user, self.permission, self.index.courses[course_id])
+        )
+
+    def __len__(self):
+        return len(self.visible_ids)
+
+    def __iter__(self):
+        visible_ids = self.visible_ids
+        for course_id in self.index.orders[self.order]:
+            if course_id in visible_ids:
+                yield self.index.courses[course_id]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is not None:
+                return list(self)[key]
+            return list(islice(self, key.start, key.stop))
+        if key < 0:
+            return list(self)[key]
+        try:
+            return next(islice(self, key, None))
+        except StopIteration:
+            raise IndexError('CatalogQuery index out of range')
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_catalog_index():
+    """
+    Returns an up to date index of the course catalog.
+    """
+    global _INDEX  # pylint: disable=global-statement
+    generation = CourseOverview.get_catalog_generation()
+
+    if generation is None:
+        # Changes can't be tracked: only share the index within the request.
+        index = request_cache.get_cache(REQUEST_CACHE_NAME).get('index')
+        if index is None:
+            index = CatalogIndex(CourseOverview.get_all_courses(), generation)
+            request_cache.get_cache(REQUEST_CACHE_NAME)['index'] = index
+        return index
+
+    index = _INDEX
+    if index is None or not index.is_current(generation):
+        with _INDEX_LOCK:
+            index = _INDEX
+            if index is None or not index.is_current(generation):
+                index = _INDEX = CatalogIndex(CourseOverview.get_all_courses(), generation)
+    return index
+
+
+def clear_catalog_index():
+    """
+    Discards the index held by the current process.
+    """
+    global _INDEX  # pylint: disable=global-statement
+    _INDEX = None
@@ -16,6 +16,7 @@ from path import Path as path
 
 import branding
 from courseware.access import has_access
+from courseware.catalog_index import ORDER_BY_ANNOUNCEMENT, ORDER_BY_START_DATE, CatalogQuery, get_catalog_index
 from courseware.date_summary import (
     CourseEndDate,
     CourseStartDate,
@@ -28,6 +29,8 @@ from courseware.module_render import get_module, get_module_for_descriptor
 from edxmako.shortcuts import render_to_string
 from lms.djangoapps.courseware.courseware_access_exception import CoursewareAccessException
 from lms.djangoapps.courseware.exceptions import CourseAccessRedirect
+from openedx.core.djangoapps.content.course_overviews.config import INDEX_COURSE_CATALOG
+from openedx.core.djangoapps.content.course_overviews.config import waffle as course_overviews_waffle
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from static_replace import replace_static_urls
@@ -364,14 +367,20 @@ def get_courses(user, org=None, filter_=None):
     """
     Returns a list of courses available, sorted by course.number and optionally
     filtered by org code (case-insensitive).
-    """
-    courses = branding.get_visible_courses(org=org, filter_=filter_)
 
+    When the index_course_catalog switch is enabled, the courses are read from
+    the in-memory catalog index, and returned as a lazy CatalogQuery.
+    """
     permission_name = configuration_helpers.get_value(
         'COURSE_CATALOG_VISIBILITY_PERMISSION',
         settings.COURSE_CATALOG_VISIBILITY_PERMISSION
     )
 
+    if course_overviews_waffle().is_enabled(INDEX_COURSE_CATALOG):
+        return get_catalog_index().query(user, permission_name, org=org, filter_=filter_)
+
+    courses = branding.get_visible_courses(org=org, filter_=filter_)
+
     courses = [c for c in courses if has_access(user, permission_name, c)]
 
     return courses
@@ -392,6 +401,8 @@ def sort_by_announcement(courses):
     Sorts a list of courses by their announcement date. If the date is
     not available, sort them by their start date.
     """
+    if isinstance(courses, CatalogQuery):
+        return courses.order_by(ORDER_BY_ANNOUNCEMENT)
 
     # Sort courses by how far are they from they start day
     key = lambda course: course.sorting_score
@@ -404,6 +415,8 @@ def sort_by_start_date(courses):
     """
     Returns a list of courses sorted by their start date, latest first.
     """
+    if isinstance(courses, CatalogQuery):
+        return courses.order_by(ORDER_BY_START_DATE)
     courses = sorted(
         courses,
         key=lambda course: (course.has_ended(), course.start is None, course.start),
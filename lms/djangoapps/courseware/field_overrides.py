@@ -129,6 +129,63 @@ class FieldOverrideProvider(object):
         """
         return False
 
+    def override_index(self, block):
+        """
+        Return a :class:`FieldOverrideIndex` of this provider's overrides for
+        the course of the given block, or None if this provider has no such
+        index, in which case `get` is called for every field lookup.
+
+        Providers which can look up all of their overrides for a course at
+        once should publish an index, so that field reads, and above all
+        the lookups of inherited overrides, don't need to query them over
+        and over while a course is rendered.
+        """
+        return None
+
+
+class FieldOverrideIndex(object):
+    """
+    An index of the overrides a provider has for the blocks of a course, for
+    a given user or CCX.  Concrete implementations provide `get`.
+
+    Overrides inherited from ancestors are resolved once for each block and
+    field, and remembered for the life of the index, so indexes should be
+    cached by their providers for as long as their overrides don't change,
+    e.g. for the duration of a request.
+    """
+    __metaclass__ = ABCMeta
+
+    def __init__(self):
+        self._inherited = {}
+
+    @abstractmethod
+    def get(self, block, name):  # pragma no cover
+        """
+        Returns the override for the field named `name` in `block`, or `NOTSET`.
+        """
+        raise NotImplementedError
+
+    def get_inherited(self, block, name):
+        """
+        Looks for an override for the field named `name` in the ancestors of
+        `block`.  Returns a tuple of the distance to the nearest ancestor with
+        such an override and the overridden value, or None.
+        """
+        key = (block.location, name)
+        if key not in self._inherited:
+            inherited = None
+            parent = block.get_parent()
+            if parent is not None:
+                value = self.get(parent, name)
+                if value is not NOTSET:
+                    inherited = (1, value)
+                else:
+                    above = self.get_inherited(parent, name)
+                    if above is not None:
+                        inherited = (above[0] + 1, above[1])
+            self._inherited[key] = inherited
+        return self._inherited[key]
+
 
 class OverrideFieldData(FieldData):
     """
@@ -198,18 +255,53 @@ class OverrideFieldData(FieldData):
         self.fallback = fallback
         self.providers = tuple(provider(user) for provider in providers)
 
+    def _override_indexes(self, block):
+        """
+        Returns the override index of each provider, or None for the
+        providers which don't publish one.  Indexes are not kept by the
+        instance, as they are replaced by their providers when overrides change.
+        """
+        return tuple(provider.override_index(block) for provider in self.providers)
+
     def get_override(self, block, name):
         """
         Checks for an override for the field identified by `name` in `block`.
         Returns the overridden value or `NOTSET` if no override is found.
         """
         if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
+            for provider, index in zip(self.providers, self._override_indexes(block)):
+                if index is not None:
+                    value = index.get(block, name)
+                else:
+                    value = provider.get(block, name, NOTSET)
                 if value is not NOTSET:
                     return value
         return NOTSET
 
+    def get_inherited_override(self, block, name):
+        """
+        Checks for an override for the field identified by `name` in the
+        ancestors of `block`.  Returns the value overridden in the nearest
+        ancestor or `NOTSET` if no override is found.
+        """
+        if overrides_disabled():
+            return NOTSET
+
+        indexes = self._override_indexes(block)
+        if all(index is not None for index in indexes):
+            nearest = None
+            for index in indexes:
+                inherited = index.get_inherited(block, name)
+                if inherited is not None and (nearest is None or inherited[0] < nearest[0]):
+                    nearest = inherited
+            return nearest[1] if nearest is not None else NOTSET
+
+        for ancestor in _lineage(block):
+            value = self.get_override(ancestor, name)
+            if value is not NOTSET:
+                return value
+        return NOTSET
+
     def get(self, block, name):
         value = self.get_override(block, name)
         if value is not NOTSET:
@@ -232,10 +324,8 @@ class OverrideFieldData(FieldData):
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
             inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in inheritable and self.get_inherited_override(block, name) is not NOTSET:
+                return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -248,10 +338,9 @@ class OverrideFieldData(FieldData):
         if self.providers and not overrides_disabled():
             inheritable = InheritanceMixin.fields.keys()
             if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+                value = self.get_inherited_override(block, name)
+                if value is not NOTSET:
+                    return value
         return self.fallback.default(block, name)
 
 
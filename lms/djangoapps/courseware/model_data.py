@@ -23,10 +23,13 @@ DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 
 import json
 import logging
+import threading
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from contextlib import contextmanager
 
 from contracts import contract, new_contract
+from django.conf import settings
 from django.db import DatabaseError
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
@@ -37,6 +40,7 @@ from xblock.fields import Scope, UserScope
 from xblock.runtime import KeyValueStore
 
 from courseware.user_state_client import DjangoXBlockUserStateClient
+from openedx.core.djangoapps.monitoring_utils import set_custom_metric
 from xmodule.modulestore.django import modulestore
 
 from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
@@ -51,6 +55,76 @@ class InvalidWriteError(Exception):
     """
 
 
+class _CoalescedUserStateWrites(threading.local):
+    """
+    A thread-local keeping track of the UserStateCaches with user state
+    writes pending while coalesced_user_state_writes is in effect.
+    """
+    def __init__(self):
+        super(_CoalescedUserStateWrites, self).__init__()
+        self.depth = 0
+        self.dirty_caches = []
+        self.num_coalesced = 0
+
+
+_COALESCED_USER_STATE_WRITES = _CoalescedUserStateWrites()
+
+
+@contextmanager
+def coalesced_user_state_writes():
+    """
+    Context manager within which the user state written to a block is kept
+    pending, so that all of the writes to the same block are saved at once,
+    with a single update of its StudentModule, when the outermost context
+    exits, or when flush_user_state_writes is called.
+
+    Only coalesces when the COALESCE_USER_STATE_WRITES feature is enabled.
+    """
+    if not settings.FEATURES.get('COALESCE_USER_STATE_WRITES'):
+        yield
+        return
+
+    coalesced = _COALESCED_USER_STATE_WRITES
+    coalesced.depth += 1
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        coalesced.depth -= 1
+        if coalesced.depth == 0:
+            try:
+                flush_user_state_writes()
+            except KeyValueMultiSaveError:
+                # Don't hide the error which interrupted the writes.
+                if not failed:
+                    raise
+            finally:
+                set_custom_metric('user_state_writes_coalesced', coalesced.num_coalesced)
+                coalesced.num_coalesced = 0
+
+
+def flush_user_state_writes():
+    """
+    Saves the user state writes pending in coalesced_user_state_writes, for
+    them to be read from the database, e.g. before a score is published.
+
+    Raises: KeyValueMultiSaveError if the state of any block failed to save
+    """
+    coalesced = _COALESCED_USER_STATE_WRITES
+    dirty_caches, coalesced.dirty_caches = coalesced.dirty_caches, []
+    error = None
+    for user_state_cache in dirty_caches:
+        try:
+            user_state_cache.flush_pending_updates()
+        except KeyValueMultiSaveError as exc:
+            error = error or exc
+    if error is not None:
+        raise error
+
+
 def _all_usage_keys(descriptors, aside_types):
     """
     Return a set of all usage_ids for the `descriptors` and for
@@ -350,6 +424,8 @@ class UserStateCache(object):
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
+        # The field values written while coalesced_user_state_writes is in effect, by block.
+        self._pending_updates = defaultdict(dict)
 
     def cache_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
@@ -389,6 +465,7 @@ class UserStateCache(object):
 
         Returns: datetime if there was a modified date, or None otherwise
         """
+        self.flush_pending_updates()
         try:
             return self._client.get(
                 self.user.username,
@@ -413,6 +490,40 @@ class UserStateCache(object):
 
             pending_updates[cache_key][kvs_key.field_name] = value
 
+        coalesced = _COALESCED_USER_STATE_WRITES
+        if coalesced.depth == 0:
+            try:
+                self._save_updates(pending_updates)
+            finally:
+                self._cache.update(pending_updates)
+            return
+
+        if not self._pending_updates:
+            coalesced.dirty_caches.append(self)
+        for cache_key, field_updates in pending_updates.iteritems():
+            if cache_key in self._pending_updates:
+                coalesced.num_coalesced += 1
+            self._pending_updates[cache_key].update(field_updates)
+        self._cache.update(pending_updates)
+
+    def flush_pending_updates(self):
+        """
+        Save the field values written while coalesced_user_state_writes is in effect.
+
+        Raises: KeyValueMultiSaveError if the values failed to save
+        """
+        pending_updates, self._pending_updates = self._pending_updates, defaultdict(dict)
+        if pending_updates:
+            self._save_updates(pending_updates)
+
+    def _save_updates(self, pending_updates):
+        """
+        Save the given field values, by block.
+
+        Arguments:
+            pending_updates (dict): A dictionary mapping block keys to dictionaries
+                of field names to values.
+        """
         try:
             self._client.set_many(
                 self.user.username,
@@ -421,8 +532,6 @@ class UserStateCache(object):
         except DatabaseError:
             log.exception("Saving user state failed for %s", self.user.username)
             raise KeyValueMultiSaveError([])
-        finally:
-            self._cache.update(pending_updates)
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def get(self, kvs_key):
@@ -460,6 +569,7 @@ class UserStateCache(object):
         if kvs_key.field_name not in field_state:
             raise KeyError(kvs_key.field_name)
 
+        self.flush_pending_updates()
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
 
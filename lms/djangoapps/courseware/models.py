@@ -18,10 +18,16 @@ import logging
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from model_utils.models import TimeStampedModel
 
 import coursewarehistoryextended
+from courseware.student_module_history import (
+    decompress_state,
+    discard_history_entries,
+    flush_history_writes,
+    save_history_entry
+)
 from openedx.core.djangoapps.xmodule_django.models import BlockTypeKeyField, CourseKeyField, LocationKeyField
 
 log = logging.getLogger("edx.courseware")
@@ -175,7 +181,11 @@ class BaseStudentModuleHistory(models.Model):
     def get_history(student_modules):
         """
         Find history objects across multiple backend stores for a given StudentModule
+
+        The states of the history entries compressed by compaction are returned decompressed.
         """
+        # Entries buffered during this request or task are read as well.
+        flush_history_writes()
 
         history_entries = []
 
@@ -194,6 +204,8 @@ class BaseStudentModuleHistory(models.Model):
                 student_module__in=student_modules
             ).order_by('-id')
 
+        for history_entry in history_entries:
+            history_entry.state = decompress_state(history_entry.state)
         return history_entries
 
 
@@ -224,13 +236,21 @@ class StudentModuleHistory(BaseStudentModuleHistory):
                                                  state=instance.state,
                                                  grade=instance.grade,
                                                  max_grade=instance.max_grade)
-            history_entry.save()
+            save_history_entry(history_entry)
+
+    def discard_history(sender, instance, **kwargs):  # pylint: disable=no-self-argument, unused-argument
+        """
+        Discards the buffered entries of a deleted StudentModule, whose saved
+        entries are deleted along with it.
+        """
+        discard_history_entries(StudentModuleHistory, instance.id)
 
     # When the extended studentmodulehistory table exists, don't save
     # duplicate history into courseware_studentmodulehistory, just retain
     # data for reading.
     if not settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
         post_save.connect(save_history, sender=StudentModule)
+    post_delete.connect(discard_history, sender=StudentModule)
 
 
 class XBlockFieldBase(models.Model):
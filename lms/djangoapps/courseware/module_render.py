@@ -17,6 +17,7 @@ from django.core.urlresolvers import reverse
 from django.http import Http404, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from edx_proctoring.services import ProctoringService
+from lazy import lazy
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -37,7 +38,12 @@ from courseware.masquerade import (
     is_masquerading_as_specific_student,
     setup_masquerade
 )
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache
+from courseware.model_data import (
+    DjangoKeyValueStore,
+    FieldDataCache,
+    coalesced_user_state_writes,
+    flush_user_state_writes
+)
 from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from lms.djangoapps.grades.signals.signals import SCORE_PUBLISHED
@@ -285,7 +291,7 @@ def _add_timed_exam_info(user, course, section, section_context):
 def get_module(user, request, usage_key, field_data_cache,
                position=None, log_if_not_found=True, wrap_xmodule_display=True,
                grade_bucket_type=None, depth=0,
-               static_asset_path='', course=None):
+               static_asset_path='', course=None, read_only_anonymous_id=True):
     """
     Get an instance of the xmodule class identified by location,
     setting the state based on an existing StudentModule, or creating one if none
@@ -308,6 +314,10 @@ def get_module(user, request, usage_key, field_data_cache,
                                 by get_course_info_section, because info section modules
                                 do not have a course as the parent module, and thus do not
                                 inherit this lms key value.
+      - read_only_anonymous_id: If this is True, the anonymous id of the user is saved in the
+                                background rather than while the module is built, which is only
+                                safe for rendering: the modules handling requests, whose scores
+                                are tied to the user by their anonymous id, must set it to False.
 
     Returns: xmodule instance, or None if the user does not have access to the
     module.  If there's an error, will try to return an instance of ErrorModule
@@ -320,7 +330,8 @@ def get_module(user, request, usage_key, field_data_cache,
                                          wrap_xmodule_display=wrap_xmodule_display,
                                          grade_bucket_type=grade_bucket_type,
                                          static_asset_path=static_asset_path,
-                                         course=course)
+                                         course=course,
+                                         read_only_anonymous_id=read_only_anonymous_id)
     except ItemNotFoundError:
         if log_if_not_found:
             log.debug("Error in get_module: ItemNotFoundError")
@@ -350,7 +361,7 @@ def get_xqueue_callback_url_prefix(request):
 def get_module_for_descriptor(user, request, descriptor, field_data_cache, course_key,
                               position=None, wrap_xmodule_display=True, grade_bucket_type=None,
                               static_asset_path='', disable_staff_debug_info=False,
-                              course=None):
+                              course=None, read_only_anonymous_id=True):
     """
     Implements get_module, extracting out the request-specific functionality.
 
@@ -382,16 +393,164 @@ def get_module_for_descriptor(user, request, descriptor, field_data_cache, cours
         user_location=user_location,
         request_token=xblock_request_token(request),
         disable_staff_debug_info=disable_staff_debug_info,
-        course=course
+        course=course,
+        read_only_anonymous_id=read_only_anonymous_id,
     )
 
 
+class SharedRuntimeParts(object):
+    """
+    The parts of the runtime of a block that only depend on the user and the
+    course, built once and shared with the runtimes of its descendants, which
+    are rendered for the same user, course and request.
+    """
+    def __init__(self, user, descriptor, course_id, course, request_token, wrap_xmodule_display):
+        self.user = user
+        # Access checks are course-wide, so they are made against the block
+        # for which these parts were built.
+        self.descriptor = descriptor
+        self.course_id = course_id
+        self.course = course
+        self.request_token = request_token
+        self.wrap_xmodule_display = wrap_xmodule_display
+
+    def is_shareable_with(self, user, course_id, request_token, wrap_xmodule_display):
+        """
+        Returns whether these parts can be shared with the runtime of a block
+        rendered with the given arguments.
+        """
+        return (
+            user is self.user and
+            course_id == self.course_id and
+            request_token == self.request_token and
+            wrap_xmodule_display == self.wrap_xmodule_display
+        )
+
+    @lazy
+    def is_masquerading_as_specific_student(self):
+        """
+        Whether the user is masquerading as a specific student in the course.
+        """
+        return is_masquerading_as_specific_student(self.user, self.course_id)
+
+    @lazy
+    def jump_to_id_base_url(self):
+        """
+        The base URL of intra-courseware links of the course.
+        """
+        return reverse('jump_to_id', kwargs={'course_id': self.course_id.to_deprecated_string(), 'module_id': ''})
+
+    @lazy
+    def staff_and_instructor_access(self):
+        """
+        Whether the user has staff and instructor access to the course, for the
+        staff debug info.
+        """
+        if self.is_masquerading_as_specific_student:
+            # When masquerading as a specific student, we want to show the debug button
+            # unconditionally to enable resetting the state of the student we are masquerading as.
+            # We already know the user has staff access when masquerading is active.
+            staff_access = True
+            # To figure out whether the user has instructor access, we temporarily remove the
+            # masquerade_settings from the real_user.  With the masquerading settings in place,
+            # the result would always be "False".
+            masquerade_settings = self.user.real_user.masquerade_settings
+            del self.user.real_user.masquerade_settings
+            instructor_access = bool(has_access(self.user.real_user, 'instructor', self.descriptor, self.course_id))
+            self.user.real_user.masquerade_settings = masquerade_settings
+        else:
+            staff_access = has_access(self.user, 'staff', self.descriptor, self.course_id)
+            instructor_access = bool(has_access(self.user, 'instructor', self.descriptor, self.course_id))
+        return staff_access, instructor_access
+
+    @lazy
+    def user_is_staff(self):
+        """
+        Whether the user has staff access to the course.
+        """
+        return bool(has_access(self.user, u'staff', self.descriptor.location, self.course_id))
+
+    @lazy
+    def user_is_admin(self):
+        """
+        Whether the user is global staff.
+        """
+        return bool(has_access(self.user, u'staff', 'global'))
+
+    @lazy
+    def user_is_beta_tester(self):
+        """
+        Whether the user is a beta tester of the course.
+        """
+        return CourseBetaTesterRole(self.course_id).has_user(self.user)
+
+    @lazy
+    def leading_block_wrappers(self):
+        """
+        The wrapping functions applied to the Fragments of the blocks before
+        their static URLs are rewritten.
+        """
+        block_wrappers = []
+
+        if self.is_masquerading_as_specific_student:
+            block_wrappers.append(filter_displayed_blocks)
+
+        if settings.FEATURES.get("LICENSING", False):
+            block_wrappers.append(wrap_with_license)
+
+        # Wrap the output display in a single div to allow for the XModule
+        # javascript to be bound correctly
+        if self.wrap_xmodule_display is True:
+            block_wrappers.append(partial(
+                wrap_xblock,
+                'LmsRuntime',
+                extra_data={'course-id': self.course_id.to_deprecated_string()},
+                usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string()),
+                request_token=self.request_token,
+            ))
+        return block_wrappers
+
+    @lazy
+    def trailing_block_wrappers(self):
+        """
+        The wrapping functions applied to the Fragments of the blocks after
+        their static URLs are rewritten, other than the staff debug info.
+        """
+        return [
+            # Allow URLs of the form '/course/' refer to the root of multicourse directory
+            #   hierarchy of this course
+            partial(replace_course_urls, self.course_id),
+
+            # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
+            # is an improvement over the /course/... format for studio authored courses,
+            # because it is agnostic to course-hierarchy.
+            # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
+            # function, we just need to specify something to get the reverse() to work.
+            partial(replace_jump_to_id_urls, self.course_id, self.jump_to_id_base_url),
+        ]
+
+    @lazy
+    def services(self):
+        """
+        The services of the runtimes that don't depend on the block.
+        """
+        return {
+            'fs': FSService(),
+            'user': DjangoXBlockUserService(self.user, user_is_staff=self.user_is_staff),
+            'verification': VerificationService(),
+            'proctoring': ProctoringService(),
+            'milestones': milestones_helpers.get_service(),
+            'credit': CreditService(),
+            'bookmarks': BookmarksService(user=self.user),
+        }
+
+
 def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=too-many-statements
                                # Arguments preceding this comment have user binding, those following don't
                                descriptor, course_id, track_function, xqueue_callback_url_prefix,
                                request_token, position=None, wrap_xmodule_display=True, grade_bucket_type=None,
                                static_asset_path='', user_location=None, disable_staff_debug_info=False,
-                               course=None):
+                               course=None, shared_runtime_parts=None, read_only_anonymous_id=False):
     """
     Helper function that returns a module system and student_data bound to a user and a descriptor.
 
@@ -407,10 +566,18 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
     Arguments:
         see arguments for get_module()
         request_token (str): A token unique to the request use by xblock initialization
+        shared_runtime_parts (SharedRuntimeParts): The parts of the runtime built for an ancestor of the
+            descriptor, rendered for the same user, if any.
 
     Returns:
         (LmsModuleSystem, KvsFieldData):  (module system, student_data) bound to, primarily, the user and descriptor
     """
+    if shared_runtime_parts is None or not shared_runtime_parts.is_shareable_with(
+            user, course_id, request_token, wrap_xmodule_display
+    ):
+        shared_runtime_parts = SharedRuntimeParts(
+            user, descriptor, course_id, course, request_token, wrap_xmodule_display
+        )
 
     def make_xqueue_callback(dispatch='score_update'):
         """
@@ -460,12 +627,16 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
             static_asset_path=static_asset_path,
             user_location=user_location,
             request_token=request_token,
-            course=course
+            course=course,
+            shared_runtime_parts=shared_runtime_parts,
+            read_only_anonymous_id=read_only_anonymous_id,
         )
 
     def publish(block, event_type, event):
         """A function that allows XModules to publish events."""
-        if event_type == 'grade' and not is_masquerading_as_specific_student(user, course_id):
+        if event_type == 'grade' and not shared_runtime_parts.is_masquerading_as_specific_student:
+            # The score is recomputed from the saved state of the block.
+            flush_user_state_writes()
             SCORE_PUBLISHED.send(
                 sender=None,
                 block=block,
@@ -549,24 +720,7 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
 
     # Build a list of wrapping functions that will be applied in order
     # to the Fragment content coming out of the xblocks that are about to be rendered.
-    block_wrappers = []
-
-    if is_masquerading_as_specific_student(user, course_id):
-        block_wrappers.append(filter_displayed_blocks)
-
-    if settings.FEATURES.get("LICENSING", False):
-        block_wrappers.append(wrap_with_license)
-
-    # Wrap the output display in a single div to allow for the XModule
-    # javascript to be bound correctly
-    if wrap_xmodule_display is True:
-        block_wrappers.append(partial(
-            wrap_xblock,
-            'LmsRuntime',
-            extra_data={'course-id': course_id.to_deprecated_string()},
-            usage_id_serializer=lambda usage_id: quote_slashes(usage_id.to_deprecated_string()),
-            request_token=request_token,
-        ))
+    block_wrappers = list(shared_runtime_parts.leading_block_wrappers)
 
     # TODO (cpennington): When modules are shared between courses, the static
     # prefix is going to have to be specific to the module, not the directory
@@ -580,37 +734,10 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
         static_asset_path=static_asset_path or descriptor.static_asset_path
     ))
 
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
-    # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
-    # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
-    ))
+    block_wrappers.extend(shared_runtime_parts.trailing_block_wrappers)
 
     if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
-        if is_masquerading_as_specific_student(user, course_id):
-            # When masquerading as a specific student, we want to show the debug button
-            # unconditionally to enable resetting the state of the student we are masquerading as.
-            # We already know the user has staff access when masquerading is active.
-            staff_access = True
-            # To figure out whether the user has instructor access, we temporarily remove the
-            # masquerade_settings from the real_user.  With the masquerading settings in place,
-            # the result would always be "False".
-            masquerade_settings = user.real_user.masquerade_settings
-            del user.real_user.masquerade_settings
-            instructor_access = bool(has_access(user.real_user, 'instructor', descriptor, course_id))
-            user.real_user.masquerade_settings = masquerade_settings
-        else:
-            staff_access = has_access(user, 'staff', descriptor, course_id)
-            instructor_access = bool(has_access(user, 'instructor', descriptor, course_id))
+        staff_access, instructor_access = shared_runtime_parts.staff_and_instructor_access
         if staff_access:
             block_wrappers.append(partial(add_staff_markup, user, instructor_access, disable_staff_debug_info))
 
@@ -627,13 +754,16 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
     module_class = getattr(descriptor, 'module_class', None)
     is_lti_module = not is_pure_xblock and issubclass(module_class, LTIModule)
     if is_pure_xblock or is_lti_module:
-        anonymous_student_id = anonymous_id_for_user(user, course_id)
+        anonymous_student_id = anonymous_id_for_user(user, course_id, read_only=read_only_anonymous_id)
     else:
-        anonymous_student_id = anonymous_id_for_user(user, None)
+        anonymous_student_id = anonymous_id_for_user(user, None, read_only=read_only_anonymous_id)
 
     field_data = LmsFieldData(descriptor._field_data, student_data)  # pylint: disable=protected-access
 
-    user_is_staff = bool(has_access(user, u'staff', descriptor.location, course_id))
+    user_is_staff = shared_runtime_parts.user_is_staff
+
+    services = dict(shared_runtime_parts.services)
+    services['field-data'] = field_data
 
     system = LmsModuleSystem(
         track_function=track_function,
@@ -662,7 +792,7 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
         replace_jump_to_id_urls=partial(
             static_replace.replace_jump_to_id_urls,
             course_id=course_id,
-            jump_to_id_base_url=reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''})
+            jump_to_id_base_url=shared_runtime_parts.jump_to_id_base_url
         ),
         node_path=settings.NODE_PATH,
         publish=publish,
@@ -675,16 +805,7 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
         mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
         wrappers=block_wrappers,
         get_real_user=user_by_anonymous_id,
-        services={
-            'fs': FSService(),
-            'field-data': field_data,
-            'user': DjangoXBlockUserService(user, user_is_staff=user_is_staff),
-            'verification': VerificationService(),
-            'proctoring': ProctoringService(),
-            'milestones': milestones_helpers.get_service(),
-            'credit': CreditService(),
-            'bookmarks': BookmarksService(user=user),
-        },
+        services=services,
         get_user_role=lambda: get_user_role(user, course_id),
         descriptor_runtime=descriptor._runtime,  # pylint: disable=protected-access
         rebind_noauth_module_to_user=rebind_noauth_module_to_user,
@@ -703,12 +824,12 @@ def get_module_system_for_user(user, student_data,  # TODO  # pylint: disable=to
     system.set('position', position)
 
     system.set(u'user_is_staff', user_is_staff)
-    system.set(u'user_is_admin', bool(has_access(user, u'staff', 'global')))
-    system.set(u'user_is_beta_tester', CourseBetaTesterRole(course_id).has_user(user))
+    system.set(u'user_is_admin', shared_runtime_parts.user_is_admin)
+    system.set(u'user_is_beta_tester', shared_runtime_parts.user_is_beta_tester)
     system.set(u'days_early_for_beta', descriptor.days_early_for_beta)
 
     # make an ErrorDescriptor -- assuming that the descriptor's system is ok
-    if has_access(user, u'staff', descriptor.location, course_id):
+    if user_is_staff:
         system.error_descriptor_class = ErrorDescriptor
     else:
         system.error_descriptor_class = NonStaffErrorDescriptor
@@ -722,7 +843,7 @@ def get_module_for_descriptor_internal(user, descriptor, student_data, course_id
                                        track_function, xqueue_callback_url_prefix, request_token,
                                        position=None, wrap_xmodule_display=True, grade_bucket_type=None,
                                        static_asset_path='', user_location=None, disable_staff_debug_info=False,
-                                       course=None):
+                                       course=None, shared_runtime_parts=None, read_only_anonymous_id=False):
     """
     Actually implement get_module, without requiring a request.
 
@@ -730,6 +851,8 @@ def get_module_for_descriptor_internal(user, descriptor, student_data, course_id
 
     Arguments:
         request_token (str): A unique token for this request, used to isolate xblock rendering
+        shared_runtime_parts (SharedRuntimeParts): The parts of the runtime built for an ancestor
+            of the descriptor, if any.
     """
 
     (system, student_data) = get_module_system_for_user(
@@ -746,7 +869,9 @@ def get_module_for_descriptor_internal(user, descriptor, student_data, course_id
         user_location=user_location,
         request_token=request_token,
         disable_staff_debug_info=disable_staff_debug_info,
-        course=course
+        course=course,
+        shared_runtime_parts=shared_runtime_parts,
+        read_only_anonymous_id=read_only_anonymous_id,
     )
 
     descriptor.bind_for_student(
@@ -785,7 +910,10 @@ def load_single_xblock(request, user_id, course_id, usage_key_string, course=Non
         modulestore().get_item(usage_key),
         depth=0,
     )
-    instance = get_module(user, request, usage_key, field_data_cache, grade_bucket_type='xqueue', course=course)
+    instance = get_module(
+        user, request, usage_key, field_data_cache, grade_bucket_type='xqueue', course=course,
+        read_only_anonymous_id=False,
+    )
     if instance is None:
         msg = "No module {0} for user {1}--access denied?".format(usage_key_string, user)
         log.debug(msg)
@@ -881,10 +1009,13 @@ def handle_xblock_callback(request, course_id, usage_id, handler, suffix=None):
         return _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course=course)
 
 
-def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None):
+def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None,
+                           read_only_anonymous_id=True):
     """
     Gets a module instance based on its `usage_id` in a course, for a given request/user
 
+    See get_module() for read_only_anonymous_id.
+
     Returns (instance, tracking_context)
     """
     user = request.user
@@ -932,7 +1063,8 @@ def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_inf
         field_data_cache,
         usage_key.course_key,
         disable_staff_debug_info=disable_staff_debug_info,
-        course=course
+        course=course,
+        read_only_anonymous_id=read_only_anonymous_id,
     )
     if instance is None:
         # Either permissions just changed, or someone is trying to be clever
@@ -970,7 +1102,9 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
     set_custom_metrics_for_course_key(course_key)
 
     with modulestore().bulk_operations(course_key):
-        instance, tracking_context = get_module_by_usage_id(request, course_id, usage_id, course=course)
+        instance, tracking_context = get_module_by_usage_id(
+            request, course_id, usage_id, course=course, read_only_anonymous_id=False,
+        )
 
         # Name the transaction so that we can view XBlock handlers separately in
         # New Relic. The suffix is necessary for XModule handlers because the
@@ -983,7 +1117,8 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
         req = django_to_webob_request(request)
         try:
             with tracker.get_tracker().context(tracking_context_name, tracking_context):
-                resp = instance.handle(handler, req, suffix)
+                with coalesced_user_state_writes():
+                    resp = instance.handle(handler, req, suffix)
                 if suffix == 'problem_check' \
                         and course \
                         and getattr(course, 'entrance_exam_enabled', False) \
@@ -3,9 +3,32 @@ Field overrides for self-paced courses. This allows overriding due
 dates for each block in the course.
 """
 
+import request_cache
 from openedx.core.djangoapps.self_paced.models import SelfPacedConfiguration
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import NOTSET, FieldOverrideIndex, FieldOverrideProvider
+
+
+def _get_date_override(block, name, default):
+    """
+    Returns the overridden date for the field named `name` in `block`, or `default`.
+    """
+    # Remove due dates
+    if name == 'due':
+        return None
+    # Remove release dates for course content
+    if name == 'start' and block.category != 'course':
+        return None
+
+    return default
+
+
+class SelfPacedDateOverrideIndex(FieldOverrideIndex):
+    """
+    The date overrides of a self-paced course.
+    """
+    def get(self, block, name):
+        return _get_date_override(block, name, NOTSET)
 
 
 class SelfPacedDateOverrideProvider(FieldOverrideProvider):
@@ -15,14 +38,18 @@ class SelfPacedDateOverrideProvider(FieldOverrideProvider):
     due dates to be overridden for self-paced courses.
     """
     def get(self, block, name, default):
-        # Remove due dates
-        if name == 'due':
-            return None
-        # Remove release dates for course content
-        if name == 'start' and block.category != 'course':
-            return None
-
-        return default
+        return _get_date_override(block, name, default)
+
+    def override_index(self, block):
+        """
+        The overrides are the same for all users, so the index is shared by
+        all the blocks of the course for the duration of the request.
+        """
+        index_cache = request_cache.get_cache('self-paced-override-index')
+        course_key = block.location.course_key
+        if course_key not in index_cache:
+            index_cache[course_key] = SelfPacedDateOverrideIndex()
+        return index_cache[course_key]
 
     @classmethod
     def enabled_for(cls, block):
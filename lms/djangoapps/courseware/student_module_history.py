@@ -0,0 +1,185 @@
+"""
+Writing and compacting of StudentModule history.
+
+Every save of a StudentModule of a type whose history is kept adds a row
+to the history table, with a snapshot of its state.  When the
+ENABLE_CSMH_WRITE_BUFFER feature is enabled, these rows are buffered, and
+inserted at once when the request or celery task is over, instead of one
+at a time along with the saves of the StudentModules.
+
+Older history rows can have their state compressed, or be thinned out, by
+the compact_studentmodulehistory management command.  Compressed states
+are decompressed when read through BaseStudentModuleHistory.get_history.
+"""
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.dispatch import receiver
+
+log = logging.getLogger(__name__)
+
+# Prefix of the states compressed by compress_state, which can't be the
+# start of a serialized JSON state.
+COMPRESSED_STATE_PREFIX = 'zlib:'
+
+
+class _HistoryWriteBuffer(threading.local):
+    """
+    A thread-local collecting the history entries to insert, by model, while
+    buffered_history_writes is in effect.
+    """
+    def __init__(self):
+        super(_HistoryWriteBuffer, self).__init__()
+        self.depth = 0
+        self.pending = OrderedDict()
+
+
+_HISTORY_WRITE_BUFFER = _HistoryWriteBuffer()
+
+
+@contextmanager
+def buffered_history_writes():
+    """
+    Context manager within which the history entries saved with
+    save_history_entry are buffered, and inserted in bulk when the outermost
+    context exits.
+
+    It is in effect for every request and celery task, and only buffers when
+    the ENABLE_CSMH_WRITE_BUFFER feature is enabled.
+    """
+    _enter_buffered_history_writes()
+    try:
+        yield
+    finally:
+        _exit_buffered_history_writes()
+
+
+def save_history_entry(history_entry):
+    """
+    Saves the given history entry, or buffers it while
+    buffered_history_writes is in effect.
+    """
+    buffered = _HISTORY_WRITE_BUFFER
+    if buffered.depth == 0 or not settings.FEATURES.get('ENABLE_CSMH_WRITE_BUFFER'):
+        history_entry.save()
+        return
+    buffered.pending.setdefault(type(history_entry), []).append(history_entry)
+
+
+def discard_history_entries(history_model, student_module_id):
+    """
+    Discards the buffered entries of the given history model for the
+    StudentModule of the given id, which is being deleted.
+    """
+    pending = _HISTORY_WRITE_BUFFER.pending.get(history_model)
+    if pending:
+        pending[:] = [entry for entry in pending if entry.student_module_id != student_module_id]
+
+
+def flush_history_writes():
+    """
+    Inserts the buffered history entries, for them to be read.
+
+    The entries of each model are inserted at once, or one at a time if
+    that fails, so that one bad entry doesn't lose the others.
+    """
+    pending, _HISTORY_WRITE_BUFFER.pending = _HISTORY_WRITE_BUFFER.pending, OrderedDict()
+    for history_model, history_entries in pending.iteritems():
+        try:
+            history_model.objects.bulk_create(history_entries)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(
+                u'Failed to insert %d %s entries at once, inserting them one at a time.',
+                len(history_entries),
+                history_model.__name__,
+            )
+            _save_history_entries(history_entries)
+
+
+def _save_history_entries(history_entries):
+    """
+    Saves the given history entries one at a time, logging the failures.
+    """
+    for history_entry in history_entries:
+        try:
+            history_entry.save()
+        except Exception:  # pylint: disable=broad-except
+            # The buffered entries are inserted when the request or task is
+            # over, so their failure can't fail it anymore.
+            log.exception(
+                u'Failed to insert the %s entry of StudentModule %s.',
+                type(history_entry).__name__,
+                history_entry.student_module_id,
+            )
+
+
+def _enter_buffered_history_writes():
+    """
+    Starts buffering history writes, for the outermost caller.
+    """
+    _HISTORY_WRITE_BUFFER.depth += 1
+
+
+def _exit_buffered_history_writes():
+    """
+    Stops buffering history writes, and inserts the buffered entries when
+    exiting the outermost caller.
+    """
+    buffered = _HISTORY_WRITE_BUFFER
+    if buffered.depth == 0:
+        return
+    buffered.depth -= 1
+    if buffered.depth == 0:
+        flush_history_writes()
+
+
+@receiver(request_started)
+@task_prerun.connect
+def _start_buffering_history_writes(**kwargs):  # pylint: disable=unused-argument
+    """
+    Buffers history writes until the end of the request or celery task.
+    """
+    _enter_buffered_history_writes()
+
+
+@receiver(request_finished)
+@task_postrun.connect
+def _flush_buffered_history_writes(**kwargs):  # pylint: disable=unused-argument
+    """
+    Inserts the history entries buffered during the request or celery task.
+    """
+    _exit_buffered_history_writes()
+
+
+def compress_state(state):
+    """
+    Returns the given serialized state compressed, for it to be stored in
+    place of the state of an old history entry, unless it's shorter as is.
+    """
+    if state is None or is_compressed_state(state):
+        return state
+    compressed = COMPRESSED_STATE_PREFIX + zlib.compress(state.encode('utf-8')).encode('base64').replace('\n', '')
+    # Small states don't compress, so they are kept as is.
+    return compressed if len(compressed) < len(state) else state
+
+
+def decompress_state(state):
+    """
+    Returns the serialized state of the given possibly compressed state.
+    """
+    if state is None or not is_compressed_state(state):
+        return state
+    return zlib.decompress(state[len(COMPRESSED_STATE_PREFIX):].decode('base64')).decode('utf-8')
+
+
+def is_compressed_state(state):
+    """
+    Returns whether the given state was compressed by compress_state.
+    """
+    return state.startswith(COMPRESSED_STATE_PREFIX)
@@ -0,0 +1,92 @@
+"""
+Benchmark of the rendering of a large vertical for a learner.
+
+Not collected by the test runner; run it explicitly, e.g.:
+
+    paver test_system -t lms/djangoapps/courseware/tests/benchmark_module_render.py -s
+
+It reports the time taken to get and render the student view of a vertical
+of 40 HTML components, with the parts of the runtimes bound to the user and
+the course shared by the vertical and its components, and with a runtime
+built from scratch for each of them.
+"""
+import timeit
+
+from django.test.client import RequestFactory
+from mock import patch
+
+from courseware import module_render as render
+from courseware.model_data import FieldDataCache
+from courseware.tests.factories import UserFactory
+from student.tests.factories import CourseEnrollmentFactory
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.x_module import STUDENT_VIEW
+
+_get_module_for_descriptor_internal = render.get_module_for_descriptor_internal
+
+
+def _get_module_without_shared_parts(*args, **kwargs):
+    """
+    Gets the module of the given descriptor, building its runtime from scratch.
+    """
+    kwargs.pop('shared_runtime_parts', None)
+    return _get_module_for_descriptor_internal(*args, **kwargs)
+
+
+class LargeVerticalRenderBenchmark(SharedModuleStoreTestCase):
+    """
+    Times the rendering of a vertical of many components.
+    """
+    COMPONENTS = 40
+    NUMBER = 10
+    REPEAT = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super(LargeVerticalRenderBenchmark, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category='chapter')
+        sequential = ItemFactory.create(parent=chapter, category='sequential')
+        cls.vertical = ItemFactory.create(parent=sequential, category='vertical')
+        for index in range(cls.COMPONENTS):
+            ItemFactory.create(
+                parent=cls.vertical,
+                category='html',
+                data=u'<p>Component {} <a href="/static/handout.pdf">handout</a></p>'.format(index),
+            )
+
+    def setUp(self):
+        super(LargeVerticalRenderBenchmark, self).setUp()
+        self.user = UserFactory.create()
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course.id)
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        self.request.session = {}
+
+    def render_vertical(self):
+        """
+        Gets and renders the student view of the vertical.
+        """
+        vertical = self.store.get_item(self.vertical.location, depth=None)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, vertical)
+        module = render.get_module_for_descriptor(
+            self.user, self.request, vertical, field_data_cache, self.course.id, course=self.course,
+        )
+        module.render(STUDENT_VIEW)
+
+    def time_render(self):
+        """
+        Returns the best average time taken to render the vertical.
+        """
+        return min(timeit.repeat(self.render_vertical, number=self.NUMBER, repeat=self.REPEAT)) / self.NUMBER
+
+    def test_render_large_vertical(self):
+        shared = self.time_render()
+        with patch('courseware.module_render.get_module_for_descriptor_internal', _get_module_without_shared_parts):
+            unshared = self.time_render()
+        print "Vertical of {} components: {:.1f}ms with shared runtime parts, {:.1f}ms without".format(
+            self.COMPONENTS,
+            shared * 1000,
+            unshared * 1000,
+        )
@@ -0,0 +1,139 @@
+"""
+Tests for the in-memory index of the course catalog.
+"""
+import itertools
+from datetime import datetime, timedelta
+
+import ddt
+import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache.backends.locmem import LocMemCache
+from freezegun import freeze_time
+from nose.plugins.attrib import attr
+from pytz import UTC
+
+from courseware.catalog_index import CatalogQuery, clear_catalog_index, get_catalog_index
+from courseware.courses import get_courses, sort_by_announcement, sort_by_start_date
+from openedx.core.djangoapps.content.course_overviews.config import INDEX_COURSE_CATALOG, waffle
+from student.tests.factories import AdminFactory, UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+@attr(shard=1)
+@ddt.ddt
+class CatalogIndexTest(ModuleStoreTestCase):
+    """
+    Tests for listing courses from the catalog index.
+    """
+    ENABLED_SIGNALS = ['course_published']
+
+    def setUp(self):
+        super(CatalogIndexTest, self).setUp()
+
+        # The index is only kept in process memory along with a shared cache
+        patcher = mock.patch(
+            'openedx.core.djangoapps.content.course_overviews.models.cache',
+            LocMemCache('catalog_index', {}),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(clear_catalog_index)
+
+        now = datetime.now(UTC)
+        self.started_course = CourseFactory.create(
+            org='edX', number='C', start=now - timedelta(days=10), emit_signals=True
+        )
+        self.announced_course = CourseFactory.create(
+            org='MITx', number='A', start=now + timedelta(days=10), announcement=now - timedelta(days=1),
+            emit_signals=True,
+        )
+        self.unannounced_course = CourseFactory.create(
+            org='edX', number='B', start=now + timedelta(days=10), enrollment_start=now + timedelta(days=5),
+            emit_signals=True,
+        )
+        self.ended_course = CourseFactory.create(
+            org='HarvardX', number='D', start=now - timedelta(days=20), end=now - timedelta(days=1),
+            mobile_available=True, emit_signals=True,
+        )
+
+        self.users = {
+            'anonymous': AnonymousUser(),
+            'learner': UserFactory.create(),
+            'staff': AdminFactory.create(),
+        }
+
+    def get_course_ids(self, courses):
+        """
+        Returns the ids of the given courses, in order.
+        """
+        return [course.id for course in courses]
+
+    @ddt.data(*itertools.product(
+        ['anonymous', 'learner', 'staff'],
+        [None, 'edx', 'MITx'],
+        [None, {'mobile_available': True}, {'mobile_available': False}],
+    ))
+    @ddt.unpack
+    def test_same_courses(self, user, org, filter_):
+        user = self.users[user]
+        expected = get_courses(user, org=org, filter_=filter_)
+
+        with waffle().override(INDEX_COURSE_CATALOG, True):
+            courses = get_courses(user, org=org, filter_=filter_)
+
+        self.assertIsInstance(courses, CatalogQuery)
+        self.assertEqual(len(courses), len(expected))
+        self.assertEqual(self.get_course_ids(courses), self.get_course_ids(expected))
+        self.assertEqual(
+            self.get_course_ids(sort_by_announcement(courses)),
+            self.get_course_ids(sort_by_announcement(expected)),
+        )
+        self.assertEqual(
+            self.get_course_ids(sort_by_start_date(courses)),
+            self.get_course_ids(sort_by_start_date(expected)),
+        )
+
+    def test_unannounced_course_hidden(self):
+        with waffle().override(INDEX_COURSE_CATALOG, True):
+            for user, visible in (('anonymous', False), ('learner', False), ('staff', True)):
+                course_ids = self.get_course_ids(get_courses(self.users[user]))
+                self.assertEqual(self.unannounced_course.id in course_ids, visible)
+
+    def test_slicing(self):
+        with waffle().override(INDEX_COURSE_CATALOG, True):
+            courses = get_courses(self.users['staff'])
+            all_courses = list(courses)
+
+            self.assertEqual(len(all_courses), 4)
+            self.assertEqual(courses[1:3], all_courses[1:3])
+            self.assertEqual(courses[2], all_courses[2])
+            self.assertEqual(courses[-1], all_courses[-1])
+            with self.assertRaises(IndexError):
+                courses[4]  # pylint: disable=pointless-statement
+
+    def test_index_reused(self):
+        index = get_catalog_index()
+        with self.assertNumQueries(0):
+            self.assertIs(get_catalog_index(), index)
+
+    def test_index_rebuilt_on_publish(self):
+        index = get_catalog_index()
+        self.assertFalse(index.courses[self.started_course.id].mobile_available)
+
+        self.started_course.mobile_available = True
+        self.update_course(self.started_course, self.user.id)
+
+        index = get_catalog_index()
+        self.assertTrue(index.courses[self.started_course.id].mobile_available)
+
+    def test_index_rebuilt_when_enrollment_opens(self):
+        index = get_catalog_index()
+        enrollment_start = index.courses[self.unannounced_course.id].enrollment_start
+        self.assertEqual(index.valid_until, enrollment_start)
+
+        with freeze_time(enrollment_start + timedelta(seconds=1)):
+            self.assertIsNot(get_catalog_index(), index)
+            with waffle().override(INDEX_COURSE_CATALOG, True):
+                course_ids = self.get_course_ids(get_courses(self.users['anonymous']))
+            self.assertIn(self.unannounced_course.id, course_ids)
@@ -12,6 +12,8 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..field_overrides import (
+    NOTSET,
+    FieldOverrideIndex,
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
@@ -142,6 +144,102 @@ class OverrideModulestoreFieldDataTests(FieldOverrideTestMixin, OverrideFieldDat
         self.assertIsInstance(data, DictFieldData)
 
 
+class FakeBlock(object):
+    """
+    A block with just enough of an interface for override lookups.
+    """
+    def __init__(self, location, parent=None):
+        self.location = location
+        self.parent = parent
+
+    def get_parent(self):
+        return self.parent
+
+
+class TestOverrideIndex(FieldOverrideIndex):
+    """
+    A concrete implementation of `FieldOverrideIndex` for testing.
+    """
+    def __init__(self, overrides):
+        super(TestOverrideIndex, self).__init__()
+        self.overrides = overrides
+        self.lookups = 0
+
+    def get(self, block, name):
+        self.lookups += 1
+        return self.overrides.get(block.location, {}).get(name, NOTSET)
+
+
+def make_indexed_provider(overrides):
+    """
+    Returns a provider class publishing a `TestOverrideIndex` of `overrides`.
+    """
+    index = TestOverrideIndex(overrides)
+
+    class TestIndexedOverrideProvider(FieldOverrideProvider):
+        def get(self, block, name, default):
+            raise AssertionError("The index should be used")
+
+        def override_index(self, block):
+            return index
+
+        @classmethod
+        def enabled_for(cls, course):
+            return True
+
+    return TestIndexedOverrideProvider
+
+
+@attr(shard=1)
+class OverrideIndexTests(unittest.TestCase):
+    """
+    Tests for `OverrideFieldData` with providers publishing override indexes.
+    """
+    def setUp(self):
+        super(OverrideIndexTests, self).setUp()
+        self.course = FakeBlock('course')
+        self.chapter = FakeBlock('chapter', self.course)
+        self.sequential = FakeBlock('sequential', self.chapter)
+        self.vertical = FakeBlock('vertical', self.sequential)
+
+    def make_one(self, *providers):
+        return OverrideFieldData(TESTUSER, DictFieldData({'due': 'original'}), providers)
+
+    def test_get(self):
+        data = self.make_one(make_indexed_provider({'vertical': {'due': 'tomorrow'}}))
+        self.assertEqual(data.get(self.vertical, 'due'), 'tomorrow')
+        self.assertEqual(data.get(self.sequential, 'due'), 'original')
+        with disable_overrides():
+            self.assertEqual(data.get(self.vertical, 'due'), 'original')
+
+    def test_inherited(self):
+        provider = make_indexed_provider({'chapter': {'due': 'tomorrow'}})
+        data = self.make_one(provider)
+        self.assertFalse(data.has(self.vertical, 'due'))
+        self.assertEqual(data.default(self.vertical, 'due'), 'tomorrow')
+        self.assertEqual(data.get_inherited_override(self.chapter, 'due'), NOTSET)
+        with disable_overrides():
+            self.assertEqual(data.get_inherited_override(self.vertical, 'due'), NOTSET)
+
+    def test_inherited_is_resolved_once(self):
+        provider = make_indexed_provider({'course': {'due': 'tomorrow'}})
+        index = provider(TESTUSER).override_index(self.course)
+        self.assertEqual(self.make_one(provider).default(self.vertical, 'due'), 'tomorrow')
+        lookups = index.lookups
+        # Lookups are remembered by the index, across field data instances
+        self.assertEqual(self.make_one(provider).default(self.vertical, 'due'), 'tomorrow')
+        self.assertEqual(self.make_one(provider).default(self.sequential, 'due'), 'tomorrow')
+        self.assertEqual(index.lookups, lookups)
+
+    def test_nearest_inherited_override_wins(self):
+        data = self.make_one(
+            make_indexed_provider({'course': {'due': 'course'}}),
+            make_indexed_provider({'sequential': {'due': 'sequential'}}),
+        )
+        self.assertEqual(data.default(self.vertical, 'due'), 'sequential')
+        self.assertEqual(data.default(self.sequential, 'due'), 'course')
+
+
 @attr(shard=1)
 class ResolveDottedTests(unittest.TestCase):
     """
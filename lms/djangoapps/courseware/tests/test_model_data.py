@@ -4,6 +4,7 @@ Test for lms courseware app, module data (runtime data storage for XBlocks)
 import json
 from functools import partial
 
+from django.conf import settings
 from django.db import DatabaseError
 from django.test import TestCase
 from mock import Mock, patch
@@ -12,7 +13,13 @@ from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import (
+    DjangoKeyValueStore,
+    FieldDataCache,
+    InvalidScopeError,
+    coalesced_user_state_writes,
+    flush_user_state_writes
+)
 from courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -234,6 +241,41 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
                 self.kvs.set_many(kv_dict)
         self.assertEquals(exception_context.exception.saved_field_names, [])
 
+    @patch.dict(settings.FEATURES, {'COALESCE_USER_STATE_WRITES': True})
+    def test_coalesced_writes(self):
+        "Test that the writes to a StudentModule are saved at once when coalesced"
+        with coalesced_user_state_writes():
+            with self.assertNumQueries(0):
+                self.kvs.set(user_state_key('a_field'), 'new_value')
+                self.kvs.set(user_state_key('not_a_field'), 'other_value')
+                self.kvs.set(user_state_key('a_field'), 'newer_value')
+                self.assertEquals('newer_value', self.kvs.get(user_state_key('a_field')))
+            self.assertEquals(
+                {'b_field': 'b_value', 'a_field': 'a_value'},
+                json.loads(StudentModule.objects.get().state)
+            )
+
+            with self.assertNumQueries(4, using='default'):
+                with self.assertNumQueries(1, using='student_module_history'):
+                    flush_user_state_writes()
+            self.assertEquals(
+                {'b_field': 'b_value', 'a_field': 'newer_value', 'not_a_field': 'other_value'},
+                json.loads(StudentModule.objects.get().state)
+            )
+
+            self.kvs.set(user_state_key('a_field'), 'last_value')
+        self.assertEquals('last_value', json.loads(StudentModule.objects.get().state)['a_field'])
+
+    @patch.dict(settings.FEATURES, {'COALESCE_USER_STATE_WRITES': True})
+    def test_coalesced_writes_failure(self):
+        "Test that failures to save coalesced writes are raised when leaving the context"
+        with patch('django.db.models.Model.save', side_effect=DatabaseError):
+            with self.assertRaises(KeyValueMultiSaveError):
+                with coalesced_user_state_writes():
+                    self.kvs.set(user_state_key('a_field'), 'new_value')
+        self.assertEquals('a_value', json.loads(StudentModule.objects.get().state)['a_field'])
+        self.assertEquals('new_value', self.kvs.get(user_state_key('a_field')))
+
 
 @attr(shard=1)
 class TestMissingStudentModule(TestCase):
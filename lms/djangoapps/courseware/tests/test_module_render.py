@@ -49,7 +49,7 @@ from openedx.core.djangoapps.credit.models import CreditCourse
 from openedx.core.lib.courses import course_image_url
 from openedx.core.lib.gating import api as gating_api
 from openedx.core.lib.url_utils import quote_slashes
-from student.models import anonymous_id_for_user
+from student.models import anonymous_id_for_user, user_by_anonymous_id
 from verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xblock_django.models import XBlockConfiguration
 from xmodule.lti_module import LTIDescriptor
@@ -1591,7 +1591,7 @@ class TestAnonymousStudentId(SharedModuleStoreTestCase, LoginEnrollmentTestCase)
         self.user = UserFactory()
 
     @patch('courseware.module_render.has_access', Mock(return_value=True, autospec=True))
-    def _get_anonymous_id(self, course_id, xblock_class):
+    def _get_anonymous_id(self, course_id, xblock_class, **kwargs):
         location = course_id.make_usage_key('dummy_category', 'dummy_name')
         descriptor = Mock(
             spec=xblock_class,
@@ -1627,6 +1627,7 @@ class TestAnonymousStudentId(SharedModuleStoreTestCase, LoginEnrollmentTestCase)
             xqueue_callback_url_prefix=Mock(name='xqueue_callback_url_prefix'),  # XQueue Callback Url Prefix
             request_token='request_token',
             course=self.course,
+            **kwargs
         ).xmodule_runtime.anonymous_student_id
 
     @ddt.data(*PER_STUDENT_ANONYMIZED_DESCRIPTORS)
@@ -1655,6 +1656,22 @@ class TestAnonymousStudentId(SharedModuleStoreTestCase, LoginEnrollmentTestCase)
             self._get_anonymous_id(SlashSeparatedCourseKey('MITx', '6.00x', '2013_Spring'), descriptor_class)
         )
 
+    @patch('student.tasks.create_anonymous_user_ids_task.delay')
+    def test_anonymous_id_saved_unless_rendering(self, mock_delay):
+        course_key = SlashSeparatedCourseKey('MITx', '6.00x', '2012_Fall')
+        anonymous_id = self._get_anonymous_id(course_key, PER_COURSE_ANONYMIZED_DESCRIPTORS[0])
+        self.assertEqual(user_by_anonymous_id(anonymous_id), self.user)
+        self.assertEqual(mock_delay.call_count, 0)
+
+    @patch('student.tasks.create_anonymous_user_ids_task.delay')
+    def test_anonymous_id_saved_in_background_while_rendering(self, mock_delay):
+        course_key = SlashSeparatedCourseKey('MITx', '6.00x', '2012_Fall')
+        anonymous_id = self._get_anonymous_id(
+            course_key, PER_COURSE_ANONYMIZED_DESCRIPTORS[0], read_only_anonymous_id=True
+        )
+        self.assertIsNone(user_by_anonymous_id(anonymous_id))
+        self.assertEqual(mock_delay.call_count, 1)
+
 
 @attr(shard=1)
 @patch('track.views.tracker', autospec=True)
@@ -2023,6 +2040,28 @@ class LMSXBlockServiceBindingTest(SharedModuleStoreTestCase):
         self.assertFalse(runtime.user_is_beta_tester)
         self.assertEqual(runtime.days_early_for_beta, 5)
 
+    @XBlock.register_temp_plugin(PureXBlock, identifier='pure')
+    def test_runtime_parts_shared_with_children(self):
+        """
+        Tests that the parts of the runtime bound to the user and the course are
+        built once for a block and the blocks it gets.
+        """
+        descriptor = ItemFactory(category="pure", parent=self.course)
+        with patch('courseware.module_render.SharedRuntimeParts', wraps=render.SharedRuntimeParts) as mock_parts:
+            runtime, _ = render.get_module_system_for_user(
+                self.user,
+                self.student_data,
+                descriptor,
+                self.course.id,
+                self.track_function,
+                self.xqueue_callback_url_prefix,
+                self.request_token,
+                course=self.course
+            )
+            runtime.get_module(ItemFactory(category="pure", parent=self.course))
+            runtime.get_module(ItemFactory(category="pure", parent=self.course))
+        self.assertEqual(mock_parts.call_count, 1)
+
 
 class PureXBlockWithChildren(PureXBlock):
     """
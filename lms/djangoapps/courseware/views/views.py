@@ -57,7 +57,7 @@ from courseware.courses import (
     sort_by_start_date
 )
 from courseware.date_summary import VerifiedUpgradeDeadlineDate
-from courseware.masquerade import setup_masquerade
+from courseware.masquerade import is_masquerading_as_student, setup_masquerade
 from courseware.model_data import FieldDataCache
 from courseware.models import BaseStudentModuleHistory, StudentModule
 from courseware.url_helpers import get_redirect_url
@@ -69,6 +69,7 @@ from lms.djangoapps.ccx.custom_exception import CCXLocatorValidationException
 from lms.djangoapps.ccx.utils import prep_course_for_grading
 from lms.djangoapps.courseware.exceptions import CourseAccessRedirect, Redirect
 from lms.djangoapps.grades.new.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.grades.new.progress_summary_factory import ProgressSummaryFactory
 from lms.djangoapps.grades.signals.signals import PROGRESS_PAGE_VISITED
 from lms.djangoapps.instructor.enrollment import uses_shib
 from lms.djangoapps.instructor.views.api import require_global_staff
@@ -919,7 +920,10 @@ def _progress(request, course_key, student_id):
     # NOTE: To make sure impersonation by instructor works, use
     # student instead of request.user in the rest of the function.
 
-    course_grade = CourseGradeFactory().create(student, course)
+    if is_masquerading_as_student(request.user, course_key):
+        course_grade = CourseGradeFactory().create(student, course)
+    else:
+        course_grade = ProgressSummaryFactory().create(student, course)
     courseware_summary = course_grade.chapter_grades.values()
     grade_summary = course_grade.summary
 
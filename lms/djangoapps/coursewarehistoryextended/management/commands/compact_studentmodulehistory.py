@@ -0,0 +1,156 @@
+"""
+Command to compact old StudentModuleHistoryExtended entries.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from courseware.student_module_history import compress_state
+from coursewarehistoryextended.models import StudentModuleHistoryExtended
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Compacts the StudentModuleHistoryExtended entries by age, in tiers:
+
+    * the entries created in the last --compress_after_days days are kept as is,
+    * the older ones have their state compressed,
+    * the ones older than --thin_after_days days, if given, are thinned out to the
+      last entry of each day of each StudentModule.
+
+    The entries are processed in batches of ids, so that an entry ending a day
+    in a batch may be kept along with the entry ending it in the next batch.
+
+    Example usage:
+        $ ./manage.py lms compact_studentmodulehistory --compress_after_days 90 --thin_after_days 730
+    """
+    help = 'Compresses the state of old StudentModule history entries, and thins out the oldest ones.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--compress_after_days',
+            type=int,
+            default=90,
+            help='Age in days of the entries to compress the state of.',
+        )
+        parser.add_argument(
+            '--thin_after_days',
+            type=int,
+            default=None,
+            help='Age in days of the entries to keep only the last entry of each day of each StudentModule of.',
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=1000,
+            help='Number of ids of entries to process at once.',
+        )
+        parser.add_argument(
+            '--sleep_between',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches.',
+        )
+        parser.add_argument(
+            '--dry_run',
+            action='store_true',
+            default=False,
+            help='Count the entries to compact without changing them.',
+        )
+
+    def handle(self, *args, **options):
+        compress_after_days = options['compress_after_days']
+        thin_after_days = options['thin_after_days']
+        if thin_after_days is not None and thin_after_days < compress_after_days:
+            raise CommandError('--thin_after_days must not be less than --compress_after_days.')
+
+        now = timezone.now()
+        compress_before = now - timedelta(days=compress_after_days)
+        thin_before = now - timedelta(days=thin_after_days) if thin_after_days is not None else None
+
+        id_range = StudentModuleHistoryExtended.objects.filter(created__lt=compress_before).aggregate(
+            min_id=Min('id'),
+            max_id=Max('id'),
+        )
+        if id_range['min_id'] is None:
+            log.info('No StudentModule history entries to compact.')
+            return
+
+        totals = {'compressed': 0, 'deleted': 0}
+        for batch_start in xrange(id_range['min_id'], id_range['max_id'] + 1, options['batch_size']):
+            compressed, deleted = self._compact_batch(
+                batch_start,
+                batch_start + options['batch_size'],
+                compress_before,
+                thin_before,
+                options['dry_run'],
+            )
+            totals['compressed'] += compressed
+            totals['deleted'] += deleted
+            log.info(
+                'Compacted StudentModule history entries with ids from %d: %d compressed, %d deleted.',
+                batch_start,
+                compressed,
+                deleted,
+            )
+            if options['sleep_between']:
+                time.sleep(options['sleep_between'])
+
+        log.info(
+            'Compacted StudentModule history%s: %d entries compressed, %d deleted.',
+            ' (dry run)' if options['dry_run'] else '',
+            totals['compressed'],
+            totals['deleted'],
+        )
+
+    def _compact_batch(self, batch_start, batch_end, compress_before, thin_before, dry_run):
+        """
+        Compacts the entries of ids in [batch_start, batch_end) created before
+        compress_before, and returns the numbers of entries compressed and deleted.
+        """
+        entries = list(StudentModuleHistoryExtended.objects.filter(
+            id__gte=batch_start,
+            id__lt=batch_end,
+            created__lt=compress_before,
+        ).order_by('id').values_list('id', 'student_module_id', 'created', 'state'))
+
+        deleted_ids = set()
+        if thin_before is not None:
+            # The last entries by StudentModule and day, the ones processed last overriding the others.
+            last_entry_ids = {}
+            for entry_id, student_module_id, created, __ in entries:
+                if created < thin_before:
+                    last_entry_ids[(student_module_id, created.date())] = entry_id
+            deleted_ids = {
+                entry_id
+                for entry_id, student_module_id, created, __ in entries
+                if created < thin_before and last_entry_ids[(student_module_id, created.date())] != entry_id
+            }
+
+        compressed_states = {}
+        for entry_id, __, __, state in entries:
+            if entry_id not in deleted_ids:
+                compressed_state = compress_state(state)
+                if compressed_state != state:
+                    compressed_states[entry_id] = compressed_state
+
+        if not dry_run:
+            with transaction.atomic(using=router.db_for_write(StudentModuleHistoryExtended)):
+                if deleted_ids:
+                    StudentModuleHistoryExtended.objects.filter(id__in=deleted_ids).delete()
+                for entry_id, compressed_state in compressed_states.iteritems():
+                    StudentModuleHistoryExtended.objects.filter(id=entry_id).update(state=compressed_state)
+        return len(compressed_states), len(deleted_ids)
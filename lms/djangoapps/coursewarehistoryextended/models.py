@@ -17,6 +17,7 @@ from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from courseware.models import BaseStudentModuleHistory, StudentModule
+from courseware.student_module_history import discard_history_entries, save_history_entry
 from coursewarehistoryextended.fields import UnsignedBigIntAutoField
 
 
@@ -51,7 +52,7 @@ class StudentModuleHistoryExtended(BaseStudentModuleHistory):
                                                          state=instance.state,
                                                          grade=instance.grade,
                                                          max_grade=instance.max_grade)
-            history_entry.save()
+            save_history_entry(history_entry)
 
     @receiver(post_delete, sender=StudentModule)
     def delete_history(sender, instance, **kwargs):  # pylint: disable=no-self-argument, unused-argument
@@ -59,6 +60,7 @@ class StudentModuleHistoryExtended(BaseStudentModuleHistory):
         Django can't cascade delete across databases, so we tell it at the model level to
         on_delete=DO_NOTHING and then listen for post_delete so we can clean up the CSMHE rows.
         """
+        discard_history_entries(StudentModuleHistoryExtended, instance.id)
         StudentModuleHistoryExtended.objects.filter(student_module=instance).all().delete()
 
     def __unicode__(self):
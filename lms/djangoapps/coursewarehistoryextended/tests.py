@@ -6,15 +6,21 @@ backend tables.
 """
 
 import json
+from datetime import timedelta
 from unittest import skipUnless
 
 from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError
 from django.test import TestCase
+from django.utils import timezone
 from mock import patch
 from nose.plugins.attrib import attr
 
 from courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleHistory
+from courseware.student_module_history import buffered_history_writes, is_compressed_state, save_history_entry
 from courseware.tests.factories import StudentModuleFactory, course_id, location
+from coursewarehistoryextended.models import StudentModuleHistoryExtended
 
 
 @attr(shard=1)
@@ -79,3 +85,88 @@ class TestStudentModuleHistoryBackends(TestCase):
         student_module = StudentModule.objects.all()
         history = BaseStudentModuleHistory.get_history(student_module)
         self.assertEquals(len(history), 0)
+
+
+@attr(shard=1)
+@skipUnless(settings.FEATURES["ENABLE_CSMH_EXTENDED"], "CSMH Extended needs to be enabled")
+class TestStudentModuleHistoryCompaction(TestCase):
+    """ Tests of the buffering and compaction of CSMHE entries """
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestStudentModuleHistoryCompaction, self).setUp()
+        self.csm = StudentModuleFactory.create(module_state_key=location('usage_id'),
+                                               course_id=course_id,
+                                               state=json.dumps({'attempts': 0}))
+
+    def save_states(self, count):
+        """
+        Saves the CSM with count new states.
+        """
+        for attempts in range(1, count + 1):
+            self.csm.state = json.dumps({'attempts': attempts, 'input_state': {'answer': 'a' * 100}})
+            self.csm.save()
+
+    @patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_WRITE_BUFFER": True})
+    def test_buffered_history_writes(self):
+        with buffered_history_writes():
+            self.save_states(3)
+            self.assertEquals(StudentModuleHistoryExtended.objects.count(), 1)
+            with buffered_history_writes():
+                self.assertEquals(StudentModuleHistoryExtended.objects.count(), 1)
+            # The entries buffered so far are inserted at once to be read.
+            with self.assertNumQueries(2, using='student_module_history'):
+                history = BaseStudentModuleHistory.get_history([self.csm])
+            self.assertEquals(len(history), 4)
+            self.save_states(2)
+        self.assertEquals(StudentModuleHistoryExtended.objects.count(), 6)
+        self.assertEquals(json.loads(BaseStudentModuleHistory.get_history([self.csm])[0].state)['attempts'], 2)
+
+    @patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_WRITE_BUFFER": True})
+    def test_buffered_history_writes_saved_one_at_a_time(self):
+        with patch.object(StudentModuleHistoryExtended.objects, 'bulk_create', side_effect=DatabaseError):
+            with buffered_history_writes():
+                self.save_states(3)
+        self.assertEquals(StudentModuleHistoryExtended.objects.count(), 4)
+
+    @patch.dict("django.conf.settings.FEATURES", {"ENABLE_CSMH_WRITE_BUFFER": True})
+    def test_buffered_history_writes_discarded_on_delete(self):
+        with buffered_history_writes():
+            self.save_states(1)
+            save_history_entry(StudentModuleHistory(
+                student_module=self.csm,
+                version=None,
+                created=self.csm.modified,
+                state=self.csm.state,
+                grade=self.csm.grade,
+                max_grade=self.csm.max_grade,
+            ))
+            self.csm.delete()
+        self.assertEquals(StudentModuleHistoryExtended.objects.count(), 0)
+        self.assertEquals(StudentModuleHistory.objects.count(), 0)
+
+    def test_compress_old_entries(self):
+        self.save_states(3)
+        StudentModuleHistoryExtended.objects.update(created=timezone.now() - timedelta(days=100))
+        states = [entry.state for entry in BaseStudentModuleHistory.get_history([self.csm])]
+
+        call_command('compact_studentmodulehistory', compress_after_days=90)
+        self.assertTrue(all(
+            is_compressed_state(state) for state in StudentModuleHistoryExtended.objects.exclude(
+                state=json.dumps({'attempts': 0})
+            ).values_list('state', flat=True)
+        ))
+        self.assertEquals([entry.state for entry in BaseStudentModuleHistory.get_history([self.csm])], states)
+
+    def test_thin_out_oldest_entries(self):
+        self.save_states(3)
+        last_entry = StudentModuleHistoryExtended.objects.latest('id')
+        StudentModuleHistoryExtended.objects.update(created=timezone.now() - timedelta(days=800))
+
+        call_command('compact_studentmodulehistory', compress_after_days=90, thin_after_days=730)
+        self.assertEquals(list(StudentModuleHistoryExtended.objects.values_list('id', flat=True)), [last_entry.id])
+        self.assertEquals(
+            json.loads(BaseStudentModuleHistory.get_history([self.csm])[0].state)['attempts'],
+            3,
+        )
@@ -1,3 +1,5 @@
+from django.conf import settings
+
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
 from lms.djangoapps.grades.config.waffle import waffle as waffle_func, ASSUME_ZERO_GRADE_IF_ABSENT
 
@@ -14,3 +16,10 @@ def should_persist_grades(course_key):
     Returns whether grades should be persisted.
     """
     return PersistentGradesEnabledFlag.feature_enabled(course_key)
+
+
+def should_materialize_progress_summary(course_key):
+    """
+    Returns whether the grades shown on progress pages should be materialized.
+    """
+    return settings.FEATURES.get('MATERIALIZE_PROGRESS_SUMMARY', False) and should_persist_grades(course_key)
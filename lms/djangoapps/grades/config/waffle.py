@@ -11,6 +11,8 @@ WAFFLE_NAMESPACE = u'grades'
 WRITE_ONLY_IF_ENGAGED = u'write_only_if_engaged'
 ASSUME_ZERO_GRADE_IF_ABSENT = u'assume_zero_grade_if_absent'
 ESTIMATE_FIRST_ATTEMPTED = u'estimate_first_attempted'
+DEFER_COURSE_GRADE_UPDATES = u'defer_course_grade_updates'
+DEBOUNCE_COURSE_GRADE_UPDATES = u'debounce_course_grade_updates'
 
 
 def waffle():
@@ -6,6 +6,13 @@ from collections import OrderedDict
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 
 from .scores import possibly_scored
+from .transformer import GradesTransformer
+
+# Depth of the graded blocks of each type in the course.
+GRADED_BLOCK_DEPTHS = {
+    'sequential': 2,
+    'vertical': 3,
+}
 
 
 def grading_context_for_course(course_key):
@@ -36,37 +43,89 @@ def grading_context(course_structure):
         the descriptor tree again.
 
     """
+    graded_subsections_by_type, all_graded_blocks = graded_blocks_by_format(course_structure, 'sequential')
+    return {
+        'all_graded_subsections_by_type': OrderedDict(
+            (
+                subsection_format,
+                [
+                    {'subsection_block': subsection, 'scored_descendants': scored_descendants}
+                    for subsection, scored_descendants in subsections
+                ],
+            )
+            for subsection_format, subsections in graded_subsections_by_type.iteritems()
+        ),
+        'all_graded_blocks': all_graded_blocks,
+    }
+
+
+def graded_blocks_by_format(course_structure, block_type):
+    """
+    Returns the graded blocks of the given type (subsections or verticals)
+    in the course structure, along with their scored descendants, as a pair:
+
+        OrderedDict of block format (assignment type) to a list of
+            (block, scored_descendants) pairs, where scored_descendants
+            are the descendants of the block that have a score,
+        list of all blocks that can affect grading a student.
+
+    The usage keys of these blocks only depend on the version of the
+    course, so they are read from the block structure, as collected by
+    the GradesTransformer.  They are only computed again if the structure
+    was collected for another type of graded blocks.
+    """
+    collected = course_structure.get_transformer_block_field(
+        course_structure.root_block_usage_key,
+        GradesTransformer,
+        GradesTransformer.GRADING_CONTEXT_FIELD_NAME,
+    )
+    if collected is None or collected['block_type'] != block_type:
+        collected = collect_grading_context(course_structure, block_type, course_structure.__getitem__)
+
+    graded_blocks = OrderedDict()
     all_graded_blocks = []
-    all_graded_subsections_by_type = OrderedDict()
-
-    for chapter_key in course_structure.get_children(course_structure.root_block_usage_key):
-        for subsection_key in course_structure.get_children(chapter_key):
-            subsection = course_structure[subsection_key]
-            scored_descendants_of_subsection = []
-            if subsection.graded:
-                for descendant_key in course_structure.post_order_traversal(
-                        filter_func=possibly_scored,
-                        start_node=subsection_key,
-                ):
-                    scored_descendants_of_subsection.append(
-                        course_structure[descendant_key],
-                    )
-
-                # include only those blocks that have scores, not if they are just a parent
-                subsection_info = {
-                    'subsection_block': subsection,
-                    'scored_descendants': [
-                        child for child in scored_descendants_of_subsection
-                        if getattr(child, 'has_score', None)
-                    ]
-                }
-                subsection_format = getattr(subsection, 'format', '')
-                if subsection_format not in all_graded_subsections_by_type:
-                    all_graded_subsections_by_type[subsection_format] = []
-                all_graded_subsections_by_type[subsection_format].append(subsection_info)
-                all_graded_blocks.extend(scored_descendants_of_subsection)
+    for block_format, block_keys in collected['graded_blocks_by_format'].iteritems():
+        for block_key, descendant_keys in block_keys:
+            if block_key not in course_structure:
+                continue
+            descendants = [course_structure[key] for key in descendant_keys if key in course_structure]
+            # include only those blocks that have scores, not if they are just a parent
+            scored_descendants = [child for child in descendants if getattr(child, 'has_score', None)]
+            graded_blocks.setdefault(block_format, []).append((course_structure[block_key], scored_descendants))
+            all_graded_blocks.extend(descendants)
+    return graded_blocks, all_graded_blocks
+
+
+def collect_grading_context(block_structure, block_type, get_block):
+    """
+    Returns the usage keys of the graded blocks of the given type in the
+    block structure, keyed by format, with the usage keys of the blocks
+    under them which could possibly be scored, in course order.
+
+    Arguments:
+        block_structure (BlockStructure): The course's block structure.
+        block_type (str): 'sequential' or 'vertical'.
+        get_block (function): Returns the block, or its collected data,
+            of a given usage key.
+    """
+    # Graded sequentials are the children of chapters, graded verticals their grandchildren.
+    block_keys = [block_structure.root_block_usage_key]
+    for __ in range(GRADED_BLOCK_DEPTHS[block_type]):
+        block_keys = [child_key for block_key in block_keys for child_key in block_structure.get_children(block_key)]
+
+    graded_blocks_by_format = OrderedDict()
+    for block_key in block_keys:
+        block = get_block(block_key)
+        if getattr(block, 'graded', False):
+            scored_descendant_keys = list(block_structure.post_order_traversal(
+                filter_func=possibly_scored,
+                start_node=block_key,
+            ))
+            graded_blocks_by_format.setdefault(getattr(block, 'format', ''), []).append(
+                (block_key, scored_descendant_keys)
+            )
 
     return {
-        'all_graded_subsections_by_type': all_graded_subsections_by_type,
-        'all_graded_blocks': all_graded_blocks,
+        'block_type': block_type,
+        'graded_blocks_by_format': graded_blocks_by_format,
     }
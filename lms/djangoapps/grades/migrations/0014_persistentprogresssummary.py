@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import lms.djangoapps.grades.models
+import coursewarehistoryextended.fields
+import django.utils.timezone
+import openedx.core.djangoapps.xmodule_django.models
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0013_persistent_vertical_grade'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersistentProgressSummary',
+            fields=[
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, verbose_name='created', editable=False)),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, verbose_name='modified', editable=False)),
+                ('id', coursewarehistoryextended.fields.UnsignedBigIntAutoField(serialize=False, primary_key=True)),
+                ('user_id', models.IntegerField()),
+                ('course_id', openedx.core.djangoapps.xmodule_django.models.CourseKeyField(max_length=255)),
+                ('course_version', models.CharField(max_length=255, verbose_name='Course content version identifier', blank=True)),
+                ('grading_policy_hash', models.CharField(max_length=255, verbose_name='Hash of grading policy')),
+                ('valid_until', models.DateTimeField(null=True, verbose_name='Next release date of course content', blank=True)),
+                ('enrollment_mode', models.CharField(max_length=100, verbose_name='Enrollment mode of the learner', blank=True)),
+                ('cohort_id', models.IntegerField(null=True, verbose_name='Cohort of the learner', blank=True)),
+                ('percent_grade', models.FloatField()),
+                ('letter_grade', models.CharField(max_length=255, verbose_name='Letter grade for course', blank=True)),
+                ('chapter_grades', models.TextField(verbose_name='Serialized chapter grades')),
+            ],
+            bases=(lms.djangoapps.grades.models.DeleteGradesMixin, models.Model),
+        ),
+        migrations.AlterUniqueTogether(
+            name='persistentprogresssummary',
+            unique_together=set([('course_id', 'user_id')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='persistentprogresssummary',
+            index_together=set([('modified', 'course_id')]),
+        ),
+    ]
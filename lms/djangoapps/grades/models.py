@@ -11,7 +11,7 @@ persisted, course grades are also immune to changes in course content.
 import json
 import logging
 from base64 import b64encode
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from hashlib import sha1
 
 from django.db import models
@@ -25,7 +25,11 @@ from eventtracking import tracker
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageKeyField
 from request_cache import get_cache
 from track import contexts
-from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
+from track.event_transaction_utils import (
+    get_event_transaction_id,
+    get_event_transaction_type,
+    set_event_transaction_id
+)
 
 from .config import waffle
 
@@ -71,6 +75,75 @@ class DeleteGradesMixin(object):
         query.delete()
 
 
+class BulkUpdateOrCreateGradesMixin(object):
+    """
+    A Mixin class that provides functionality to update or create grades in bulk.
+    """
+
+    @classmethod
+    def bulk_update_or_create_grades(cls, grade_params_iter, course_key, event_transaction_ids=None):
+        """
+        Bulk update or creation of grades, e.g. of the grades of many users
+        for the same blocks.  The new grades are bulk created, and the saved
+        grades are updated with a single query per distinct set of values,
+        which is shared by all the users with the same scores.
+
+        As with update_or_create_grade, the first_attempted of a saved grade
+        is only set if it is not set yet.
+
+        Arguments:
+            grade_params_iter: The parameters of the grades, as passed to
+                update_or_create_grade
+            course_key: The course identifier of the grades
+            event_transaction_ids: If given, maps user ids to the event
+                transaction ids with which to emit the events of their grades
+        """
+        if not grade_params_iter:
+            return []
+
+        map(cls._prepare_params, grade_params_iter)
+        VisibleBlocks.bulk_get_or_create([params['visible_blocks'] for params in grade_params_iter], course_key)
+        map(cls._prepare_params_visible_blocks_id, grade_params_iter)
+        map(cls._prepare_first_attempted_for_create, grade_params_iter)
+
+        saved_grades = {
+            (grade.user_id, grade.full_usage_key): grade
+            for grade in cls.objects.filter(
+                course_id=course_key,
+                user_id__in={params['user_id'] for params in grade_params_iter},
+                usage_key__in={params['usage_key'] for params in grade_params_iter},
+            ).only('id', 'user_id', 'course_id', 'usage_key', 'first_attempted')
+        }
+
+        grades, grades_to_create, grade_ids_by_values = [], [], defaultdict(list)
+        for params in grade_params_iter:
+            grade = cls(**params)
+            saved_grade = saved_grades.get((grade.user_id, grade.usage_key))
+            if saved_grade is None:
+                grades_to_create.append(grade)
+            else:
+                grade.id = saved_grade.id
+                if saved_grade.first_attempted is not None:
+                    grade.first_attempted = saved_grade.first_attempted
+                values = tuple(sorted(
+                    (field, getattr(grade, field)) for field in params
+                    if field not in ('user_id', 'course_id', 'usage_key')
+                ))
+                grade_ids_by_values[values].append(grade.id)
+            grades.append(grade)
+
+        cls.objects.bulk_create(grades_to_create)
+        modified = now()
+        for values, grade_ids in grade_ids_by_values.iteritems():
+            cls.objects.filter(id__in=grade_ids).update(modified=modified, **dict(values))
+
+        for grade in grades:
+            if event_transaction_ids and event_transaction_ids.get(grade.user_id):
+                set_event_transaction_id(event_transaction_ids[grade.user_id])
+            cls._emit_grade_calculated_event(grade)
+        return grades
+
+
 class BlockRecordList(tuple):
     """
     An immutable ordered list of BlockRecord objects.
@@ -203,6 +276,15 @@ class VisibleBlocks(models.Model):
         Returns the blocks_json data stored on this model as a list of
         BlockRecords in the order they were provided.
         """
+        return self._block_record_list
+
+    @lazy
+    def _block_record_list(self):
+        """
+        The decoded blocks_json data.  Visible blocks are immutable, and the
+        ones prefetched for a course are shared by the grades of all of its
+        learners, so they are only decoded once.
+        """
         return BlockRecordList.from_json(self.blocks_json)
 
     @classmethod
@@ -285,7 +367,20 @@ class VisibleBlocks(models.Model):
         return u"visible_blocks_cache.{}".format(course_key)
 
 
-class PersistentSubsectionGrade(DeleteGradesMixin, TimeStampedModel):
+class SubsectionGradeRow(namedtuple('SubsectionGradeRow', [
+    'user_id', 'full_usage_key', 'course_version', 'subtree_edited_timestamp',
+    'earned_all', 'possible_all', 'earned_graded', 'possible_graded', 'first_attempted', 'visible_blocks',
+])):
+    """
+    A persisted subsection grade, as read in bulk by
+    PersistentSubsectionGrade.bulk_read_grade_rows.  Provides the
+    attributes of PersistentSubsectionGrade which are used to load a
+    SubsectionGrade, without instantiating the model.
+    """
+    pass
+
+
+class PersistentSubsectionGrade(DeleteGradesMixin, BulkUpdateOrCreateGradesMixin, TimeStampedModel):
     """
     A django model tracking persistent grades at the subsection level.
     """
@@ -340,6 +435,8 @@ class PersistentSubsectionGrade(DeleteGradesMixin, TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGrade"
+
     @property
     def full_usage_key(self):
         """
@@ -400,6 +497,102 @@ class PersistentSubsectionGrade(DeleteGradesMixin, TimeStampedModel):
             course_id=course_key,
         )
 
+    @classmethod
+    def bulk_read_grades_for_users(cls, user_ids, course_key):
+        """
+        Reads all grades for the given users and course in a single query.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_key: The course identifier for the desired grades
+
+        Returns a dict mapping each user id to the list of that user's grades.
+        """
+        grades_by_user = defaultdict(list)
+        for grade in cls.objects.select_related('visible_blocks').filter(user_id__in=user_ids, course_id=course_key):
+            grades_by_user[grade.user_id].append(grade)
+        return grades_by_user
+
+    @classmethod
+    def bulk_read_grade_rows(cls, user_ids, course_key):
+        """
+        Reads all grades for the given users and course in a single query, as
+        SubsectionGradeRows rather than model instances.  The visible blocks
+        of the grades are shared from the VisibleBlocks cache of the course,
+        and the usage key of each subsection is only parsed once.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_key: The course identifier for the desired grades
+
+        Returns a dict mapping each user id to the list of that user's grades.
+        """
+        grades_by_user = defaultdict(list)
+        usage_keys = {}
+        visible_blocks = None
+        rows = cls.objects.filter(user_id__in=user_ids, course_id=course_key).values_list(
+            'user_id', 'usage_key', 'course_version', 'subtree_edited_timestamp', 'earned_all', 'possible_all',
+            'earned_graded', 'possible_graded', 'first_attempted', 'visible_blocks_id',
+        )
+        for (user_id, usage_key, course_version, subtree_edited_timestamp, earned_all, possible_all,
+             earned_graded, possible_graded, first_attempted, visible_blocks_hash) in rows.iterator():
+            if visible_blocks is None:
+                visible_blocks = VisibleBlocks.bulk_read(course_key)
+            if visible_blocks_hash not in visible_blocks:
+                # created since the visible blocks of the course were cached
+                visible_blocks[visible_blocks_hash] = VisibleBlocks.objects.get(hashed=visible_blocks_hash)
+            if usage_key not in usage_keys:
+                usage_keys[usage_key] = cls._full_usage_key(usage_key, course_key)
+            grades_by_user[user_id].append(SubsectionGradeRow(
+                user_id=user_id,
+                full_usage_key=usage_keys[usage_key],
+                course_version=course_version,
+                subtree_edited_timestamp=subtree_edited_timestamp,
+                earned_all=earned_all,
+                possible_all=possible_all,
+                earned_graded=earned_graded,
+                possible_graded=possible_graded,
+                first_attempted=first_attempted,
+                visible_blocks=visible_blocks[visible_blocks_hash],
+            ))
+        return grades_by_user
+
+    @staticmethod
+    def _full_usage_key(usage_key, course_key):
+        """
+        Returns the given usage key, as read from the database, with the
+        run filled in.  See full_usage_key.
+        """
+        usage_key = UsageKey.from_string(unicode(usage_key))
+        if usage_key.run is None:  # pylint: disable=no-member
+            return usage_key.replace(course_key=course_key)
+        return usage_key
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grades_cache.{}".format(course_key)
+
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches grades for the given users for the given course,
+        as SubsectionGradeRows.
+        """
+        get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_key)] = cls.bulk_read_grade_rows(
+            [user.id for user in users], course_key,
+        )
+
+    @classmethod
+    def read_prefetched_grades(cls, user_id, course_key):
+        """
+        Returns the prefetched grades of the given user for the given
+        course, or None if grades were not prefetched for the course.
+        """
+        prefetched_grades = get_cache(cls.CACHE_NAMESPACE).get(cls._cache_key(course_key))
+        if prefetched_grades is None:
+            return None
+        return prefetched_grades.get(user_id, [])
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -528,7 +721,7 @@ class PersistentSubsectionGrade(DeleteGradesMixin, TimeStampedModel):
             )
 
 
-class PersistentVerticalGrade(DeleteGradesMixin, TimeStampedModel):
+class PersistentVerticalGrade(DeleteGradesMixin, BulkUpdateOrCreateGradesMixin, TimeStampedModel):
     """
     A django model tracking persistent grades at the vertical level.
     """
@@ -641,6 +834,22 @@ class PersistentVerticalGrade(DeleteGradesMixin, TimeStampedModel):
             course_id=course_key,
         )
 
+    @classmethod
+    def bulk_read_grades_for_users(cls, user_ids, course_key):
+        """
+        Reads all grades for the given users and course in a single query.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_key: The course identifier for the desired grades
+
+        Returns a dict mapping each user id to the list of that user's grades.
+        """
+        grades_by_user = defaultdict(list)
+        for grade in cls.objects.select_related('visible_blocks').filter(user_id__in=user_ids, course_id=course_key):
+            grades_by_user[grade.user_id].append(grade)
+        return grades_by_user
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -907,3 +1116,79 @@ class PersistentCourseGrade(DeleteGradesMixin, TimeStampedModel):
                     'grading_policy_hash': unicode(grade.grading_policy_hash),
                 }
             )
+
+
+class PersistentProgressSummary(DeleteGradesMixin, TimeStampedModel):
+    """
+    A django model materializing the grades shown on a learner's progress
+    page: the chapter, subsection and vertical grades of the learner in a
+    course, as of the last update of the learner's course grade.
+    """
+
+    class Meta(object):
+        app_label = "grades"
+        # Indices:
+        # (course_id, user_id) for individual summaries
+        # (modified, course_id): find all the summaries updated within a certain timespan for a course
+        unique_together = [
+            ('course_id', 'user_id'),
+        ]
+        index_together = [
+            ('modified', 'course_id'),
+        ]
+
+    # primary key will need to be large for this table
+    id = UnsignedBigIntAutoField(primary_key=True)  # pylint: disable=invalid-name
+    user_id = models.IntegerField(blank=False)
+    course_id = CourseKeyField(blank=False, max_length=255)
+
+    # Information relating to the state of content when the summary was computed
+    course_version = models.CharField(u'Course content version identifier', blank=True, max_length=255)
+    grading_policy_hash = models.CharField(u'Hash of grading policy', blank=False, max_length=255)
+    valid_until = models.DateTimeField(u'Next release date of course content', blank=True, null=True)
+
+    # Information relating to which content of the course the learner sees
+    enrollment_mode = models.CharField(u'Enrollment mode of the learner', blank=True, max_length=100)
+    cohort_id = models.IntegerField(u'Cohort of the learner', blank=True, null=True)
+
+    # Information about the course grade itself
+    percent_grade = models.FloatField(blank=False)
+    letter_grade = models.CharField(u'Letter grade for course', blank=True, max_length=255)
+    chapter_grades = models.TextField(u'Serialized chapter grades', blank=False)
+
+    def __unicode__(self):
+        """
+        Returns a string representation of this model.
+        """
+        return u', '.join([
+            u"{} user: {}".format(type(self).__name__, self.user_id),
+            u"course version: {}".format(self.course_version),
+            u"grading policy: {}".format(self.grading_policy_hash),
+            u"valid until: {}".format(self.valid_until),
+            u"percent grade: {}%".format(self.percent_grade),
+        ])
+
+    @classmethod
+    def read(cls, user_id, course_id):
+        """
+        Reads a progress summary from database
+
+        Raises PersistentProgressSummary.DoesNotExist if applicable
+        """
+        return cls.objects.get(user_id=user_id, course_id=course_id)
+
+    @classmethod
+    def update_or_create(cls, user_id, course_id, **kwargs):
+        """
+        Creates or updates a progress summary in the database.
+        Returns a PersistentProgressSummary object.
+        """
+        if kwargs.get('course_version', None) is None:
+            kwargs['course_version'] = ""
+
+        summary, _ = cls.objects.update_or_create(
+            user_id=user_id,
+            course_id=course_id,
+            defaults=kwargs
+        )
+        return summary
@@ -3,6 +3,7 @@ from contextlib import contextmanager
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
+from django.conf import settings
 
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE_GRADE_NOW_PASSED
 
@@ -11,6 +12,7 @@ from ..config.waffle import WRITE_ONLY_IF_ENGAGED, waffle
 from ..models import PersistentCourseGrade, VisibleBlocks
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
+from .progress_summary import ProgressSummary
 
 log = getLogger(__name__)
 
@@ -207,6 +209,8 @@ class CourseGradeFactory(object):
                 letter_grade=course_grade.letter_grade or "",
                 passed=course_grade.passed,
             )
+            if settings.FEATURES.get('MATERIALIZE_PROGRESS_SUMMARY', False):
+                ProgressSummary.update_from_course_grade(course_grade)
 
         COURSE_GRADE_CHANGED.send_robust(
             sender=None,
@@ -0,0 +1,303 @@
+"""
+ProgressSummary Class
+
+A learner's progress page shows the learner's grades of every chapter,
+subsection and vertical of a course.  Computing them takes the learner's
+course blocks and all of the learner's scores, so they are materialized in
+PersistentProgressSummary whenever the learner's course grade is persisted,
+and the progress page reads them back as a ProgressSummary, as long as they
+are still up to date.
+"""
+import json
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+
+from opaque_keys.edx.keys import UsageKey
+from pytz import UTC
+
+from lms.djangoapps.course_blocks.transformers.start_date import StartDateTransformer
+from openedx.core.djangoapps.course_groups.cohorts import get_cohort_id
+from request_cache import get_cache
+from student.models import CourseEnrollment
+from xmodule.fields import Date
+from xmodule.graders import ShowCorrectness
+
+from ..models import PersistentProgressSummary
+from .course_grade import CourseGradeBase
+
+# Version of the format in which chapter grades are serialized.
+SERIALIZATION_VERSION = 1
+
+# Request cache of the release dates of the content of courses.
+RELEASE_DATES_CACHE_NAMESPACE = u'grades.new.progress_summary.release_dates'
+
+_DATE_FIELD = Date()
+
+
+class SummarizedScore(namedtuple('SummarizedScore', ['earned', 'possible'])):
+    """
+    The weighted score of a problem, or the aggregated score of a
+    subsection or vertical, as materialized in a progress summary.
+    """
+    pass
+
+
+class SummarizedGrade(object):
+    """
+    The grade of a subsection or a vertical, as materialized in a progress summary.
+
+    Provides the attributes of SubsectionGrade and VerticalGrade which are
+    used to render the progress page and to grade the course.
+    """
+    def __init__(self, location, display_name, url_name, format, due, graded, weight, show_correctness,  # pylint: disable=redefined-builtin
+                 all_total, graded_total, problem_scores):
+        self.location = location
+        self.display_name = display_name
+        self.url_name = url_name
+        self.format = format
+        self.due = due
+        self.graded = graded
+        self.weight = weight
+        self.show_correctness = show_correctness
+        self.all_total = all_total
+        self.graded_total = graded_total
+        self.problem_scores = problem_scores
+
+    @property
+    def locations_to_scores(self):
+        """
+        Problem scores keyed by problem location, as named in VerticalGrade.
+        """
+        return self.problem_scores
+
+    @property
+    def scores(self):
+        """
+        List of all problem scores.
+        """
+        return self.problem_scores.values()
+
+    def show_grades(self, has_staff_access):
+        """
+        Returns whether scores are currently available to users with or without staff access.
+        """
+        return ShowCorrectness.correctness_available(self.show_correctness, self.due, has_staff_access)
+
+    @staticmethod
+    def to_json(grade):
+        """
+        Returns the serializable representation of the given SubsectionGrade or VerticalGrade.
+        """
+        problem_scores = getattr(grade, 'problem_scores', None)
+        if problem_scores is None:
+            problem_scores = grade.locations_to_scores
+        return {
+            'location': unicode(grade.location),
+            'display_name': grade.display_name,
+            'url_name': grade.url_name,
+            'format': grade.format,
+            'due': _DATE_FIELD.to_json(grade.due),
+            'graded': grade.graded,
+            'weight': getattr(grade, 'weight', None),
+            'show_correctness': getattr(grade, 'show_correctness', ''),
+            'all_total': [grade.all_total.earned, grade.all_total.possible],
+            'graded_total': [grade.graded_total.earned, grade.graded_total.possible],
+            'problem_scores': [
+                [unicode(location), score.earned, score.possible]
+                for location, score in problem_scores.iteritems()
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Returns the SummarizedGrade of the given serialized representation.
+        """
+        return cls(
+            location=UsageKey.from_string(data['location']),
+            display_name=data['display_name'],
+            url_name=data['url_name'],
+            format=data['format'],
+            due=_DATE_FIELD.from_json(data['due']),
+            graded=data['graded'],
+            weight=data['weight'],
+            show_correctness=data['show_correctness'],
+            all_total=SummarizedScore(*data['all_total']),
+            graded_total=SummarizedScore(*data['graded_total']),
+            problem_scores=OrderedDict(
+                (UsageKey.from_string(location), SummarizedScore(earned, possible))
+                for location, earned, possible in data['problem_scores']
+            ),
+        )
+
+
+class ProgressSummary(CourseGradeBase):
+    """
+    Course grade whose chapter grades are read from a PersistentProgressSummary.
+
+    Like CourseGrade, the grade summary is computed by the course's grader,
+    but from the materialized subsection or vertical grades.
+    """
+    def __init__(self, user, course_data, chapter_grades, *args, **kwargs):
+        super(ProgressSummary, self).__init__(user, course_data, *args, **kwargs)
+        self.chapter_grades = chapter_grades
+
+    @classmethod
+    def from_model(cls, user, course_data, model, passed):
+        """
+        Returns the ProgressSummary materialized in the given PersistentProgressSummary,
+        or None if it was serialized in an outdated format.
+        """
+        serialized = json.loads(model.chapter_grades)
+        if serialized.get('version') != SERIALIZATION_VERSION:
+            return None
+        return cls(
+            user,
+            course_data,
+            _deserialize_chapter_grades(serialized['chapters']),
+            percent=model.percent_grade,
+            letter_grade=model.letter_grade,
+            passed=passed,
+        )
+
+    @staticmethod
+    def is_valid(model, course_data, user):
+        """
+        Returns whether the given PersistentProgressSummary is still up to
+        date with the content and grading policy of the course, and with
+        which of its content the user sees.
+        """
+        if not model.course_version or model.course_version != course_data.version:
+            return False
+        if model.grading_policy_hash != course_data.grading_policy_hash:
+            return False
+        if model.valid_until is not None and model.valid_until <= datetime.now(UTC):
+            return False
+        enrollment_mode, cohort_id = _get_learner_groups(user, course_data.course_key)
+        return model.enrollment_mode == enrollment_mode and model.cohort_id == cohort_id
+
+    @staticmethod
+    def update_from_course_grade(course_grade):
+        """
+        Materializes the chapter grades of the given course grade.
+
+        Courses without a content version, i.e. Old Mongo courses, are not
+        materialized, as their changes couldn't be detected.
+        """
+        user, course_data = course_grade.user, course_grade.course_data
+        if not course_data.version:
+            return None
+
+        enrollment_mode, cohort_id = _get_learner_groups(user, course_data.course_key)
+        return PersistentProgressSummary.update_or_create(
+            user_id=user.id,
+            course_id=course_data.course_key,
+            course_version=course_data.version,
+            grading_policy_hash=course_data.grading_policy_hash,
+            valid_until=_get_next_release_date(course_data),
+            enrollment_mode=enrollment_mode,
+            cohort_id=cohort_id,
+            percent_grade=course_grade.percent,
+            letter_grade=course_grade.letter_grade or "",
+            chapter_grades=json.dumps({
+                'version': SERIALIZATION_VERSION,
+                'chapters': _serialize_chapter_grades(course_grade.chapter_grades),
+            }),
+        )
+
+
+def _serialize_chapter_grades(chapter_grades):
+    """
+    Returns the serializable representation of the given chapter grades.
+
+    Depending on the course's grading policy, the sections of a chapter
+    are either a list of subsection grades, or the subsections' vertical
+    grades, keyed by subsection.
+    """
+    chapters = []
+    for chapter_key, chapter in chapter_grades.iteritems():
+        sections = chapter['sections']
+        if isinstance(sections, dict):
+            serialized_sections = [
+                {
+                    'location': unicode(subsection_key),
+                    'display_name': subsection['display_name'],
+                    'url_name': subsection['url_name'],
+                    'verticals': [SummarizedGrade.to_json(grade) for grade in subsection['verticals']],
+                }
+                for subsection_key, subsection in sections.iteritems()
+            ]
+        else:
+            serialized_sections = [SummarizedGrade.to_json(grade) for grade in sections]
+        chapters.append({
+            'location': unicode(chapter_key),
+            'display_name': chapter['display_name'],
+            'url_name': chapter['url_name'],
+            'by_subsection': isinstance(sections, dict),
+            'sections': serialized_sections,
+        })
+    return chapters
+
+
+def _deserialize_chapter_grades(chapters):
+    """
+    Returns the chapter grades of the given serialized representation.
+    """
+    chapter_grades = OrderedDict()
+    for chapter in chapters:
+        if chapter['by_subsection']:
+            sections = OrderedDict(
+                (
+                    UsageKey.from_string(subsection['location']),
+                    {
+                        'display_name': subsection['display_name'],
+                        'url_name': subsection['url_name'],
+                        'verticals': [SummarizedGrade.from_json(grade) for grade in subsection['verticals']],
+                    },
+                )
+                for subsection in chapter['sections']
+            )
+        else:
+            sections = [SummarizedGrade.from_json(grade) for grade in chapter['sections']]
+        chapter_grades[UsageKey.from_string(chapter['location'])] = {
+            'display_name': chapter['display_name'],
+            'url_name': chapter['url_name'],
+            'sections': sections,
+        }
+    return chapter_grades
+
+
+def _get_learner_groups(user, course_key):
+    """
+    Returns the enrollment mode and the cohort id of the user in the course,
+    which determine the content of the course the user sees.
+    """
+    enrollment_mode, _ = CourseEnrollment.enrollment_mode_for_user(user, course_key)
+    return enrollment_mode or u'', get_cohort_id(user, course_key, use_cached=True)
+
+
+def _get_next_release_date(course_data):
+    """
+    Returns the earliest date at which content of the course, hidden from
+    learners until then, is released, or None.
+    """
+    cache = get_cache(RELEASE_DATES_CACHE_NAMESPACE)
+    cache_key = (course_data.course_key, course_data.version)
+    if cache_key not in cache:
+        structure = course_data.collected_structure
+        release_dates = set()
+        for block_key in structure.topological_traversal():
+            start = structure.get_transformer_block_field(
+                block_key, StartDateTransformer, StartDateTransformer.MERGED_START_DATE,
+            )
+            if not start:
+                continue
+            release_dates.add(start)
+            # Beta testers see content this many days before its release.
+            days_early_for_beta = structure.get_xblock_field(block_key, 'days_early_for_beta')
+            if days_early_for_beta:
+                release_dates.add(start - timedelta(days=days_early_for_beta))
+        cache[cache_key] = sorted(release_dates)
+
+    now = datetime.now(UTC)
+    return next((date for date in cache[cache_key] if date > now), None)
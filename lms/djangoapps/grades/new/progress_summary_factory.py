@@ -0,0 +1,72 @@
+from logging import getLogger
+
+import dogstats_wrapper as dog_stats_api
+
+from ..config import should_materialize_progress_summary
+from ..models import PersistentCourseGrade, PersistentProgressSummary
+from .course_data import CourseData
+from .course_grade_factory import CourseGradeFactory
+from .progress_summary import ProgressSummary
+
+log = getLogger(__name__)
+
+
+class ProgressSummaryFactory(object):
+    """
+    Factory class to get the grades shown on a learner's progress page.
+    """
+    def create(self, user, course):
+        """
+        Returns the course grade of the given user in the course, with the
+        grades of its chapters, subsections and verticals.
+
+        If the MATERIALIZE_PROGRESS_SUMMARY feature is enabled, returns
+        the ProgressSummary materialized along with the user's persisted
+        course grade, if it is still up to date.  Else, returns the CourseGrade
+        as computed by the CourseGradeFactory, and materializes it for later.
+        """
+        if not should_materialize_progress_summary(course.id):
+            return CourseGradeFactory().create(user, course)
+
+        course_data = CourseData(user, course)
+        try:
+            persistent_grade = PersistentCourseGrade.read(user.id, course_data.course_key)
+        except PersistentCourseGrade.DoesNotExist:
+            # Summaries are only kept up to date along with persisted course grades.
+            return CourseGradeFactory().create(user, course)
+
+        summary = self._read(user, course_data, persistent_grade)
+        stats_tags = [u'course_id:{}'.format(course_data.course_key)]
+        if summary is not None:
+            dog_stats_api.increment('lms.grades.ProgressSummaryFactory.hit', tags=stats_tags)
+            return summary
+
+        dog_stats_api.increment('lms.grades.ProgressSummaryFactory.miss', tags=stats_tags)
+        course_grade = CourseGradeFactory().create(user, course)
+        ProgressSummary.update_from_course_grade(course_grade)
+        return course_grade
+
+    @staticmethod
+    def _read(user, course_data, persistent_grade):
+        """
+        Returns the ProgressSummary of the given user in the course, or None
+        if it isn't materialized or it is out of date.
+        """
+        try:
+            model = PersistentProgressSummary.read(user.id, course_data.course_key)
+        except PersistentProgressSummary.DoesNotExist:
+            return None
+
+        # The course grade was updated without the summary, e.g. while
+        # the MATERIALIZE_PROGRESS_SUMMARY feature was disabled.
+        if model.modified < persistent_grade.modified:
+            return None
+        if not ProgressSummary.is_valid(model, course_data, user):
+            return None
+
+        summary = ProgressSummary.from_model(
+            user, course_data, model, passed=persistent_grade.passed_timestamp is not None,
+        )
+        if summary is not None:
+            log.info(u'Grades: ReadSummary, %s, User: %s, %s', unicode(course_data), user.id, model)
+        return summary
@@ -144,6 +144,25 @@ class SubsectionGrade(SubsectionGradeBase):
             course_key,
         )
 
+    @classmethod
+    def bulk_update_or_create_models(cls, student_grades, course_key, event_transaction_ids=None):
+        """
+        Saves or updates the given (student, subsection grade) pairs in
+        persisted models, in bulk.
+        """
+        student_grades = [
+            (student, subsection_grade) for student, subsection_grade in student_grades
+            if subsection_grade._should_persist_per_attempted  # pylint: disable=protected-access
+        ]
+        return PersistentSubsectionGrade.bulk_update_or_create_grades(
+            [
+                grade._persisted_model_params(student)  # pylint: disable=protected-access
+                for student, grade in student_grades
+            ],
+            course_key,
+            event_transaction_ids,
+        )
+
     def create_model(self, student):
         """
         Saves the subsection grade in a persisted model.
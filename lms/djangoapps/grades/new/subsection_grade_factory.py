@@ -21,12 +21,19 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
-    def __init__(self, student, course=None, course_structure=None, course_data=None):
+    def __init__(self, student, course=None, course_structure=None, course_data=None, saved_grades=None):
+        """
+        If given, saved_grades is the list of all the student's persisted
+        subsection grades in the course, as already read in bulk by the caller.
+        """
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
 
         self._cached_subsection_grades = None
+        if saved_grades is not None:
+            self._cached_subsection_grades = {record.full_usage_key: record for record in saved_grades}
         self._unsaved_subsection_grades = OrderedDict()
+        self.unsaved_updates = []
 
     def create(self, subsection, read_only=False):
         """
@@ -63,9 +70,13 @@ class SubsectionGradeFactory(object):
         )
         self._unsaved_subsection_grades.clear()
 
-    def update(self, subsection, only_if_higher=None):
+    def update(self, subsection, only_if_higher=None, read_only=False):
         """
         Updates the SubsectionGrade object for the student and subsection.
+
+        If read_only is True, doesn't save the updated grade, but adds it to
+        unsaved_updates, for the caller to save in bulk along with the grades
+        of other students, see SubsectionGrade.bulk_update_or_create_models.
         """
         # Save ourselves the extra queries if the course does not persist
         # subsection grades.
@@ -78,7 +89,7 @@ class SubsectionGradeFactory(object):
         if should_persist_grades(self.course_data.course_key):
             if only_if_higher:
                 try:
-                    grade_model = PersistentSubsectionGrade.read_grade(self.student.id, subsection.location)
+                    grade_model = self._read_saved_grade(subsection.location)
                 except PersistentSubsectionGrade.DoesNotExist:
                     pass
                 else:
@@ -93,8 +104,11 @@ class SubsectionGradeFactory(object):
                     ):
                         return orig_subsection_grade
 
-            grade_model = calculated_grade.update_or_create_model(self.student)
-            self._update_saved_subsection_grade(subsection.location, grade_model)
+            if read_only:
+                self.unsaved_updates.append(calculated_grade)
+            else:
+                grade_model = calculated_grade.update_or_create_model(self.student)
+                self._update_saved_subsection_grade(subsection.location, grade_model)
 
         return calculated_grade
 
@@ -137,12 +151,27 @@ class SubsectionGradeFactory(object):
         a bulk retrieval of all subsection grades in the course.
         """
         if self._cached_subsection_grades is None:
-            self._cached_subsection_grades = {
-                record.full_usage_key: record
-                for record in PersistentSubsectionGrade.bulk_read_grades(self.student.id, self.course_data.course_key)
-            }
+            saved_grades = PersistentSubsectionGrade.read_prefetched_grades(
+                self.student.id, self.course_data.course_key,
+            )
+            if saved_grades is None:
+                saved_grades = PersistentSubsectionGrade.bulk_read_grades(self.student.id, self.course_data.course_key)
+            self._cached_subsection_grades = {record.full_usage_key: record for record in saved_grades}
         return self._cached_subsection_grades
 
+    def _read_saved_grade(self, subsection_usage_key):
+        """
+        Returns the student's saved grade for the given subsection,
+        from the bulk retrieval cache if it is populated.
+        Raises PersistentSubsectionGrade.DoesNotExist if not found.
+        """
+        if self._cached_subsection_grades is None:
+            return PersistentSubsectionGrade.read_grade(self.student.id, subsection_usage_key)
+        try:
+            return self._cached_subsection_grades[subsection_usage_key]
+        except KeyError:
+            raise PersistentSubsectionGrade.DoesNotExist
+
     def _update_saved_subsection_grade(self, subsection_usage_key, subsection_model):
         """
         Updates (or adds) the subsection grade for the given
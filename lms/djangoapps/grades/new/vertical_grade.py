@@ -143,6 +143,25 @@ class VerticalGrade(VerticalGradeBase):
             course_key,
         )
 
+    @classmethod
+    def bulk_update_or_create_models(cls, student_grades, course_key, event_transaction_ids=None):
+        """
+        Saves or updates the given (student, vertical grade) pairs in
+        persisted models, in bulk.
+        """
+        student_grades = [
+            (student, vertical_grade) for student, vertical_grade in student_grades
+            if vertical_grade._should_persist_per_attempted  # pylint: disable=protected-access
+        ]
+        return PersistentVerticalGrade.bulk_update_or_create_grades(
+            [
+                grade._persisted_model_params(student)  # pylint: disable=protected-access
+                for student, grade in student_grades
+            ],
+            course_key,
+            event_transaction_ids,
+        )
+
     def create_model(self, student):
         """
         Saves the vertical grade in a persisted model.
@@ -20,12 +20,19 @@ class VerticalGradeFactory(object):
     """
     Factory for Vertical Grades.
     """
-    def __init__(self, student, course=None, course_structure=None, course_data=None):
+    def __init__(self, student, course=None, course_structure=None, course_data=None, saved_grades=None):
+        """
+        If given, saved_grades is the list of all the student's persisted
+        vertical grades in the course, as already read in bulk by the caller.
+        """
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
 
         self._cached_vertical_grades = None
+        if saved_grades is not None:
+            self._cached_vertical_grades = {record.full_usage_key: record for record in saved_grades}
         self._unsaved_vertical_grades = []
+        self.unsaved_updates = []
 
     def create(self, vertical, read_only=False):
         """
@@ -60,9 +67,13 @@ class VerticalGradeFactory(object):
         VerticalGrade.bulk_create_models(self.student, self._unsaved_vertical_grades, self.course_data.course_key)
         self._unsaved_vertical_grades = []
 
-    def update(self, vertical, only_if_higher=None):
+    def update(self, vertical, only_if_higher=None, read_only=False):
         """
         Updates the VerticalGrade object for the student and vertical.
+
+        If read_only is True, doesn't save the updated grade, but adds it to
+        unsaved_updates, for the caller to save in bulk along with the grades
+        of other students, see VerticalGrade.bulk_update_or_create_models.
         """
         # Save ourselves the extra queries if the course does not persist
         # vertical grades.
@@ -75,7 +86,7 @@ class VerticalGradeFactory(object):
         if should_persist_grades(self.course_data.course_key):
             if only_if_higher:
                 try:
-                    grade_model = PersistentVerticalGrade.read_grade(self.student.id, vertical.location)
+                    grade_model = self._read_saved_grade(vertical.location)
                 except PersistentVerticalGrade.DoesNotExist:
                     pass
                 else:
@@ -90,8 +101,11 @@ class VerticalGradeFactory(object):
                     ):
                         return orig_vertical_grade
 
-            grade_model = calculated_grade.update_or_create_model(self.student)
-            self._update_saved_vertical_grade(vertical.location, grade_model)
+            if read_only:
+                self.unsaved_updates.append(calculated_grade)
+            else:
+                grade_model = calculated_grade.update_or_create_model(self.student)
+                self._update_saved_vertical_grade(vertical.location, grade_model)
 
         return calculated_grade
 
@@ -140,6 +154,19 @@ class VerticalGradeFactory(object):
             }
         return self._cached_vertical_grades
 
+    def _read_saved_grade(self, vertical_usage_key):
+        """
+        Returns the student's saved grade for the given vertical,
+        from the bulk retrieval cache if it is populated.
+        Raises PersistentVerticalGrade.DoesNotExist if not found.
+        """
+        if self._cached_vertical_grades is None:
+            return PersistentVerticalGrade.read_grade(self.student.id, vertical_usage_key)
+        try:
+            return self._cached_vertical_grades[vertical_usage_key]
+        except KeyError:
+            raise PersistentVerticalGrade.DoesNotExist
+
     def _update_saved_vertical_grade(self, vertical_usage_key, vertical_model):
         """
         Updates (or adds) the vertical grade for the given
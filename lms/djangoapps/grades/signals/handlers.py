@@ -25,9 +25,14 @@ from track.event_transaction_utils import (
 from util.date_utils import to_timestamp
 
 from ..constants import ScoreDatabaseTableEnum
-from ..new.course_grade_factory import CourseGradeFactory
 from ..scores import weighted_score
-from ..tasks import RECALCULATE_GRADE_DELAY, recalculate_subsection_grade_v3, recalculate_vertical_grade_v3
+from ..tasks import (
+    RECALCULATE_GRADE_DELAY,
+    add_to_grade_recalculation_batch,
+    recalculate_subsection_grade_v3,
+    recalculate_vertical_grade_v3,
+    update_course_grade
+)
 from .signals import (
     PROBLEM_RAW_SCORE_CHANGED,
     PROBLEM_WEIGHTED_SCORE_CHANGED,
@@ -218,24 +223,31 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     """
     Handles the PROBLEM_WEIGHTED_SCORE_CHANGED signal by
     enqueueing a subsection update operation to occur asynchronously.
+
+    Within grades.tasks.batched_grade_recalculation, the update is added
+    to a batch of users instead.
     """
     _emit_event(kwargs)
+    task_kwargs = dict(
+        user_id=kwargs['user_id'],
+        anonymous_user_id=kwargs.get('anonymous_user_id'),
+        course_id=kwargs['course_id'],
+        usage_id=kwargs['usage_id'],
+        only_if_higher=kwargs.get('only_if_higher'),
+        expected_modified_time=to_timestamp(kwargs['modified']),
+        score_deleted=kwargs.get('score_deleted', False),
+        event_transaction_id=unicode(get_event_transaction_id()),
+        event_transaction_type=unicode(get_event_transaction_type()),
+        score_db_table=kwargs['score_db_table'],
+    )
+    if add_to_grade_recalculation_batch(**task_kwargs):
+        return
+
     course_obj = modulestore().get_course(CourseKey.from_string(str(kwargs['course_id'])), depth=0)
     recalculate_method = recalculate_vertical_grade_v3 if course_obj.enable_vertical_grading\
         else recalculate_subsection_grade_v3
     result = recalculate_method.apply_async(
-        kwargs=dict(
-            user_id=kwargs['user_id'],
-            anonymous_user_id=kwargs.get('anonymous_user_id'),
-            course_id=kwargs['course_id'],
-            usage_id=kwargs['usage_id'],
-            only_if_higher=kwargs.get('only_if_higher'),
-            expected_modified_time=to_timestamp(kwargs['modified']),
-            score_deleted=kwargs.get('score_deleted', False),
-            event_transaction_id=unicode(get_event_transaction_id()),
-            event_transaction_type=unicode(get_event_transaction_type()),
-            score_db_table=kwargs['score_db_table'],
-        ),
+        kwargs=task_kwargs,
         countdown=RECALCULATE_GRADE_DELAY,
     )
     log.info(
@@ -246,20 +258,14 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     )
 
 
-@receiver(VERTICAL_SCORE_CHANGED)
-def recalculate_course_grade(sender, course, course_structure, user, **kwargs):  # pylint: disable=unused-argument
-    """
-    Updates a saved course grade.
-    """
-    CourseGradeFactory().update(user, course=course, course_structure=course_structure)
-
-
-@receiver(SUBSECTION_SCORE_CHANGED)
+@receiver([VERTICAL_SCORE_CHANGED, SUBSECTION_SCORE_CHANGED])
 def recalculate_course_grade(sender, course, course_structure, user, **kwargs):  # pylint: disable=unused-argument
     """
-    Updates a saved course grade.
+    Updates a saved course grade.  The update may be coalesced with the
+    other updates of the user's course grade during the same request or
+    task, see grades.tasks.deferred_course_grade_updates.
     """
-    CourseGradeFactory().update(user, course=course, course_structure=course_structure)
+    update_course_grade(user, course, course_structure)
 
 
 def _emit_event(kwargs):
@@ -2,23 +2,33 @@
 This module contains tasks for asynchronous execution of grade updates.
 """
 
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
 from logging import getLogger
 
 import six
 from celery import task
+from celery.signals import task_prerun
 from celery_utils.logged_task import LoggedTask
 from celery_utils.persist_on_failure import PersistOnFailureTask
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.signals import request_finished, request_started
+from django.db import transaction
+from django.dispatch import receiver
 from django.db.utils import DatabaseError
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locator import CourseLocator
 
+import dogstats_wrapper as dog_stats_api
 from courseware.model_data import get_score
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.courseware import courses
 from lms.djangoapps.grades.config.models import ComputeGradesSetting
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangoapps.monitoring_utils import set_custom_metric, set_custom_metrics_for_course_key
 from student.models import CourseEnrollment
 from submissions import api as sub_api
@@ -26,11 +36,19 @@ from track.event_transaction_utils import set_event_transaction_id, set_event_tr
 from util.date_utils import from_timestamp
 from xmodule.modulestore.django import modulestore
 
-from .config.waffle import ESTIMATE_FIRST_ATTEMPTED, waffle
+from .config.waffle import (
+    DEBOUNCE_COURSE_GRADE_UPDATES,
+    DEFER_COURSE_GRADE_UPDATES,
+    ESTIMATE_FIRST_ATTEMPTED,
+    waffle
+)
 from .constants import ScoreDatabaseTableEnum
 from .exceptions import DatabaseNotReadyError
+from .models import PersistentCourseGrade, PersistentSubsectionGrade, PersistentVerticalGrade
 from .new.course_grade_factory import CourseGradeFactory
+from .new.subsection_grade import SubsectionGrade
 from .new.subsection_grade_factory import SubsectionGradeFactory
+from .new.vertical_grade import VerticalGrade
 from .new.vertical_grade_factory import VerticalGradeFactory
 from .signals.signals import SUBSECTION_SCORE_CHANGED, VERTICAL_SCORE_CHANGED
 from .transformer import GradesTransformer
@@ -43,6 +61,45 @@ KNOWN_RETRY_ERRORS = (  # Errors we expect occasionally, should be resolved on r
     DatabaseNotReadyError,
 )
 RECALCULATE_GRADE_DELAY = 2  # in seconds, to prevent excessive _has_db_updated failures. See TNL-6424.
+RECALCULATE_GRADES_BATCH_SIZE = 100  # number of users per recalculate_grades_for_users_v3 task
+COURSE_GRADE_DEBOUNCE_DELAY = 10  # in seconds, quiet window before a debounced course grade update
+
+
+class _GradeRecalculationBatch(threading.local):
+    """
+    A thread-local collecting the users whose grades need recalculating,
+    while batched_grade_recalculation is in effect.
+
+    The request cache is not used, since it is cleared whenever a celery
+    task completes, which happens repeatedly within an eager instructor task.
+    """
+    def __init__(self):
+        super(_GradeRecalculationBatch, self).__init__()
+        self.depth = 0
+        self.pending = defaultdict(dict)
+        # Full batches, held back until the transactions that changed their scores are over.
+        self.ready = []
+
+
+_GRADE_RECALCULATION_BATCH = _GradeRecalculationBatch()
+
+
+class _DeferredCourseGradeUpdates(threading.local):
+    """
+    A thread-local collecting the course grades to update, keyed by
+    (user id, course key), while deferred_course_grade_updates is in effect.
+    Whether the DEFER_COURSE_GRADE_UPDATES waffle switch is enabled is read
+    once, when the outermost context is entered.
+    """
+    def __init__(self):
+        super(_DeferredCourseGradeUpdates, self).__init__()
+        self.depth = 0
+        self.enabled = False
+        self.pending = OrderedDict()
+        self.num_coalesced = 0
+
+
+_DEFERRED_COURSE_GRADE_UPDATES = _DeferredCourseGradeUpdates()
 
 
 class _BaseTask(PersistOnFailureTask, LoggedTask):  # pylint: disable=abstract-method
@@ -142,6 +199,345 @@ def recalculate_vertical_grade_v3(self, **kwargs):
     _recalculate_vertical_grade(self, **kwargs)
 
 
+@task(bind=True, base=_BaseTask, default_retry_delay=30, routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY)
+def recalculate_grades_for_users_v3(self, **kwargs):
+    """
+    Updates the saved subsection (or vertical) grades of a batch of users
+    after a change to the score of a single block.  Enqueued by
+    batched_grade_recalculation instead of one recalculate_subsection_grade_v3
+    or recalculate_vertical_grade_v3 task per user.
+
+    Keyword Arguments:
+        user_ids (list of int): ids of the applicable User objects
+        course_id (string): identifying the course
+        usage_id (string): identifying the scored block
+        only_if_higher (boolean): indicating whether grades should
+            be updated only if the new raw_earned is higher than the
+            previous value.
+        score_changes (dict): the score change of each user, keyed by
+            user id, with the anonymous_user_id, expected_modified_time,
+            score_deleted, event_transaction_id and score_db_table
+            arguments of recalculate_subsection_grade_v3.
+        event_transaction_type (string): human-readable type of the
+            event at the root of the event transactions.
+    """
+    try:
+        course_key = CourseLocator.from_string(kwargs['course_id'])
+        scored_block_usage_key = UsageKey.from_string(kwargs['usage_id']).replace(course_key=course_key)
+
+        set_custom_metrics_for_course_key(course_key)
+        set_custom_metric('usage_id', unicode(scored_block_usage_key))
+        set_custom_metric('num_users', len(kwargs['user_ids']))
+        set_event_transaction_type(kwargs.get('event_transaction_type'))
+
+        # Celery serializes the dict keys as strings.
+        score_changes = {int(user_id): change for user_id, change in kwargs['score_changes'].iteritems()}
+
+        # Verify the database has been updated with the scores of every user
+        # when the task was created, as recalculate_subsection_grade_v3 does.
+        for user_id in kwargs['user_ids']:
+            if not _has_db_updated_with_new_score(
+                self, scored_block_usage_key, user_id=user_id, **score_changes[user_id]
+            ):
+                raise DatabaseNotReadyError
+
+        with deferred_course_grade_updates():
+            _update_grades_for_users(
+                course_key,
+                scored_block_usage_key,
+                kwargs['only_if_higher'],
+                kwargs['user_ids'],
+                {user_id: change['event_transaction_id'] for user_id, change in score_changes.iteritems()},
+            )
+    except Exception as exc:   # pylint: disable=broad-except
+        if not isinstance(exc, KNOWN_RETRY_ERRORS):
+            log.info("tnl-6244 grades unexpected failure: {}. task id: {}. kwargs={}".format(
+                repr(exc),
+                self.request.id,
+                kwargs,
+            ))
+        raise self.retry(kwargs=kwargs, exc=exc)
+
+
+@contextmanager
+def batched_grade_recalculation():
+    """
+    Context manager within which score changes do not each enqueue a
+    grade recalculation task for their user.  Instead, the affected users
+    are collected per scored block, and a recalculate_grades_for_users_v3
+    task is enqueued for every RECALCULATE_GRADES_BATCH_SIZE users, and
+    for any remaining users when the outermost context exits.
+
+    The scores are changed within transactions, which must be committed
+    before the recalculation of their grades is enqueued:  full batches
+    are only enqueued by enqueue_ready_grade_recalculation_batches, once
+    outside of any transaction, and the outermost context must exit
+    outside of any transaction as well.
+
+    Intended for operations that change the score of one block for many
+    users, such as rescoring a problem or resetting attempts.
+    """
+    batch = _GRADE_RECALCULATION_BATCH
+    batch.depth += 1
+    try:
+        yield
+    finally:
+        batch.depth -= 1
+        if batch.depth == 0:
+            ready, batch.ready = batch.ready, []
+            pending, batch.pending = batch.pending, defaultdict(dict)
+            ready.append(pending)
+            for batches in ready:
+                _enqueue_grade_recalculation_batches(batches)
+
+
+def enqueue_ready_grade_recalculation_batches():
+    """
+    Enqueues the full batches of the current grade recalculation batch,
+    unless within a transaction, which may not have committed their scores yet.
+
+    Meant to be called between the transactions of the score changes
+    within batched_grade_recalculation, so as not to hold back full
+    batches until the whole operation is done.
+    """
+    batch = _GRADE_RECALCULATION_BATCH
+    if transaction.get_connection().in_atomic_block:
+        return
+    ready, batch.ready = batch.ready, []
+    for batches in ready:
+        _enqueue_grade_recalculation_batches(batches)
+
+
+def add_to_grade_recalculation_batch(**kwargs):
+    """
+    Adds a user's score change to the current grade recalculation batch.
+    Takes the same keyword arguments as recalculate_subsection_grade_v3.
+
+    Returns whether the score change was batched, which is only the
+    case within batched_grade_recalculation.
+    """
+    batch = _GRADE_RECALCULATION_BATCH
+    if batch.depth == 0:
+        return False
+    batch_key = (
+        kwargs['course_id'],
+        kwargs['usage_id'],
+        kwargs.get('only_if_higher'),
+        kwargs.get('event_transaction_type'),
+    )
+    users = batch.pending[batch_key]
+    users[kwargs['user_id']] = dict(
+        anonymous_user_id=kwargs.get('anonymous_user_id'),
+        expected_modified_time=kwargs['expected_modified_time'],
+        score_deleted=kwargs.get('score_deleted', False),
+        event_transaction_id=kwargs.get('event_transaction_id'),
+        score_db_table=kwargs['score_db_table'],
+    )
+    if len(users) >= RECALCULATE_GRADES_BATCH_SIZE:
+        # The score change has not been committed yet, see enqueue_ready_grade_recalculation_batches.
+        batch.ready.append({batch_key: batch.pending.pop(batch_key)})
+    return True
+
+
+def _enqueue_grade_recalculation_batches(pending):
+    """
+    Enqueues recalculate_grades_for_users_v3 tasks for the collected score changes.
+    """
+    for (course_id, usage_id, only_if_higher, event_transaction_type), users in pending.iteritems():
+        user_ids = sorted(users)
+        for offset in six.moves.range(0, len(user_ids), RECALCULATE_GRADES_BATCH_SIZE):
+            batch_user_ids = user_ids[offset:offset + RECALCULATE_GRADES_BATCH_SIZE]
+            result = recalculate_grades_for_users_v3.apply_async(
+                kwargs=dict(
+                    user_ids=batch_user_ids,
+                    course_id=course_id,
+                    usage_id=usage_id,
+                    only_if_higher=only_if_higher,
+                    score_changes={user_id: users[user_id] for user_id in batch_user_ids},
+                    event_transaction_type=event_transaction_type,
+                ),
+                countdown=RECALCULATE_GRADE_DELAY,
+            )
+            log.info(
+                u'Grades: Request async calculation of grades for %d users of block %s. Task [%s]',
+                len(batch_user_ids), usage_id, getattr(result, 'id', 'N/A'),
+            )
+
+
+@task(bind=True, base=_BaseTask, default_retry_delay=30, routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY)
+def recalculate_course_grade_v3(self, **kwargs):
+    """
+    Updates a saved course grade, once the quiet window following the
+    score changes that scheduled it is over.
+
+    Keyword Arguments:
+        user_id (int): id of applicable User object
+        course_id (string): identifying the course
+    """
+    try:
+        course_key = CourseKey.from_string(kwargs['course_id'])
+        set_custom_metrics_for_course_key(course_key)
+
+        # Score changes from now on must schedule a new update, since
+        # they may not be seen by this one.
+        cache.delete(_course_grade_update_cache_key(kwargs['user_id'], course_key))
+
+        student = User.objects.get(id=kwargs['user_id'])
+        CourseGradeFactory().update(student, course_key=course_key)
+    except Exception as exc:   # pylint: disable=broad-except
+        if not isinstance(exc, KNOWN_RETRY_ERRORS):
+            log.info("tnl-6244 grades unexpected failure: {}. task id: {}. kwargs={}".format(
+                repr(exc),
+                self.request.id,
+                kwargs,
+            ))
+        raise self.retry(kwargs=kwargs, exc=exc)
+
+
+@contextmanager
+def deferred_course_grade_updates():
+    """
+    Context manager within which course grade updates are coalesced, so
+    that each (user, course) course grade is recomputed only once, when
+    the outermost context exits, however many of the user's subsection
+    and vertical grades changed in the meantime.  The updates are
+    discarded if the outermost context exits with an error, and the
+    errors of the updates are raised.
+
+    It is in effect for every request and grade recalculation task, if
+    the DEFER_COURSE_GRADE_UPDATES waffle switch is enabled.  If the
+    DEBOUNCE_COURSE_GRADE_UPDATES waffle switch is enabled as well, the
+    course grades are not even recomputed then, but in a
+    recalculate_course_grade_v3 task scheduled after a
+    COURSE_GRADE_DEBOUNCE_DELAY quiet window, which coalesces the updates
+    of subsequent requests and tasks as well.
+    """
+    _enter_deferred_course_grade_updates()
+    try:
+        yield
+    except Exception:
+        _exit_deferred_course_grade_updates(discard=True)
+        raise
+    _exit_deferred_course_grade_updates()
+
+
+def update_course_grade(user, course, course_structure):
+    """
+    Updates the course grade of the given user, or defers the update
+    while deferred_course_grade_updates is in effect.
+    """
+    deferred = _DEFERRED_COURSE_GRADE_UPDATES
+    if deferred.depth == 0 or not deferred.enabled:
+        CourseGradeFactory().update(user, course=course, course_structure=course_structure)
+        return
+
+    update_key = (user.id, course.id)
+    if update_key in deferred.pending:
+        deferred.num_coalesced += 1
+    # Keep the latest course structure, which reflects the latest changes.
+    deferred.pending[update_key] = (user, course, course_structure)
+
+
+def _enter_deferred_course_grade_updates():
+    """
+    Starts deferring course grade updates, for the outermost caller.
+    """
+    deferred = _DEFERRED_COURSE_GRADE_UPDATES
+    if deferred.depth == 0:
+        deferred.enabled = waffle().is_enabled(DEFER_COURSE_GRADE_UPDATES)
+    deferred.depth += 1
+
+
+def _exit_deferred_course_grade_updates(discard=False):
+    """
+    Stops deferring course grade updates, and performs the deferred
+    updates when exiting the outermost caller, unless discarding them.
+    """
+    deferred = _DEFERRED_COURSE_GRADE_UPDATES
+    if deferred.depth == 0:
+        return
+    deferred.depth -= 1
+    if deferred.depth > 0:
+        return
+
+    pending, deferred.pending = deferred.pending, OrderedDict()
+    num_coalesced, deferred.num_coalesced = deferred.num_coalesced, 0
+    if discard or not pending:
+        return
+    if num_coalesced:
+        dog_stats_api.increment('lms.grades.course_grade_update.coalesced', num_coalesced)
+
+    debounce = waffle().is_enabled(DEBOUNCE_COURSE_GRADE_UPDATES)
+    for user, course, course_structure in pending.itervalues():
+        if debounce:
+            _schedule_course_grade_update(user.id, course.id)
+        else:
+            CourseGradeFactory().update(user, course=course, course_structure=course_structure)
+
+
+def _schedule_course_grade_update(user_id, course_key):
+    """
+    Schedules a recalculate_course_grade_v3 task for the user's course
+    grade, unless one is already scheduled and has not yet started.
+    """
+    # The timeout only guards against a lost task blocking updates forever.
+    cache_timeout = COURSE_GRADE_DEBOUNCE_DELAY * 30
+    if cache.add(_course_grade_update_cache_key(user_id, course_key), True, cache_timeout):
+        recalculate_course_grade_v3.apply_async(
+            kwargs=dict(user_id=user_id, course_id=unicode(course_key)),
+            countdown=COURSE_GRADE_DEBOUNCE_DELAY,
+        )
+    else:
+        dog_stats_api.increment('lms.grades.course_grade_update.coalesced')
+
+
+def _course_grade_update_cache_key(user_id, course_key):
+    """
+    Returns the cache key marking that a course grade update is scheduled.
+    """
+    return u'grades.course_grade_update_scheduled.{}.{}'.format(user_id, course_key)
+
+
+@receiver(request_started)
+def _start_deferring_course_grade_updates(**kwargs):  # pylint: disable=unused-argument
+    """
+    Defers course grade updates until the end of the request.
+    """
+    _enter_deferred_course_grade_updates()
+
+
+@receiver(request_finished)
+def _perform_deferred_course_grade_updates(**kwargs):  # pylint: disable=unused-argument
+    """
+    Performs the course grade updates deferred during the request.
+    """
+    try:
+        _exit_deferred_course_grade_updates()
+    except Exception:  # pylint: disable=broad-except
+        # The response has already been sent, so there is no caller left to
+        # handle the error.
+        log.exception(u'Grades: Deferred course grade updates failed')
+
+
+@task_prerun.connect
+def _reset_deferred_course_grade_updates(task=None, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forgets the course grade updates left deferred on this thread by a
+    previous task, so that they are not deferred for good.  The grade
+    recalculation tasks defer their updates within the task body, see
+    deferred_course_grade_updates.
+
+    Eagerly run tasks, which run within their caller's context, keep it.
+    """
+    if task is not None and getattr(task.request, 'is_eager', False):
+        return
+    deferred = _DEFERRED_COURSE_GRADE_UPDATES
+    deferred.depth = 0
+    deferred.enabled = False
+    deferred.pending = OrderedDict()
+    deferred.num_coalesced = 0
+
+
 def _recalculate_vertical_grade(self, **kwargs):
     """
     Updates a saved vertical grade.
@@ -189,12 +585,13 @@ def _recalculate_vertical_grade(self, **kwargs):
         if not has_database_updated:
             raise DatabaseNotReadyError
 
-        _update_vertical_grades(
-            course_key,
-            scored_block_usage_key,
-            kwargs['only_if_higher'],
-            kwargs['user_id'],
-        )
+        with deferred_course_grade_updates():
+            _update_vertical_grades(
+                course_key,
+                scored_block_usage_key,
+                kwargs['only_if_higher'],
+                kwargs['user_id'],
+            )
     except Exception as exc:   # pylint: disable=broad-except
         if not isinstance(exc, KNOWN_RETRY_ERRORS):
             log.info("tnl-6244 grades unexpected failure: {}. task id: {}. kwargs={}".format(
@@ -252,12 +649,13 @@ def _recalculate_subsection_grade(self, **kwargs):
         if not has_database_updated:
             raise DatabaseNotReadyError
 
-        _update_subsection_grades(
-            course_key,
-            scored_block_usage_key,
-            kwargs['only_if_higher'],
-            kwargs['user_id'],
-        )
+        with deferred_course_grade_updates():
+            _update_subsection_grades(
+                course_key,
+                scored_block_usage_key,
+                kwargs['only_if_higher'],
+                kwargs['user_id'],
+            )
     except Exception as exc:   # pylint: disable=broad-except
         if not isinstance(exc, KNOWN_RETRY_ERRORS):
             log.info("tnl-6244 grades unexpected failure: {}. task id: {}. kwargs={}".format(
@@ -385,6 +783,73 @@ def _update_vertical_grades(
                 )
 
 
+def _update_grades_for_users(course_key, scored_block_usage_key, only_if_higher, user_ids, event_transaction_ids):
+    """
+    A helper function to update the subsection grades (or vertical
+    grades, for courses with vertical grading) containing the given
+    block for each of the given users, and to signal that those grades
+    were updated.
+
+    The course and its collected block structure are loaded once, the
+    users and their saved grades are read in bulk, and the updated grades
+    are saved in bulk, before being signalled, for the whole batch.
+    """
+    store = modulestore()
+    with store.bulk_operations(course_key):
+        course = store.get_course(course_key, depth=0)
+        course_usage_key = store.make_course_usage_key(course_key)
+        collected_block_structure = get_course_in_cache(course_key)
+
+        if course.enable_vertical_grading:
+            grade_factory_class, grade_class = VerticalGradeFactory, VerticalGrade
+            bulk_read_grades = PersistentVerticalGrade.bulk_read_grades_for_users
+            block_field, signal = 'verticals', VERTICAL_SCORE_CHANGED
+        else:
+            grade_factory_class, grade_class = SubsectionGradeFactory, SubsectionGrade
+            bulk_read_grades = PersistentSubsectionGrade.bulk_read_grade_rows
+            block_field, signal = 'subsections', SUBSECTION_SCORE_CHANGED
+
+        users = list(User.objects.filter(id__in=user_ids))
+        PersistentCourseGrade.prefetch(course_key, users)
+        saved_grades = bulk_read_grades(user_ids, course_key)
+
+        updated_grades, unsaved_grades = [], []
+        for student in users:
+            course_structure = get_course_blocks(
+                student, course_usage_key, collected_block_structure=collected_block_structure,
+            )
+            blocks_to_update = course_structure.get_transformer_block_field(
+                scored_block_usage_key,
+                GradesTransformer,
+                block_field,
+                set(),
+            )
+            grade_factory = grade_factory_class(
+                student, course, course_structure, saved_grades=saved_grades.get(student.id, []),
+            )
+            for block_usage_key in blocks_to_update:
+                if block_usage_key in course_structure:
+                    grade = grade_factory.update(course_structure[block_usage_key], only_if_higher, read_only=True)
+                    updated_grades.append((student, course_structure, grade))
+            unsaved_grades.extend((student, grade) for grade in grade_factory.unsaved_updates)
+
+        grade_class.bulk_update_or_create_models(unsaved_grades, course_key, event_transaction_ids)
+
+        for student, course_structure, grade in updated_grades:
+            event_transaction_id = event_transaction_ids.get(student.id)
+            if event_transaction_id:
+                set_event_transaction_id(event_transaction_id)
+
+            signal_kwargs = {'vertical_grade' if block_field == 'verticals' else 'subsection_grade': grade}
+            signal.send(
+                sender=None,
+                course=course,
+                course_structure=course_structure,
+                user=student,
+                **signal_kwargs
+            )
+
+
 def _course_task_args(course_key, **kwargs):
     """
     Helper function to generate course-grade task args.
@@ -0,0 +1,111 @@
+"""
+Benchmark of bulk reads of persisted subsection grades across a course.
+
+Not collected by the test runner; run it explicitly, e.g.:
+
+    paver test_system -t lms/djangoapps/grades/tests/benchmark_bulk_read.py -s
+
+It reports the time taken to read the subsection grades of 100,000 learners
+in a course of 30 subsections, by batches of users as the grade reports
+and the grade recalculation tasks do, as model instances and as
+SubsectionGradeRows, along with decoding their visible blocks.
+"""
+import timeit
+from datetime import datetime
+
+import pytz
+from django.test import TestCase
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from request_cache.middleware import RequestCache
+
+from ..models import BlockRecord, BlockRecordList, PersistentSubsectionGrade, VisibleBlocks
+
+
+class SubsectionGradesBulkReadBenchmark(TestCase):
+    """
+    Times the bulk reads of the subsection grades of a large course.
+    """
+    USERS = 100000
+    SUBSECTIONS = 30
+    PROBLEMS_PER_SUBSECTION = 5
+    USER_BATCH_SIZE = 100
+    CREATE_BATCH_SIZE = 10000
+    REPEAT = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.course_key = CourseLocator(org='BenchX', course='Bulk101', run='2017')
+        subsection_keys = [
+            BlockUsageLocator(cls.course_key, block_type='sequential', block_id='subsection_{}'.format(index))
+            for index in range(cls.SUBSECTIONS)
+        ]
+        block_record_lists = [
+            BlockRecordList.from_list(
+                [
+                    BlockRecord(
+                        locator=subsection_key.replace(
+                            block_type='problem', block_id='{}_{}'.format(subsection_key.block_id, index),
+                        ),
+                        weight=1,
+                        raw_possible=2,
+                        graded=True,
+                    )
+                    for index in range(cls.PROBLEMS_PER_SUBSECTION)
+                ],
+                cls.course_key,
+            )
+            for subsection_key in subsection_keys
+        ]
+        VisibleBlocks.bulk_get_or_create(block_record_lists, cls.course_key)
+
+        now = datetime.now(pytz.UTC)
+        grades = (
+            PersistentSubsectionGrade(
+                user_id=user_id,
+                course_id=cls.course_key,
+                usage_key=subsection_key,
+                course_version='deadbeef',
+                subtree_edited_timestamp=now,
+                earned_all=user_id % 11,
+                possible_all=10,
+                earned_graded=user_id % 11,
+                possible_graded=10,
+                first_attempted=now,
+                visible_blocks_id=block_record_list.hash_value,
+            )
+            for user_id in range(1, cls.USERS + 1)
+            for subsection_key, block_record_list in zip(subsection_keys, block_record_lists)
+        )
+        batch = []
+        for grade in grades:
+            batch.append(grade)
+            if len(batch) == cls.CREATE_BATCH_SIZE:
+                PersistentSubsectionGrade.objects.bulk_create(batch)
+                batch = []
+        PersistentSubsectionGrade.objects.bulk_create(batch)
+
+    def read_grades(self, bulk_read):
+        """
+        Reads the grades of all users by batches, and the visible blocks of each grade.
+        """
+        RequestCache.clear_request_cache()
+        for first_user_id in range(1, self.USERS + 1, self.USER_BATCH_SIZE):
+            user_ids = range(first_user_id, first_user_id + self.USER_BATCH_SIZE)
+            for grades in bulk_read(user_ids, self.course_key).itervalues():
+                for grade in grades:
+                    grade.visible_blocks.blocks  # pylint: disable=pointless-statement
+
+    def time_read(self, bulk_read):
+        """
+        Returns the best time taken to read the grades of all users.
+        """
+        return min(timeit.repeat(lambda: self.read_grades(bulk_read), number=1, repeat=self.REPEAT))
+
+    def test_bulk_read(self):
+        print "Subsection grades of {} users in {} subsections: {:.3f}s models, {:.3f}s rows".format(
+            self.USERS,
+            self.SUBSECTIONS,
+            self.time_read(PersistentSubsectionGrade.bulk_read_grades_for_users),
+            self.time_read(PersistentSubsectionGrade.bulk_read_grade_rows),
+        )
@@ -13,7 +13,7 @@ from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 from freezegun import freeze_time
-from mock import patch
+from mock import Mock, patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
 from lms.djangoapps.grades.config import waffle
@@ -25,6 +25,7 @@ from lms.djangoapps.grades.models import (
     PersistentSubsectionGrade,
     VisibleBlocks
 )
+from request_cache.middleware import RequestCache
 from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 
 
@@ -306,6 +307,81 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
             grade = PersistentSubsectionGrade.create_grade(**self.params)
         self._assert_tracker_emitted_event(tracker_mock, grade)
 
+    def test_bulk_read_grade_rows(self):
+        PersistentSubsectionGrade.create_grade(**self.params)
+        self.params['usage_key'] = self.usage_key.replace(block_id='subsection_67890')
+        PersistentSubsectionGrade.create_grade(**self.params)
+        self.params['user_id'] = 67890
+        PersistentSubsectionGrade.create_grade(**self.params)
+        grades = sorted(
+            PersistentSubsectionGrade.objects.filter(course_id=self.course_key),
+            key=lambda grade: (grade.user_id, unicode(grade.full_usage_key)),
+        )
+        VisibleBlocks.clear_cache(self.course_key)
+
+        with self.assertNumQueries(2):
+            rows_by_user = PersistentSubsectionGrade.bulk_read_grade_rows([12345, 67890, 13579], self.course_key)
+
+        self.assertEqual(set(rows_by_user), {12345, 67890})
+        rows = sorted(
+            rows_by_user[12345] + rows_by_user[67890],
+            key=lambda row: (row.user_id, unicode(row.full_usage_key)),
+        )
+        self.assertEqual(len(rows), 3)
+        for row, grade in zip(rows, grades):
+            self.assertEqual(
+                row,
+                (
+                    grade.user_id, grade.full_usage_key, grade.course_version, grade.subtree_edited_timestamp,
+                    grade.earned_all, grade.possible_all, grade.earned_graded, grade.possible_graded,
+                    grade.first_attempted, row.visible_blocks,
+                ),
+            )
+            self.assertEqual(row.visible_blocks.blocks, self.block_records)
+        # the visible blocks are shared by all the grades
+        self.assertEqual(len({id(row.visible_blocks) for row in rows}), 1)
+
+    def test_bulk_update_or_create_grades(self):
+        with waffle.waffle().override(waffle.ESTIMATE_FIRST_ATTEMPTED, active=True):
+            saved_grades = [
+                PersistentSubsectionGrade.create_grade(**dict(self.params, user_id=user_id))
+                for user_id in (12345, 67890)
+            ]
+            VisibleBlocks.clear_cache(self.course_key)
+            grade_params = [
+                dict(self.params, user_id=user_id, earned_all=7.0, first_attempted=None)
+                for user_id in (12345, 67890, 13579, 24680)
+            ]
+
+            # visible blocks, saved grades, created grades, and a single update for the saved grades
+            with self.assertNumQueries(4), patch('lms.djangoapps.grades.models.tracker') as tracker_mock:
+                grades = PersistentSubsectionGrade.bulk_update_or_create_grades(grade_params, self.course_key)
+
+        self.assertEqual(tracker_mock.emit.call_count, 4)
+        self._assert_tracker_emitted_event(tracker_mock, grades[-1])
+        grades_by_user = {grade.user_id: grade for grade in PersistentSubsectionGrade.objects.all()}
+        self.assertEqual(set(grades_by_user), {12345, 67890, 13579, 24680})
+        for grade in grades_by_user.values():
+            self.assertEqual(grade.earned_all, 7.0)
+            self.assertEqual(grade.visible_blocks.blocks, self.block_records)
+        for saved_grade in saved_grades:
+            grade = grades_by_user[saved_grade.user_id]
+            self.assertEqual(grade.id, saved_grade.id)
+            self.assertEqual(grade.first_attempted, saved_grade.first_attempted)
+        self.assertIsNone(grades_by_user[13579].first_attempted)
+
+    def test_prefetch(self):
+        self.addCleanup(RequestCache.clear_request_cache)
+        grade = PersistentSubsectionGrade.create_grade(**self.params)
+        self.assertIsNone(PersistentSubsectionGrade.read_prefetched_grades(12345, self.course_key))
+
+        users = [Mock(id=12345), Mock(id=67890)]
+        PersistentSubsectionGrade.prefetch(self.course_key, users)
+        with self.assertNumQueries(0):
+            prefetched_grades = PersistentSubsectionGrade.read_prefetched_grades(12345, self.course_key)
+            self.assertEqual([row.full_usage_key for row in prefetched_grades], [grade.full_usage_key])
+            self.assertEqual(PersistentSubsectionGrade.read_prefetched_grades(67890, self.course_key), [])
+
     def _assert_tracker_emitted_event(self, tracker_mock, grade):
         """
         Helper function to ensure that the mocked event tracker
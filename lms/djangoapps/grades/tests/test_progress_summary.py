@@ -0,0 +1,151 @@
+"""
+Tests for the materialized grades of the progress page.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from mock import patch
+from pytz import UTC
+
+from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..models import PersistentProgressSummary
+from ..new.course_grade import CourseGrade
+from ..new.course_grade_factory import CourseGradeFactory
+from ..new.progress_summary import ProgressSummary
+from ..new.progress_summary_factory import ProgressSummaryFactory
+from .utils import mock_get_score
+
+
+@patch.dict(settings.FEATURES, {'MATERIALIZE_PROGRESS_SUMMARY': True})
+class ProgressSummaryFactoryTest(SharedModuleStoreTestCase):
+    """
+    Tests that the grades of the progress page are materialized, and read
+    back as long as they are up to date.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(ProgressSummaryFactoryTest, cls).setUpClass()
+        with cls.store.default_store(ModuleStoreEnum.Type.split):
+            cls.course = CourseFactory.create()
+            with cls.store.bulk_operations(cls.course.id):
+                chapter = ItemFactory.create(parent=cls.course, category='chapter', display_name='Test Chapter')
+                for index in range(2):
+                    sequence = ItemFactory.create(
+                        parent=chapter,
+                        category='sequential',
+                        display_name='Test Sequential {}'.format(index),
+                        graded=True,
+                        format='Homework',
+                    )
+                    vertical = ItemFactory.create(parent=sequence, category='vertical')
+                    ItemFactory.create(
+                        parent=vertical,
+                        category='problem',
+                        display_name='Test Problem',
+                        data=MultipleChoiceResponseXMLFactory().build_xml(
+                            question_text='The correct answer is Choice 1',
+                            choices=[True, False],
+                        ),
+                    )
+
+    def setUp(self):
+        super(ProgressSummaryFactoryTest, self).setUp()
+        self.user = UserFactory.create()
+        CourseEnrollment.enroll(self.user, self.course.id)
+        self.course = self.store.get_course(self.course.id)
+        with mock_get_score(1, 2):
+            self.course_grade = CourseGradeFactory().update(self.user, self.course)
+
+    def _update_grading_policy(self, passing):
+        """
+        Updates the course's grading policy.
+        """
+        self.course.set_grading_policy({
+            "GRADER": [
+                {"type": "Homework", "min_count": 2, "drop_count": 0, "short_label": "HW", "weight": 1.0},
+            ],
+            "GRADE_CUTOFFS": {"Pass": passing},
+        })
+        self.course = self.store.update_item(self.course, self.user.id)
+
+    def _assert_same_grades(self, course_grade, expected_grade):
+        """
+        Asserts that both course grades show the same grades on the progress page.
+        """
+        self.assertEqual(course_grade.percent, expected_grade.percent)
+        self.assertEqual(course_grade.letter_grade, expected_grade.letter_grade)
+        self.assertEqual(course_grade.summary, expected_grade.summary)
+
+        chapters = course_grade.chapter_grades.values()
+        expected_chapters = expected_grade.chapter_grades.values()
+        self.assertEqual(
+            [chapter['display_name'] for chapter in chapters],
+            [chapter['display_name'] for chapter in expected_chapters],
+        )
+        for chapter, expected_chapter in zip(chapters, expected_chapters):
+            self.assertEqual(
+                [
+                    (section.location, section.display_name, section.due, section.all_total.earned,
+                     section.all_total.possible, [(score.earned, score.possible) for score in section.problem_scores.values()])
+                    for section in chapter['sections']
+                ],
+                [
+                    (section.location, section.display_name, section.due, section.all_total.earned,
+                     section.all_total.possible, [(score.earned, score.possible) for score in section.problem_scores.values()])
+                    for section in expected_chapter['sections']
+                ],
+            )
+
+    def test_materialized_on_update(self):
+        model = PersistentProgressSummary.read(self.user.id, self.course.id)
+        self.assertEqual(model.percent_grade, self.course_grade.percent)
+
+        course_grade = ProgressSummaryFactory().create(self.user, self.course)
+        self.assertIsInstance(course_grade, ProgressSummary)
+        self._assert_same_grades(course_grade, self.course_grade)
+
+    def test_stale_when_grading_policy_changes(self):
+        self._update_grading_policy(passing=0.9)
+
+        with mock_get_score(1, 2):
+            course_grade = ProgressSummaryFactory().create(self.user, self.course)
+        self.assertIsInstance(course_grade, CourseGrade)
+        self.assertIsNone(course_grade.letter_grade)
+
+        # The recomputed grades are materialized for later.
+        summary = ProgressSummaryFactory().create(self.user, self.course)
+        self.assertIsInstance(summary, ProgressSummary)
+        self._assert_same_grades(summary, course_grade)
+
+    def test_stale_when_content_is_released(self):
+        PersistentProgressSummary.objects.filter(user_id=self.user.id).update(
+            valid_until=datetime.now(UTC) - timedelta(minutes=1),
+        )
+        with mock_get_score(1, 2):
+            self.assertIsInstance(ProgressSummaryFactory().create(self.user, self.course), CourseGrade)
+
+    def test_stale_when_enrollment_mode_changes(self):
+        CourseEnrollment.get_enrollment(self.user, self.course.id).update_enrollment(mode='verified')
+        with mock_get_score(1, 2):
+            self.assertIsInstance(ProgressSummaryFactory().create(self.user, self.course), CourseGrade)
+
+    def test_stale_when_course_grade_updated_without_summary(self):
+        with patch.dict(settings.FEATURES, {'MATERIALIZE_PROGRESS_SUMMARY': False}):
+            with mock_get_score(2, 2):
+                CourseGradeFactory().update(self.user, self.course)
+
+        with mock_get_score(2, 2):
+            course_grade = ProgressSummaryFactory().create(self.user, self.course)
+        self.assertIsInstance(course_grade, CourseGrade)
+        self.assertEqual(course_grade.percent, 1.0)
+
+    @patch.dict(settings.FEATURES, {'MATERIALIZE_PROGRESS_SUMMARY': False})
+    def test_disabled(self):
+        with mock_get_score(1, 2):
+            self.assertIsInstance(ProgressSummaryFactory().create(self.user, self.course), CourseGrade)
@@ -10,19 +10,27 @@ from datetime import datetime, timedelta
 import ddt
 import pytz
 import six
+from celery.signals import task_prerun
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.db.utils import IntegrityError
 from mock import MagicMock, patch
 
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
+from lms.djangoapps.grades.config.waffle import DEBOUNCE_COURSE_GRADE_UPDATES, DEFER_COURSE_GRADE_UPDATES, waffle
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
-from lms.djangoapps.grades.signals.signals import PROBLEM_WEIGHTED_SCORE_CHANGED
+from lms.djangoapps.grades.signals.signals import PROBLEM_WEIGHTED_SCORE_CHANGED, VERTICAL_SCORE_CHANGED
 from lms.djangoapps.grades.tasks import (
+    COURSE_GRADE_DEBOUNCE_DELAY,
     RECALCULATE_GRADE_DELAY,
     _course_task_args,
+    batched_grade_recalculation,
     compute_all_grades_for_course,
     compute_grades_for_course_v2,
+    deferred_course_grade_updates,
+    enqueue_ready_grade_recalculation_batches,
+    recalculate_grades_for_users_v3,
     recalculate_subsection_grade_v3
 )
 from openedx.core.djangoapps.content.block_structure.exceptions import BlockStructureNotFound
@@ -425,3 +433,242 @@ class ComputeGradesForCourseTest(HasCourseWithProblemsMixin, ModuleStoreTestCase
             self.assertEqual(batch_size, test_batch_size)
             self.assertEqual(offset, offset_expected)
             offset_expected += test_batch_size
+
+
+@patch.dict(settings.FEATURES, {'PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS': False})
+class BatchedGradeRecalculationTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
+    """
+    Ensures that score changes within batched_grade_recalculation are
+    recalculated with a task per batch of users.
+    """
+    ENABLED_SIGNALS = ['course_published', 'pre_publish']
+
+    def setUp(self):
+        super(BatchedGradeRecalculationTest, self).setUp()
+        self.user = UserFactory()
+        self.other_users = [UserFactory() for _ in xrange(3)]
+        PersistentGradesEnabledFlag.objects.create(enabled_for_all_courses=True, enabled=True)
+        self.set_up_course()
+
+    def _send_score_changes(self, users):
+        """
+        Sends a PROBLEM_WEIGHTED_SCORE_CHANGED signal for each of the given users.
+        """
+        for user in users:
+            send_args = self.problem_weighted_score_changed_kwargs.copy()
+            send_args['user_id'] = user.id
+            PROBLEM_WEIGHTED_SCORE_CHANGED.send(sender=None, **send_args)
+
+    def test_score_changes_are_batched(self):
+        users = [self.user] + self.other_users
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_grades_for_users_v3.apply_async', return_value=None
+        ) as mock_batch_apply, patch(
+            'lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.apply_async', return_value=None
+        ) as mock_task_apply:
+            with batched_grade_recalculation():
+                self._send_score_changes(users)
+                self.assertFalse(mock_batch_apply.called)
+        self.assertFalse(mock_task_apply.called)
+        self.assertEqual(mock_batch_apply.call_count, 1)
+        task_kwargs = mock_batch_apply.call_args[1]['kwargs']
+        self.assertEqual(task_kwargs['user_ids'], sorted(user.id for user in users))
+        self.assertEqual(task_kwargs['usage_id'], unicode(self.problem.location))
+        self.assertEqual(
+            task_kwargs['score_changes'][self.user.id],
+            dict(
+                anonymous_user_id=5,
+                expected_modified_time=self.frozen_now_timestamp,
+                score_deleted=False,
+                event_transaction_id=unicode(get_event_transaction_id()),
+                score_db_table=ScoreDatabaseTableEnum.courseware_student_module,
+            ),
+        )
+
+    @patch('lms.djangoapps.grades.tasks.RECALCULATE_GRADES_BATCH_SIZE', 2)
+    def test_full_batches_are_enqueued_after_their_transactions(self):
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_grades_for_users_v3.apply_async', return_value=None
+        ) as mock_batch_apply:
+            with batched_grade_recalculation():
+                self._send_score_changes([self.user] + self.other_users[:2])
+                # Each test runs within a transaction.
+                enqueue_ready_grade_recalculation_batches()
+                self.assertEqual(mock_batch_apply.call_count, 0)
+
+                with patch('lms.djangoapps.grades.tasks.transaction.get_connection') as mock_get_connection:
+                    mock_get_connection.return_value.in_atomic_block = False
+                    enqueue_ready_grade_recalculation_batches()
+                self.assertEqual(mock_batch_apply.call_count, 1)
+                self.assertEqual(len(mock_batch_apply.call_args[1]['kwargs']['user_ids']), 2)
+        self.assertEqual(mock_batch_apply.call_count, 2)
+
+    def _recalculate_grades_for_users(self, users, modified):
+        """
+        Calls the recalculate_grades_for_users_v3 task for the given users,
+        with their scores found modified at the given time.
+        """
+        with patch('lms.djangoapps.grades.tasks.get_score', return_value=MagicMock(modified=modified)):
+            recalculate_grades_for_users_v3.apply(kwargs=dict(
+                user_ids=[user.id for user in users],
+                course_id=unicode(self.course.id),
+                usage_id=unicode(self.problem.location),
+                only_if_higher=None,
+                score_changes={
+                    unicode(user.id): dict(
+                        anonymous_user_id=None,
+                        expected_modified_time=self.frozen_now_timestamp,
+                        score_deleted=False,
+                        event_transaction_id=None,
+                        score_db_table=ScoreDatabaseTableEnum.courseware_student_module,
+                    )
+                    for user in users
+                },
+                event_transaction_type=u'edx.grades.problem.rescored',
+            ))
+
+    def test_recalculate_grades_for_users(self):
+        users = [self.user] + self.other_users
+        self._recalculate_grades_for_users(users, self.frozen_now_datetime + timedelta(seconds=1))
+        self.assertEqual(
+            PersistentSubsectionGrade.objects.filter(
+                course_id=self.course.id, usage_key=self.sequential.location,
+            ).count(),
+            len(users),
+        )
+
+    def test_recalculate_saved_grades_for_users(self):
+        users = [self.user] + self.other_users
+        self._recalculate_grades_for_users(users[:2], self.frozen_now_datetime + timedelta(seconds=1))
+        saved_grade_ids = set(PersistentSubsectionGrade.objects.values_list('id', flat=True))
+        self._recalculate_grades_for_users(users, self.frozen_now_datetime + timedelta(seconds=1))
+        grade_ids = set(
+            PersistentSubsectionGrade.objects.filter(
+                course_id=self.course.id, usage_key=self.sequential.location,
+            ).values_list('id', flat=True)
+        )
+        self.assertEqual(len(grade_ids), len(users))
+        self.assertLessEqual(saved_grade_ids, grade_ids)
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_grades_for_users_v3.retry')
+    def test_retry_when_db_not_updated(self, mock_retry):
+        self._recalculate_grades_for_users(
+            [self.user] + self.other_users, self.frozen_now_datetime - timedelta(days=1)
+        )
+        self.assertEqual(mock_retry.call_count, 1)
+        self.assertFalse(PersistentSubsectionGrade.objects.filter(course_id=self.course.id).exists())
+
+
+class DeferredCourseGradeUpdatesTest(HasCourseWithProblemsMixin, ModuleStoreTestCase):
+    """
+    Ensures that course grade updates are coalesced within deferred_course_grade_updates.
+    """
+    ENABLED_SIGNALS = ['course_published', 'pre_publish']
+
+    def setUp(self):
+        super(DeferredCourseGradeUpdatesTest, self).setUp()
+        self.user = UserFactory()
+        self.set_up_course()
+
+    def _send_score_changes(self, num_changes):
+        """
+        Sends the given number of VERTICAL_SCORE_CHANGED signals for the user.
+        """
+        for _ in xrange(num_changes):
+            VERTICAL_SCORE_CHANGED.send(
+                sender=None, course=self.course, course_structure=None, user=self.user, vertical_grade=None,
+            )
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_not_deferred_by_default(self, mock_update):
+        self._send_score_changes(2)
+        self.assertEqual(mock_update.call_count, 2)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_not_deferred_without_switch(self, mock_update):
+        with deferred_course_grade_updates():
+            self._send_score_changes(2)
+            self.assertEqual(mock_update.call_count, 2)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_switch_read_when_outermost_context_entered(self, mock_update):
+        with deferred_course_grade_updates():
+            with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+                with deferred_course_grade_updates():
+                    self._send_score_changes(2)
+                    self.assertEqual(mock_update.call_count, 2)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_updates_coalesced(self, mock_update):
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+            with deferred_course_grade_updates():
+                with deferred_course_grade_updates():
+                    self._send_score_changes(3)
+                self.assertFalse(mock_update.called)
+        mock_update.assert_called_once_with(self.user, course=self.course, course_structure=None)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_updates_discarded_on_error(self, mock_update):
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+            with self.assertRaises(ValueError):
+                with deferred_course_grade_updates():
+                    self._send_score_changes(1)
+                    raise ValueError
+            with deferred_course_grade_updates():
+                pass
+        self.assertFalse(mock_update.called)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update', side_effect=ValueError)
+    def test_update_errors_raised(self, mock_update):
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+            with self.assertRaises(ValueError):
+                with deferred_course_grade_updates():
+                    self._send_score_changes(1)
+        self.assertEqual(mock_update.call_count, 1)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_reset_before_task(self, mock_update):
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+            with deferred_course_grade_updates():
+                self._send_score_changes(1)
+                task_prerun.send(sender=None, task=MagicMock(request=MagicMock(is_eager=False)))
+                # A left over context doesn't defer the updates of the task.
+                self._send_score_changes(1)
+                self.assertEqual(mock_update.call_count, 1)
+        self.assertEqual(mock_update.call_count, 1)
+
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_not_reset_before_eager_task(self, mock_update):
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+            with deferred_course_grade_updates():
+                self._send_score_changes(1)
+                task_prerun.send(sender=None, task=MagicMock(request=MagicMock(is_eager=True)))
+                self._send_score_changes(1)
+                self.assertFalse(mock_update.called)
+        self.assertEqual(mock_update.call_count, 1)
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_subsection_grade_v3.retry')
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update', side_effect=ValueError)
+    def test_task_retried_on_update_error(self, mock_update, mock_retry):
+        modified = datetime.utcnow().replace(tzinfo=pytz.UTC) + timedelta(days=1)
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES):
+            with patch('lms.djangoapps.grades.tasks.get_score', return_value=MagicMock(modified=modified)):
+                recalculate_subsection_grade_v3.apply(kwargs=self.recalculate_subsection_grade_kwargs)
+        self.assertEqual(mock_update.call_count, 1)
+        self.assertEqual(mock_retry.call_count, 1)
+
+    @patch('lms.djangoapps.grades.tasks.cache', LocMemCache('course-grade-updates', {}))
+    @patch('lms.djangoapps.grades.tasks.CourseGradeFactory.update')
+    def test_updates_debounced(self, mock_update):
+        with waffle().override(DEFER_COURSE_GRADE_UPDATES), waffle().override(DEBOUNCE_COURSE_GRADE_UPDATES):
+            with patch(
+                'lms.djangoapps.grades.tasks.recalculate_course_grade_v3.apply_async', return_value=None
+            ) as mock_task_apply:
+                for _ in xrange(2):
+                    with deferred_course_grade_updates():
+                        self._send_score_changes(2)
+        self.assertFalse(mock_update.called)
+        mock_task_apply.assert_called_once_with(
+            kwargs=dict(user_id=self.user.id, course_id=unicode(self.course.id)),
+            countdown=COURSE_GRADE_DEBOUNCE_DELAY,
+        )
@@ -392,6 +392,59 @@ class GradesTransformerTestCase(CourseStructureTestCase):
         )
 
 
+    def test_grading_context_collected(self):
+        blocks = self.build_course([
+            {
+                u'org': u'GradesTestOrg',
+                u'course': u'GB101',
+                u'run': u'cannonball',
+                u'#type': u'course',
+                u'#ref': u'course',
+                u'#children': [
+                    {
+                        u'#type': u'chapter',
+                        u'#ref': u'chapter',
+                        u'#children': [
+                            {
+                                u'metadata': {u'graded': True, u'format': u'Homework'},
+                                u'#type': u'sequential',
+                                u'#ref': u'graded_subsection',
+                                u'#children': [
+                                    {
+                                        u'#type': u'vertical',
+                                        u'#ref': u'vertical',
+                                        u'#children': [{u'#type': u'problem', u'#ref': u'problem'}],
+                                    },
+                                ],
+                            },
+                            {u'#type': u'sequential', u'#ref': u'ungraded_subsection'},
+                        ],
+                    },
+                ],
+            },
+        ])
+        block_structure = get_course_blocks(self.student, blocks[u'course'].location, self.transformers)
+        grading_context = block_structure.get_transformer_block_field(
+            blocks[u'course'].location,
+            self.TRANSFORMER_CLASS_TO_TEST,
+            GradesTransformer.GRADING_CONTEXT_FIELD_NAME,
+        )
+        self.assertEqual(grading_context[u'block_type'], u'sequential')
+        self.assertEqual(
+            dict(grading_context[u'graded_blocks_by_format']),
+            {
+                u'Homework': [(
+                    blocks[u'graded_subsection'].location,
+                    [
+                        blocks[u'problem'].location,
+                        blocks[u'vertical'].location,
+                        blocks[u'graded_subsection'].location,
+                    ],
+                )],
+            },
+        )
+
+
 @ddt.ddt
 class MultiProblemModulestoreAccessTestCase(CourseStructureTestCase, SharedModuleStoreTestCase):
     """
@@ -36,9 +36,15 @@ class GradesTransformer(BlockStructureTransformer):
     transformer_block_field for each block:
 
         max_score: (numeric)
+
+    And the following value is stored as a transformer_block_field for the
+    course block, see grades.context.collect_grading_context:
+
+        grading_context: (dict) usage keys of the graded blocks, by format,
+            and of the blocks which could possibly be scored under them.
     """
-    WRITE_VERSION = 4
-    READ_VERSION = 4
+    WRITE_VERSION = 5
+    READ_VERSION = 5
     FIELDS_TO_COLLECT = [
         u'due',
         u'format',
@@ -51,6 +57,7 @@ class GradesTransformer(BlockStructureTransformer):
     ]
 
     EXPLICIT_GRADED_FIELD_NAME = 'explicit_graded'
+    GRADING_CONTEXT_FIELD_NAME = 'grading_context'
 
     @classmethod
     def name(cls):
@@ -83,6 +90,7 @@ class GradesTransformer(BlockStructureTransformer):
         )
         cls._collect_explicit_graded(block_structure)
         cls._collect_grading_policy_hash(block_structure)
+        cls._collect_grading_context(block_structure, block_type)
 
     def transform(self, block_structure, usage_context):
         """
@@ -176,6 +184,24 @@ class GradesTransformer(BlockStructureTransformer):
             cls.grading_policy_hash(course_block),
         )
 
+    @classmethod
+    def _collect_grading_context(cls, block_structure, block_type):
+        """
+        Collect the usage keys of the graded blocks of the given type, with
+        the blocks under them which could possibly be scored, storing them
+        as a `transformer_block_field` of the course block, so that the
+        grading context of the course isn't computed again until the course
+        changes.
+        """
+        # Imported here, as the grades context depends on this transformer.
+        from .context import collect_grading_context
+        block_structure.set_transformer_block_field(
+            block_structure.root_block_usage_key,
+            cls,
+            cls.GRADING_CONTEXT_FIELD_NAME,
+            collect_grading_context(block_structure, block_type, block_structure.get_xblock),
+        )
+
     @staticmethod
     def _iter_scorable_xmodules(block_structure):
         """
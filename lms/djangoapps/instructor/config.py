@@ -0,0 +1,19 @@
+"""
+This module contains various configuration settings via
+waffle switches for the Instructor app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'instructor'
+
+# Switches
+REGISTER_AND_ENROLL_IN_BACKGROUND = u'register_and_enroll_in_background'
+UPDATE_ENROLLMENT_IN_BACKGROUND = u'update_enrollment_in_background'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for Instructor.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'Instructor: ')
@@ -15,6 +15,7 @@ import pytz
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core import mail
+from django.core.files.storage import DefaultStorage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse as django_reverse
 from django.http import HttpRequest, HttpResponse
@@ -45,6 +46,8 @@ from courseware.tests.factories import (
 from courseware.tests.helpers import LoginEnrollmentTestCase
 from django_comment_common.models import FORUM_ROLE_COMMUNITY_TA
 from django_comment_common.utils import seed_permissions_roles
+from lms.djangoapps.instructor.config import REGISTER_AND_ENROLL_IN_BACKGROUND, UPDATE_ENROLLMENT_IN_BACKGROUND
+from lms.djangoapps.instructor.config import waffle as instructor_waffle
 from lms.djangoapps.instructor.tests.utils import FakeContentTask, FakeEmail, FakeEmailInfo
 from lms.djangoapps.instructor.views.api import (
     _split_input_list,
@@ -640,6 +643,47 @@ class TestInstructorAPIBulkAccountCreationAndEnrollment(SharedModuleStoreTestCas
         # test the log for email that's send to new created user.
         info_log.assert_called_with('email sent to new created user at %s', 'test_student@example.com')
 
+    @patch.object(lms.djangoapps.instructor_task.api, 'submit_register_and_enroll_students')
+    def test_account_creation_and_enrollment_in_background(self, submit_task_function):
+        """
+        Test that the students are registered and enrolled by a task when the switch is on.
+        """
+        csv_content = "test_student@example.com,test_student_1,tester1,USA"
+        uploaded_file = SimpleUploadedFile("temp.csv", csv_content)
+        with instructor_waffle().override(REGISTER_AND_ENROLL_IN_BACKGROUND, True):
+            response = self.client.post(self.url, {'students_list': uploaded_file})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEquals(len(data['row_errors']), 0)
+        self.assertEquals(len(data['warnings']), 0)
+        self.assertEquals(len(data['general_errors']), 0)
+        self.assertIn('Data Download', data['status'])
+
+        self.assertTrue(submit_task_function.called)
+        self.assertFalse(User.objects.filter(email='test_student@example.com').exists())
+        self.assertFalse(ManualEnrollmentAudit.objects.exists())
+
+    @patch.object(lms.djangoapps.instructor_task.api, 'submit_register_and_enroll_students')
+    def test_account_creation_and_enrollment_in_background_errors(self, submit_task_function):
+        """
+        Test that the errors submitting the task are reported as general errors.
+        """
+        with instructor_waffle().override(REGISTER_AND_ENROLL_IN_BACKGROUND, True):
+            uploaded_file = SimpleUploadedFile("temp.jpg", "test_student@example.com,test_student_1,tester1,USA")
+            response = self.client.post(self.url, {'students_list': uploaded_file})
+            data = json.loads(response.content)
+            self.assertNotEquals(len(data['general_errors']), 0)
+            self.assertFalse(submit_task_function.called)
+
+            submit_task_function.side_effect = AlreadyRunningError()
+            uploaded_file = SimpleUploadedFile("temp.csv", "test_student@example.com,test_student_1,tester1,USA")
+            response = self.client.post(self.url, {'students_list': uploaded_file})
+            data = json.loads(response.content)
+            self.assertEquals(
+                data['general_errors'][0]['response'],
+                'Students are already being enrolled. Wait for them to be enrolled to upload more.'
+            )
+
     @patch('lms.djangoapps.instructor.views.api.log.info')
     def test_email_and_username_already_exist(self, info_log):
         """
@@ -1695,6 +1739,51 @@ class TestInstructorAPIEnrollment(SharedModuleStoreTestCase, LoginEnrollmentTest
         )
         self.assertEqual(course_enrollment.mode, CourseMode.DEFAULT_MODE_SLUG)
 
+    @ddt.data('enroll', 'unenroll')
+    @patch.object(lms.djangoapps.instructor_task.api, 'submit_update_students_enrollment')
+    def test_update_enrollment_in_background(self, action, submit_task_function):
+        """
+        Test that the enrollments are updated by a task when the switch is on.
+        """
+        url = reverse('students_update_enrollment', kwargs={'course_id': self.course.id.to_deprecated_string()})
+        params = {
+            'identifiers': u'{}, {}'.format(self.notenrolled_student.username, self.notregistered_email),
+            'action': action,
+            'email_students': True,
+        }
+        with instructor_waffle().override(UPDATE_ENROLLMENT_IN_BACKGROUND, True):
+            response = self.client.post(url, params)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['results'], [])
+        self.assertIn('Data Download', data['status'])
+
+        self.assertTrue(submit_task_function.called)
+        __, course_id, file_name, task_action, auto_enroll, email_students = submit_task_function.call_args[0]
+        self.assertEqual((course_id, task_action, auto_enroll, email_students), (self.course.id, action, False, True))
+        with DefaultStorage().open(file_name) as enrollment_update_file:
+            self.assertEqual(
+                json.load(enrollment_update_file)['identifiers'],
+                [self.notenrolled_student.username, self.notregistered_email],
+            )
+        DefaultStorage().delete(file_name)
+        self.assertFalse(CourseEnrollment.is_enrolled(self.notenrolled_student, self.course.id))
+        self.assertFalse(ManualEnrollmentAudit.objects.exists())
+
+    @patch.object(lms.djangoapps.instructor_task.api, 'submit_update_students_enrollment')
+    def test_update_enrollment_in_background_already_running(self, submit_task_function):
+        """
+        Test that the enrollments are not updated while an update is running.
+        """
+        submit_task_function.side_effect = AlreadyRunningError()
+        url = reverse('students_update_enrollment', kwargs={'course_id': self.course.id.to_deprecated_string()})
+        with instructor_waffle().override(UPDATE_ENROLLMENT_IN_BACKGROUND, True):
+            response = self.client.post(url, {'identifiers': self.notenrolled_student.email, 'action': 'enroll'})
+        self.assertEqual(
+            json.loads(response.content)['status'],
+            'The enrollments of students are already being updated. Wait for them to be updated to update more.'
+        )
+
     def _change_student_enrollment(self, user, course, action):
         """
         Helper function that posts to 'students_update_enrollment' to change
@@ -2987,7 +3076,7 @@ class TestInstructorAPILevelsDataDump(SharedModuleStoreTestCase, LoginEnrollment
         url = reverse('get_anon_ids', kwargs={'course_id': self.course.id.to_deprecated_string()})
         response = self.client.post(url, {})
         self.assertEqual(response['Content-Type'], 'text/csv')
-        body = response.content.replace('\r', '')
+        body = ''.join(response.streaming_content).replace('\r', '')
         self.assertTrue(body.startswith(
             '"User ID","Anonymized User ID","Course Specific Anonymized User ID"'
             '\n"{user_id}","41","42"\n'.format(user_id=self.students[0].id)
@@ -2996,6 +3085,16 @@ class TestInstructorAPILevelsDataDump(SharedModuleStoreTestCase, LoginEnrollment
             body.endswith('"{user_id}","41","42"\n'.format(user_id=self.students[-1].id))
         )
 
+    @patch.object(lms.djangoapps.instructor.views.api, 'ANON_IDS_BATCH_SIZE', 2)
+    def test_get_anon_ids_in_batches(self):
+        """
+        Test that all the enrolled users are streamed when read in batches.
+        """
+        url = reverse('get_anon_ids', kwargs={'course_id': self.course.id.to_deprecated_string()})
+        response = self.client.post(url, {})
+        lines = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1 + CourseEnrollment.objects.filter(course_id=self.course.id).count())
+
     def test_list_report_downloads(self):
         url = reverse('list_report_downloads', kwargs={'course_id': self.course.id.to_deprecated_string()})
         with patch('lms.djangoapps.instructor_task.models.DjangoStorageReportStore.links_for') as mock_links_for:
@@ -7,6 +7,7 @@ Many of these GETs may become PUTs in the future.
 """
 import csv
 import decimal
+import itertools
 import json
 import logging
 import random
@@ -20,11 +21,19 @@ import unicodecsv
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied, ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import DefaultStorage
 from django.core.mail.message import EmailMessage
 from django.core.urlresolvers import reverse
 from django.core.validators import validate_email
 from django.db import IntegrityError, transaction
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotFound
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseNotFound,
+    StreamingHttpResponse
+)
 from django.shortcuts import redirect
 from django.utils.html import strip_tags
 from django.utils.translation import ugettext as _
@@ -50,6 +59,8 @@ from django_comment_client.utils import has_forum_access
 from django_comment_common.models import FORUM_ROLE_ADMINISTRATOR, FORUM_ROLE_COMMUNITY_TA, FORUM_ROLE_MODERATOR, Role
 from edxmako.shortcuts import render_to_string
 from lms.djangoapps.instructor.access import ROLES, allow_access, list_with_level, revoke_access, update_forum_role
+from lms.djangoapps.instructor.config import REGISTER_AND_ENROLL_IN_BACKGROUND, UPDATE_ENROLLMENT_IN_BACKGROUND
+from lms.djangoapps.instructor.config import waffle as instructor_waffle
 from lms.djangoapps.instructor.enrollment import (
     enroll_email,
     get_email_params,
@@ -120,6 +131,9 @@ from .tools import (
 
 log = logging.getLogger(__name__)
 
+# Number of enrolled users read at once by get_anon_ids
+ANON_IDS_BATCH_SIZE = 1000
+
 
 def common_exceptions_400(func):
     """
@@ -271,6 +285,7 @@ NAME_INDEX = 2
 COUNTRY_INDEX = 3
 
 
+@transaction.non_atomic_requests
 @require_POST
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
@@ -282,6 +297,10 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
     Order in csv should be the following email = 0; username = 1; name = 2; country = 3.
     Requires staff access.
 
+    When the instructor.register_and_enroll_in_background switch is on, the
+    students are registered and enrolled by a celery task instead, and the
+    result of each row is provided via data downloads.
+
     -If the email address and username already exists and the user is enrolled in the course,
     do nothing (including no email gets sent out)
 
@@ -312,7 +331,31 @@ def register_and_enroll_students(request, course_id):  # pylint: disable=too-man
     else:
         course_mode = None
 
-    if 'students_list' in request.FILES:
+    if 'students_list' in request.FILES and instructor_waffle().is_enabled(REGISTER_AND_ENROLL_IN_BACKGROUND):
+        try:
+            __, filename = store_uploaded_file(
+                request, 'students_list', ['.csv'],
+                course_and_time_based_filename_generator(course_id, 'students'),
+                max_file_size=5000000,  # limit to 5 MB
+            )
+            lms.djangoapps.instructor_task.api.submit_register_and_enroll_students(request, course_id, filename)
+        except PermissionDenied as err:
+            general_errors.append({'username': '', 'email': '', 'response': unicode(err)})
+        except AlreadyRunningError:
+            general_errors.append({
+                'username': '', 'email': '',
+                'response': _('Students are already being enrolled. Wait for them to be enrolled to upload more.')
+            })
+        else:
+            return JsonResponse({
+                'row_errors': row_errors,
+                'general_errors': general_errors,
+                'warnings': warnings,
+                'status': _('The accounts are being created and the students enrolled. '
+                            'The result of each row will be available for download in the Data Download tab.'),
+            })
+
+    elif 'students_list' in request.FILES:
         students = []
 
         try:
@@ -565,6 +608,7 @@ def create_and_enroll_user(email, username, name, country, password, course_id,
     return errors
 
 
+@transaction.non_atomic_requests
 @require_POST
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
@@ -575,6 +619,10 @@ def students_update_enrollment(request, course_id):
     Enroll or unenroll students by email.
     Requires staff access.
 
+    When the instructor.update_enrollment_in_background switch is on, the
+    students are enrolled or unenrolled by a celery task instead, and the
+    result for each of them is provided via data downloads.
+
     Query Parameters:
     - action in ['enroll', 'unenroll']
     - identifiers is string containing a list of emails and/or usernames separated by anything split_input_list can handle.
@@ -623,6 +671,12 @@ def students_update_enrollment(request, course_id):
                     'results': [{'error': True}],
                     'auto_enroll': auto_enroll,
                 }, status=400)
+
+    if action in ('enroll', 'unenroll') and instructor_waffle().is_enabled(UPDATE_ENROLLMENT_IN_BACKGROUND):
+        return _update_enrollment_in_background(
+            request, course_id, action, identifiers, auto_enroll, email_students, reason
+        )
+
     enrollment_obj = None
     state_transition = DEFAULT_TRANSITION_STATE
 
@@ -755,6 +809,34 @@ def students_update_enrollment(request, course_id):
     return JsonResponse(response_payload)
 
 
+def _update_enrollment_in_background(request, course_id, action, identifiers, auto_enroll, email_students, reason):
+    """
+    Submits a task enrolling or unenrolling the given students, for
+    `students_update_enrollment`.  The identifiers of the students, which
+    don't fit in the input of the task, are stored in a file.
+    """
+    file_name = DefaultStorage().save(
+        course_and_time_based_filename_generator(course_id, 'enrollment_update') + '.json',
+        ContentFile(json.dumps({'identifiers': identifiers, 'reason': reason})),
+    )
+    try:
+        lms.djangoapps.instructor_task.api.submit_update_students_enrollment(
+            request, course_id, file_name, action, auto_enroll, email_students
+        )
+    except AlreadyRunningError:
+        DefaultStorage().delete(file_name)
+        status = _('The enrollments of students are already being updated. Wait for them to be updated to update more.')
+    else:
+        status = _('The enrollments of the students are being updated. '
+                   'The result for each of them will be available for download in the Data Download tab.')
+    return JsonResponse({
+        'action': action,
+        'results': [],
+        'auto_enroll': auto_enroll,
+        'status': status,
+    })
+
+
 @require_POST
 @ensure_csrf_cookie
 @cache_control(no_cache=True, no_store=True, must_revalidate=True)
@@ -1205,7 +1287,7 @@ def get_issued_certificates(request, course_id):
         __, data_rows = instructor_analytics.csvs.format_dictlist(certificates_data, query_features)
         return instructor_analytics.csvs.create_csv_response(
             'issued_certificates.csv',
-            [col_header for __, col_header in query_features_names],
+            [col_header for feature, col_header in query_features_names],
             data_rows
         )
     else:
@@ -1884,31 +1966,54 @@ def spent_registration_codes(request, course_id):
 def get_anon_ids(request, course_id):  # pylint: disable=unused-argument
     """
     Respond with 2-column CSV output of user-id, anonymized-user-id
+
+    The CSV is streamed, so that the enrolled users are read from the database
+    in batches while it is sent, rather than all at once.
     """
     # TODO: the User.objects query and CSV generation here could be
     # centralized into instructor_analytics. Currently instructor_analytics
     # has similar functionality but not quite what's needed.
     course_id = SlashSeparatedCourseKey.from_deprecated_string(course_id)
 
+    class Echo(object):
+        """A file-like object which returns what is written to it, for csv.writer."""
+        def write(self, value):
+            """Returns `value`."""
+            return value
+
     def csv_response(filename, header, rows):
-        """Returns a CSV http response for the given header and rows (excel/utf-8)."""
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename={0}'.format(unicode(filename).encode('utf-8'))
-        writer = csv.writer(response, dialect='excel', quotechar='"', quoting=csv.QUOTE_ALL)
+        """Returns a streamed CSV http response for the given header and rows (excel/utf-8)."""
+        writer = csv.writer(Echo(), dialect='excel', quotechar='"', quoting=csv.QUOTE_ALL)
         # In practice, there should not be non-ascii data in this query,
         # but trying to do the right thing anyway.
-        encoded = [unicode(s).encode('utf-8') for s in header]
-        writer.writerow(encoded)
-        for row in rows:
-            encoded = [unicode(s).encode('utf-8') for s in row]
-            writer.writerow(encoded)
+        lines = (
+            writer.writerow([unicode(s).encode('utf-8') for s in row])
+            for row in itertools.chain([header], rows)
+        )
+        response = StreamingHttpResponse(lines, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename={0}'.format(unicode(filename).encode('utf-8'))
         return response
 
     students = User.objects.filter(
         courseenrollment__course_id=course_id,
-    ).order_by('id')
+    ).order_by('id').only('id')
+
+    def iter_students():
+        """Yields the enrolled students, read in batches."""
+        last_id = 0
+        while True:
+            batch = list(students.filter(id__gt=last_id)[:ANON_IDS_BATCH_SIZE])
+            if not batch:
+                return
+            for student in batch:
+                yield student
+            last_id = batch[-1].id
+
     header = ['User ID', 'Anonymized User ID', 'Course Specific Anonymized User ID']
-    rows = [[s.id, unique_id_for_user(s, save=False), anonymous_id_for_user(s, course_id, save=False)] for s in students]
+    rows = (
+        [s.id, unique_id_for_user(s, save=False), anonymous_id_for_user(s, course_id, save=False)]
+        for s in iter_students()
+    )
     return csv_response(course_id.to_deprecated_string().replace('/', '-') + '-anon-ids.csv', header, rows)
 
 
@@ -35,9 +35,11 @@ from lms.djangoapps.instructor_task.tasks import (
     export_ora2_data,
     generate_certificates,
     proctored_exam_results_csv,
+    register_and_enroll_students,
     rescore_problem,
     reset_problem_attempts,
-    send_bulk_course_email
+    send_bulk_course_email,
+    update_students_enrollment
 )
 from util import milestones_helpers
 from xmodule.modulestore.django import modulestore
@@ -435,6 +437,42 @@ def submit_cohort_students(request, course_key, file_name):
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
 
 
+def submit_register_and_enroll_students(request, course_key, file_name):  # pylint: disable=invalid-name
+    """
+    Request to have accounts created for students, and students enrolled, in bulk.
+
+    Raises AlreadyRunningError if students are currently being registered and enrolled.
+    """
+    task_type = 'register_and_enroll_students'
+    task_class = register_and_enroll_students
+    task_input = {'file_name': file_name, 'secure': request.is_secure()}
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
+def submit_update_students_enrollment(  # pylint: disable=invalid-name
+        request, course_key, file_name, action, auto_enroll, email_students
+):
+    """
+    Request to have students enrolled or unenrolled in bulk.
+
+    Raises AlreadyRunningError if the enrollments of students are currently being updated.
+    """
+    task_type = 'update_students_enrollment'
+    task_class = update_students_enrollment
+    task_input = {
+        'file_name': file_name,
+        'action': action,
+        'auto_enroll': auto_enroll,
+        'email_students': email_students,
+        'secure': request.is_secure(),
+    }
+    task_key = ""
+
+    return submit_task(request, task_type, task_class, course_key, task_input, task_key)
+
+
 def submit_export_ora2_data(request, course_key):
     """
     AlreadyRunningError is raised if an ora2 report is already being generated.
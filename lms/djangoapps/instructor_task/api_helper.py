@@ -16,6 +16,7 @@ from opaque_keys.edx.keys import UsageKey
 from courseware.courses import get_problems_in_section
 from courseware.module_render import get_xqueue_callback_url_prefix
 from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import merge_subtask_progress
 from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
 
@@ -126,7 +127,8 @@ def _update_instructor_task(instructor_task, task_result):
     to the task's AsyncResult object.  When subtasks are running, the
     InstructorTask object itself is updated with the subtasks' progress,
     not any AsyncResult object.  In this case, the InstructorTask is
-    not updated at all.
+    only updated in-place with subtask progress that has not yet been
+    folded into it.
 
     Calculates json to store in "task_output" field of the `instructor_task`,
     as well as updating the task_state.
@@ -156,8 +158,9 @@ def _update_instructor_task(instructor_task, task_result):
         # meaning that the subtasks have successfully been defined.  However, the InstructorTask
         # will be marked as in PROGRESS, until the last subtask completes and marks it as SUCCESS.
         # We want to ignore the parent SUCCESS if subtasks are still running, and just trust the
-        # contents of the InstructorTask.
+        # contents of the InstructorTask, merged with the subtasks' latest progress.
         entry_needs_updating = False
+        merge_subtask_progress(instructor_task)
     elif result_state in [PROGRESS, SUCCESS]:
         # construct a status message directly from the task result's result:
         # it needs to go back with the entry passed in.
@@ -25,6 +25,16 @@ SUBTASK_LOCK_EXPIRE = 60 * 10  # Lock expires in 10 minutes
 # Number of times to retry if a subtask update encounters a lock on the InstructorTask.
 # (These are recursive retries, so don't make this number too large.)
 MAX_DATABASE_LOCK_RETRIES = 5
+# Subtask progress counters and statuses are kept in the cache while subtasks run,
+# and must outlive the slowest (retried) subtask of an instructor task.
+SUBTASK_COUNTER_EXPIRE = 60 * 60 * 24 * 3  # Counters expire in 3 days
+# Number of completed subtasks after which the cached counters are folded into the
+# InstructorTask.  The counters are always folded when the last subtask completes.
+SUBTASK_STATUS_FOLD_INTERVAL = 50
+# Item-level counters accumulated into the InstructorTask's "task_output".
+ITEM_COUNTER_NAMES = ['attempted', 'succeeded', 'failed', 'skipped']
+# Subtask-level counters accumulated into the InstructorTask's "subtasks".
+SUBTASK_COUNTER_NAMES = ['subtasks_succeeded', 'subtasks_failed']
 
 
 def _get_number_of_subtasks(total_num_items, items_per_task):
@@ -269,6 +279,7 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
 
     # and save the entry immediately, before any subtasks actually start work:
     entry.save_now()
+    _initialize_subtask_counters(entry.id, num_subtasks)
     return task_progress
 
 
@@ -381,6 +392,176 @@ def _release_subtask_lock(task_id):
     cache.delete(key)
 
 
+def _subtask_counter_key(entry_id, name):
+    """
+    Returns the cache key of the named progress counter of an InstructorTask.
+    """
+    return "subtask-counter-{}-{}".format(entry_id, name)
+
+
+def _subtask_status_key(entry_id, task_id):
+    """
+    Returns the cache key holding the latest status of a subtask of an InstructorTask.
+    """
+    return "subtask-status-{}-{}".format(entry_id, task_id)
+
+
+def _subtask_counted_key(entry_id, task_id):
+    """
+    Returns the cache key marking that a completed subtask has been added to the counters.
+    """
+    return "subtask-counted-{}-{}".format(entry_id, task_id)
+
+
+def _initialize_subtask_counters(entry_id, num_subtasks):
+    """
+    Store zeroed progress counters for the subtasks of an InstructorTask in the cache.
+
+    Subtasks accumulate their results into these counters with atomic increments,
+    rather than rewriting the InstructorTask entry under a lock.  The total number
+    of subtasks is stored alongside, so that a subtask can tell whether it was the
+    last one to complete without reading the InstructorTask.
+    """
+    counters = {_subtask_counter_key(entry_id, name): 0 for name in ITEM_COUNTER_NAMES + SUBTASK_COUNTER_NAMES}
+    counters[_subtask_counter_key(entry_id, 'total')] = num_subtasks
+    cache.set_many(counters, SUBTASK_COUNTER_EXPIRE)
+
+
+def _get_subtask_counters(entry_id):
+    """
+    Returns a dict of the cached progress counters of an InstructorTask.
+
+    Returns None if the counters were never initialized or any of them has been
+    evicted from the cache, in which case the InstructorTask entry is authoritative.
+    """
+    names = ITEM_COUNTER_NAMES + SUBTASK_COUNTER_NAMES + ['total']
+    cached = cache.get_many([_subtask_counter_key(entry_id, name) for name in names])
+    counters = {}
+    for name in names:
+        value = cached.get(_subtask_counter_key(entry_id, name))
+        if value is None:
+            return None
+        counters[name] = int(value)
+    return counters
+
+
+def _get_cached_subtask_status(entry_id, task_id):
+    """
+    Returns the SubtaskStatus cached for a subtask by update_subtask_status(), if any.
+    """
+    status_dict = cache.get(_subtask_status_key(entry_id, task_id))
+    if status_dict is None:
+        return None
+    return SubtaskStatus.from_dict(status_dict)
+
+
+def _record_subtask_status(entry_id, current_task_id, new_subtask_status):
+    """
+    Record the status of a subtask in the cached progress counters of its InstructorTask.
+
+    The subtask's status is cached as-is.  When the subtask is done, its counts are added
+    to the item counters with atomic increments, and it is counted as a succeeded or failed
+    subtask.  A completed subtask is only ever added to the counters once, so recording the
+    same status again (e.g. when retrying a failed database update) is harmless.
+
+    Returns a (counted, num_done, num_total) tuple, where `counted` indicates whether the
+    status was recorded, and `num_done` is the number of completed subtasks after this one,
+    or None if this status did not complete a subtask.  Returns (False, None, None) if the
+    counters are not available, in which case the InstructorTask must be updated directly.
+    """
+    counters = _get_subtask_counters(entry_id)
+    if counters is None:
+        return False, None, None
+
+    cache.set(_subtask_status_key(entry_id, current_task_id), new_subtask_status.to_dict(), SUBTASK_COUNTER_EXPIRE)
+
+    new_state = new_subtask_status.state
+    if new_state not in READY_STATES:
+        return True, None, counters['total']
+
+    if not cache.add(_subtask_counted_key(entry_id, current_task_id), 'true', SUBTASK_COUNTER_EXPIRE):
+        TASK_LOG.info("Subtask %s of instructor task %d was already counted", current_task_id, entry_id)
+        return True, None, counters['total']
+
+    try:
+        for statname in ITEM_COUNTER_NAMES:
+            increment = getattr(new_subtask_status, statname)
+            if increment:
+                cache.incr(_subtask_counter_key(entry_id, statname), increment)
+        done_counter = 'subtasks_succeeded' if new_state == SUCCESS else 'subtasks_failed'
+        cache.incr(_subtask_counter_key(entry_id, done_counter))
+    except ValueError:
+        # A counter was evicted while it was being updated, so the counters can no longer be
+        # trusted:  drop them all and fall back to updating the InstructorTask directly, which
+        # folds in the statuses of the other subtasks that are still cached.
+        TASK_LOG.warning("Progress counters for instructor task %d were evicted from the cache", entry_id)
+        dog_stats_api.increment('instructor_task.subtask.counters_evicted')
+        cache.delete(_subtask_counter_key(entry_id, 'total'))
+        cache.delete(_subtask_counted_key(entry_id, current_task_id))
+        return False, None, None
+
+    done_counters = cache.get_many(
+        [_subtask_counter_key(entry_id, name) for name in SUBTASK_COUNTER_NAMES + ['total']]
+    )
+    if _subtask_counter_key(entry_id, 'total') not in done_counters:
+        # The counters were dropped by another subtask meanwhile, possibly after it folded
+        # the cached statuses, so this one must be folded in directly.
+        return False, None, None
+    num_done = sum(done_counters[_subtask_counter_key(entry_id, name)] for name in SUBTASK_COUNTER_NAMES)
+    return True, num_done, counters['total']
+
+
+def _merge_cached_subtask_statuses(entry_id, subtask_status_info):
+    """
+    Update the given statuses of the subtasks of an InstructorTask, by task id, in-place
+    with their latest statuses cached by _record_subtask_status(), if any.
+    """
+    status_keys = {_subtask_status_key(entry_id, task_id): task_id for task_id in subtask_status_info}
+    for key, status in cache.get_many(status_keys.keys()).iteritems():
+        subtask_status_info[status_keys[key]] = status
+
+
+def _recompute_subtask_progress(subtask_dict, task_progress):
+    """
+    Set the item counters of the given task progress, and the counters of succeeded and
+    failed subtasks of the given "subtasks" dict, in-place from the statuses of its
+    completed subtasks.
+    """
+    for statname in ITEM_COUNTER_NAMES:
+        task_progress[statname] = 0
+    subtask_dict['succeeded'] = 0
+    subtask_dict['failed'] = 0
+    for status in subtask_dict['status'].itervalues():
+        state = status.get('state')
+        if state not in READY_STATES:
+            continue
+        for statname in ITEM_COUNTER_NAMES:
+            task_progress[statname] += status.get(statname, 0)
+        subtask_dict['succeeded' if state == SUCCESS else 'failed'] += 1
+
+
+def merge_subtask_progress(entry):
+    """
+    Update an InstructorTask in-place with the progress of its subtasks that has not been folded in yet.
+
+    The entry is not saved.  This is used when status is requested for a task whose
+    subtasks are still running.
+    """
+    if not entry.subtasks or entry.task_output is None:
+        return
+    counters = _get_subtask_counters(entry.id)
+    if counters is None:
+        return
+    task_progress = json.loads(entry.task_output)
+    if 'start_time' not in task_progress:
+        return
+    for statname in ITEM_COUNTER_NAMES:
+        task_progress[statname] = max(task_progress.get(statname, 0), counters[statname])
+    new_duration = int((time() - task_progress['start_time']) * 1000)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+
+
 def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
     """
     Confirms that the current subtask is known to the InstructorTask and hasn't already been completed.
@@ -424,8 +605,11 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
     # Confirm that the InstructorTask doesn't think that this subtask has already been
-    # performed successfully.
-    subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
+    # performed successfully.  Status that has not yet been folded into the InstructorTask
+    # is more recent than the stored status.
+    subtask_status = _get_cached_subtask_status(entry_id, current_task_id)
+    if subtask_status is None:
+        subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
     subtask_state = subtask_status.state
     if subtask_state in READY_STATES:
         format_str = "Unexpected task_id '{}': already completed - status {} for subtask of instructor task '{}': rejecting task {}"
@@ -463,6 +647,11 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
+    When the InstructorTask's progress counters are available in the cache, the subtask's
+    status is recorded there with atomic increments, and the counters are only folded into
+    the InstructorTask every SUBTASK_STATUS_FOLD_INTERVAL completed subtasks and when the
+    last subtask completes.  Otherwise the InstructorTask is updated directly.
+
     Because select_for_update is used to lock the InstructorTask object while it is being updated,
     multiple subtasks updating at the same time may time out while waiting for the lock.
     The actual update operation is surrounded by a try/except/else that permits the update to be
@@ -472,7 +661,17 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
     the attempting of retries has concluded.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        counted, num_done, num_total = _record_subtask_status(entry_id, current_task_id, new_subtask_status)
+        if not counted:
+            _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        elif retry_count > 0 or (
+            num_done is not None and (num_done % SUBTASK_STATUS_FOLD_INTERVAL == 0 or num_done >= num_total)
+        ):
+            # A retry cannot tell whether this subtask was due to fold the counters,
+            # but folding is idempotent, so do it anyway.
+            _fold_subtask_counters(entry_id)
+        else:
+            dog_stats_api.increment('instructor_task.subtask.update_deferred')
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -503,23 +702,24 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     committed on completion, or rolled back on error.
 
     The InstructorTask's "task_output" field is updated.  This is a JSON-serialized dict.
-    Accumulates values for 'attempted', 'succeeded', 'failed', 'skipped' from `new_subtask_status`
-    into the corresponding values in the InstructorTask's task_output.  Also updates the 'duration_ms'
-    value with the current interval since the original InstructorTask started.  Note that this
-    value is only approximate, since the subtask may be running on a different server than the
-    original task, so is subject to clock skew.
+    Its values for 'attempted', 'succeeded', 'failed', 'skipped' are recomputed as the sums of the
+    corresponding values of the completed subtasks, `new_subtask_status` included.  Also updates
+    the 'duration_ms' value with the current interval since the original InstructorTask started.
+    Note that this value is only approximate, since the subtask may be running on a different
+    server than the original task, so is subject to clock skew.
 
     The InstructorTask's "subtasks" field is also updated.  This is also a JSON-serialized dict.
     Keys include 'total', 'succeeded', 'retried', 'failed', which are counters for the number of
     subtasks.  'Total' is expected to have been set at the time the subtasks were created.
-    The other three counters are incremented depending on the value of `status`.  Once the counters
-    for 'succeeded' and 'failed' match the 'total', the subtasks are done and the InstructorTask's
-    "status" is changed to SUCCESS.
+    The 'succeeded' and 'failed' counters are recomputed from the states of the subtasks.  Once they
+    match the 'total', the subtasks are done and the InstructorTask's "status" is changed to SUCCESS.
 
     The "subtasks" field also contains a 'status' key, that contains a dict that stores status
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
     is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
-    about failure messages, progress made, etc.
+    about failure messages, progress made, etc.  The statuses of the other subtasks still cached
+    by _record_subtask_status(), if its progress counters were dropped, are folded in as well, so
+    recording the same status again is harmless.
     """
     TASK_LOG.info("Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
@@ -536,6 +736,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
             raise ValueError(msg)
 
         # Update status:
+        _merge_cached_subtask_statuses(entry_id, subtask_status_info)
         subtask_status_info[current_task_id] = new_subtask_status.to_dict()
 
         # Update the parent task progress.
@@ -548,22 +749,13 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         new_duration = int((time() - start_time) * 1000)
         task_progress['duration_ms'] = max(prev_duration, new_duration)
 
-        # Update counts only when subtask is done.
+        # Count only the subtasks that are done.
         # In future, we can make this more responsive by updating status
         # between retries, by comparing counts that change from previous
         # retry.
-        new_state = new_subtask_status.state
-        if new_subtask_status is not None and new_state in READY_STATES:
-            for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
-                task_progress[statname] += getattr(new_subtask_status, statname)
+        _recompute_subtask_progress(subtask_dict, task_progress)
 
         # Figure out if we're actually done (i.e. this is the last task to complete).
-        # This is easier if we just maintain a counter, rather than scanning the
-        # entire new_subtask_status dict.
-        if new_state == SUCCESS:
-            subtask_dict['succeeded'] += 1
-        elif new_state in READY_STATES:
-            subtask_dict['failed'] += 1
         num_remaining = subtask_dict['total'] - subtask_dict['succeeded'] - subtask_dict['failed']
 
         # If we're done with the last task, update the parent status to indicate that.
@@ -583,3 +775,55 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         dog_stats_api.increment('instructor_task.subtask.update_exception')
         raise
+
+
+@transaction.atomic
+def _fold_subtask_counters(entry_id):
+    """
+    Fold the cached progress counters and subtask statuses into the parent InstructorTask.
+
+    Uses select_for_update to lock the InstructorTask object while it is being updated, like
+    _update_subtask_status(), but only every SUBTASK_STATUS_FOLD_INTERVAL completed subtasks
+    rather than once per subtask update.
+
+    The counters hold absolute totals since the subtasks were initialized, so folding them
+    in more than once is harmless.  If they are no longer cached, the progress is recomputed
+    from the statuses of the subtasks instead, as by _update_subtask_status().  Once all
+    subtasks are done, the InstructorTask's "status" is changed to SUCCESS.
+    """
+    TASK_LOG.info("Preparing to fold subtask counters into instructor task %d", entry_id)
+
+    try:
+        entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+        counters = _get_subtask_counters(entry_id)
+
+        subtask_dict = json.loads(entry.subtasks)
+        _merge_cached_subtask_statuses(entry_id, subtask_dict['status'])
+
+        task_progress = json.loads(entry.task_output)
+        new_duration = int((time() - task_progress['start_time']) * 1000)
+        task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+
+        if counters is None:
+            TASK_LOG.warning(
+                "Progress counters for instructor task %d are no longer cached, recomputing its progress", entry_id
+            )
+            _recompute_subtask_progress(subtask_dict, task_progress)
+        else:
+            for statname in ITEM_COUNTER_NAMES:
+                task_progress[statname] = counters[statname]
+            subtask_dict['succeeded'] = counters['subtasks_succeeded']
+            subtask_dict['failed'] = counters['subtasks_failed']
+        num_remaining = subtask_dict['total'] - subtask_dict['succeeded'] - subtask_dict['failed']
+        if num_remaining <= 0:
+            entry.task_state = SUCCESS
+        entry.subtasks = json.dumps(subtask_dict)
+        entry.task_output = InstructorTask.create_output_for_success(task_progress)
+        entry.save()
+        dog_stats_api.increment('instructor_task.subtask.counters_folded')
+        TASK_LOG.info("Task output updated to %s from subtask counters of instructor task %d",
+                      entry.task_output, entry_id)
+    except Exception:
+        TASK_LOG.exception("Unexpected error while folding subtask counters into InstructorTask.")
+        dog_stats_api.increment('instructor_task.subtask.update_exception')
+        raise
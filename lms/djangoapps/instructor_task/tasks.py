@@ -30,6 +30,8 @@ from bulk_email.tasks import perform_delegate_email_batches
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
+    register_and_enroll_students_and_upload,
+    update_students_enrollment_and_upload,
     upload_enrollment_report,
     upload_exec_summary_report,
     upload_may_enroll_csv,
@@ -296,6 +298,30 @@ def cohort_students(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(base=BaseInstructorTask)  # pylint: disable=not-callable
+def register_and_enroll_students(entry_id, xmodule_instance_args):
+    """
+    Create accounts for students and enroll them in bulk, and upload the results.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    # An example of such a message is: "Progress: {action} {succeeded} of {attempted} so far"
+    action_name = ugettext_noop('enrolled')
+    task_fn = partial(register_and_enroll_students_and_upload, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
+
+
+@task(base=BaseInstructorTask)  # pylint: disable=not-callable
+def update_students_enrollment(entry_id, xmodule_instance_args):
+    """
+    Enroll or unenroll students in bulk, and upload the results.
+    """
+    # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
+    # An example of such a message is: "Progress: {action} {succeeded} of {attempted} so far"
+    action_name = ugettext_noop('updated')
+    task_fn = partial(update_students_enrollment_and_upload, xmodule_instance_args)
+    return run_main_task(entry_id, task_fn, action_name)
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def export_ora2_data(entry_id, xmodule_instance_args):
     """
@@ -1,21 +1,36 @@
 """
 Instructor tasks related to enrollments.
 """
+import json
 import logging
+import uuid
 from datetime import datetime
 from StringIO import StringIO
 from time import time
 
+import unicodecsv
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.storage import DefaultStorage
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
 from django.utils.translation import ugettext as _
 from pytz import UTC
 
+import dogstats_wrapper as dog_stats_api
+from course_modes.models import CourseMode
 from courseware.courses import get_course_by_id
 from edxmako.shortcuts import render_to_string
 from instructor_analytics.basic import enrolled_students_features, list_may_enroll
 from instructor_analytics.csvs import format_dictlist
+from lms.djangoapps.instructor.enrollment import get_email_params, send_mail_to_student
 from lms.djangoapps.instructor.paidcourse_enrollment_report import PaidCourseEnrollmentReportProvider
-from lms.djangoapps.instructor_task.models import ReportStore
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from openedx.core.djangoapps.lang_pref import LANGUAGE_KEY
+from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
+from openedx.core.djangoapps.user_api.models import UserPreference
 from shoppingcart.models import (
     CouponRedemption,
     CourseRegCodeItem,
@@ -25,8 +40,28 @@ from shoppingcart.models import (
     PaidCourseRegistration,
     RegistrationCodeRedemption
 )
-from student.models import CourseAccessRole, CourseEnrollment
-from util.file import course_filename_prefix_generator
+from student.models import (
+    ALLOWEDTOENROLL_TO_ENROLLED,
+    ALLOWEDTOENROLL_TO_UNENROLLED,
+    ENROLLED_TO_ENROLLED,
+    ENROLLED_TO_UNENROLLED,
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
+    EVENT_NAME_ENROLLMENT_DEACTIVATED,
+    EVENT_NAME_ENROLLMENT_MODE_CHANGED,
+    UNENROLL_DONE,
+    UNENROLLED_TO_ALLOWEDTOENROLL,
+    UNENROLLED_TO_ENROLLED,
+    UNENROLLED_TO_UNENROLLED,
+    CourseAccessRole,
+    CourseEnrollment,
+    CourseEnrollmentAllowed,
+    EnrollStatusChange,
+    ManualEnrollmentAudit,
+    Registration,
+    UserProfile,
+    UserSignupSource
+)
+from util.file import UniversalNewlineIterator, course_filename_prefix_generator
 
 from .runner import TaskProgress
 from .utils import tracker_emit, upload_csv_to_report_store
@@ -34,6 +69,25 @@ from .utils import tracker_emit, upload_csv_to_report_store
 TASK_LOG = logging.getLogger('edx.celery.task')
 FILTERED_OUT_ROLES = ['staff', 'instructor', 'finance_admin', 'sales_admin']
 
+# Number of students registered and enrolled in a single transaction.
+REGISTRATION_BATCH_SIZE = 500
+
+# Results of the rows of a CSV file of students to register and enroll.
+REGISTRATION_CREATED = 'created'
+REGISTRATION_ENROLLED = 'enrolled'
+REGISTRATION_ALREADY_ENROLLED = 'already enrolled'
+REGISTRATION_DUPLICATE = 'duplicate'
+REGISTRATION_FAILED = 'failed'
+
+# Number of students whose enrollment is updated in a single transaction.
+ENROLLMENT_UPDATE_BATCH_SIZE = 500
+
+# Results of the students whose enrollment is updated.
+ENROLLMENT_UPDATE_SUCCEEDED = 'succeeded'
+ENROLLMENT_UPDATE_DUPLICATE = 'duplicate'
+ENROLLMENT_UPDATE_INVALID = 'invalid identifier'
+ENROLLMENT_UPDATE_FAILED = 'failed'
+
 
 def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
     """
@@ -391,3 +445,769 @@ def _upload_exec_summary_to_store(data_dict, report_name, course_id, generated_a
         output_buffer,
     )
     tracker_emit(report_name)
+
+
+def register_and_enroll_students_and_upload(_xmodule_instance_args, entry_id, course_id, task_input, action_name):
+    """
+    Within a given course, create accounts for the students listed in an
+    uploaded CSV file and enroll them, in bulk, then upload the result of each
+    row using a `ReportStore`.
+
+    The rows of the file are: email, username, full name, and country.
+    """
+    start_time = time()
+    start_date = datetime.now(UTC)
+
+    with DefaultStorage().open(task_input['file_name']) as f:
+        # Blank lines are skipped, but still counted as rows.
+        rows = [
+            (row_num, row)
+            for row_num, row in enumerate(unicodecsv.reader(UniversalNewlineIterator(f), encoding='utf-8'), 1)
+            if row
+        ]
+
+    task_progress = TaskProgress(action_name, len(rows), start_time)
+    current_step = {'step': 'Creating accounts and enrolling students'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    registration = BulkRegistration(
+        course_id,
+        enrolled_by=InstructorTask.objects.get(pk=entry_id).requester,
+        secure=task_input.get('secure', True),
+    )
+    results = []
+    for batch_start in range(0, len(rows), REGISTRATION_BATCH_SIZE):
+        for result in registration.register_and_enroll(rows[batch_start:batch_start + REGISTRATION_BATCH_SIZE]):
+            task_progress.attempted += 1
+            if result.status == REGISTRATION_FAILED:
+                task_progress.failed += 1
+            elif result.status in (REGISTRATION_ALREADY_ENROLLED, REGISTRATION_DUPLICATE):
+                task_progress.skipped += 1
+            else:
+                task_progress.succeeded += 1
+            results.append(result)
+        task_progress.update_task_state(extra_meta=current_step)
+
+    current_step['step'] = 'Uploading CSV'
+    task_progress.update_task_state(extra_meta=current_step)
+
+    header = ['Row', 'Email', 'Username', 'Status', 'Message']
+    rows = [header] + [
+        [result.row_num, result.email, result.username, result.status, result.message] for result in results
+    ]
+    upload_csv_to_report_store(rows, 'students_registration', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+def update_students_enrollment_and_upload(_xmodule_instance_args, entry_id, course_id, task_input, action_name):
+    """
+    Within a given course, enroll or unenroll the students identified by the
+    emails or usernames stored in a JSON file, in bulk, as the
+    `students_update_enrollment` view does, then upload the result for each
+    of them using a `ReportStore`.
+
+    The file holds the identifiers of the students, and the reason for
+    updating their enrollments.
+    """
+    start_time = time()
+    start_date = datetime.now(UTC)
+
+    with DefaultStorage().open(task_input['file_name']) as f:
+        enrollment_update = json.load(f)
+    identifiers = enrollment_update['identifiers']
+
+    task_progress = TaskProgress(action_name, len(identifiers), start_time)
+    current_step = {'step': 'Updating the enrollments of the students'}
+    task_progress.update_task_state(extra_meta=current_step)
+
+    enrollment_updater = BulkEnrollmentUpdate(
+        course_id,
+        task_input['action'],
+        updated_by=InstructorTask.objects.get(pk=entry_id).requester,
+        reason=enrollment_update.get('reason'),
+        auto_enroll=task_input.get('auto_enroll', False),
+        email_students=task_input.get('email_students', False),
+        secure=task_input.get('secure', True),
+    )
+    results = []
+    for batch_start in range(0, len(identifiers), ENROLLMENT_UPDATE_BATCH_SIZE):
+        batch = identifiers[batch_start:batch_start + ENROLLMENT_UPDATE_BATCH_SIZE]
+        for result in enrollment_updater.update(batch):
+            task_progress.attempted += 1
+            if result.status == ENROLLMENT_UPDATE_SUCCEEDED:
+                task_progress.succeeded += 1
+            elif result.status == ENROLLMENT_UPDATE_DUPLICATE:
+                task_progress.skipped += 1
+            else:
+                task_progress.failed += 1
+            results.append(result)
+        task_progress.update_task_state(extra_meta=current_step)
+
+    current_step['step'] = 'Uploading CSV'
+    task_progress.update_task_state(extra_meta=current_step)
+
+    header = [
+        'Identifier', 'Email', 'Registered', 'Enrolled Before', 'Enrolled After',
+        'Allowed Before', 'Allowed After', 'Auto Enroll', 'Status', 'Message',
+    ]
+    rows = [header] + [
+        [
+            result.identifier, result.email, result.before.get('user', False),
+            result.before.get('enrollment', False), result.after.get('enrollment', False),
+            result.before.get('allowed', False), result.after.get('allowed', False),
+            result.after.get('auto_enroll', False), result.status, result.message,
+        ]
+        for result in results
+    ]
+    upload_csv_to_report_store(rows, 'enrollment_update', course_id, start_date)
+
+    return task_progress.update_task_state(extra_meta=current_step)
+
+
+class RegistrationRow(object):
+    """
+    A row of the CSV file of students to register and enroll, and its result.
+    """
+    def __init__(self, row_num, email, username, name=u'', country=u''):
+        self.row_num = row_num
+        self.email = email
+        self.username = username
+        self.name = name
+        self.country = country[:2]
+        # Whether an account has to be created for the student.
+        self.is_new = False
+        self.user = None
+        # The student's enrollment in the course before the upload, if any.
+        self.previous_enrollment = None
+        self.previous_mode = None
+        self.enrollment = None
+        self.password = None
+        self.status = None
+        self.message = u''
+
+    def set_result(self, status, message=u''):
+        """
+        Records the result of the row.
+        """
+        self.status = status
+        self.message = message
+
+
+class BulkRegistration(object):
+    """
+    Creates accounts for students and enrolls them in a course, in bulk.
+
+    The rows are handled in batches: the users of a batch are looked up with a
+    couple of queries, the missing ones are created along with their
+    registrations and profiles in bulk, and they are all enrolled in a single
+    transaction.  Should that transaction fail, e.g. because a username got
+    taken meanwhile, the rows of the batch are handled one at a time.
+    Enrollment events and signals, and the emails to the students, are only
+    sent once the batch is committed.
+
+    Rows are handled as by the `register_and_enroll_students` view: a student
+    whose email address has an account is enrolled with that account, even if
+    the username differs, while a student whose username is taken fails.
+    """
+    def __init__(self, course_id, enrolled_by, secure=True):
+        self.course_id = course_id
+        self.enrolled_by = enrolled_by
+        # White labels enroll students in the 'shoppingcart' mode, see `enroll_email`.
+        modes_dict = CourseMode.modes_for_course_dict(course_id)
+        if CourseMode.is_white_label(course_id, modes_dict=modes_dict):
+            self.mode = CourseMode.DEFAULT_SHOPPINGCART_MODE_SLUG
+        else:
+            self.mode = CourseMode.default_mode_slug(course_id, modes_dict=modes_dict)
+        self.email_params = get_email_params(get_course_by_id(course_id), True, secure=secure)
+        self.site = configuration_helpers.get_value('SITE_NAME')
+
+    def register_and_enroll(self, rows):
+        """
+        Registers and enrolls the students of the given (row number, row)
+        pairs.  Returns a `RegistrationRow` with the result of each of them.
+        """
+        results = []
+        students = []
+        for row_num, row in rows:
+            if len(row) != 4:
+                result = RegistrationRow(row_num, u'', u'')
+                result.set_result(REGISTRATION_FAILED, _(
+                    'Data in row #{row_num} must have exactly four columns: email, username, full name, and country'
+                ).format(row_num=row_num))
+            else:
+                result = RegistrationRow(row_num, *row)
+                try:
+                    validate_email(result.email)
+                except ValidationError:
+                    result.set_result(
+                        REGISTRATION_FAILED, _('Invalid email {email_address}.').format(email_address=result.email)
+                    )
+                else:
+                    students.append(result)
+            results.append(result)
+
+        students = self._resolve(students)
+        try:
+            with transaction.atomic():
+                self._create_users([student for student in students if student.is_new])
+                self._enroll(students)
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.warning(
+                u'Failed to register and enroll a batch of %d students in course %s, retrying one at a time',
+                len(students),
+                self.course_id,
+                exc_info=True,
+            )
+            students = self._register_and_enroll_one_at_a_time(students)
+
+        self._send_enrollment_events(students)
+        self._send_emails(students)
+        return results
+
+    def _resolve(self, students):
+        """
+        Looks up the accounts and enrollments of the given students.  Returns
+        the students to register or enroll; the others are given their result.
+        """
+        users_by_email = {}
+        for user in User.objects.filter(
+                email__in=[student.email for student in students]
+        ).select_related('profile').order_by('id'):
+            users_by_email.setdefault(user.email.lower(), user)
+        taken_usernames = {
+            username.lower() for username in User.objects.filter(
+                username__in=[student.username for student in students]
+            ).values_list('username', flat=True)
+        }
+        enrollments = {
+            enrollment.user_id: enrollment for enrollment in CourseEnrollment.objects.filter(
+                course_id=self.course_id,
+                user__in=users_by_email.values(),
+            )
+        }
+
+        to_register = []
+        students_by_email = {}
+        for student in students:
+            first_student = students_by_email.setdefault(student.email.lower(), student)
+            if first_student is not student:
+                # Listed more than once: the student is handled for the first row.
+                student.set_result(REGISTRATION_DUPLICATE, _('Duplicate of row #{row_num}.').format(
+                    row_num=first_student.row_num
+                ))
+                continue
+            user = users_by_email.get(student.email.lower())
+            if user is not None:
+                student.user = user
+                student.previous_enrollment = enrollments.get(user.id)
+                if user.username != student.username:
+                    student.message = _(
+                        'An account with email {email} exists but the provided username {username} '
+                        'is different. Enrolling anyway with {email}.'
+                    ).format(email=student.email, username=student.username)
+                if student.previous_enrollment is not None:
+                    if student.previous_enrollment.is_active:
+                        student.set_result(REGISTRATION_ALREADY_ENROLLED, student.message)
+                        continue
+                    student.previous_mode = student.previous_enrollment.mode
+                to_register.append(student)
+            elif student.username.lower() in taken_usernames:
+                student.set_result(
+                    REGISTRATION_FAILED, _('Username {user} already exists.').format(user=student.username)
+                )
+            else:
+                student.is_new = True
+                taken_usernames.add(student.username.lower())
+                to_register.append(student)
+        return to_register
+
+    def _register_and_enroll_one_at_a_time(self, students):
+        """
+        Registers and enrolls the given students, each in its own transaction.
+        Returns the students who were registered or enrolled.
+        """
+        registered = []
+        for student in students:
+            try:
+                with transaction.atomic():
+                    if student.is_new:
+                        self._create_users([student])
+                    self._enroll([student])
+            except IntegrityError as exc:
+                if not student.is_new:
+                    TASK_LOG.exception(type(exc).__name__)
+                    student.set_result(REGISTRATION_FAILED, type(exc).__name__)
+                    continue
+                student.set_result(
+                    REGISTRATION_FAILED, _('Username {user} already exists.').format(user=student.username)
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                TASK_LOG.exception(type(exc).__name__)
+                student.set_result(REGISTRATION_FAILED, type(exc).__name__)
+            else:
+                registered.append(student)
+        return registered
+
+    def _create_users(self, students):
+        """
+        Creates the accounts of the given students, along with their
+        registrations and profiles.
+        """
+        if not students:
+            return
+        for student in students:
+            student.password = User.objects.make_random_password(length=12)
+        User.objects.bulk_create([
+            User(
+                username=student.username,
+                email=User.objects.normalize_email(student.email),
+                password=make_password(student.password),
+            )
+            for student in students
+        ])
+        # bulk_create doesn't set the ids of the users on MySQL
+        users = {
+            user.username.lower(): user
+            for user in User.objects.filter(username__in=[student.username for student in students])
+        }
+        for student in students:
+            student.user = users[student.username.lower()]
+
+        Registration.objects.bulk_create([
+            Registration(user=student.user, activation_key=uuid.uuid4().hex) for student in students
+        ])
+        UserProfile.objects.bulk_create([
+            UserProfile(user=student.user, name=student.name, country=student.country) for student in students
+        ])
+        if self.site:
+            # As done by `user_signup_handler` when a User is created.
+            UserSignupSource.objects.bulk_create([
+                UserSignupSource(user=student.user, site=self.site) for student in students
+            ])
+
+    def _enroll(self, students):
+        """
+        Enrolls the given students, and adds a manual enrollment audit trail.
+
+        Enrollments are saved one by one, as saving them updates their history
+        and forum roles, but the events and signals of `CourseEnrollment.enroll`
+        are left to `_send_enrollment_events`.
+        """
+        for student in students:
+            enrollment = student.previous_enrollment
+            if enrollment is None:
+                enrollment = CourseEnrollment(user=student.user, course_id=self.course_id)
+            enrollment.mode = self.mode
+            enrollment.is_active = True
+            enrollment.save()
+            student.enrollment = enrollment
+
+        ManualEnrollmentAudit.objects.bulk_create([
+            ManualEnrollmentAudit(
+                enrolled_by=self.enrolled_by,
+                enrolled_email=student.user.email,
+                state_transition=UNENROLLED_TO_ENROLLED,
+                reason='Enrolling via csv upload',
+                enrollment=student.enrollment,
+            )
+            for student in students
+        ])
+
+    def _send_enrollment_events(self, students):
+        """
+        Emits the events, and sends the signals, of the enrollments of the
+        given students, as `CourseEnrollment.enroll` does.
+        """
+        for student in students:
+            enrollment = student.enrollment
+            enrollment.emit_event(EVENT_NAME_ENROLLMENT_ACTIVATED)
+            if student.previous_mode not in (None, enrollment.mode):
+                enrollment.emit_event(EVENT_NAME_ENROLLMENT_MODE_CHANGED)
+            enrollment.send_signal(EnrollStatusChange.enroll)
+        if students:
+            dog_stats_api.increment(
+                "common.student.enrollment",
+                value=len(students),
+                tags=[u"org:{}".format(self.course_id.org),
+                      u"offering:{}".format(self.course_id.offering),
+                      u"mode:{}".format(self.mode)]
+            )
+
+    def _send_emails(self, students):
+        """
+        Sends their new account's credentials, or a notification of their
+        enrollment, to the given students, and records their result.
+        """
+        for student in students:
+            email_params = dict(self.email_params, email_address=student.email)
+            if student.is_new:
+                email_params.update({
+                    'message': 'account_creation_and_enrollment',
+                    'password': student.password,
+                    'platform_name': configuration_helpers.get_value('platform_name', settings.PLATFORM_NAME),
+                })
+            else:
+                try:
+                    full_name = student.user.profile.name
+                except UserProfile.DoesNotExist:
+                    full_name = None
+                email_params.update({'message': 'enrolled_enroll', 'full_name': full_name})
+            # Don't keep passwords around any longer than needed.
+            student.password = None
+
+            try:
+                send_mail_to_student(student.email, email_params)
+            except Exception as exc:  # pylint: disable=broad-except
+                TASK_LOG.exception(
+                    u"Exception '%s' raised while sending email to student %s.", type(exc).__name__, student.email
+                )
+                if student.is_new:
+                    student.set_result(REGISTRATION_FAILED, _(
+                        "Error '{error}' while sending email to new user (user email={email}). "
+                        "Without the email student would not be able to login. "
+                        "Please contact support for further information."
+                    ).format(error=type(exc).__name__, email=student.email))
+                    continue
+            student.set_result(REGISTRATION_CREATED if student.is_new else REGISTRATION_ENROLLED, student.message)
+
+
+class EnrollmentUpdateRow(object):
+    """
+    A student whose enrollment is updated, and its result.
+    """
+    def __init__(self, identifier):
+        self.identifier = identifier
+        self.email = identifier
+        self.user = None
+        self.language = None
+        # The states of the student's enrollment before and after the update,
+        # as given by `EmailEnrollmentState.to_dict`.
+        self.before = {}
+        self.after = {}
+        # The student's enrollment in the course, and permission to enroll in
+        # it, before the update, if any.
+        self.previous_enrollment = None
+        self.allowed = None
+        self.enrollment = None
+        self.activation_changed = False
+        self.mode_changed = False
+        self.state_transition = None
+        self.status = None
+        self.message = u''
+
+    def set_result(self, status, message=u''):
+        """
+        Records the result of the update.
+        """
+        self.status = status
+        self.message = message
+
+
+class BulkEnrollmentUpdate(object):
+    """
+    Enrolls students in a course, or unenrolls them from it, in bulk.
+
+    The students are handled in batches: their users, enrollments and
+    permissions to enroll are looked up with a few queries, the permissions
+    to enroll and the manual enrollment audit rows are created, updated or
+    deleted in bulk, and the batch is updated in a single transaction.
+    Should that transaction fail, the students of the batch are handled one
+    at a time.  Enrollment events and signals, and the emails to the
+    students, are only sent once the batch is committed.
+
+    Students are handled as by the `students_update_enrollment` view: those
+    with an account are enrolled in the course, while the others are allowed
+    to enroll once they register.
+    """
+    def __init__(self, course_id, action, updated_by, reason=None, auto_enroll=False, email_students=False,
+                 secure=True):
+        if action not in ('enroll', 'unenroll'):
+            raise ValueError(u'Unrecognized action {}'.format(action))
+        self.course_id = course_id
+        self.action = action
+        self.updated_by = updated_by
+        self.reason = reason
+        self.auto_enroll = auto_enroll
+        self.email_params = None
+        if email_students:
+            self.email_params = get_email_params(get_course_by_id(course_id), auto_enroll, secure=secure)
+        if action == 'enroll':
+            # White labels enroll students in the 'shoppingcart' mode, see `enroll_email`.
+            modes_dict = CourseMode.modes_for_course_dict(course_id)
+            if CourseMode.is_white_label(course_id, modes_dict=modes_dict):
+                self.mode = CourseMode.DEFAULT_SHOPPINGCART_MODE_SLUG
+            else:
+                self.mode = CourseMode.default_mode_slug(course_id, modes_dict=modes_dict)
+
+    def update(self, identifiers):
+        """
+        Updates the enrollments of the students of the given emails or
+        usernames.  Returns an `EnrollmentUpdateRow` with the result of each
+        of them.
+        """
+        results = self._resolve(identifiers)
+        students = [student for student in results if student.status is None]
+        try:
+            with transaction.atomic():
+                self._update(students)
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.warning(
+                u'Failed to %s a batch of %d students in course %s, retrying one at a time',
+                self.action,
+                len(students),
+                self.course_id,
+                exc_info=True,
+            )
+            students = self._update_one_at_a_time(students)
+
+        self._send_enrollment_events(students)
+        self._send_emails(students)
+        return results
+
+    def _resolve(self, identifiers):
+        """
+        Looks up the users, enrollments and permissions to enroll of the
+        students of the given identifiers, as `EmailEnrollmentState` does.
+        """
+        users_by_email = {}
+        users_by_username = {}
+        for user in User.objects.filter(
+                email__in=[identifier for identifier in identifiers if '@' in identifier]
+        ).select_related('profile').order_by('id'):
+            users_by_email.setdefault(user.email.lower(), user)
+        for user in User.objects.filter(
+                username__in=[identifier for identifier in identifiers if '@' not in identifier]
+        ).select_related('profile'):
+            users_by_username[user.username.lower()] = user
+
+        results = []
+        students_by_email = {}
+        for identifier in identifiers:
+            student = EnrollmentUpdateRow(identifier)
+            results.append(student)
+            if '@' in identifier:
+                student.user = users_by_email.get(identifier.lower())
+            else:
+                student.user = users_by_username.get(identifier.lower())
+            if student.user is not None:
+                student.email = student.user.email
+            try:
+                validate_email(student.email)
+            except ValidationError:
+                student.set_result(ENROLLMENT_UPDATE_INVALID)
+                continue
+            first_student = students_by_email.setdefault(student.email.lower(), student)
+            if first_student is not student:
+                # Listed more than once: the student is handled for the first identifier.
+                student.set_result(ENROLLMENT_UPDATE_DUPLICATE, _('Duplicate of {identifier}.').format(
+                    identifier=first_student.identifier
+                ))
+
+        students = [student for student in results if student.status is None]
+        users = [student.user for student in students if student.user is not None]
+        enrollments = {
+            enrollment.user_id: enrollment for enrollment in CourseEnrollment.objects.filter(
+                course_id=self.course_id,
+                user__in=users,
+            )
+        }
+        allowed = {
+            cea.email.lower(): cea for cea in CourseEnrollmentAllowed.objects.filter(
+                course_id=self.course_id,
+                email__in=[student.email for student in students],
+            )
+        }
+        languages = {}
+        if self.email_params is not None and users:
+            languages = dict(
+                UserPreference.objects.filter(user__in=users, key=LANGUAGE_KEY).values_list('user_id', 'value')
+            )
+
+        for student in students:
+            student.allowed = allowed.get(student.email.lower())
+            if student.user is not None:
+                student.previous_enrollment = enrollments.get(student.user.id)
+                student.language = languages.get(student.user.id)
+            student.before = {
+                'user': student.user is not None,
+                'enrollment': student.previous_enrollment is not None and student.previous_enrollment.is_active,
+                'allowed': student.allowed is not None,
+                'auto_enroll': student.allowed is not None and student.allowed.auto_enroll,
+            }
+        return results
+
+    def _update_one_at_a_time(self, students):
+        """
+        Updates the enrollments of the given students, each in its own
+        transaction.  Returns the students whose enrollment was updated.
+        """
+        updated = []
+        for student in students:
+            try:
+                with transaction.atomic():
+                    self._update([student])
+            except Exception as exc:  # pylint: disable=broad-except
+                TASK_LOG.exception(type(exc).__name__)
+                student.set_result(ENROLLMENT_UPDATE_FAILED, type(exc).__name__)
+            else:
+                updated.append(student)
+        return updated
+
+    def _update(self, students):
+        """
+        Updates the enrollments and permissions to enroll of the given
+        students, and adds a manual enrollment audit trail.
+        """
+        if self.action == 'enroll':
+            self._enroll(students)
+        else:
+            self._unenroll(students)
+
+        ManualEnrollmentAudit.objects.bulk_create([
+            ManualEnrollmentAudit(
+                enrolled_by=self.updated_by,
+                enrolled_email=student.email,
+                state_transition=student.state_transition,
+                reason=self.reason,
+                enrollment=student.enrollment,
+            )
+            for student in students
+        ])
+
+    def _enroll(self, students):
+        """
+        Enrolls the given students with an account, as `enroll_email` does,
+        and allows the others to enroll once they register.
+
+        Enrollments are saved one by one, as saving them updates their history
+        and forum roles, but the events and signals of `CourseEnrollment.enroll`
+        are left to `_send_enrollment_events`.
+        """
+        new_allowed = []
+        for student in students:
+            if student.user is None:
+                student.enrollment = None
+                student.state_transition = UNENROLLED_TO_ALLOWEDTOENROLL
+                if student.allowed is None:
+                    new_allowed.append(CourseEnrollmentAllowed(
+                        course_id=self.course_id, email=student.email, auto_enroll=self.auto_enroll
+                    ))
+                student.after = dict(student.before, allowed=True, auto_enroll=self.auto_enroll)
+                continue
+
+            enrollment = student.previous_enrollment
+            if enrollment is None:
+                enrollment = CourseEnrollment(user=student.user, course_id=self.course_id, mode=self.mode)
+            # Students currently enrolled keep their mode.
+            mode = enrollment.mode if student.before['enrollment'] else self.mode
+            student.activation_changed = not student.before['enrollment']
+            student.mode_changed = enrollment.pk is not None and enrollment.mode != mode
+            if student.activation_changed or student.mode_changed or enrollment.pk is None:
+                enrollment.mode = mode
+                enrollment.is_active = True
+                enrollment.save()
+            student.enrollment = enrollment
+            if student.before['enrollment']:
+                student.state_transition = ENROLLED_TO_ENROLLED
+            elif student.before['allowed']:
+                student.state_transition = ALLOWEDTOENROLL_TO_ENROLLED
+            else:
+                student.state_transition = UNENROLLED_TO_ENROLLED
+            student.after = dict(student.before, enrollment=True)
+
+        CourseEnrollmentAllowed.objects.filter(
+            pk__in=[
+                student.allowed.pk for student in students
+                if student.user is None and student.allowed is not None
+            ]
+        ).update(auto_enroll=self.auto_enroll)
+        CourseEnrollmentAllowed.objects.bulk_create(new_allowed)
+
+    def _unenroll(self, students):
+        """
+        Unenrolls the given students, and removes their permissions to
+        enroll, as `unenroll_email` does.
+        """
+        for student in students:
+            student.enrollment = student.previous_enrollment
+            student.activation_changed = student.before['enrollment']
+            if student.activation_changed:
+                student.enrollment.is_active = False
+                student.enrollment.save()
+                student.state_transition = ENROLLED_TO_UNENROLLED
+            elif student.before['allowed']:
+                student.state_transition = ALLOWEDTOENROLL_TO_UNENROLLED
+            else:
+                student.state_transition = UNENROLLED_TO_UNENROLLED
+            student.after = dict(student.before, enrollment=False, allowed=False, auto_enroll=False)
+
+        CourseEnrollmentAllowed.objects.filter(
+            pk__in=[student.allowed.pk for student in students if student.allowed is not None]
+        ).delete()
+
+    def _send_enrollment_events(self, students):
+        """
+        Emits the events, and sends the signals, of the enrollment updates of
+        the given students, as `CourseEnrollment.update_enrollment` does.
+        """
+        changed = 0
+        for student in students:
+            enrollment = student.enrollment
+            if enrollment is None:
+                continue
+            if self.action == 'enroll':
+                if student.activation_changed:
+                    enrollment.emit_event(EVENT_NAME_ENROLLMENT_ACTIVATED)
+                    changed += 1
+                if student.mode_changed:
+                    enrollment.emit_event(EVENT_NAME_ENROLLMENT_MODE_CHANGED)
+                enrollment.send_signal(EnrollStatusChange.enroll)
+            elif student.activation_changed:
+                UNENROLL_DONE.send(sender=None, course_enrollment=enrollment, skip_refund=False)
+                enrollment.emit_event(EVENT_NAME_ENROLLMENT_DEACTIVATED)
+                enrollment.send_signal(EnrollStatusChange.unenroll)
+                changed += 1
+        if changed:
+            dog_stats_api.increment(
+                "common.student.enrollment" if self.action == 'enroll' else "common.student.unenrollment",
+                value=changed,
+                tags=[u"org:{}".format(self.course_id.org),
+                      u"offering:{}".format(self.course_id.offering),
+                      u"mode:{}".format(self.mode if self.action == 'enroll' else None)]
+            )
+
+    def _send_emails(self, students):
+        """
+        Notifies the given students of their enrollment update if requested,
+        as `enroll_email` and `unenroll_email` do, and records their result.
+        """
+        for student in students:
+            messages = []
+            if self.email_params is not None:
+                if self.action == 'enroll':
+                    messages.append('enrolled_enroll' if student.user is not None else 'allowed_enroll')
+                else:
+                    if student.before['enrollment']:
+                        messages.append('enrolled_unenroll')
+                    if student.before['allowed']:
+                        messages.append('allowed_unenroll')
+
+            try:
+                for message in messages:
+                    email_params = dict(self.email_params, message=message, email_address=student.email)
+                    if message.startswith('enrolled_'):
+                        try:
+                            email_params['full_name'] = student.user.profile.name
+                        except UserProfile.DoesNotExist:
+                            email_params['full_name'] = None
+                    send_mail_to_student(student.email, email_params, language=student.language)
+            except Exception as exc:  # pylint: disable=broad-except
+                TASK_LOG.exception(
+                    u"Exception '%s' raised while sending email to student %s.", type(exc).__name__, student.email
+                )
+                student.set_result(ENROLLMENT_UPDATE_FAILED, _(
+                    "Error '{error}' while sending email to student (user email={email})."
+                ).format(error=type(exc).__name__, email=student.email))
+                continue
+            student.set_result(ENROLLMENT_UPDATE_SUCCEEDED)
@@ -17,6 +17,7 @@ from courseware.models import StudentModule
 from courseware.module_render import get_module_for_descriptor_internal
 from eventtracking import tracker
 from lms.djangoapps.grades.scores import weighted_score
+from lms.djangoapps.grades.tasks import batched_grade_recalculation, enqueue_ready_grade_recalculation_batches
 from track.contexts import course_context_from_course_id
 from track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from track.views import task_track
@@ -112,23 +113,29 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update, task_input)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    # The resulting score changes are recalculated for batches of learners,
+    # rather than with one grade recalculation task per learner.
+    with batched_grade_recalculation():
+        for module_to_update in modules_to_update:
+            task_progress.attempted += 1
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            timer_tags = [u'action:{name}'.format(name=action_name)]
+            with dog_stats_api.timer('instructor_tasks.module.time.step', tags=timer_tags):
+                update_status = update_fcn(module_descriptor, module_to_update, task_input)
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    # If the update_fcn returns true, then it performed some kind of work.
+                    # Logging of failures is left to the update_fcn itself.
+                    task_progress.succeeded += 1
+                elif update_status == UPDATE_STATUS_FAILED:
+                    task_progress.failed += 1
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    task_progress.skipped += 1
+                else:
+                    raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+            # The update's transaction is committed by now.
+            enqueue_ready_grade_recalculation_batches()
 
     return task_progress.update_task_state()
 
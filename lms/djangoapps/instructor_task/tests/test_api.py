@@ -25,11 +25,13 @@ from lms.djangoapps.instructor_task.api import (
     submit_detailed_enrollment_features_csv,
     submit_executive_summary_report,
     submit_export_ora2_data,
+    submit_register_and_enroll_students,
     submit_rescore_entrance_exam_for_student,
     submit_rescore_problem_for_all_students,
     submit_rescore_problem_for_student,
     submit_reset_problem_attempts_for_all_students,
-    submit_reset_problem_attempts_in_entrance_exam
+    submit_reset_problem_attempts_in_entrance_exam,
+    submit_update_students_enrollment
 )
 from lms.djangoapps.instructor_task.api_helper import AlreadyRunningError
 from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
@@ -279,6 +281,25 @@ class InstructorTaskCourseSubmitTest(TestReportMixin, InstructorTaskCourseTestCa
         )
         self._test_resubmission(api_call)
 
+    def test_submit_register_and_enroll_students(self):
+        api_call = lambda: submit_register_and_enroll_students(
+            self.create_task_request(self.instructor),
+            self.course.id,
+            file_name=u'filename.csv'
+        )
+        self._test_resubmission(api_call)
+
+    def test_submit_update_students_enrollment(self):
+        api_call = lambda: submit_update_students_enrollment(
+            self.create_task_request(self.instructor),
+            self.course.id,
+            file_name=u'filename.json',
+            action='enroll',
+            auto_enroll=False,
+            email_students=True,
+        )
+        self._test_resubmission(api_call)
+
     def test_submit_ora2_request_task(self):
         request = self.create_task_request(self.instructor)
 
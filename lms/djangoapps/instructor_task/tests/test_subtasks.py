@@ -1,11 +1,24 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
+from celery.states import SUCCESS
+from django.core.cache.backends.locmem import LocMemCache
 from mock import Mock, patch
 
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task import subtasks
+from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    _fold_subtask_counters,
+    _subtask_counter_key,
+    initialize_subtask_info,
+    merge_subtask_progress,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -79,3 +92,83 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+
+@patch('lms.djangoapps.instructor_task.subtasks.cache', LocMemCache('subtask-counters', {}))
+@patch('lms.djangoapps.instructor_task.subtasks.SUBTASK_STATUS_FOLD_INTERVAL', 2)
+class TestSubtaskCounters(InstructorTaskCourseTestCase):
+    """Tests for aggregating subtask progress in cached counters."""
+
+    def setUp(self):
+        super(TestSubtaskCounters, self).setUp()
+        self.initialize_course()
+        self.subtask_ids = [str(uuid4()) for _ in range(3)]
+        self.entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='bulk_course_email',
+        )
+        initialize_subtask_info(self.entry, 'emailed', 30, self.subtask_ids)
+
+    def _complete_subtask(self, subtask_id, succeeded=10):
+        """Report a subtask as having completed successfully."""
+        update_subtask_status(self.entry.id, subtask_id, SubtaskStatus.create(subtask_id, succeeded=succeeded, state=SUCCESS))
+        return InstructorTask.objects.get(pk=self.entry.id)
+
+    def test_counters_folded_periodically(self):
+        entry = self._complete_subtask(self.subtask_ids[0])
+        # Not folded into the InstructorTask yet, but visible in the merged view.
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 0)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 0)
+        merge_subtask_progress(entry)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 10)
+
+        entry = self._complete_subtask(self.subtask_ids[1])
+        subtask_info = json.loads(entry.subtasks)
+        self.assertEqual(subtask_info['succeeded'], 2)
+        self.assertEqual(subtask_info['status'][self.subtask_ids[0]]['state'], SUCCESS)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 20)
+        self.assertEqual(entry.task_state, PROGRESS)
+
+    def test_last_subtask_completes_task(self):
+        for subtask_id in self.subtask_ids[:2]:
+            self._complete_subtask(subtask_id)
+        entry = self._complete_subtask(self.subtask_ids[2], succeeded=5)
+        self.assertEqual(entry.task_state, SUCCESS)
+        task_progress = json.loads(entry.task_output)
+        self.assertEqual(task_progress['succeeded'], 25)
+        self.assertEqual(task_progress['attempted'], 25)
+
+    def test_duplicate_completion_counted_once(self):
+        self._complete_subtask(self.subtask_ids[0])
+        entry = self._complete_subtask(self.subtask_ids[0])
+        merge_subtask_progress(entry)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 10)
+
+    def test_evicted_counters_keep_other_subtasks(self):
+        self._complete_subtask(self.subtask_ids[0])
+        # A counter is evicted while the second subtask adds its counts.
+        with patch.object(subtasks.cache, 'incr', side_effect=ValueError):
+            entry = self._complete_subtask(self.subtask_ids[1])
+        subtask_info = json.loads(entry.subtasks)
+        self.assertEqual(subtask_info['succeeded'], 2)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 20)
+
+        entry = self._complete_subtask(self.subtask_ids[2], succeeded=5)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 25)
+
+    def test_fold_without_counters(self):
+        self._complete_subtask(self.subtask_ids[0])
+        subtasks.cache.delete(_subtask_counter_key(self.entry.id, 'succeeded'))
+        _fold_subtask_counters(self.entry.id)
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 1)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 10)
+        self.assertEqual(entry.task_state, PROGRESS)
+
+        for subtask_id in self.subtask_ids[1:]:
+            entry = self._complete_subtask(subtask_id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 30)
@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -17,6 +18,8 @@ from datetime import datetime
 import ddt
 import unicodecsv
 from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
 from freezegun import freeze_time
@@ -30,11 +33,16 @@ from certificates.models import CertificateStatuses, GeneratedCertificate
 from certificates.tests.factories import CertificateWhitelistFactory, GeneratedCertificateFactory
 from course_modes.models import CourseMode
 from courseware.tests.factories import InstructorFactory
+from django_comment_common.models import FORUM_ROLE_STUDENT
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
+    BulkEnrollmentUpdate,
+    BulkRegistration,
+    register_and_enroll_students_and_upload,
+    update_students_enrollment_and_upload,
     upload_enrollment_report,
     upload_exec_summary_report,
     upload_may_enroll_csv,
@@ -52,6 +60,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -74,7 +83,18 @@ from shoppingcart.models import (
     Order,
     PaidCourseRegistration
 )
-from student.models import ALLOWEDTOENROLL_TO_ENROLLED, CourseEnrollment, CourseEnrollmentAllowed, ManualEnrollmentAudit
+from student.models import (
+    ALLOWEDTOENROLL_TO_ENROLLED,
+    ALLOWEDTOENROLL_TO_UNENROLLED,
+    ENROLLED_TO_ENROLLED,
+    ENROLLED_TO_UNENROLLED,
+    UNENROLLED_TO_ALLOWEDTOENROLL,
+    UNENROLLED_TO_ENROLLED,
+    CourseEnrollment,
+    CourseEnrollmentAllowed,
+    ManualEnrollmentAudit,
+    Registration
+)
 from student.tests.factories import CourseEnrollmentFactory, CourseModeFactory, UserFactory
 from survey.models import SurveyAnswer, SurveyForm
 from xmodule.modulestore import ModuleStoreEnum
@@ -394,7 +414,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
 
         RequestCache.clear_request_cache()
 
-        expected_query_count = 41
+        expected_query_count = 42
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with check_mongo_calls(mongo_count):
                 with self.assertNumQueries(expected_query_count):
@@ -1706,6 +1726,358 @@ class TestCohortStudents(TestReportMixin, InstructorTaskCourseTestCase):
         )
 
 
+@patch('lms.djangoapps.instructor_task.tasks_helper.enrollments.DefaultStorage', new=MockDefaultStorage)
+class TestRegisterAndEnrollStudents(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that bulk student registration and enrollment works.
+    """
+    def setUp(self):
+        super(TestRegisterAndEnrollStudents, self).setUp()
+
+        self.course = CourseFactory.create()
+        self.instructor = InstructorFactory(course_key=self.course.id)
+        self.task = InstructorTaskFactory.create(
+            course_id=self.course.id, task_type='register_and_enroll_students', requester=self.instructor
+        )
+        self.student = UserFactory.create(username='student', email='student@example.com')
+        self.csv_header_row = ['Row', 'Email', 'Username', 'Status', 'Message']
+
+    def _register_and_enroll_students_and_upload(self, csv_data):
+        """
+        Call `register_and_enroll_students_and_upload` with a file generated from `csv_data`.
+        """
+        with tempfile.NamedTemporaryFile() as temp_file:
+            temp_file.write(csv_data.encode('utf-8'))
+            temp_file.flush()
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                return register_and_enroll_students_and_upload(
+                    None, self.task.id, self.course.id, {'file_name': temp_file.name}, 'enrolled'
+                )
+
+    def assert_enrolled(self, username):
+        """
+        Asserts that the user was manually enrolled in the course.
+        """
+        user = User.objects.get(username=username)
+        self.assertTrue(CourseEnrollment.is_enrolled(user, self.course.id))
+        audit = ManualEnrollmentAudit.get_manual_enrollment_by_email(user.email)
+        self.assertEqual(audit.enrolled_by, self.instructor)
+        self.assertEqual(audit.enrollment, CourseEnrollment.get_enrollment(user, self.course.id))
+
+    def test_new_students(self):
+        result = self._register_and_enroll_students_and_upload(
+            u'new_1@example.com,new_1,New Student 1,US\n'
+            u'\n'
+            u'new_2@example.com,new_2\xec,New Student 2\xec,CA'
+        )
+        self.assertDictContainsSubset({'total': 2, 'attempted': 2, 'succeeded': 2, 'failed': 0}, result)
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, ['1', 'new_1@example.com', 'new_1', 'created', ''])),
+            dict(zip(self.csv_header_row, ['3', 'new_2@example.com', u'new_2\xec', 'created', ''])),
+        ])
+
+        for username, name, country in (('new_1', 'New Student 1', 'US'), (u'new_2\xec', u'New Student 2\xec', 'CA')):
+            self.assert_enrolled(username)
+            user = User.objects.get(username=username)
+            self.assertEqual(user.profile.name, name)
+            self.assertEqual(user.profile.country, country)
+            self.assertTrue(Registration.objects.filter(user=user).exists())
+            self.assertTrue(user.roles.filter(course_id=self.course.id, name=FORUM_ROLE_STUDENT).exists())
+
+        self.assertEqual(
+            sorted(message.to for message in mail.outbox), [['new_1@example.com'], ['new_2@example.com']]
+        )
+        self.assertIn('password', mail.outbox[0].body)
+
+    def test_existing_students(self):
+        enrolled_student = self.create_student('enrolled', 'enrolled@example.com')
+        result = self._register_and_enroll_students_and_upload(
+            u'student@example.com,other_name,Student,US\n'
+            u'enrolled@example.com,enrolled,Enrolled Student,US'
+        )
+        self.assertDictContainsSubset(
+            {'total': 2, 'attempted': 2, 'succeeded': 1, 'skipped': 1, 'failed': 0}, result
+        )
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, [
+                '1', 'student@example.com', 'other_name', 'enrolled',
+                'An account with email student@example.com exists but the provided username other_name is '
+                'different. Enrolling anyway with student@example.com.'
+            ])),
+            dict(zip(self.csv_header_row, ['2', 'enrolled@example.com', 'enrolled', 'already enrolled', ''])),
+        ])
+        self.assert_enrolled('student')
+        self.assertFalse(User.objects.filter(username='other_name').exists())
+        self.assertFalse(ManualEnrollmentAudit.objects.filter(enrolled_email=enrolled_student.email).exists())
+        self.assertEqual([message.to for message in mail.outbox], [['student@example.com']])
+
+    def test_inactive_enrollment(self):
+        CourseEnrollmentFactory.create(user=self.student, course_id=self.course.id, is_active=False)
+        result = self._register_and_enroll_students_and_upload(u'student@example.com,student,Student,US')
+        self.assertDictContainsSubset({'total': 1, 'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
+        self.assert_enrolled('student')
+
+    def test_invalid_rows(self):
+        result = self._register_and_enroll_students_and_upload(
+            u'new_1@example.com,new_1,New Student 1\n'
+            u'not an email,new_2,New Student 2,US\n'
+            u'new_3@example.com,student,New Student 3,US\n'
+            u'new_4@example.com,new_4,New Student 4,US\n'
+            u'new_4@example.com,new_4,New Student 4,US'
+        )
+        self.assertDictContainsSubset(
+            {'total': 5, 'attempted': 5, 'succeeded': 1, 'skipped': 1, 'failed': 3}, result
+        )
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, [
+                '1', '', '', 'failed',
+                'Data in row #1 must have exactly four columns: email, username, full name, and country'
+            ])),
+            dict(zip(self.csv_header_row, ['2', 'not an email', 'new_2', 'failed', 'Invalid email not an email.'])),
+            dict(zip(self.csv_header_row, [
+                '3', 'new_3@example.com', 'student', 'failed', 'Username student already exists.'
+            ])),
+            dict(zip(self.csv_header_row, ['4', 'new_4@example.com', 'new_4', 'created', ''])),
+            dict(zip(self.csv_header_row, [
+                '5', 'new_4@example.com', 'new_4', 'duplicate', 'Duplicate of row #4.'
+            ])),
+        ])
+        self.assertEqual(User.objects.filter(email='new_4@example.com').count(), 1)
+
+    def test_duplicate_existing_student(self):
+        result = self._register_and_enroll_students_and_upload(
+            u'student@example.com,student,Student,US\n'
+            u'Student@example.com,student,Student,US'
+        )
+        self.assertDictContainsSubset(
+            {'total': 2, 'attempted': 2, 'succeeded': 1, 'skipped': 1, 'failed': 0}, result
+        )
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, ['1', 'student@example.com', 'student', 'enrolled', ''])),
+            dict(zip(self.csv_header_row, [
+                '2', 'Student@example.com', 'student', 'duplicate', 'Duplicate of row #1.'
+            ])),
+        ])
+        self.assert_enrolled('student')
+        self.assertEqual(ManualEnrollmentAudit.objects.filter(enrolled_email=self.student.email).count(), 1)
+        self.assertEqual([message.to for message in mail.outbox], [['student@example.com']])
+
+    def test_batches(self):
+        with patch('lms.djangoapps.instructor_task.tasks_helper.enrollments.REGISTRATION_BATCH_SIZE', 2):
+            result = self._register_and_enroll_students_and_upload(
+                u'\n'.join(u'new_{0}@example.com,new_{0},New Student {0},US'.format(index) for index in range(5))
+            )
+        self.assertDictContainsSubset({'total': 5, 'attempted': 5, 'succeeded': 5, 'failed': 0}, result)
+        for index in range(5):
+            self.assert_enrolled('new_{}'.format(index))
+
+    def test_batch_failure(self):
+        """
+        Test that the rows of a batch are handled one at a time when the
+        batch fails, e.g. when a username is taken while it is handled.
+        """
+        resolve = BulkRegistration._resolve  # pylint: disable=protected-access
+
+        def resolve_and_take_username(registration, students):
+            """
+            Looks up the students, then takes the username of one of them.
+            """
+            to_register = resolve(registration, students)
+            UserFactory.create(username='new_2', email='other@example.com')
+            return to_register
+
+        with patch.object(BulkRegistration, '_resolve', autospec=True, side_effect=resolve_and_take_username):
+            result = self._register_and_enroll_students_and_upload(
+                u'new_1@example.com,new_1,New Student 1,US\n'
+                u'new_2@example.com,new_2,New Student 2,US\n'
+                u'student@example.com,student,Student,US'
+            )
+        self.assertDictContainsSubset({'total': 3, 'attempted': 3, 'succeeded': 2, 'failed': 1}, result)
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, ['1', 'new_1@example.com', 'new_1', 'created', ''])),
+            dict(zip(self.csv_header_row, [
+                '2', 'new_2@example.com', 'new_2', 'failed', 'Username new_2 already exists.'
+            ])),
+            dict(zip(self.csv_header_row, ['3', 'student@example.com', 'student', 'enrolled', ''])),
+        ])
+        self.assert_enrolled('new_1')
+        self.assert_enrolled('student')
+        self.assertFalse(User.objects.filter(email='new_2@example.com').exists())
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.enrollments.send_mail_to_student', side_effect=Exception)
+    def test_email_failure(self, __):
+        result = self._register_and_enroll_students_and_upload(
+            u'new_1@example.com,new_1,New Student 1,US\n'
+            u'student@example.com,student,Student,US'
+        )
+        self.assertDictContainsSubset({'total': 2, 'attempted': 2, 'succeeded': 1, 'failed': 1}, result)
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, [
+                '1', 'new_1@example.com', 'new_1', 'failed',
+                "Error 'Exception' while sending email to new user (user email=new_1@example.com). "
+                "Without the email student would not be able to login. "
+                "Please contact support for further information."
+            ])),
+            dict(zip(self.csv_header_row, ['2', 'student@example.com', 'student', 'enrolled', ''])),
+        ])
+        self.assert_enrolled('new_1')
+
+    def test_enrollment_signals(self):
+        with patch('student.models.ENROLL_STATUS_CHANGE.send') as mock_send:
+            self._register_and_enroll_students_and_upload(
+                u'new_1@example.com,new_1,New Student 1,US\n'
+                u'student@example.com,student,Student,US'
+            )
+        self.assertEqual(
+            sorted(call[1]['user'].username for call in mock_send.call_args_list), ['new_1', 'student']
+        )
+
+
+@patch('lms.djangoapps.instructor_task.tasks_helper.enrollments.DefaultStorage', new=MockDefaultStorage)
+class TestUpdateStudentsEnrollment(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that bulk enrollment updates work.
+    """
+    def setUp(self):
+        super(TestUpdateStudentsEnrollment, self).setUp()
+
+        self.course = CourseFactory.create()
+        self.instructor = InstructorFactory(course_key=self.course.id)
+        self.task = InstructorTaskFactory.create(
+            course_id=self.course.id, task_type='update_students_enrollment', requester=self.instructor
+        )
+        self.student = UserFactory.create(username='student', email='student@example.com')
+        self.enrolled_student = self.create_student('enrolled', 'enrolled@example.com')
+        CourseEnrollmentAllowed.objects.create(email='allowed@example.com', course_id=self.course.id)
+        self.csv_header_row = [
+            'Identifier', 'Email', 'Registered', 'Enrolled Before', 'Enrolled After',
+            'Allowed Before', 'Allowed After', 'Auto Enroll', 'Status', 'Message',
+        ]
+
+    def _update_students_enrollment_and_upload(self, identifiers, action, **task_input):
+        """
+        Call `update_students_enrollment_and_upload` with a file holding the given identifiers.
+        """
+        with tempfile.NamedTemporaryFile() as temp_file:
+            json.dump({'identifiers': identifiers, 'reason': 'Testing'}, temp_file)
+            temp_file.flush()
+            task_input.update(file_name=temp_file.name, action=action)
+            with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+                return update_students_enrollment_and_upload(
+                    None, self.task.id, self.course.id, task_input, 'updated'
+                )
+
+    def assert_audited(self, email, state_transition):
+        """
+        Asserts that the enrollment update of the given email was audited.
+        """
+        audit = ManualEnrollmentAudit.get_manual_enrollment_by_email(email)
+        self.assertEqual(audit.enrolled_by, self.instructor)
+        self.assertEqual(audit.state_transition, state_transition)
+        self.assertEqual(audit.reason, 'Testing')
+
+    def test_enroll(self):
+        result = self._update_students_enrollment_and_upload(
+            ['student', 'enrolled@example.com', 'allowed@example.com', 'new@example.com', 'not_a_user',
+             'student@example.com'],
+            'enroll',
+            auto_enroll=True,
+            email_students=True,
+        )
+        self.assertDictContainsSubset(
+            {'total': 6, 'attempted': 6, 'succeeded': 4, 'skipped': 1, 'failed': 1}, result
+        )
+        self.verify_rows_in_csv([
+            dict(zip(self.csv_header_row, row)) for row in [
+                ['student', 'student@example.com', 'True', 'False', 'True', 'False', 'False', 'False', 'succeeded',
+                 ''],
+                ['enrolled@example.com', 'enrolled@example.com', 'True', 'True', 'True', 'False', 'False', 'False',
+                 'succeeded', ''],
+                ['allowed@example.com', 'allowed@example.com', 'False', 'False', 'False', 'True', 'True', 'True',
+                 'succeeded', ''],
+                ['new@example.com', 'new@example.com', 'False', 'False', 'False', 'False', 'True', 'True',
+                 'succeeded', ''],
+                ['not_a_user', 'not_a_user', 'False', 'False', 'False', 'False', 'False', 'False',
+                 'invalid identifier', ''],
+                ['student@example.com', 'student@example.com', 'False', 'False', 'False', 'False', 'False', 'False',
+                 'duplicate', 'Duplicate of student.'],
+            ]
+        ])
+
+        self.assertTrue(CourseEnrollment.is_enrolled(self.student, self.course.id))
+        self.assertTrue(CourseEnrollment.is_enrolled(self.enrolled_student, self.course.id))
+        self.assertEqual(CourseEnrollment.enrollment_mode_for_user(self.enrolled_student, self.course.id)[0], 'honor')
+        self.assertTrue(
+            CourseEnrollmentAllowed.objects.get(email='allowed@example.com', course_id=self.course.id).auto_enroll
+        )
+        self.assertTrue(
+            CourseEnrollmentAllowed.objects.get(email='new@example.com', course_id=self.course.id).auto_enroll
+        )
+        self.assert_audited('student@example.com', UNENROLLED_TO_ENROLLED)
+        self.assert_audited('enrolled@example.com', ENROLLED_TO_ENROLLED)
+        self.assert_audited('new@example.com', UNENROLLED_TO_ALLOWEDTOENROLL)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['allowed@example.com', 'enrolled@example.com', 'new@example.com', 'student@example.com'],
+        )
+
+    def test_enroll_allowed_student(self):
+        allowed_student = UserFactory.create(username='allowed', email='allowed@example.com')
+        result = self._update_students_enrollment_and_upload(['allowed'], 'enroll')
+        self.assertDictContainsSubset({'total': 1, 'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
+        self.assertTrue(CourseEnrollment.is_enrolled(allowed_student, self.course.id))
+        self.assert_audited('allowed@example.com', ALLOWEDTOENROLL_TO_ENROLLED)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_unenroll(self):
+        with patch('student.models.UNENROLL_DONE.send') as mock_unenroll_done:
+            result = self._update_students_enrollment_and_upload(
+                ['enrolled', 'allowed@example.com', 'student@example.com'], 'unenroll', email_students=True
+            )
+        self.assertDictContainsSubset({'total': 3, 'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+        self.assertFalse(CourseEnrollment.is_enrolled(self.enrolled_student, self.course.id))
+        self.assertFalse(CourseEnrollmentAllowed.objects.filter(course_id=self.course.id).exists())
+        self.assert_audited('enrolled@example.com', ENROLLED_TO_UNENROLLED)
+        self.assert_audited('allowed@example.com', ALLOWEDTOENROLL_TO_UNENROLLED)
+        self.assertEqual(
+            [call[1]['course_enrollment'].user for call in mock_unenroll_done.call_args_list],
+            [self.enrolled_student],
+        )
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox), ['allowed@example.com', 'enrolled@example.com']
+        )
+
+    def test_batch_failure(self):
+        """
+        Test that the students of a batch are handled one at a time when the
+        batch fails.
+        """
+        enroll = BulkEnrollmentUpdate._enroll  # pylint: disable=protected-access
+
+        def enroll_and_fail_batch(enrollment_updater, students):
+            """
+            Enrolls the students, failing if there is more than one.
+            """
+            enroll(enrollment_updater, students)
+            if len(students) > 1:
+                raise Exception()
+
+        with patch.object(BulkEnrollmentUpdate, '_enroll', autospec=True, side_effect=enroll_and_fail_batch):
+            with patch('lms.djangoapps.instructor_task.tasks_helper.enrollments.ENROLLMENT_UPDATE_BATCH_SIZE', 2):
+                result = self._update_students_enrollment_and_upload(
+                    ['student', 'new@example.com', 'other@example.com'], 'enroll'
+                )
+        self.assertDictContainsSubset({'total': 3, 'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.student, self.course.id))
+        self.assertEqual(
+            CourseEnrollmentAllowed.objects.filter(
+                course_id=self.course.id, email__in=['new@example.com', 'other@example.com']
+            ).count(),
+            2,
+        )
+        self.assertEqual(ManualEnrollmentAudit.objects.count(), 3)
+
+
 @patch('lms.djangoapps.instructor_task.tasks_helper.misc.DefaultStorage', new=MockDefaultStorage)
 class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
     """
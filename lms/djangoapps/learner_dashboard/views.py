@@ -12,7 +12,8 @@ from openedx.core.djangoapps.programs.utils import (
     ProgramDataExtender,
     ProgramProgressMeter,
     get_certificates,
-    get_program_marketing_url
+    get_program_marketing_url,
+    get_progress_meter
 )
 from openedx.core.djangoapps.user_api.preferences.api import get_user_preferences
 
@@ -25,7 +26,7 @@ def program_listing(request):
     if not programs_config.enabled:
         raise Http404
 
-    meter = ProgramProgressMeter(request.user)
+    meter = get_progress_meter(request.user)
 
     context = {
         'disable_courseware_js': True,
@@ -10,7 +10,7 @@ from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module_for_descriptor
 from util.module_utils import get_dynamic_descriptor_children
 from xmodule.modulestore.django import modulestore
-from xmodule.modulestore.mongo.base import BLOCK_TYPES_WITH_CHILDREN
+from xmodule.modulestore.mongo.base import get_block_types_with_children
 
 
 class BlockOutline(object):
@@ -38,7 +38,7 @@ class BlockOutline(object):
             """
             return (
                 usage_key.block_type in self.block_types or
-                usage_key.block_type in BLOCK_TYPES_WITH_CHILDREN
+                usage_key.block_type in get_block_types_with_children()
             )
 
         def create_module(descriptor):
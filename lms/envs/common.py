@@ -361,6 +361,18 @@ FEATURES = {
     # making multiple queries.
     'ENABLE_READING_FROM_MULTIPLE_HISTORY_TABLES': True,
 
+    # Buffer the new CSM history entries of each request and celery task,
+    # and insert them at once when it's over.
+    'ENABLE_CSMH_WRITE_BUFFER': False,
+
+    # Save the user state written by an XBlock handler at once, with a single
+    # update of each StudentModule, when the handler returns.
+    'COALESCE_USER_STATE_WRITES': False,
+
+    # Initialize the expensive subsystems, such as the tracking backends and the
+    # modulestores, on first use rather than at startup, for workers to start faster.
+    'LAZY_STARTUP_INITIALIZATION': False,
+
     # Display the 'Analytics' tab in the instructor dashboard for CCX courses.
     # Note: This has no effect unless ANALYTICS_DASHBOARD_URL is already set,
     #       because without that setting, the tab does not show up for any courses.
@@ -392,6 +404,10 @@ FEATURES = {
     # Whether to check the "Notify users by email" checkbox in the batch enrollment form
     # in the instructor dashboard.
     'BATCH_ENROLLMENT_NOTIFY_USERS_DEFAULT': True,
+
+    # Materialize the grades shown on learners' progress pages whenever their
+    # course grades are persisted, and read them from there.
+    'MATERIALIZE_PROGRESS_SUMMARY': False,
 }
 
 # Settings for the course reviews tool template and identification key, set either to None to disable course reviews
@@ -504,6 +520,9 @@ OAUTH2_PROVIDER_APPLICATION_MODEL = 'oauth2_provider.Application'
 # TODO: Move the Mako templating into a different engine in TEMPLATES below.
 import tempfile
 MAKO_MODULE_DIR = os.path.join(tempfile.gettempdir(), 'mako_lms')
+# Directory of the templates precompiled by the compile_mako_templates command,
+# loaded from there as is when set.
+MAKO_PRECOMPILED_DIR = None
 MAKO_TEMPLATES = {}
 MAKO_TEMPLATES['main'] = [
     PROJECT_ROOT / 'templates',
@@ -830,6 +849,15 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of warm sandboxes, which import the common libraries once and fork
+    # a fresh process for each execution.  A size of 0 disables the pool.
+    'pool': {
+        # How many idle sandboxes can each process keep?
+        'size': 0,
+        # How many executions before a sandbox is replaced?
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1875,6 +1903,11 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     # Maximum number of retries per task.
     TASK_MAX_RETRIES=5,
 
+    # Whether the data derived from a published course (block structures,
+    # course structures, bookmarks' XBlock cache, search index) are built by
+    # a single task loading the course once, rather than by a task per app.
+    PUBLISH_PIPELINE=False,
+
     # Backend storage
     # STORAGE_CLASS='storages.backends.s3boto.S3BotoStorage',
     # STORAGE_KWARGS=dict(bucket='nim-beryl-test'),
@@ -11,13 +11,14 @@ from django.conf import settings
 
 settings.INSTALLED_APPS  # pylint: disable=pointless-statement
 
-from openedx.core.lib.django_startup import autostartup
+from openedx.core.lib.django_startup import autostartup, timed_startup_phase
 from openedx.core.release import doc_version
 import analytics
 
 from openedx.core.djangoapps.monkey_patch import django_db_models_options
 
 import xmodule.x_module
+from capa.safe_exec import pool as safe_exec_pool
 import lms_xblock.runtime
 
 from startup_configurations.validate_config import validate_lms_config
@@ -49,7 +50,8 @@ def run():
     # before the django.setup().
     microsite.enable_microsites_pre_startup(log)
 
-    django.setup()
+    with timed_startup_phase('django.setup'):
+        django.setup()
 
     autostartup()
 
@@ -86,6 +88,10 @@ def run():
     settings.HELP_TOKENS_LANGUAGE_CODE = settings.LANGUAGE_CODE
     settings.HELP_TOKENS_VERSION = doc_version()
 
+    # Run sandboxed problem code in a pool of warm sandboxes, if configured.
+    pool_settings = settings.CODE_JAIL.get('pool', {})
+    safe_exec_pool.configure(pool_settings.get('size', 0), pool_settings.get('max_executions', 100))
+
     # validate configurations on startup
     validate_lms_config(settings)
 
@@ -348,8 +348,9 @@ such that the value can be defined later than this assignment (file load order).
                 );
             }
             if (resultFromServerIsSuccess) {
+                // Accounts created in the background are reported via data downloads.
                 return renderResponse(gettext('Success'),
-                    gettext('All accounts were created successfully.'), 'confirmation', []
+                    dataFromServer.status || gettext('All accounts were created successfully.'), 'confirmation', []
                 );
             }
             return renderResponse();
@@ -611,6 +612,10 @@ such that the value can be defined later than this assignment (file load order).
             autoenrolled = [];
             notenrolled = [];
             notunenrolled = [];
+            if (dataFromServer.status) {
+                // Enrollments updated in the background are reported via data downloads.
+                return this.$task_response.text(dataFromServer.status);
+            }
             ref = dataFromServer.results;
             for (i = 0, len = ref.length; i < len; i++) {
                 studentResults = ref[i];
@@ -25,11 +25,15 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lms.envs.aws")
 import lms.startup as startup
 startup.run()
 
+from openedx.core.lib.django_startup import is_lazy_startup, timed_startup_phase
 from xmodule.modulestore.django import modulestore
 
 # Trigger a forced initialization of our modulestores since this can take a
-# while to complete and we want this done before HTTP requests are accepted.
-modulestore()
+# while to complete and we want this done before HTTP requests are accepted,
+# unless the workers are to start fast and initialize them on first use.
+if not is_lazy_startup():
+    with timed_startup_phase('modulestore'):
+        modulestore()
 
 
 # This application object is used by the development server
@@ -108,8 +108,14 @@ if __name__ == "__main__":
         # This will trigger django-admin.py to print out its help
         django_args.append('--help')
 
-    startup = importlib.import_module(edx_args.startup)
-    startup.run()
+    from openedx.core.lib.django_startup import profile_imports, timed_startup_phase
+    # Record the time taken by each import, for the profile_startup command.
+    if os.environ.get('EDX_PROFILE_STARTUP'):
+        profile_imports()
+
+    with timed_startup_phase('startup'):
+        startup = importlib.import_module(edx_args.startup)
+        startup.run()
 
     from django.core.management import execute_from_command_line
 
@@ -5,6 +5,7 @@ from importlib import import_module
 
 from django.dispatch.dispatcher import receiver
 
+from openedx.core.djangoapps.content.block_structure import publish_pipeline
 from xmodule.modulestore.django import SignalHandler
 
 
@@ -13,8 +14,20 @@ def trigger_update_xblocks_cache_task(sender, course_key, **kwargs):  # pylint:
     """
     Trigger update_xblocks_cache() when course_published signal is fired.
     """
+    if publish_pipeline.is_enabled(course_key):
+        return
+
     tasks = import_module('openedx.core.djangoapps.bookmarks.tasks')  # Importing tasks early causes issues in tests.
 
     # Note: The countdown=0 kwarg is set to ensure the method below does not attempt to access the course
     # before the signal emitter has finished all operations. This is also necessary to ensure all tests pass.
     tasks.update_xblocks_cache.apply_async([unicode(course_key)], countdown=0)
+
+
+@publish_pipeline.register_builder('bookmarks')
+def _build_xblocks_cache(course_key, course, published_at):  # pylint: disable=unused-argument
+    """
+    Updates the XBlocks cache from the course loaded by the publish pipeline.
+    """
+    tasks = import_module('openedx.core.djangoapps.bookmarks.tasks')  # Importing tasks early causes issues in tests.
+    tasks._update_xblocks_cache(course_key, course)  # pylint: disable=protected-access
@@ -14,15 +14,16 @@ from . import PathItem
 log = logging.getLogger('edx.celery.task')
 
 
-def _calculate_course_xblocks_data(course_key):
+def _calculate_course_xblocks_data(course_key, course=None):
     """
-    Fetch data for all the blocks in the course.
+    Fetch data for all the blocks in the course, loading it unless it's given.
 
     This data consists of the display_name and path of the block.
     """
     with modulestore().bulk_operations(course_key):
 
-        course = modulestore().get_course(course_key, depth=None)
+        if course is None:
+            course = modulestore().get_course(course_key, depth=None)
         blocks_info_dict = {}
 
         # Collect display_name and children usage keys.
@@ -104,12 +105,13 @@ def paths_equal(paths_1, paths_2):
     return True
 
 
-def _update_xblocks_cache(course_key):
+def _update_xblocks_cache(course_key, course=None):
     """
-    Calculate the XBlock cache data for a course and update the XBlockCache table.
+    Calculate the XBlock cache data for a course, from the given course
+    descriptor if any, and update the XBlockCache table.
     """
     from .models import XBlockCache
-    blocks_data = _calculate_course_xblocks_data(course_key)
+    blocks_data = _calculate_course_xblocks_data(course_key, course)
 
     def update_block_cache_if_needed(block_cache, block_data):
         """ Compare block_cache object with data and update if there are differences. """
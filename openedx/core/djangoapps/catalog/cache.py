@@ -8,3 +8,6 @@ PROGRAM_UUIDS_CACHE_KEY = 'program-uuids'
 
 # Cache key used to locate an item containing a list of all program UUIDs for a site.
 SITE_PROGRAM_UUIDS_CACHE_KEY_TPL = 'program-uuids-{domain}'
+
+# Cache key used to locate a token which changes every time programs are cached.
+PROGRAMS_GENERATION_CACHE_KEY = 'programs-generation'
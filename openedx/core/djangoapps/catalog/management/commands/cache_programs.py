@@ -1,5 +1,6 @@
 import logging
 import sys
+import uuid as uuid_lib
 
 import waffle
 from django.contrib.auth import get_user_model
@@ -10,6 +11,7 @@ from django.core.management import BaseCommand
 from openedx.core.djangoapps.catalog.cache import (
     PROGRAM_CACHE_KEY_TPL,
     PROGRAM_UUIDS_CACHE_KEY,
+    PROGRAMS_GENERATION_CACHE_KEY,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -70,6 +72,7 @@ class Command(BaseCommand):
             successful = len(programs)
             logger.info('Caching details for {successful} programs.'.format(successful=successful))
             cache.set_many(programs, None)
+            self.bump_programs_generation()
 
             if failure:
                 # This will fail a Jenkins job running this command, letting site
@@ -126,12 +129,20 @@ class Command(BaseCommand):
 
             logger.info('Caching UUIDs for {total} programs.'.format(total=total))
             cache.set(PROGRAM_UUIDS_CACHE_KEY, uuids, None)
+            self.bump_programs_generation()
 
             if failure:
                 # This will fail a Jenkins job running this command, letting site
                 # operators know that there was a problem.
                 sys.exit(1)
 
+    def bump_programs_generation(self):
+        """
+        Mark data derived from previously cached programs, like learners'
+        program progress snapshots, as out of date.
+        """
+        cache.set(PROGRAMS_GENERATION_CACHE_KEY, uuid_lib.uuid4().hex, None)
+
     def get_site_program_uuids(self, client, site):
         failure = False
         uuids = []
@@ -8,6 +8,7 @@ from django.core.management import call_command
 from openedx.core.djangoapps.catalog.cache import (
     PROGRAM_CACHE_KEY_TPL,
     PROGRAM_UUIDS_CACHE_KEY,
+    PROGRAMS_GENERATION_CACHE_KEY,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.tests.factories import ProgramFactory
@@ -118,6 +119,12 @@ class TestCachePrograms(CatalogIntegrationMixin, CacheIsolationTestCase, SiteMix
         for key, program in cached_programs.items():
             self.assertEqual(program, programs[key])
 
+        # Verify that data derived from previously cached programs is marked as out of date.
+        generation = cache.get(PROGRAMS_GENERATION_CACHE_KEY)
+        self.assertIsNotNone(generation)
+        call_command('cache_programs')
+        self.assertNotEqual(cache.get(PROGRAMS_GENERATION_CACHE_KEY), generation)
+
     @waffle.testutils.override_switch('populate-multitenant-programs', True)
     def test_handle_missing_service_user(self):
         """
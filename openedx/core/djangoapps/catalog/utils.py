@@ -11,6 +11,7 @@ from edx_rest_api_client.client import EdxRestApiClient
 from openedx.core.djangoapps.catalog.cache import (
     PROGRAM_CACHE_KEY_TPL,
     PROGRAM_UUIDS_CACHE_KEY,
+    PROGRAMS_GENERATION_CACHE_KEY,
     SITE_PROGRAM_UUIDS_CACHE_KEY_TPL
 )
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
@@ -35,13 +36,15 @@ def create_catalog_api_client(user, site=None):
     return EdxRestApiClient(url, jwt=jwt)
 
 
-def get_programs(uuid=None):
+def get_programs(uuid=None, uuids=None):
     """Read programs from the cache.
 
     The cache is populated by a management command, cache_programs.
 
     Keyword Arguments:
         uuid (string): UUID identifying a specific program to read from the cache.
+        uuids (list): UUIDs identifying the programs to read from the cache, instead
+            of all the programs of the current site.
 
     Returns:
         list of dict, representing programs.
@@ -55,14 +58,12 @@ def get_programs(uuid=None):
             logger.warning(missing_details_msg_tpl.format(uuid=uuid))
 
         return program
-    if waffle.switch_is_active('get-multitenant-programs'):
-        uuids = cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=get_current_site().domain), [])
-    else:
-        uuids = cache.get(PROGRAM_UUIDS_CACHE_KEY, [])
-    if not uuids:
-        logger.warning('Failed to get program UUIDs from the cache.')
+    if uuids is None:
+        uuids = get_program_uuids()
+        if not uuids:
+            logger.warning('Failed to get program UUIDs from the cache.')
 
-    programs = cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in uuids])
+    programs = cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=program_uuid) for program_uuid in uuids])
     programs = list(programs.values())
 
     # The get_many above sometimes fails to bring back details cached on one or
@@ -79,16 +80,41 @@ def get_programs(uuid=None):
             'Failed to get details for {count} programs. Retrying.'.format(count=len(missing_uuids))
         )
 
-        retried_programs = cache.get_many([PROGRAM_CACHE_KEY_TPL.format(uuid=uuid) for uuid in missing_uuids])
+        retried_programs = cache.get_many(
+            [PROGRAM_CACHE_KEY_TPL.format(uuid=program_uuid) for program_uuid in missing_uuids]
+        )
         programs += list(retried_programs.values())
 
         still_missing_uuids = set(uuids) - set(program['uuid'] for program in programs)
-        for uuid in still_missing_uuids:
-            logger.warning(missing_details_msg_tpl.format(uuid=uuid))
+        for program_uuid in still_missing_uuids:
+            logger.warning(missing_details_msg_tpl.format(uuid=program_uuid))
 
     return programs
 
 
+def get_program_uuids():
+    """Read the UUIDs of the programs of the current site from the cache.
+
+    Returns:
+        list of UUIDs
+    """
+    if waffle.switch_is_active('get-multitenant-programs'):
+        return cache.get(SITE_PROGRAM_UUIDS_CACHE_KEY_TPL.format(domain=get_current_site().domain), [])
+    return cache.get(PROGRAM_UUIDS_CACHE_KEY, [])
+
+
+def get_programs_generation():
+    """Read the token identifying the programs currently in the cache.
+
+    The token changes every time the cache_programs management command runs,
+    so data derived from cached programs can tell whether it is out of date.
+
+    Returns:
+        str, or None if programs have never been cached
+    """
+    return cache.get(PROGRAMS_GENERATION_CACHE_KEY)
+
+
 def get_program_types(name=None):
     """Retrieve program types from the catalog service.
 
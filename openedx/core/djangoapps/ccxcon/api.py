@@ -14,7 +14,7 @@ from rest_framework.status import HTTP_200_OK, HTTP_201_CREATED
 
 from lms.djangoapps.courseware.courses import get_course_by_id
 from openedx.core.djangoapps.models.course_details import CourseDetails
-from student.models import anonymous_id_for_user
+from student.models import anonymous_ids_for_users
 from student.roles import CourseInstructorRole
 
 from .models import CCXCon
@@ -120,9 +120,10 @@ def course_info_to_ccxcon(course_key):
     )
 
     # get the entire list of instructors
-    course_instructors = CourseInstructorRole(course.id).users_with_role()
+    course_instructors = list(CourseInstructorRole(course.id).users_with_role())
     # get anonymous ids for each of them
-    course_instructors_ids = [anonymous_id_for_user(user, course_key) for user in course_instructors]
+    anonymous_ids = anonymous_ids_for_users(course_instructors, course_key)
+    course_instructors_ids = [anonymous_ids[user.id] for user in course_instructors]
     # extract the course details
     course_details = CourseDetails.fetch(course_key)
 
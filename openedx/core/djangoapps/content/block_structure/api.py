@@ -20,13 +20,16 @@ def get_course_in_cache(course_key):
     return get_block_structure_manager(course_key).get_collected()
 
 
-def update_course_in_cache(course_key):
+def update_course_in_cache(course_key, course=None):
     """
     A higher order function implemented on top of the
     block_structure.updated_collected function that updates the block
     structure in the cache for the given course_key.
+
+    If given, course is the course descriptor, already loaded with all
+    of its descendants, from which the block structure is collected.
     """
-    return get_block_structure_manager(course_key).update_collected_if_needed()
+    return get_block_structure_manager(course_key).update_collected_if_needed(root_xblock=course)
 
 
 def clear_course_from_cache(course_key):
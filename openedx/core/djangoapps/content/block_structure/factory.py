@@ -31,7 +31,25 @@ class BlockStructureFactory(object):
             xmodule.modulestore.exceptions.ItemNotFoundError if a block for
                 root_block_usage_key is not found in the modulestore.
         """
-        block_structure = BlockStructureModulestoreData(root_block_usage_key)
+        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
+        return cls.create_from_xblock(root_xblock)
+
+    @classmethod
+    def create_from_xblock(cls, root_xblock):
+        """
+        Creates and returns a block structure from the given xBlock and
+        its descendants, as already loaded from the modulestore.
+
+        Arguments:
+            root_xblock (XBlock) - The root of the block structure that is
+                to be created, e.g. a course descriptor loaded with all of
+                its descendants.
+
+        Returns:
+            BlockStructureModulestoreData - The created block structure
+                with the given xBlock and its descendants.
+        """
+        block_structure = BlockStructureModulestoreData(root_xblock.location)
         blocks_visited = set()
 
         def build_block_structure(xblock):
@@ -53,7 +71,6 @@ class BlockStructureFactory(object):
                 block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
                 build_block_structure(child)
 
-        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
         build_block_structure(root_xblock)
         return block_structure
 
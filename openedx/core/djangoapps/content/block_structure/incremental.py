@@ -0,0 +1,246 @@
+"""
+Incremental collection of block structures from split modulestore courses.
+
+When a course is published, its new split structure is diffed against the
+structure the stored block structure was collected from, so that only the
+changed blocks and their ancestors are recollected, instead of every block
+of the course.  This is only possible when all registered transformers are
+subtree-local (see BlockStructureTransformer.SUBTREE_LOCAL); otherwise, the
+block structure is collected in full.
+"""
+# pylint: disable=protected-access
+from logging import getLogger
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+from openedx.core.djangoapps.monitoring_utils import set_custom_metric
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.inheritance import InheritanceMixin
+from xmodule.modulestore.split_mongo import BlockKey
+
+from . import config
+from .block_structure import BlockStructure, BlockStructureModulestoreData
+from .exceptions import BlockStructureNotFound, TransformerDataIncompatible
+from .factory import BlockStructureFactory
+from .transformer_registry import TransformerRegistry
+from .transformers import BlockStructureTransformers
+
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Above this ratio of recollected blocks, loading them one at a time costs
+# more than loading the whole course at once, so the block structure is
+# collected in full.
+MAX_RECOLLECTED_RATIO = 0.5
+
+
+def collect_incrementally(root_block_usage_key, modulestore, block_structure_store):
+    """
+    Returns the block structure starting at root_block_usage_key, with the
+    data of the blocks changed since it was last stored recollected, or None
+    if it has to be collected in full.
+    """
+    # Checked ahead of the waffle switch, to spare its query.
+    if not all(transformer.SUBTREE_LOCAL for transformer in TransformerRegistry.get_registered_transformers()):
+        return None
+
+    if not config.waffle().is_enabled(config.INCREMENTAL_COLLECT):
+        return None
+
+    try:
+        previous_block_structure, previous_version = block_structure_store.get_with_data_version(
+            root_block_usage_key
+        )
+        BlockStructureTransformers.verify_versions(previous_block_structure)
+    except (BlockStructureNotFound, TransformerDataIncompatible):
+        return None
+
+    root_xblock = modulestore.get_item(root_block_usage_key)
+    structures = _get_split_structures(
+        modulestore,
+        root_block_usage_key.course_key,
+        previous_version,
+        getattr(root_xblock, 'course_version', None),
+    )
+    if structures is None:
+        return None
+    previous_structure, current_structure = structures
+
+    course_key = root_block_usage_key.course_key
+    children_map = _get_children_map(current_structure, BlockKey.from_usage_key(root_block_usage_key))
+    changed = _get_changed_blocks(previous_structure, current_structure, children_map)
+    recollected = _with_ancestors(changed, children_map)
+
+    set_custom_metric('block_structure_blocks_total', len(children_map))
+    set_custom_metric('block_structure_blocks_recollected', len(recollected))
+    if len(recollected) > len(children_map) * MAX_RECOLLECTED_RATIO:
+        logger.info(
+            u'BlockStructure: Collecting in full; %d blocks out of %d changed; %s.',
+            len(recollected),
+            len(children_map),
+            root_block_usage_key,
+        )
+        return None
+
+    def usage_key(block_key):
+        """
+        Returns the usage key of the block of the given split block key.
+        """
+        return course_key.make_usage_key(block_key.type, block_key.id)
+
+    # Collect the data of the recollected blocks alone, which include the
+    # root block whenever any block changed.
+    partial_block_structure = BlockStructureModulestoreData(root_block_usage_key)
+    for block_key in recollected:
+        block_usage_key = usage_key(block_key)
+        xblock = root_xblock if block_usage_key == root_block_usage_key else modulestore.get_item(block_usage_key)
+        partial_block_structure._add_xblock(block_usage_key, xblock)
+        for child_key in children_map[block_key]:
+            if child_key in recollected:
+                partial_block_structure._add_relation(block_usage_key, usage_key(child_key))
+    if recollected:
+        BlockStructureTransformers.collect(partial_block_structure)
+
+    # Carry over the data of the other blocks to the current relations.
+    block_relations = {}
+    BlockStructure._add_block(block_relations, root_block_usage_key)
+    for block_key, children in children_map.iteritems():
+        for child_key in children:
+            BlockStructure._add_to_relations(block_relations, usage_key(block_key), usage_key(child_key))
+
+    block_data_map = {}
+    for block_usage_key in block_relations:
+        try:
+            block_data_map[block_usage_key] = previous_block_structure[block_usage_key]
+        except KeyError:
+            pass
+    for block_usage_key, block_data in partial_block_structure.iteritems():
+        if block_usage_key not in block_relations:
+            continue
+        if BlockKey(block_usage_key.block_type, block_usage_key.block_id) in recollected:
+            block_data_map[block_usage_key] = block_data
+        else:
+            # Data set by a transformer on an unchanged child of a recollected block.
+            previous_block_data = block_data_map.setdefault(block_usage_key, block_data)
+            previous_block_data.transformer_data.update(block_data.transformer_data)
+
+    transformer_data = previous_block_structure.transformer_data
+    transformer_data.update(partial_block_structure.transformer_data)
+
+    logger.info(
+        u'BlockStructure: Collected incrementally; %d blocks out of %d recollected; %s.',
+        len(recollected),
+        len(children_map),
+        root_block_usage_key,
+    )
+    return BlockStructureFactory.create_new(root_block_usage_key, block_relations, transformer_data, block_data_map)
+
+
+def _get_split_structures(modulestore, course_key, previous_version, current_version):
+    """
+    Returns the split structures of the given previous and current versions
+    of the course, or None if either isn't available.
+    """
+    if not previous_version or current_version is None:
+        return None
+    if modulestore.get_modulestore_type(course_key) != ModuleStoreEnum.Type.split:
+        return None
+    try:
+        previous_version = ObjectId(previous_version)
+    except InvalidId:
+        return None
+
+    split_modulestore = modulestore._get_modulestore_for_courselike(course_key)
+    structures = (
+        split_modulestore.get_structure(course_key, previous_version),
+        split_modulestore.get_structure(course_key, current_version),
+    )
+    if None in structures:
+        return None
+    return structures
+
+
+def _get_children_map(structure, root_block_key):
+    """
+    Returns a map of the keys of the blocks of the given split structure
+    reachable from the given root, to the keys of their children.
+    """
+    blocks = structure['blocks']
+    children_map = {}
+    stack = [root_block_key]
+    while stack:
+        block_key = stack.pop()
+        if block_key in children_map:
+            continue
+        children = [
+            BlockKey(*child) for child in blocks[block_key].fields.get('children', [])
+            if BlockKey(*child) in blocks
+        ]
+        children_map[block_key] = children
+        stack.extend(children)
+    return children_map
+
+
+def _get_changed_blocks(previous_structure, current_structure, children_map):
+    """
+    Returns the set of keys of the blocks of the given children map that
+    were added or changed between the given split structures, along with
+    the descendants of the blocks whose inheritable settings changed.
+    """
+    previous_blocks = previous_structure['blocks']
+    current_blocks = current_structure['blocks']
+    changed = set()
+    inheritance_changed = []
+    for block_key in children_map:
+        current_block = current_blocks[block_key]
+        previous_block = previous_blocks.get(block_key)
+        if previous_block is None:
+            changed.add(block_key)
+        elif (
+                current_block.fields != previous_block.fields or
+                current_block.definition != previous_block.definition or
+                current_block.defaults != previous_block.defaults or
+                current_block.get_asides() != previous_block.get_asides()
+        ):
+            changed.add(block_key)
+            if _inherited_settings(current_block) != _inherited_settings(previous_block):
+                inheritance_changed.append(block_key)
+
+    while inheritance_changed:
+        block_key = inheritance_changed.pop()
+        for child_key in children_map[block_key]:
+            if child_key not in changed:
+                changed.add(child_key)
+                inheritance_changed.append(child_key)
+    return changed
+
+
+def _inherited_settings(block):
+    """
+    Returns the values of the inheritable settings of the given split block.
+    """
+    return [
+        (block.fields.get(field_name), block.defaults.get(field_name))
+        for field_name in InheritanceMixin.fields
+    ]
+
+
+def _with_ancestors(block_keys, children_map):
+    """
+    Returns the set of the given block keys along with the keys of all of
+    their ancestors in the given children map.
+    """
+    parents_map = {}
+    for block_key, children in children_map.iteritems():
+        for child_key in children:
+            parents_map.setdefault(child_key, []).append(block_key)
+
+    result = set()
+    stack = list(block_keys)
+    while stack:
+        block_key = stack.pop()
+        if block_key not in result:
+            result.add(block_key)
+            stack.extend(parents_map.get(block_key, []))
+    return result
@@ -7,6 +7,7 @@ from contextlib import contextmanager
 from . import config
 from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
 from .factory import BlockStructureFactory
+from .incremental import collect_incrementally
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
@@ -105,26 +106,36 @@ class BlockStructureManager(object):
 
         return block_structure
 
-    def update_collected_if_needed(self):
+    def update_collected_if_needed(self, root_xblock=None):
         """
         The store is updated with newly collected transformers data from
         the modulestore, only if the data in the store is outdated.
+
+        Arguments:
+            root_xblock (XBlock) - The xBlock of root_block_usage_key, if
+                already loaded with all of its descendants, to collect the
+                block structure from instead of loading it again.
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                self._update_collected(root_xblock)
 
-    def _update_collected(self):
+    def _update_collected(self, root_xblock=None):
         """
         The store is updated with newly collected transformers data from
-        the modulestore.
+        the modulestore, for the changed blocks only if possible.
         """
         with self._bulk_operations():
-            block_structure = BlockStructureFactory.create_from_modulestore(
-                self.root_block_usage_key,
-                self.modulestore,
-            )
-            BlockStructureTransformers.collect(block_structure)
+            block_structure = collect_incrementally(self.root_block_usage_key, self.modulestore, self.store)
+            if block_structure is None:
+                if root_xblock is not None:
+                    block_structure = BlockStructureFactory.create_from_xblock(root_xblock)
+                else:
+                    block_structure = BlockStructureFactory.create_from_modulestore(
+                        self.root_block_usage_key,
+                        self.modulestore,
+                    )
+                BlockStructureTransformers.collect(block_structure)
             self.store.add(block_structure)
             return block_structure
 
@@ -0,0 +1,97 @@
+"""
+Pipeline building the data derived from a course when it is published.
+
+By default, each app receiving the course_published signal schedules its own
+task, which loads the whole course from the modulestore again.  When the
+PUBLISH_PIPELINE block structures setting is enabled, those apps register
+builders of their data instead, and a single task loads the course once and
+runs all of them against it, within one bulk operation.
+
+Builders are called with the course key, the course descriptor, loaded with
+all of its descendants, and the time at which the course was published, or
+None to rebuild everything.  They remain callable on their own.
+"""
+import logging
+from collections import OrderedDict
+from time import time
+
+from django.conf import settings
+from opaque_keys.edx.locator import LibraryLocator
+
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+log = logging.getLogger(__name__)
+
+# Builders of derived course data, by name, in order of registration.
+_BUILDERS = OrderedDict()
+
+
+def register_builder(name):
+    """
+    Decorator registering the decorated function as the builder of the
+    data of the given name, derived from published courses.
+    """
+    def _register(builder):
+        _BUILDERS[name] = builder
+        return builder
+    return _register
+
+
+def registered_builders():
+    """
+    Returns the names of the registered builders, in order.
+    """
+    return _BUILDERS.keys()
+
+
+def is_enabled(course_key):
+    """
+    Returns whether the data derived from the given course are built by the
+    publish pipeline, rather than by the task of each app.  Content libraries
+    are not handled by the pipeline.
+    """
+    if isinstance(course_key, LibraryLocator):
+        return False
+    return settings.BLOCK_STRUCTURES_SETTINGS.get('PUBLISH_PIPELINE', False)
+
+
+def run_builders(course_key, published_at=None, names=None):
+    """
+    Loads the course once and runs the registered builders, or only the
+    ones of the given names, against it.
+
+    A failing builder doesn't prevent the next ones from running, but its
+    error is raised once all of them ran, for the task to be retried.
+
+    Returns an OrderedDict of the time taken by each stage, in seconds.
+    """
+    timings = OrderedDict()
+    errors = []
+    store = modulestore()
+    with store.bulk_operations(course_key):
+        start = time()
+        course = store.get_course(course_key, depth=None)
+        if course is None:
+            raise ItemNotFoundError(course_key)
+        timings['load'] = time() - start
+
+        for name, builder in _BUILDERS.iteritems():
+            if names is not None and name not in names:
+                continue
+            start = time()
+            try:
+                builder(course_key, course, published_at)
+            except Exception as exc:  # pylint: disable=broad-except
+                log.exception(u'PublishPipeline: builder %s failed for course %s', name, course_key)
+                errors.append(exc)
+            timings[name] = time() - start
+
+    log.info(
+        u'PublishPipeline: course %s built in %s',
+        course_key,
+        u', '.join(u'{} {:.3f}s'.format(stage, seconds) for stage, seconds in timings.iteritems()),
+    )
+    if errors:
+        raise errors[0]
+    return timings
@@ -1,16 +1,19 @@
 """
 Signal handlers for invalidating cached data.
 """
+from datetime import datetime
+
 from django.conf import settings
 from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
 
 from opaque_keys.edx.locator import LibraryLocator
+from pytz import UTC
 
-from . import config
-from .api import clear_course_from_cache
-from .tasks import update_course_in_cache_v2
+from . import config, publish_pipeline
+from .api import clear_course_from_cache, update_course_in_cache
+from .tasks import run_publish_pipeline, update_course_in_cache_v2
 
 
 @receiver(SignalHandler.course_published)
@@ -26,12 +29,28 @@ def _update_block_structure_on_course_publish(sender, course_key, **kwargs):  #
     if config.waffle().is_enabled(config.INVALIDATE_CACHE_ON_PUBLISH):
         clear_course_from_cache(course_key)
 
+    if publish_pipeline.is_enabled(course_key):
+        run_publish_pipeline.apply_async(
+            kwargs=dict(course_id=unicode(course_key), published_at=datetime.now(UTC).isoformat()),
+            countdown=settings.BLOCK_STRUCTURES_SETTINGS['COURSE_PUBLISH_TASK_DELAY'],
+        )
+        return
+
     update_course_in_cache_v2.apply_async(
         kwargs=dict(course_id=unicode(course_key)),
         countdown=settings.BLOCK_STRUCTURES_SETTINGS['COURSE_PUBLISH_TASK_DELAY'],
     )
 
 
+@publish_pipeline.register_builder('block_structure')
+def _build_block_structure(course_key, course, published_at):  # pylint: disable=unused-argument
+    """
+    Updates the cached block structure of the course, which is collected
+    from the course loaded by the pipeline.
+    """
+    update_course_in_cache(course_key, course)
+
+
 @receiver(SignalHandler.course_deleted)
 def _delete_block_structure_on_course_delete(sender, course_key, **kwargs):  # pylint: disable=unused-argument
     """
@@ -96,6 +96,34 @@ class BlockStructureStore(object):
 
         return self._deserialize(serialized_data, root_block_usage_key)
 
+    def get_with_data_version(self, root_block_usage_key):
+        """
+        Deserializes and returns the block structure starting at
+        root_block_usage_key along with the version of the modulestore
+        data it was collected from, provided it was collected with the
+        current schema versions of the transformers and block structures.
+
+        Raises:
+            BlockStructureNotFound if storage backing is disabled, or if
+            no up-to-date block structure is found.
+        """
+        if not _is_storage_backing_enabled():
+            raise BlockStructureNotFound(root_block_usage_key)
+
+        bs_model = self._get_model(root_block_usage_key)
+        if not bs_model.data_version or any(
+                getattr(bs_model, field_name) != value
+                for field_name, value in self._schema_version_data().iteritems()
+        ):
+            raise BlockStructureNotFound(root_block_usage_key)
+
+        try:
+            serialized_data = self._get_from_cache(bs_model)
+        except BlockStructureNotFound:
+            serialized_data = self._get_from_store(bs_model)
+
+        return self._deserialize(serialized_data, root_block_usage_key), bs_model.data_version
+
     def delete(self, root_block_usage_key):
         """
         Deletes the block structure for the given root_block_usage_key
@@ -232,9 +260,20 @@ class BlockStructureStore(object):
         Returns the version-relevant data for the given block, including the
         current schema state of the Transformers and BlockStructure classes.
         """
-        return dict(
+        version_data = dict(
             data_version=getattr(root_block, 'course_version', None),
             data_edit_timestamp=getattr(root_block, 'subtree_edited_on', None),
+        )
+        version_data.update(BlockStructureStore._schema_version_data())
+        return version_data
+
+    @staticmethod
+    def _schema_version_data():
+        """
+        Returns the current schema state of the Transformers and
+        BlockStructure classes.
+        """
+        return dict(
             transformers_schema_version=TransformerRegistry.get_write_version_hash(),
             block_structure_schema_version=unicode(BlockStructureBlockData.VERSION),
         )
@@ -2,17 +2,19 @@
 Asynchronous tasks related to the Course Blocks sub-application.
 """
 import logging
+from functools import partial
 
 from capa.responsetypes import LoncapaProblemError
 from celery.task import task
 from django.conf import settings
 from lxml.etree import XMLSyntaxError
 
+from dateutil.parser import parse as parse_date
 from edxval.api import ValInternalError
 from opaque_keys.edx.keys import CourseKey
 
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from openedx.core.djangoapps.content.block_structure import api
+from openedx.core.djangoapps.content.block_structure import api, publish_pipeline
 from openedx.core.djangoapps.content.block_structure.config import STORAGE_BACKING_FOR_CACHE, waffle
 
 log = logging.getLogger('edx.celery.task')
@@ -92,6 +94,23 @@ def _get_course_in_cache(self, **kwargs):
     _call_and_retry_if_needed(self, api.get_course_in_cache, **kwargs)
 
 
+@block_structure_task()
+def run_publish_pipeline(self, **kwargs):
+    """
+    Builds the data derived from the specified course, loading it once.
+    Keyword Arguments:
+        course_id (string) - The string serialized value of the course key.
+        published_at (string) - The ISO formatted time at which the course
+            was published, if any.
+    """
+    published_at = kwargs.get('published_at')
+    run_builders = partial(
+        publish_pipeline.run_builders,
+        published_at=parse_date(published_at) if published_at else None,
+    )
+    _call_and_retry_if_needed(self, run_builders, **kwargs)
+
+
 def _call_and_retry_if_needed(self, api_method, **kwargs):
     """
     Calls the given api_method with the given course_id, retrying task_method upon failure.
@@ -29,6 +29,10 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
         )
         self.assert_block_structure(block_structure, self.children_map)
 
+    def test_from_xblock(self):
+        block_structure = BlockStructureFactory.create_from_xblock(self.modulestore.get_item(0))
+        self.assert_block_structure(block_structure, self.children_map)
+
     def test_from_modulestore_fail(self):
         with self.assertRaises(ItemNotFoundError):
             BlockStructureFactory.create_from_modulestore(
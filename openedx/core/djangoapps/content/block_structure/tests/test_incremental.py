@@ -0,0 +1,120 @@
+"""
+Tests for incremental.py
+"""
+import mock
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..api import get_block_structure_manager
+from ..config import INCREMENTAL_COLLECT, STORAGE_BACKING_FOR_CACHE, waffle
+from ..factory import BlockStructureFactory
+from .helpers import MockTransformer, mock_registered_transformers
+
+
+class SubtreeLocalTransformer(MockTransformer):
+    """
+    Subtree-local transformer recording the blocks it collects.
+    """
+    SUBTREE_LOCAL = True
+    collected_block_keys = set()
+
+    @classmethod
+    def collect(cls, block_structure):
+        block_structure.request_xblock_fields('display_name')
+        cls.collected_block_keys.update(block_structure.topological_traversal())
+
+
+class NonLocalTransformer(SubtreeLocalTransformer):
+    """
+    Transformer that isn't subtree-local.
+    """
+    SUBTREE_LOCAL = False
+    collected_block_keys = set()
+
+
+class IncrementalCollectTest(ModuleStoreTestCase):
+    """
+    Tests for the incremental collection of block structures.
+    """
+    def setUp(self):
+        super(IncrementalCollectTest, self).setUp()
+        with self.store.default_store(ModuleStoreEnum.Type.split):
+            self.course = CourseFactory.create()
+            self.html_blocks = []
+            for _ in range(3):
+                chapter = ItemFactory.create(parent=self.course, category='chapter')
+                sequential = ItemFactory.create(parent=chapter, category='sequential')
+                self.html_blocks.append(ItemFactory.create(parent=sequential, category='html'))
+        self.manager = get_block_structure_manager(self.course.id)
+
+    def collect_after_edit(self, transformers):
+        """
+        Collects the course, renames its first html block, and collects it
+        again, returning the keys of the blocks collected the second time
+        by each of the given transformers, and whether the whole course was
+        loaded from the modulestore then.
+        """
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(INCREMENTAL_COLLECT, active=True):
+                with mock_registered_transformers(transformers):
+                    self.manager.update_collected_if_needed()
+                    for transformer in transformers:
+                        transformer.collected_block_keys.clear()
+
+                    html_block = self.store.get_item(self.html_blocks[0].location)
+                    html_block.display_name = u'Renamed'
+                    self.store.update_item(html_block, self.user.id)
+                    with mock.patch.object(
+                        BlockStructureFactory,
+                        'create_from_modulestore',
+                        wraps=BlockStructureFactory.create_from_modulestore,
+                    ) as mock_create_from_modulestore:
+                        self.manager.update_collected_if_needed()
+
+                    block_structure = self.manager.get_collected()
+        self.assertEqual(
+            block_structure.get_xblock_field(self.html_blocks[0].location, 'display_name'),
+            u'Renamed',
+        )
+        self.assertEqual(
+            set(block_structure),
+            {self.course.location} | {
+                block.location
+                for html_block in self.html_blocks
+                for block in (html_block, html_block.get_parent(), html_block.get_parent().get_parent())
+            }
+        )
+        self.assertEqual(
+            set(block_structure.transformer_data),
+            {transformer.name() for transformer in transformers},
+        )
+        collected_block_keys = [set(transformer.collected_block_keys) for transformer in transformers]
+        return collected_block_keys, mock_create_from_modulestore.called
+
+    def changed_blocks_and_ancestors(self):
+        """
+        Returns the keys of the first html block and of its ancestors.
+        """
+        html_block = self.store.get_item(self.html_blocks[0].location)
+        sequential = html_block.get_parent()
+        return {self.course.location, sequential.parent, sequential.location, html_block.location}
+
+    def test_changed_blocks_and_ancestors_recollected(self):
+        self.assertEqual(
+            self.collect_after_edit([SubtreeLocalTransformer]),
+            ([self.changed_blocks_and_ancestors()], False),
+        )
+
+    def test_full_collect_with_non_local_transformer(self):
+        collected_block_keys, loaded_in_full = self.collect_after_edit([NonLocalTransformer])
+        self.assertEqual(len(collected_block_keys[0]), 10)
+        self.assertTrue(loaded_in_full)
+
+    def test_full_collect_with_local_and_non_local_transformers(self):
+        collected_block_keys, loaded_in_full = self.collect_after_edit(
+            [SubtreeLocalTransformer, NonLocalTransformer]
+        )
+        self.assertEqual([len(block_keys) for block_keys in collected_block_keys], [10, 10])
+        self.assertTrue(loaded_in_full)
@@ -0,0 +1,68 @@
+"""
+Unit tests for the publish pipeline of derived course data
+"""
+from mock import Mock, patch
+
+from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+from .. import publish_pipeline
+
+
+class PublishPipelineTest(ModuleStoreTestCase):
+    """
+    Tests for running the builders of the publish pipeline.
+    """
+    def setUp(self):
+        super(PublishPipelineTest, self).setUp()
+        self.course = CourseFactory.create()
+        self.builders = publish_pipeline._BUILDERS.copy()  # pylint: disable=protected-access
+        self.addCleanup(self._restore_builders)
+
+    def _restore_builders(self):
+        """
+        Restores the builders registered before the test.
+        """
+        publish_pipeline._BUILDERS.clear()  # pylint: disable=protected-access
+        publish_pipeline._BUILDERS.update(self.builders)  # pylint: disable=protected-access
+
+    def register(self, name, side_effect=None):
+        """
+        Registers and returns a mock builder of the given name.
+        """
+        builder = Mock(side_effect=side_effect)
+        publish_pipeline.register_builder(name)(builder)
+        return builder
+
+    def test_course_loaded_once(self):
+        first, second = self.register('first'), self.register('second')
+        with patch.object(self.store, 'get_course', wraps=self.store.get_course) as mock_get_course:
+            timings = publish_pipeline.run_builders(self.course.id, names=['first', 'second'])
+        self.assertEqual(mock_get_course.call_count, 1)
+        self.assertEqual(timings.keys(), ['load', 'first', 'second'])
+        for builder in (first, second):
+            course_key, course, published_at = builder.call_args[0]
+            self.assertEqual(course_key, self.course.id)
+            self.assertEqual(course.location, self.course.location)
+            self.assertIsNone(published_at)
+
+    def test_selected_builders(self):
+        first, second = self.register('first'), self.register('second')
+        publish_pipeline.run_builders(self.course.id, names=['second'])
+        self.assertFalse(first.called)
+        self.assertTrue(second.called)
+
+    def test_failing_builder(self):
+        self.register('failing', side_effect=ValueError)
+        following = self.register('following')
+        with self.assertRaises(ValueError):
+            publish_pipeline.run_builders(self.course.id, names=['failing', 'following'])
+        self.assertTrue(following.called)
+
+    def test_missing_course(self):
+        builder = self.register('builder')
+        self.store.delete_course(self.course.id, self.user.id)
+        with self.assertRaises(ItemNotFoundError):
+            publish_pipeline.run_builders(self.course.id, names=['builder'])
+        self.assertFalse(builder.called)
@@ -2,6 +2,8 @@
 Unit tests for the Course Blocks signals
 """
 import ddt
+from django.conf import settings
+from django.test.utils import override_settings
 from mock import patch
 
 from opaque_keys.edx.locator import LibraryLocator, CourseLocator
@@ -9,8 +11,10 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
+from .. import publish_pipeline
 from ..api import get_block_structure_manager
 from ..config import INVALIDATE_CACHE_ON_PUBLISH, waffle
+from ..factory import BlockStructureFactory
 from ..signals import _update_block_structure_on_course_publish
 from .helpers import is_course_in_block_structure_cache
 
@@ -80,3 +84,20 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
     def test_update_only_for_courses(self, key, expect_update_called, mock_update):
         _update_block_structure_on_course_publish(sender=None, course_key=key)
         self.assertEqual(mock_update.called, expect_update_called)
+
+    @ddt.data(True, False)
+    @patch('openedx.core.djangoapps.content.block_structure.tasks.run_publish_pipeline.apply_async')
+    @patch('openedx.core.djangoapps.content.block_structure.tasks.update_course_in_cache_v2.apply_async')
+    def test_publish_pipeline(self, pipeline_enabled, mock_update, mock_pipeline):
+        block_structures_settings = dict(settings.BLOCK_STRUCTURES_SETTINGS, PUBLISH_PIPELINE=pipeline_enabled)
+        with override_settings(BLOCK_STRUCTURES_SETTINGS=block_structures_settings):
+            _update_block_structure_on_course_publish(sender=None, course_key=self.course.id)
+        self.assertEqual(mock_pipeline.called, pipeline_enabled)
+        self.assertEqual(mock_update.called, not pipeline_enabled)
+
+    def test_pipeline_builds_from_loaded_course(self):
+        get_block_structure_manager(self.course.id).clear()
+        with patch.object(BlockStructureFactory, 'create_from_modulestore') as mock_create_from_modulestore:
+            publish_pipeline.run_builders(self.course.id, names=['block_structure'])
+        self.assertFalse(mock_create_from_modulestore.called)
+        self.assertTrue(is_course_in_block_structure_cache(self.course.id, self.store))
@@ -55,6 +55,21 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the data collected by the transformer for a block only
+    # depends on the xBlocks of that block and of its descendants, and is
+    # collected by traversing the given block structure.
+    #
+    # When all registered transformers are subtree-local, a published
+    # course is collected incrementally: their collect methods are given a
+    # block structure limited to the blocks changed since the last
+    # collection and their ancestors, and the data previously collected
+    # for the other blocks is carried over.
+    #
+    # Transformers percolating data down from ancestors, or aggregating it
+    # over all descendants, must leave this unset.
+    #
+    SUBTREE_LOCAL = False
+
     @classmethod
     def name(cls):
         """
@@ -0,0 +1,19 @@
+"""
+This module contains various configuration settings via
+waffle switches for the CourseOverview app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'course_overviews'
+
+# Switches
+CACHE_COURSE_OVERVIEWS = u'cache_course_overviews'
+INDEX_COURSE_CATALOG = u'index_course_catalog'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for CourseOverviews.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'CourseOverviews: ')
@@ -1,11 +1,17 @@
 """
 Declaration of CourseOverview model
 """
+import copy
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from urlparse import urlparse, urlunparse
+from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField
 from django.db.utils import IntegrityError
@@ -15,6 +21,7 @@ from ccx_keys.locator import CCXLocator
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.keys import CourseKey
 
+import request_cache
 from config_models.models import ConfigurationModel
 from lms.djangoapps import django_comment_client
 from openedx.core.djangoapps.models.course_details import CourseDetails
@@ -25,8 +32,104 @@ from xmodule.error_module import ErrorDescriptor
 from xmodule.modulestore.django import modulestore
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageKeyField
 
+from .config import CACHE_COURSE_OVERVIEWS, waffle
+
 log = logging.getLogger(__name__)
 
+# Name of the request cache of CourseOverviews.
+REQUEST_CACHE_NAME = u'course_overviews'
+# Key of the shared cache entry identifying the current generation of a
+# course's CourseOverview.  Process-local copies of the overview are only
+# valid as long as this generation doesn't change.
+GENERATION_CACHE_KEY = u'course_overviews.generation.{course_id}'
+# Key of the shared cache entry identifying the current generation of the
+# whole set of CourseOverviews, which changes whenever any of them does.
+CATALOG_GENERATION_CACHE_KEY = u'course_overviews.generation'
+# Key of the shared cache entry preventing concurrent background regenerations.
+REGENERATION_LOCK_CACHE_KEY = u'course_overviews.regenerating.{course_id}'
+REGENERATION_LOCK_TIMEOUT = 5 * 60
+
+# Number of CourseOverviews kept by each process, and for how many seconds
+# at most, in case an invalidation gets lost.
+PROCESS_CACHE_SIZE = 1000
+PROCESS_CACHE_TIMEOUT = 60 * 60
+
+
+class _ProcessCache(object):
+    """
+    A bounded, least-recently-used cache of CourseOverviews, local to the process.
+
+    Entries are keyed by course id and CourseOverview version, and remember
+    the generation of the overview they were read at.  Callers get copies
+    of the cached overviews, so they may modify them.
+    """
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, course_id, version, generation):
+        """
+        Returns a copy of the cached overview, or None if there is none
+        for the given generation.
+        """
+        with self._lock:
+            entry = self._entries.pop((course_id, version), None)
+            if entry is None:
+                return None
+            entry_generation, expires_at, course_overview = entry
+            if entry_generation != generation or expires_at < time.time():
+                return None
+            self._entries[(course_id, version)] = entry
+        return copy.copy(course_overview)
+
+    def set(self, course_id, version, generation, course_overview):
+        """
+        Caches a copy of the overview, read at the given generation.
+        """
+        entry = (generation, time.time() + self.timeout, copy.copy(course_overview))
+        with self._lock:
+            self._entries.pop((course_id, version), None)
+            self._entries[(course_id, version)] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, course_id):
+        """
+        Removes all the cached overviews of the given course.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == course_id]:
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+_PROCESS_CACHE = _ProcessCache(PROCESS_CACHE_SIZE, PROCESS_CACHE_TIMEOUT)
+
+
+def _get_cache_generation(course_id=None):
+    """
+    Returns the current generation of the CourseOverview of the given course,
+    or of all the CourseOverviews if no course is given, or None if it can't
+    be tracked, e.g. because there is no shared cache.
+    """
+    if course_id is None:
+        cache_key = CATALOG_GENERATION_CACHE_KEY
+    else:
+        cache_key = GENERATION_CACHE_KEY.format(course_id=course_id)
+    generation = cache.get(cache_key)
+    if generation is None:
+        cache.add(cache_key, uuid4().hex, None)
+        generation = cache.get(cache_key)
+    return generation
+
 
 class CourseOverview(TimeStampedModel):
     """
@@ -248,6 +351,9 @@ class CourseOverview(TimeStampedModel):
                         course_id,
                     )
                     raise
+                finally:
+                    # The tabs and images are updated after the overview
+                    cls.invalidate_cached(course_id)
 
                 return course_overview
             elif course is not None:
@@ -267,7 +373,13 @@ class CourseOverview(TimeStampedModel):
         First, we try to load the CourseOverview from the database. If it
         doesn't exist, we load the entire course from the modulestore, create a
         CourseOverview object from it, and then cache it in the database for
-        future use.
+        future use.  If it is an old version, it is regenerated in the
+        background, and used in the meantime.
+
+        When the CACHE_COURSE_OVERVIEWS switch is enabled, overviews are also
+        cached for the duration of the request and, along with their tabs and
+        image set, by each process until they are invalidated, e.g. when the
+        course is published.
 
         Arguments:
             course_id (CourseKey): the ID of the course overview to be loaded.
@@ -281,12 +393,45 @@ class CourseOverview(TimeStampedModel):
             - IOError if some other error occurs while trying to load the
                 course from the module store.
         """
+        if not waffle().is_enabled(CACHE_COURSE_OVERVIEWS):
+            return cls._get_from_db_or_module_store(course_id)
+
+        request_overviews = request_cache.get_cache(REQUEST_CACHE_NAME)
+        course_overview = request_overviews.get(course_id)
+        if course_overview is not None:
+            return course_overview
+
+        # Read the generation before the overview, so that an overview
+        # updated in the meantime is never cached as the current one.
+        generation = _get_cache_generation(course_id)
+        if generation is not None:
+            course_overview = _PROCESS_CACHE.get(course_id, cls.VERSION, generation)
+        if course_overview is None:
+            course_overview = cls._get_from_db_or_module_store(course_id, prefetch_tabs=True)
+            if course_overview.version < cls.VERSION:
+                # Being regenerated, don't cache it
+                return course_overview
+            if generation is not None:
+                _PROCESS_CACHE.set(course_id, cls.VERSION, generation, course_overview)
+
+        request_overviews[course_id] = course_overview
+        return course_overview
+
+    @classmethod
+    def _get_from_db_or_module_store(cls, course_id, prefetch_tabs=False):
+        """
+        Load a CourseOverview object for a given course ID, from the database
+        or, if it doesn't exist there, from the modulestore.  See `get_from_id`.
+        """
         try:
-            course_overview = cls.objects.select_related('image_set').get(id=course_id)
+            overviews = cls.objects.select_related('image_set')
+            if prefetch_tabs:
+                overviews = overviews.prefetch_related('tabs')
+            course_overview = overviews.get(id=course_id)
             if course_overview.version < cls.VERSION:
-                # Throw away old versions of CourseOverview, as they might contain stale data.
-                course_overview.delete()
-                course_overview = None
+                # Old versions of CourseOverview might contain stale data,
+                # but are still better than making the user wait for a new one.
+                cls._regenerate_in_background(course_id)
         except cls.DoesNotExist:
             course_overview = None
 
@@ -298,6 +443,39 @@ class CourseOverview(TimeStampedModel):
 
         return course_overview or cls.load_from_module_store(course_id)
 
+    @classmethod
+    def _regenerate_in_background(cls, course_id):
+        """
+        Schedules the regeneration of the CourseOverview of the given course,
+        unless it is already scheduled.
+        """
+        lock_key = REGENERATION_LOCK_CACHE_KEY.format(course_id=course_id)
+        if cache.add(lock_key, True, REGENERATION_LOCK_TIMEOUT):
+            # import inline due to cyclic import
+            from .tasks import regenerate_course_overview
+            log.info(u'Regenerating outdated course overview for %s.', unicode(course_id))
+            regenerate_course_overview.apply_async(kwargs={'course_id': unicode(course_id)})
+
+    @classmethod
+    def invalidate_cached(cls, course_id):
+        """
+        Discards the cached copies of the CourseOverview of the given course,
+        in the current request and in all processes.
+        """
+        request_cache.get_cache(REQUEST_CACHE_NAME).pop(course_id, None)
+        _PROCESS_CACHE.discard(course_id)
+        cache.delete_many([GENERATION_CACHE_KEY.format(course_id=course_id), CATALOG_GENERATION_CACHE_KEY])
+
+    @classmethod
+    def get_catalog_generation(cls):
+        """
+        Returns a token which changes whenever any CourseOverview changes, so
+        that data derived from all of them can tell whether it is current.
+        Returns None if changes can't be tracked, e.g. because there is no
+        shared cache.
+        """
+        return _get_cache_generation()
+
     @classmethod
     def get_from_ids_if_exists(cls, course_ids):
         """
@@ -1,9 +1,10 @@
 """
 Signal handler for invalidating cached course overviews
 """
+from django.db.models.signals import post_delete, post_save
 from django.dispatch.dispatcher import receiver
 
-from .models import CourseOverview
+from .models import CourseOverview, CourseOverviewImageSet
 from xmodule.modulestore.django import SignalHandler
 
 
@@ -13,9 +14,26 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
     Catches the signal that a course has been published in Studio and
     updates the corresponding CourseOverview cache entry.
     """
+    CourseOverview.invalidate_cached(course_key)
     CourseOverview.load_from_module_store(course_key)
 
 
+@receiver([post_save, post_delete], sender=CourseOverview)
+def _listen_for_overview_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached copies of a CourseOverview when it is updated or deleted.
+    """
+    CourseOverview.invalidate_cached(instance.id)
+
+
+@receiver([post_save, post_delete], sender=CourseOverviewImageSet)
+def _listen_for_image_set_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidates the cached copies of a CourseOverview when its image set is updated or deleted.
+    """
+    CourseOverview.invalidate_cached(instance.course_overview_id)
+
+
 @receiver(SignalHandler.course_deleted)
 def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=unused-argument
     """
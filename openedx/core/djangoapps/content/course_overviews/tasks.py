@@ -0,0 +1,30 @@
+"""
+Asynchronous tasks related to CourseOverviews.
+"""
+import logging
+
+from celery.task import task
+from django.core.cache import cache
+from opaque_keys.edx.keys import CourseKey
+
+from .models import REGENERATION_LOCK_CACHE_KEY, CourseOverview
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task()
+def regenerate_course_overview(course_id):
+    """
+    Regenerates the CourseOverview of the given course from the modulestore,
+    replacing an outdated version of it.
+
+    Arguments:
+        course_id (string) - The string serialized value of the course key.
+    """
+    course_key = CourseKey.from_string(course_id)
+    try:
+        CourseOverview.load_from_module_store(course_key)
+    except CourseOverview.DoesNotExist:
+        log.info(u'Course %s no longer exists, not regenerating its CourseOverview.', course_id)
+    finally:
+        cache.delete(REGENERATION_LOCK_CACHE_KEY.format(course_id=course_key))
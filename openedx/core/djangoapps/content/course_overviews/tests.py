@@ -11,6 +11,7 @@ from nose.plugins.attrib import attr
 import pytz
 
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.db.utils import IntegrityError
 from django.test.utils import override_settings
 from django.utils import timezone
@@ -19,6 +20,7 @@ from PIL import Image
 from lms.djangoapps.certificates.api import get_active_web_certificate
 from openedx.core.djangoapps.models.course_details import CourseDetails
 from openedx.core.lib.courses import course_image_url
+from request_cache.middleware import RequestCache
 from static_replace.models import AssetBaseUrlConfig
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.django import contentstore
@@ -35,7 +37,8 @@ from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls, check_mongo_calls_range
 
-from .models import CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
+from .config import CACHE_COURSE_OVERVIEWS, waffle
+from .models import _PROCESS_CACHE, CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
 
 
 @attr(shard=3)
@@ -435,8 +438,10 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
             overview_v10.save()
 
             # Now we're going to ask for it again. Because 9 < 10, we expect
-            # that this entry will be deleted() and that we'll get back a new
-            # entry with version = 10 again.
+            # to get it back while it is regenerated in the background, and
+            # then to get back a new entry with version = 10 again.
+            outdated_overview = CourseOverview.get_from_id(course.id)
+            self.assertEqual(outdated_overview.version, 9)
             updated_overview = CourseOverview.get_from_id(course.id)
             self.assertEqual(updated_overview.version, 10)
 
@@ -546,6 +551,79 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
         self.assertIn(course_with_overview_1.id, course_ids_to_overviews)
 
 
+@attr(shard=3)
+class CourseOverviewCachingTestCase(ModuleStoreTestCase):
+    """
+    Tests for the request and process caches of CourseOverviews.
+    """
+    def setUp(self):
+        super(CourseOverviewCachingTestCase, self).setUp()
+        self.course = CourseFactory.create(emit_signals=True)
+
+        # The process cache is only used along with a shared cache
+        patcher = mock.patch(
+            'openedx.core.djangoapps.content.course_overviews.models.cache',
+            LocMemCache('course_overviews', {}),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(_PROCESS_CACHE.clear)
+
+    def clear_request_cache(self):
+        """
+        Simulates the start of a new request.
+        """
+        RequestCache.clear_request_cache()
+
+    def test_cached_in_request(self):
+        with waffle().override(CACHE_COURSE_OVERVIEWS, True):
+            overview = CourseOverview.get_from_id(self.course.id)
+            with self.assertNumQueries(0):
+                self.assertIs(CourseOverview.get_from_id(self.course.id), overview)
+
+    def test_cached_in_process(self):
+        with waffle().override(CACHE_COURSE_OVERVIEWS, True):
+            self.clear_request_cache()
+            CourseOverview.get_from_id(self.course.id)
+            self.clear_request_cache()
+            with self.assertNumQueries(0):
+                overview = CourseOverview.get_from_id(self.course.id)
+                self.assertTrue([tab.tab_id for tab in overview.tabs.all()])
+
+    def test_invalidated_on_publish(self):
+        with waffle().override(CACHE_COURSE_OVERVIEWS, True):
+            self.assertFalse(CourseOverview.get_from_id(self.course.id).mobile_available)
+
+            self.course.mobile_available = True
+            with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+                self.store.update_item(self.course, ModuleStoreEnum.UserID.test)
+
+            self.assertTrue(CourseOverview.get_from_id(self.course.id).mobile_available)
+            self.clear_request_cache()
+            self.assertTrue(CourseOverview.get_from_id(self.course.id).mobile_available)
+
+    def test_invalidated_on_save(self):
+        with waffle().override(CACHE_COURSE_OVERVIEWS, True):
+            overview = CourseOverview.get_from_id(self.course.id)
+            overview.display_name = u'Updated'
+            overview.save()
+            self.clear_request_cache()
+            self.assertEqual(CourseOverview.get_from_id(self.course.id).display_name, u'Updated')
+
+    def test_outdated_not_cached(self):
+        with waffle().override(CACHE_COURSE_OVERVIEWS, True):
+            overview = CourseOverview.get_from_id(self.course.id)
+            overview.version = CourseOverview.VERSION - 1
+            overview.save()
+            with mock.patch(
+                'openedx.core.djangoapps.content.course_overviews.tasks.regenerate_course_overview.apply_async'
+            ) as mock_regenerate:
+                self.assertEqual(CourseOverview.get_from_id(self.course.id).version, CourseOverview.VERSION - 1)
+                self.assertEqual(CourseOverview.get_from_id(self.course.id).version, CourseOverview.VERSION - 1)
+            # Regeneration is only scheduled once
+            mock_regenerate.assert_called_once_with(kwargs={'course_id': unicode(self.course.id)})
+
+
 @attr(shard=3)
 @ddt.ddt
 class CourseOverviewImageSetTestCase(ModuleStoreTestCase):
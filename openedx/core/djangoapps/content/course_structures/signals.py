@@ -3,6 +3,7 @@ Django Signals classes and functions for the Course Structure application
 """
 from django.dispatch.dispatcher import receiver
 
+from openedx.core.djangoapps.content.block_structure import publish_pipeline
 from xmodule.modulestore.django import SignalHandler
 
 from .models import CourseStructure
@@ -24,6 +25,19 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     except CourseStructure.DoesNotExist:
         pass
 
+    if publish_pipeline.is_enabled(course_key):
+        return
+
     # Note: The countdown=0 kwarg is set to to ensure the method below does not attempt to access the course
     # before the signal emitter has finished all operations. This is also necessary to ensure all tests pass.
     update_course_structure.apply_async([unicode(course_key)], countdown=0)
+
+
+@publish_pipeline.register_builder('course_structure')
+def _build_course_structure(course_key, course, published_at):  # pylint: disable=unused-argument
+    """
+    Regenerates the course structure from the course loaded by the publish pipeline.
+    """
+    # Import tasks here to avoid a circular import.
+    from .tasks import _update_course_structure
+    _update_course_structure(course_key, course)
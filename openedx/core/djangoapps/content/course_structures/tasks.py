@@ -12,12 +12,14 @@ from xmodule.modulestore.django import modulestore
 log = logging.getLogger('edx.celery.task')
 
 
-def _generate_course_structure(course_key):
+def _generate_course_structure(course_key, course=None):
     """
-    Generates a course structure dictionary for the specified course.
+    Generates a course structure dictionary for the specified course,
+    loading it unless it's given, with all of its descendants.
     """
     with modulestore().bulk_operations(course_key):
-        course = modulestore().get_course(course_key, depth=None)
+        if course is None:
+            course = modulestore().get_course(course_key, depth=None)
         blocks_stack = [course]
         blocks_dict = {}
         discussions = {}
@@ -65,18 +67,24 @@ def update_course_structure(course_key):
     """
     Regenerates and updates the course structure (in the database) for the specified course.
     """
-    # Import here to avoid circular import.
-    from .models import CourseStructure
-
     # Ideally we'd like to accept a CourseLocator; however, CourseLocator is not JSON-serializable (by default) so
     # Celery's delayed tasks fail to start. For this reason, callers should pass the course key as a Unicode string.
     if not isinstance(course_key, basestring):
         raise ValueError('course_key must be a string. {} is not acceptable.'.format(type(course_key)))
 
-    course_key = CourseKey.from_string(course_key)
+    _update_course_structure(CourseKey.from_string(course_key))
+
+
+def _update_course_structure(course_key, course=None):
+    """
+    Regenerates and updates the course structure of the specified course,
+    from the given course descriptor if any.
+    """
+    # Import here to avoid circular import.
+    from .models import CourseStructure
 
     try:
-        structure = _generate_course_structure(course_key)
+        structure = _generate_course_structure(course_key, course)
     except Exception as ex:
         log.exception('An error occurred while generating course structure: %s', ex.message)
         raise
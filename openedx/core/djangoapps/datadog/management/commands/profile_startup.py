@@ -0,0 +1,142 @@
+"""
+Command to profile the startup of the LMS or Studio.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from openedx.core.lib.django_startup import IMPORT_TIMINGS, STARTUP_TIMINGS, is_lazy_startup, timed_startup_phase
+
+
+class Command(BaseCommand):
+    """
+    Reports the time taken by the startup of a worker of the LMS or Studio:
+    by each of its phases, such as the startup module of each app, and by the
+    imports of the modules of each app, along with the total time taken with
+    and without the lazy startup initialization.
+
+    Each startup is profiled in a fresh process, running this command with
+    the same arguments, and the startup of a worker is approximated by the
+    startup of manage.py followed by the initialization of the WSGI
+    application, and of the modulestores unless the startup is lazy.
+
+    Example usage:
+        $ ./manage.py lms profile_startup --settings=aws --runs 5
+    """
+    help = 'Reports the time taken by each phase of the startup of a worker, with and without lazy initialization.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=3,
+            help='Number of startups to time with and without lazy initialization, keeping the fastest.',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of the slowest phases and apps to report.',
+        )
+        parser.add_argument(
+            '--report_file',
+            default=None,
+            help='File to write the timings of the startup of this process to, instead of profiling new ones.',
+        )
+
+    def handle(self, *args, **options):
+        if options['report_file']:
+            self._report_startup(options['report_file'])
+            return
+
+        profile = self._profile_startup(profile_imports=True, lazy=False)
+        self._write_timings('Slowest startup phases:', profile['startup'], options['top'])
+        self._write_timings('Slowest imports by app:', self._timings_by_app(profile['imports']), options['top'])
+
+        totals = {}
+        for lazy in (False, True):
+            totals[lazy] = min(
+                self._profile_startup(profile_imports=False, lazy=lazy)['startup']['total']
+                for __ in range(options['runs'])
+            )
+        self.stdout.write(
+            'Worker startup: {:.2f}s, or {:.2f}s with lazy initialization (fastest of {} runs).'.format(
+                totals[False],
+                totals[True],
+                options['runs'],
+            )
+        )
+
+    def _profile_startup(self, profile_imports, lazy):
+        """
+        Returns the timings of the startup of a new process, with its imports
+        profiled or not, and with the lazy startup initialization or not.
+        """
+        env = dict(os.environ, EDX_LAZY_STARTUP='1' if lazy else '0')
+        env.pop('EDX_PROFILE_STARTUP', None)
+        if profile_imports:
+            env['EDX_PROFILE_STARTUP'] = '1'
+
+        report_file = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        report_file.close()
+        try:
+            subprocess.check_call([sys.executable] + sys.argv + ['--report_file', report_file.name], env=env)
+            with open(report_file.name) as report:
+                return json.load(report)
+        finally:
+            os.remove(report_file.name)
+
+    @staticmethod
+    def _report_startup(report_file):
+        """
+        Completes the startup of this process as a worker's, and writes its
+        timings to the given file.
+        """
+        from django.core.wsgi import get_wsgi_application
+        from xmodule.modulestore.django import modulestore
+
+        if not is_lazy_startup():
+            with timed_startup_phase('modulestore'):
+                modulestore()
+        with timed_startup_phase('wsgi'):
+            get_wsgi_application()
+
+        timings = dict(STARTUP_TIMINGS)
+        timings['total'] = sum(timings.get(phase, 0) for phase in ('startup', 'modulestore', 'wsgi'))
+        with open(report_file, 'w') as report:
+            json.dump({'startup': timings, 'imports': IMPORT_TIMINGS}, report)
+
+    @staticmethod
+    def _timings_by_app(import_timings):
+        """
+        Returns the given import timings added up by installed app, or by top
+        level package for the modules of no app.
+        """
+        apps = sorted(settings.INSTALLED_APPS, key=len, reverse=True)
+        timings = {}
+        for module_name, timing in import_timings.iteritems():
+            app = next(
+                (app for app in apps if module_name == app or module_name.startswith(app + '.')),
+                module_name.split('.')[0],
+            )
+            timings[app] = timings.get(app, 0) + timing
+        return timings
+
+    def _write_timings(self, title, timings, top):
+        """
+        Writes the given number of the slowest of the given timings.
+        """
+        self.stdout.write(title)
+        for name, timing in sorted(timings.iteritems(), key=lambda item: item[1], reverse=True)[:top]:
+            self.stdout.write('  {:8.3f}s  {}'.format(timing, name))
@@ -0,0 +1,18 @@
+"""
+This module contains various configuration settings via
+waffle switches for the Programs app.
+"""
+from openedx.core.djangoapps.waffle_utils import WaffleSwitchNamespace
+
+# Namespace
+WAFFLE_NAMESPACE = u'programs'
+
+# Switches
+PROGRESS_SNAPSHOTS = u'progress_snapshots'
+
+
+def waffle():
+    """
+    Returns the namespaced, cached, audited Waffle class for Programs.
+    """
+    return WaffleSwitchNamespace(name=WAFFLE_NAMESPACE, log_prefix=u'Programs: ')
@@ -3,6 +3,8 @@ This module contains signals / handlers related to programs.
 """
 import logging
 
+from celery.signals import task_postrun
+from django.core.signals import request_finished
 from django.dispatch import receiver
 
 from openedx.core.djangoapps.signals.signals import COURSE_CERT_AWARDED
@@ -52,3 +54,36 @@ def handle_course_cert_awarded(sender, user, course_key, mode, status, **kwargs)
     # import here, because signal is registered at startup, but items in tasks are not yet able to be loaded
     from openedx.core.djangoapps.programs.tasks.v1.tasks import award_program_certificates
     award_program_certificates.delay(user.username)
+
+
+def handle_progress_changed(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    When a learner's enrollment or certificate is saved or deleted, mark their
+    program progress snapshots as out of date.
+
+    Connected to the enrollment and certificate models' post_save and
+    post_delete signals at startup, as these models can't be imported here.
+
+    Args:
+        sender:
+            class of the object instance that sent this signal
+        instance:
+            the CourseEnrollment or GeneratedCertificate which changed
+
+    Returns:
+        None
+
+    """
+    from openedx.core.djangoapps.programs.utils import invalidate_progress_snapshot
+    invalidate_progress_snapshot(instance.user_id)
+
+
+@receiver(request_finished)
+@task_postrun.connect
+def handle_transactions_over(**kwargs):  # pylint: disable=unused-argument
+    """
+    Once the transactions of a request or celery task are over, mark the
+    program progress snapshots invalidated within them as out of date again.
+    """
+    from openedx.core.djangoapps.programs.utils import invalidate_pending_progress_snapshots
+    invalidate_pending_progress_snapshots()
@@ -0,0 +1,21 @@
+"""Code run at server start up to initialize the programs app."""
+from django.db.models.signals import post_delete, post_save
+
+
+def run():
+    """
+    Connect the handler invalidating learners' program progress snapshots to
+    the models they are computed from.
+    """
+    from certificates.models import GeneratedCertificate
+    from student.models import CourseEnrollment
+
+    from .signals import handle_progress_changed
+
+    for model in (CourseEnrollment, GeneratedCertificate):
+        for signal in (post_save, post_delete):
+            signal.connect(
+                handle_progress_changed,
+                sender=model,
+                dispatch_uid='programs.progress_changed.{}'.format(model.__name__),
+            )
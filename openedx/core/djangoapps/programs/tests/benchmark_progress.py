@@ -0,0 +1,89 @@
+"""
+Benchmark of program progress reads for a learner engaged in many programs.
+
+Not collected by the test runner; run it explicitly, e.g.:
+
+    paver test_system -t openedx/core/djangoapps/programs/tests/benchmark_progress.py -s
+
+It reports the time taken to find and gauge the programs of a learner
+enrolled in 50 course runs across 10 programs, as the dashboard and the
+program listing page do, with a ProgramProgressMeter and with a warm
+ProgramProgressSnapshot.
+"""
+import timeit
+
+from django.core.cache import cache
+
+from lms.djangoapps.certificates.models import CertificateStatuses
+from lms.djangoapps.certificates.tests.factories import GeneratedCertificateFactory
+from openedx.core.djangoapps.catalog.cache import PROGRAM_CACHE_KEY_TPL, PROGRAM_UUIDS_CACHE_KEY
+from openedx.core.djangoapps.catalog.tests.factories import CourseFactory, CourseRunFactory, ProgramFactory
+from openedx.core.djangoapps.programs.utils import ProgramProgressMeter, ProgramProgressSnapshot
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, skip_unless_lms
+from student.models import CourseEnrollment
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+
+@skip_unless_lms
+class ProgramProgressBenchmark(CacheIsolationTestCase):
+    """
+    Times the program progress reads of a learner engaged in many programs.
+    """
+    ENABLED_CACHES = ['default']
+    ENGAGED_PROGRAMS = 10
+    OTHER_PROGRAMS = 90
+    COURSES_PER_PROGRAM = 5
+    REPEAT = 5
+
+    def setUp(self):
+        super(ProgramProgressBenchmark, self).setUp()
+        self.user = UserFactory()
+
+        programs = [
+            ProgramFactory(courses=[
+                CourseFactory(course_runs=[CourseRunFactory()]) for __ in range(self.COURSES_PER_PROGRAM)
+            ])
+            for __ in range(self.ENGAGED_PROGRAMS + self.OTHER_PROGRAMS)
+        ]
+        cache.set_many({PROGRAM_CACHE_KEY_TPL.format(uuid=program['uuid']): program for program in programs}, None)
+        cache.set(PROGRAM_UUIDS_CACHE_KEY, [program['uuid'] for program in programs], None)
+
+        course_runs = [
+            course['course_runs'][0] for program in programs[:self.ENGAGED_PROGRAMS] for course in program['courses']
+        ]
+        for index, course_run in enumerate(course_runs):
+            CourseEnrollmentFactory(user=self.user, course_id=course_run['key'], mode=course_run['type'])
+            if index % 2:
+                GeneratedCertificateFactory(
+                    user=self.user,
+                    course_id=course_run['key'],
+                    mode=course_run['type'],
+                    status=CertificateStatuses.downloadable,
+                    download_url='http://www.example.com/cert.pdf',
+                )
+
+    def read_progress(self, meter_class):
+        """
+        Reads the learner's progress as the dashboard and the program listing page do.
+        """
+        enrollments = list(CourseEnrollment.enrollments_for_user(self.user))
+        meter_class(self.user, enrollments=enrollments).invert_programs()
+        meter = meter_class(self.user)
+        meter.engaged_programs  # pylint: disable=pointless-statement
+        meter.progress()
+
+    def time_progress(self, meter_class):
+        """
+        Returns the best time taken to read the learner's progress.
+        """
+        return min(timeit.repeat(lambda: self.read_progress(meter_class), number=1, repeat=self.REPEAT))
+
+    def test_progress(self):
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+        print "Progress of a learner in {} runs across {} of {} programs: {:.3f}s meter, {:.3f}s snapshot".format(
+            self.ENGAGED_PROGRAMS * self.COURSES_PER_PROGRAM,
+            self.ENGAGED_PROGRAMS,
+            self.ENGAGED_PROGRAMS + self.OTHER_PROGRAMS,
+            self.time_progress(ProgramProgressMeter),
+            self.time_progress(ProgramProgressSnapshot),
+        )
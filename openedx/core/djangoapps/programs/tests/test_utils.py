@@ -7,10 +7,12 @@ import uuid
 import ddt
 import httpretty
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.utils import override_settings
 import mock
+from freezegun import freeze_time
 from nose.plugins.attrib import attr
 from pytz import utc
 
@@ -18,6 +20,7 @@ from course_modes.models import CourseMode
 from lms.djangoapps.certificates.api import MODES
 from lms.djangoapps.commerce.tests.test_utils import update_commerce_config
 from lms.djangoapps.commerce.utils import EcommerceService
+from openedx.core.djangoapps.catalog.cache import PROGRAMS_GENERATION_CACHE_KEY
 from openedx.core.djangoapps.catalog.tests.factories import (
     generate_course_run_key,
     ProgramFactory,
@@ -29,11 +32,14 @@ from openedx.core.djangoapps.programs.tests.factories import ProgressFactory
 from openedx.core.djangoapps.programs.utils import (
     DEFAULT_ENROLLMENT_START_DATE,
     ProgramProgressMeter,
+    ProgramProgressSnapshot,
     ProgramDataExtender,
     ProgramMarketingDataExtender,
     get_certificates,
+    invalidate_pending_progress_snapshots,
 )
-from openedx.core.djangolib.testing.utils import skip_unless_lms
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, skip_unless_lms
+from student.models import CourseEnrollment
 from student.tests.factories import AnonymousUserFactory, UserFactory, CourseEnrollmentFactory
 from util.date_utils import strftime_localized
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -540,6 +546,129 @@ class TestProgramProgressMeter(TestCase):
         self.assertEqual(meter._is_course_complete(course), True)
 
 
+@attr(shard=2)
+@skip_unless_lms
+@mock.patch(UTILS_MODULE + '.get_programs')
+class TestProgramProgressSnapshot(CacheIsolationTestCase):
+    """Tests of the program progress snapshots."""
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestProgramProgressSnapshot, self).setUp()
+
+        self.user = UserFactory()
+        self.course_run_keys = [generate_course_run_key() for __ in range(3)]
+        self.programs = [
+            ProgramFactory(courses=[
+                CourseFactory(course_runs=[CourseRunFactory(key=self.course_run_keys[0])]),
+                CourseFactory(course_runs=[CourseRunFactory(key=self.course_run_keys[1])]),
+            ]),
+            ProgramFactory(courses=[
+                CourseFactory(course_runs=[CourseRunFactory(key=self.course_run_keys[1])]),
+            ]),
+            ProgramFactory(courses=[
+                CourseFactory(course_runs=[CourseRunFactory(key=self.course_run_keys[2])]),
+            ]),
+        ]
+
+        CourseEnrollmentFactory(user=self.user, course_id=self.course_run_keys[0], mode='verified')
+        CourseEnrollmentFactory(user=self.user, course_id=self.course_run_keys[1], mode='verified')
+
+    def _assert_snapshot_matches_meter(self, snapshot, meter):
+        """Verify that a snapshot reports the same progress as a progress meter."""
+        self.assertEqual(snapshot.invert_programs(), meter.invert_programs())
+        self.assertEqual(snapshot.engaged_programs, meter.engaged_programs)
+        self.assertEqual(snapshot.progress(), meter.progress())
+        self.assertEqual(snapshot.completed_programs, meter.completed_programs)
+
+    def test_snapshot_matches_meter(self, mock_get_programs):
+        """Verify that snapshots report the same progress as progress meters."""
+        mock_get_programs.return_value = self.programs
+
+        self._assert_snapshot_matches_meter(ProgramProgressSnapshot(self.user), ProgramProgressMeter(self.user))
+
+        enrollments = list(CourseEnrollment.enrollments_for_user(self.user))[:1]
+        self._assert_snapshot_matches_meter(
+            ProgramProgressSnapshot(self.user, enrollments=enrollments),
+            ProgramProgressMeter(self.user, enrollments=enrollments),
+        )
+
+    @mock.patch(UTILS_MODULE + '.certificate_api.get_certificates_for_user', return_value=[])
+    def test_snapshot_cached(self, mock_get_certificates_for_user, mock_get_programs):
+        """Verify that snapshots are only computed once."""
+        mock_get_programs.return_value = self.programs
+
+        for __ in range(2):
+            snapshot = ProgramProgressSnapshot(self.user)
+            self.assertEqual(len(snapshot.engaged_programs), 2)
+
+        self.assertEqual(mock_get_certificates_for_user.call_count, 1)
+        # Only the engaged programs are read from the cache once the snapshot is computed.
+        mock_get_programs.assert_called_with(uuids=mock.ANY)
+        self.assertEqual(
+            set(mock_get_programs.call_args[1]['uuids']),
+            set(program['uuid'] for program in self.programs[:2])
+        )
+
+    def test_snapshot_updated_on_enrollment(self, mock_get_programs):
+        """Verify that snapshots are computed again when the user enrolls in a course."""
+        mock_get_programs.return_value = self.programs
+        self.assertEqual(len(ProgramProgressSnapshot(self.user).engaged_programs), 2)
+
+        enrollment = CourseEnrollmentFactory(user=self.user, course_id=self.course_run_keys[2], mode='verified')
+        self.assertEqual(len(ProgramProgressSnapshot(self.user).engaged_programs), 3)
+
+        enrollment.update_enrollment(is_active=False)
+        self.assertEqual(len(ProgramProgressSnapshot(self.user).engaged_programs), 2)
+
+    @mock.patch(UTILS_MODULE + '.certificate_api.get_certificates_for_user', return_value=[])
+    def test_snapshot_updated_on_programs_refresh(self, mock_get_certificates_for_user, mock_get_programs):
+        """Verify that snapshots are computed again when programs are cached anew."""
+        mock_get_programs.return_value = self.programs
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+
+        cache.set(PROGRAMS_GENERATION_CACHE_KEY, 'new-generation')
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+
+        self.assertEqual(mock_get_certificates_for_user.call_count, 2)
+
+    @mock.patch(UTILS_MODULE + '.certificate_api.get_certificates_for_user', return_value=[])
+    def test_snapshot_updated_after_transaction(self, mock_get_certificates_for_user, mock_get_programs):
+        """Verify that snapshots invalidated within a transaction are computed again once it is over."""
+        mock_get_programs.return_value = self.programs
+        CourseEnrollmentFactory(user=self.user, course_id=self.course_run_keys[2], mode='verified')
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+
+        # Still within the test's transaction.
+        invalidate_pending_progress_snapshots()
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+        self.assertEqual(mock_get_certificates_for_user.call_count, 1)
+
+        with mock.patch(UTILS_MODULE + '.transaction.get_connection') as mock_get_connection:
+            mock_get_connection.return_value.in_atomic_block = False
+            invalidate_pending_progress_snapshots()
+            invalidate_pending_progress_snapshots()
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+        ProgramProgressSnapshot(self.user).snapshot  # pylint: disable=expression-not-assigned
+        self.assertEqual(mock_get_certificates_for_user.call_count, 2)
+
+    def test_snapshot_updated_after_upgrade_deadline(self, mock_get_programs):
+        """Verify that snapshots are computed again once an upgrade deadline passes."""
+        course_run = self.programs[2]['courses'][0]['course_runs'][0]
+        CourseEnrollmentFactory(user=self.user, course_id=course_run['key'], mode='audit')
+        deadline = datetime.datetime.now(utc) + datetime.timedelta(days=1)
+        course_run['seats'] = [SeatFactory(type='verified', upgrade_deadline=deadline.isoformat())]
+        mock_get_programs.return_value = self.programs
+
+        snapshot = ProgramProgressSnapshot(self.user)
+        self.assertEqual(snapshot.snapshot['valid_until'], deadline)
+        self.assertEqual(snapshot.progress()[0], ProgressFactory(uuid=self.programs[2]['uuid'], in_progress=1))
+
+        with freeze_time(deadline + datetime.timedelta(seconds=1)):
+            snapshot = ProgramProgressSnapshot(self.user)
+            self.assertEqual(snapshot.progress()[0], ProgressFactory(uuid=self.programs[2]['uuid'], not_started=1))
+
+
 @ddt.ddt
 @override_settings(ECOMMERCE_PUBLIC_URL_ROOT=ECOMMERCE_URL_ROOT)
 @skip_unless_lms
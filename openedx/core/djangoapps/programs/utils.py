@@ -2,6 +2,8 @@
 """Helper functions for working with Programs."""
 import datetime
 import logging
+import threading
+import uuid as uuid_lib
 from collections import defaultdict
 from copy import deepcopy
 from itertools import chain
@@ -12,20 +14,25 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import transaction
 from django.utils.functional import cached_property
 from edx_rest_api_client.exceptions import SlumberBaseException
 from opaque_keys.edx.keys import CourseKey
 from pytz import utc
 from requests.exceptions import ConnectionError, Timeout
+from waffle import switch_is_active
 
 from course_modes.models import CourseMode
 from lms.djangoapps.certificates import api as certificate_api
 from lms.djangoapps.commerce.utils import EcommerceService
 from lms.djangoapps.courseware.access import has_access
+from openedx.core.djangoapps.catalog.cache import PROGRAMS_GENERATION_CACHE_KEY
 from openedx.core.djangoapps.catalog.utils import get_programs
 from openedx.core.djangoapps.commerce.utils import ecommerce_api_client
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.credentials.utils import get_credentials
+from openedx.core.djangoapps.programs.config import PROGRESS_SNAPSHOTS, waffle
+from openedx.core.djangoapps.theming.helpers import get_current_site
 from student.models import CourseEnrollment
 from util.date_utils import strftime_localized
 from xmodule.modulestore.django import modulestore
@@ -33,6 +40,18 @@ from xmodule.modulestore.django import modulestore
 # The datetime module's strftime() methods require a year >= 1900.
 DEFAULT_ENROLLMENT_START_DATE = datetime.datetime(1900, 1, 1, tzinfo=utc)
 
+# Cache key templates used to store learners' program progress snapshots, and
+# the token identifying the version of their enrollments and certificates.
+PROGRESS_SNAPSHOT_CACHE_KEY_TPL = 'program-progress-{user_id}'
+PROGRESS_SNAPSHOT_VERSION_CACHE_KEY_TPL = 'program-progress-version-{user_id}'
+# Seconds after which a snapshot is computed again, even if nothing it was
+# computed from is known to have changed.
+PROGRESS_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+# The users whose snapshots were invalidated within a transaction of the
+# current thread, to be invalidated again once it is over.
+_PENDING_SNAPSHOT_INVALIDATIONS = threading.local()
+
 log = logging.getLogger(__name__)
 
 
@@ -348,6 +367,223 @@ class ProgramProgressMeter(object):
         return any(course_run['key'] in self.course_run_ids for course_run in course['course_runs'])
 
 
+def get_progress_meter(user, enrollments=None):
+    """Get a utility for gauging a user's progress towards program completion.
+
+    Arguments:
+        user (User): The user for which to find programs.
+
+    Keyword Arguments:
+        enrollments (list): List of the user's enrollments.
+
+    Returns:
+        ProgramProgressSnapshot if the progress_snapshots switch is enabled,
+        ProgramProgressMeter otherwise.
+    """
+    if waffle().is_enabled(PROGRESS_SNAPSHOTS):
+        return ProgramProgressSnapshot(user, enrollments=enrollments)
+    return ProgramProgressMeter(user, enrollments=enrollments)
+
+
+def invalidate_progress_snapshot(user_id):
+    """Mark a user's program progress snapshots as out of date.
+
+    Within a transaction, a snapshot may be computed again from the data it
+    hasn't committed yet, or from the data preceding it, before it commits.
+    So the snapshots are also marked out of date once the transaction is
+    over, by invalidate_pending_progress_snapshots.
+
+    Arguments:
+        user_id (int): The user whose enrollments or certificates changed.
+    """
+    if transaction.get_connection().in_atomic_block:
+        _pending_snapshot_invalidations().add(user_id)
+    _set_progress_snapshot_versions([user_id])
+
+
+def invalidate_pending_progress_snapshots():
+    """Mark the program progress snapshots invalidated within a transaction as out of date again.
+
+    Meant to be called once the transactions of the current request or celery
+    task are over, in place of an on_commit hook, which Django 1.8 lacks.
+    Does nothing if still within a transaction.
+    """
+    if transaction.get_connection().in_atomic_block:
+        return
+    user_ids = _pending_snapshot_invalidations()
+    if user_ids:
+        _PENDING_SNAPSHOT_INVALIDATIONS.user_ids = set()
+        _set_progress_snapshot_versions(user_ids)
+
+
+def _pending_snapshot_invalidations():
+    """Get the users whose snapshots are to be invalidated again on the current thread."""
+    if not hasattr(_PENDING_SNAPSHOT_INVALIDATIONS, 'user_ids'):
+        _PENDING_SNAPSHOT_INVALIDATIONS.user_ids = set()
+    return _PENDING_SNAPSHOT_INVALIDATIONS.user_ids
+
+
+def _set_progress_snapshot_versions(user_ids):
+    """Give the users' program progress snapshots a new version."""
+    version = uuid_lib.uuid4().hex
+    cache.set_many(
+        {PROGRESS_SNAPSHOT_VERSION_CACHE_KEY_TPL.format(user_id=user_id): version for user_id in user_ids},
+        PROGRESS_SNAPSHOT_TIMEOUT,
+    )
+
+
+class ProgramProgressSnapshot(object):
+    """Precomputed progress of a user towards program completion.
+
+    Supports the parts of the ProgramProgressMeter interface used to list the
+    programs a user is engaged in, without loading every program and the user's
+    certificates on each request. The snapshot is computed by a ProgramProgressMeter,
+    and cached until the user's enrollments or certificates change, programs are
+    cached anew, or an upgrade deadline which the user's progress depends on passes.
+
+    Arguments:
+        user (User): The user for which to find programs.
+
+    Keyword Arguments:
+        enrollments (list): List of the user's enrollments whose programs are
+            returned by invert_programs.
+    """
+    def __init__(self, user, enrollments=None):
+        self.user = user
+        self.course_run_ids = [unicode(enrollment.course_id) for enrollment in enrollments] if enrollments else None
+
+    @cached_property
+    def snapshot(self):
+        """Read the snapshot from the cache, computing it if it's missing or out of date.
+
+        Returns:
+            dict, describing the user's progress
+        """
+        cache_key = PROGRESS_SNAPSHOT_CACHE_KEY_TPL.format(user_id=self.user.id)
+        version_key = PROGRESS_SNAPSHOT_VERSION_CACHE_KEY_TPL.format(user_id=self.user.id)
+        cached = cache.get_many([cache_key, version_key, PROGRAMS_GENERATION_CACHE_KEY])
+        version = cached.get(version_key)
+        generation = cached.get(PROGRAMS_GENERATION_CACHE_KEY)
+
+        # Programs differ between sites when get-multitenant-programs is enabled.
+        scope = get_current_site().domain if switch_is_active('get-multitenant-programs') else ''
+        snapshots = cached.get(cache_key, {})
+        snapshot = snapshots.get(scope)
+
+        if not self._is_current(snapshot, version, generation):
+            snapshot = self._compute()
+            snapshot.update(version=version, generation=generation)
+            snapshots[scope] = snapshot
+            cache.set(cache_key, snapshots, PROGRESS_SNAPSHOT_TIMEOUT)
+
+        return snapshot
+
+    @staticmethod
+    def _is_current(snapshot, version, generation):
+        """Check if a snapshot is up to date."""
+        if snapshot is None or snapshot['version'] != version or snapshot['generation'] != generation:
+            return False
+        return snapshot['valid_until'] is None or snapshot['valid_until'] > datetime.datetime.now(utc)
+
+    def _compute(self):
+        """Compute the user's progress using a ProgramProgressMeter."""
+        meter = ProgramProgressMeter(self.user)
+        engaged_programs = meter.engaged_programs
+
+        return {
+            'programs_by_course_run': {
+                course_run_id: [program['uuid'] for program in programs]
+                for course_run_id, programs in meter.invert_programs().iteritems()
+            },
+            'engaged_programs': [program['uuid'] for program in engaged_programs],
+            'progress': meter.progress(programs=engaged_programs),
+            'completed_programs': meter.completed_programs,
+            'valid_until': self._get_next_upgrade_deadline(meter, engaged_programs),
+        }
+
+    @staticmethod
+    def _get_next_upgrade_deadline(meter, programs):
+        """Find the next deadline for upgrading to the seats required by the course runs the user is enrolled in.
+
+        Whether a course is in progress depends on these deadlines, so the
+        snapshot is out of date once the next one passes.
+
+        Returns:
+            datetime, or None if there is no upcoming deadline
+        """
+        now = datetime.datetime.now(utc)
+        deadlines = [
+            parse(seat['upgrade_deadline'])
+            for program in programs
+            for course in program['courses']
+            for course_run in course['course_runs']
+            if meter.enrolled_run_modes.get(course_run['key'], course_run['type']) != course_run['type']
+            for seat in course_run['seats']
+            if seat['type'] == course_run['type'] and seat['upgrade_deadline']
+        ]
+        upcoming = [deadline for deadline in deadlines if deadline > now]
+        return min(upcoming) if upcoming else None
+
+    def _get_programs(self, uuids):
+        """Read the given programs from the cache.
+
+        Returns:
+            dict of program dicts, keyed by UUID
+        """
+        programs = attach_program_detail_url(get_programs(uuids=list(uuids)))
+        return {program['uuid']: program for program in programs}
+
+    def invert_programs(self):
+        """Intersect programs and enrollments, see ProgramProgressMeter.invert_programs.
+
+        Returns:
+            defaultdict, programs keyed by course run ID
+        """
+        programs_by_course_run = self.snapshot['programs_by_course_run']
+        if self.course_run_ids is not None:
+            programs_by_course_run = {
+                course_run_id: programs_by_course_run[course_run_id]
+                for course_run_id in self.course_run_ids if course_run_id in programs_by_course_run
+            }
+
+        programs = self._get_programs(set(chain.from_iterable(programs_by_course_run.itervalues())))
+
+        inverted_programs = defaultdict(list)
+        for course_run_id, uuids in programs_by_course_run.iteritems():
+            inverted_programs[course_run_id] = [programs[uuid] for uuid in uuids if uuid in programs]
+
+        return inverted_programs
+
+    @cached_property
+    def engaged_programs(self):
+        """Derive a list of programs in which the given user is engaged.
+
+        Returns:
+            list of program dicts, ordered by most recent enrollment
+        """
+        uuids = self.snapshot['engaged_programs']
+        programs = self._get_programs(uuids)
+        return [programs[uuid] for uuid in uuids if uuid in programs]
+
+    def progress(self):
+        """Gauge a user's progress towards completion of the programs in which they're engaged.
+
+        Returns:
+            list of dict, each containing counts of completed, in progress
+                and not started courses of a program.
+        """
+        return [dict(progress) for progress in self.snapshot['progress']]
+
+    @property
+    def completed_programs(self):
+        """Identify programs completed by the student.
+
+        Returns:
+            list of UUIDs, each identifying a completed program.
+        """
+        return list(self.snapshot['completed_programs'])
+
+
 # pylint: disable=missing-docstring
 class ProgramDataExtender(object):
     """
@@ -1,11 +1,30 @@
 """
 Automatic execution of startup modules in Django apps.
+
+The time taken by the startup module of each app, and by the other phases
+of the startup of the LMS and Studio, is recorded in STARTUP_TIMINGS.  When
+the EDX_PROFILE_STARTUP environment variable is set, manage.py also records
+the time taken to import each module in IMPORT_TIMINGS.  Both are reported
+by the profile_startup management command.
 """
 
+import __builtin__
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from importlib import import_module
 
 from django.conf import settings
 
+# The time taken by each phase of the startup, in seconds, by name.
+STARTUP_TIMINGS = OrderedDict()
+
+# The time taken to import each module, without the modules it imports, in
+# seconds, by name.
+IMPORT_TIMINGS = {}
+
 
 def autostartup():
     """
@@ -13,11 +32,87 @@ def autostartup():
     """
     for app in settings.INSTALLED_APPS:
         # See if there's a startup module in each app.
+        with timed_startup_phase(app + '.startup'):
+            try:
+                mod = import_module(app + '.startup')
+            except ImportError:
+                continue
+
+            # If the module has a run method, run it.
+            if hasattr(mod, 'run'):
+                mod.run()
+
+
+@contextmanager
+def timed_startup_phase(name):
+    """
+    Context manager recording the time taken by the startup phase of the
+    given name in STARTUP_TIMINGS, added up if it runs more than once.
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = STARTUP_TIMINGS.get(name, 0) + time.time() - start
+
+
+def is_lazy_startup():
+    """
+    Returns whether the expensive subsystems are initialized on first use,
+    rather than at startup.
+
+    Enabled by the LAZY_STARTUP_INITIALIZATION feature, unless overridden
+    by the EDX_LAZY_STARTUP environment variable, as by profile_startup.
+    """
+    lazy_startup = os.environ.get('EDX_LAZY_STARTUP')
+    if lazy_startup is not None:
+        return lazy_startup == '1'
+    return settings.FEATURES.get('LAZY_STARTUP_INITIALIZATION', False)
+
+
+def profile_imports():
+    """
+    Records the time taken by each import from now on in IMPORT_TIMINGS.
+    """
+    original_import = __builtin__.__import__
+    # The time taken by the imports nested in each import in progress.
+    nested_times = []
+
+    def timed_import(name, globals=None, locals=None, fromlist=None, level=-1):  # pylint: disable=redefined-builtin
+        """
+        Imports the given module as __import__ does, recording the time taken.
+        """
+        nested_times.append(0)
+        start = time.time()
         try:
-            mod = import_module(app + '.startup')
-        except ImportError:
-            continue
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.time() - start
+            own_time = elapsed - nested_times.pop()
+            if nested_times:
+                nested_times[-1] += elapsed
+            module_name = _imported_module_name(name, globals, level)
+            IMPORT_TIMINGS[module_name] = IMPORT_TIMINGS.get(module_name, 0) + own_time
+
+    __builtin__.__import__ = timed_import
+
 
-        # If the module has a run method, run it.
-        if hasattr(mod, 'run'):
-            mod.run()
+def _imported_module_name(name, importer_globals, level):
+    """
+    Returns the absolute name of the module imported by the given name,
+    from the module of the given globals, at the given relative level.
+    """
+    if level == 0 or not importer_globals:
+        return name
+    package = importer_globals.get('__package__')
+    if not package:
+        package = importer_globals.get('__name__', '')
+        if '__path__' not in importer_globals:
+            package = package.rpartition('.')[0]
+    if level > 0:
+        package = package.rsplit('.', level - 1)[0]
+        return package + '.' + name if name else package
+    # An implicit relative import, which is relative only if found so.
+    if package and package + '.' + name in sys.modules:
+        return package + '.' + name
+    return name
@@ -2,7 +2,12 @@
 from __future__ import unicode_literals
 
 import logging
+import math
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 
+import dogstats_wrapper as dog_stats_api
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
@@ -14,6 +19,19 @@ from openedx.core.lib.token_utils import JwtBuilder
 
 log = logging.getLogger(__name__)
 
+# Cached data is kept, and served while it is being refreshed, for this many
+# times its configured TTL.
+STALE_TTL_FACTOR = 10
+# Seconds for which a process may refresh a cache entry before another one
+# is allowed to.
+REFRESH_LOCK_TIMEOUT = 60
+# How long, and how often, to wait for data being fetched by another process
+# before fetching it anyway.
+REFRESH_WAIT_TIMEOUT = 5
+REFRESH_WAIT_INTERVAL = 0.1
+# Number of pages of a paginated resource fetched concurrently.
+PAGE_FETCH_CONCURRENCY = 4
+
 
 def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=None, cache_key=None, many=True,
                      traverse_pagination=True):
@@ -21,6 +39,10 @@ def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=No
 
     DRY utility for handling caching and pagination.
 
+    Cached data is refreshed by a single process at a time: other processes
+    keep serving it while it is refreshed in the background, or wait for it
+    if there is no cached data at all.
+
     Arguments:
         api_config (ConfigurationModel): The configuration model governing interaction with the API.
         resource (str): Name of the API resource being requested.
@@ -45,14 +67,46 @@ def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=No
         log.warning('%s configuration is disabled.', api_config.API_NAME)
         return no_data
 
-    if cache_key:
-        cache_key = '{}.{}'.format(cache_key, resource_id) if resource_id is not None else cache_key
-        cache_key += '.zpickled'
+    def fetch():
+        """Fetches the data from the API, or returns None on failure."""
+        return _fetch(api_config, resource, api, resource_id, querystring, traverse_pagination, no_data)
+
+    if not cache_key:
+        results = fetch()
+        return no_data if results is None else results
+
+    cache_key = '{}.{}'.format(cache_key, resource_id) if resource_id is not None else cache_key
+    cache_key += '.swr.zpickled'
+    tags = ['api:{}'.format(api_config.API_NAME), 'resource:{}'.format(resource)]
+
+    entry = _get_cache_entry(cache_key)
+    if entry is not None:
+        fresh_until, results = entry
+        if time.time() < fresh_until:
+            dog_stats_api.increment('edx_api_utils.cache.hit', tags=tags)
+        else:
+            dog_stats_api.increment('edx_api_utils.cache.stale', tags=tags)
+            if _acquire_refresh_lock(cache_key):
+                _run_in_background(_refresh, cache_key, fetch, api_config.cache_ttl, tags)
+        return results
 
-        cached = cache.get(cache_key)
-        if cached:
-            return zunpickle(cached)
+    dog_stats_api.increment('edx_api_utils.cache.miss', tags=tags)
+    if not _acquire_refresh_lock(cache_key):
+        # Another process is fetching the data: wait for it instead of
+        # hitting the API along with it.
+        entry = _wait_for_cache_entry(cache_key)
+        if entry is not None:
+            return entry[1]
+        _acquire_refresh_lock(cache_key, force=True)
 
+    results = _refresh(cache_key, fetch, api_config.cache_ttl, tags)
+    return no_data if results is None else results
+
+
+def _fetch(api_config, resource, api, resource_id, querystring, traverse_pagination, no_data):
+    """
+    GETs the data from the API, see `get_edx_api_data`.  Returns None on failure.
+    """
     try:
         endpoint = getattr(api, resource)
         querystring = querystring if querystring else {}
@@ -66,24 +120,115 @@ def get_edx_api_data(api_config, resource, api, resource_id=None, querystring=No
             results = response
     except:  # pylint: disable=bare-except
         log.exception('Failed to retrieve data from the %s API.', api_config.API_NAME)
-        return no_data
-
-    if cache_key:
-        zdata = zpickle(results)
-        cache.set(cache_key, zdata, api_config.cache_ttl)
+        return None
 
     return results
 
 
+def _refresh(cache_key, fetch, cache_ttl, tags):
+    """
+    Fetches the data, caches it for `cache_ttl` seconds, plus the time it
+    may be served stale, and releases the refresh lock.  Returns the data,
+    or None on failure, in which case any cached data is left as is.
+    """
+    try:
+        with dog_stats_api.timer('edx_api_utils.refresh', tags=tags):
+            results = fetch()
+        if results is not None:
+            entry = (time.time() + cache_ttl, results)
+            cache.set(cache_key, zpickle(entry), cache_ttl * STALE_TTL_FACTOR)
+        else:
+            dog_stats_api.increment('edx_api_utils.refresh.failed', tags=tags)
+        return results
+    finally:
+        cache.delete(_refresh_lock_key(cache_key))
+
+
+def _get_cache_entry(cache_key):
+    """
+    Returns the cached (fresh until, data) tuple, or None.
+    """
+    cached = cache.get(cache_key)
+    return zunpickle(cached) if cached else None
+
+
+def _wait_for_cache_entry(cache_key):
+    """
+    Waits for the data to be cached by another process, for at most
+    REFRESH_WAIT_TIMEOUT seconds.  Returns the cached entry, or None.
+    """
+    deadline = time.time() + REFRESH_WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(REFRESH_WAIT_INTERVAL)
+        entry = _get_cache_entry(cache_key)
+        if entry is not None:
+            return entry
+        if cache.get(_refresh_lock_key(cache_key)) is None:
+            # The other process failed to fetch the data
+            break
+    return None
+
+
+def _refresh_lock_key(cache_key):
+    """
+    Returns the key of the lock taken while refreshing the given cache entry.
+    """
+    return '{}.refreshing'.format(cache_key)
+
+
+def _acquire_refresh_lock(cache_key, force=False):
+    """
+    Returns whether the lock on refreshing the given cache entry was acquired.
+    """
+    if force:
+        cache.set(_refresh_lock_key(cache_key), True, REFRESH_LOCK_TIMEOUT)
+        return True
+    return cache.add(_refresh_lock_key(cache_key), True, REFRESH_LOCK_TIMEOUT)
+
+
+def _run_in_background(func, *args):
+    """
+    Runs `func` in a daemon thread, so that the current request doesn't wait for it.
+
+    Under uWSGI, this requires the `enable-threads` option, without which
+    the thread never runs.  The thread dies with its worker when the worker
+    is recycled (e.g. on `max-requests`), in which case the refresh lock
+    expires after REFRESH_LOCK_TIMEOUT and a later request refreshes the entry.
+    """
+    thread = threading.Thread(target=func, args=args)
+    thread.daemon = True
+    thread.start()
+
+
 def _traverse_pagination(response, endpoint, querystring, no_data):
     """Traverse a paginated API response.
 
     Extracts and concatenates "results" (list of dict) returned by DRF-powered APIs.
+
+    If the first page tells the total count of results, the remaining pages
+    are fetched concurrently.  Otherwise they are fetched one after the other.
     """
     results = response.get('results', no_data)
 
-    page = 1
     next_page = response.get('next')
+    count = response.get('count')
+    num_pages = int(math.ceil(float(count) / len(results))) if next_page and count and results else 0
+    # A count inconsistent with the next link, e.g. because results were
+    # added since, leaves the remaining pages to be followed one by one.
+    if num_pages > 1:
+        def get_page(page):
+            """Returns the results of the given page."""
+            return endpoint.get(**dict(querystring, page=page)).get('results', no_data)
+
+        pool = ThreadPool(min(PAGE_FETCH_CONCURRENCY, num_pages - 1))
+        try:
+            for page_results in pool.map(get_page, range(2, num_pages + 1)):
+                results += page_results
+        finally:
+            pool.close()
+        return results
+
+    page = 1
     while next_page:
         page += 1
         querystring['page'] = page
@@ -0,0 +1,53 @@
+"""
+Tests for django_startup.py
+"""
+from unittest import TestCase
+
+from mock import patch
+
+from openedx.core.lib import django_startup
+
+
+class ImportedModuleNameTest(TestCase):
+    """
+    Tests for the names of the modules whose import times are recorded.
+    """
+    GLOBALS = {'__name__': 'openedx.core.lib.django_startup', '__package__': None}
+
+    def test_absolute_import(self):
+        self.assertEqual(
+            django_startup._imported_module_name('json', self.GLOBALS, 0),  # pylint: disable=protected-access
+            'json',
+        )
+
+    def test_relative_import(self):
+        for name, level, expected in (
+                ('tests', 1, 'openedx.core.lib.tests'),
+                ('', 1, 'openedx.core.lib'),
+                ('djangoapps', 2, 'openedx.core.djangoapps'),
+        ):
+            self.assertEqual(
+                django_startup._imported_module_name(name, self.GLOBALS, level),  # pylint: disable=protected-access
+                expected,
+            )
+
+    def test_implicit_relative_import(self):
+        for name, expected in (('tests', 'openedx.core.lib.tests'), ('json', 'json')):
+            self.assertEqual(
+                django_startup._imported_module_name(name, self.GLOBALS, -1),  # pylint: disable=protected-access
+                expected,
+            )
+
+
+class TimedStartupPhaseTest(TestCase):
+    """
+    Tests for the timing of the startup phases.
+    """
+    @patch('openedx.core.lib.django_startup.STARTUP_TIMINGS', {})
+    @patch('openedx.core.lib.django_startup.time.time')
+    def test_timings_added_up(self, mock_time):
+        mock_time.side_effect = [10, 12, 20, 21]
+        for __ in range(2):
+            with django_startup.timed_startup_phase('phase'):
+                pass
+        self.assertEqual(django_startup.STARTUP_TIMINGS, {'phase': 3})
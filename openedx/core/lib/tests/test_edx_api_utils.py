@@ -1,6 +1,8 @@
 """Tests covering edX API utilities."""
 # pylint: disable=missing-docstring
 import json
+import time
+from multiprocessing.pool import ThreadPool
 
 import httpretty
 import mock
@@ -17,6 +19,7 @@ from openedx.core.djangoapps.catalog.utils import create_catalog_api_client
 from openedx.core.djangoapps.credentials.models import CredentialsApiConfig
 from openedx.core.djangoapps.credentials.tests.mixins import CredentialsApiConfigMixin
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase, skip_unless_lms
+from openedx.core.lib.cache_utils import zpickle
 from openedx.core.lib.edx_api_utils import get_edx_api_data
 from student.tests.factories import UserFactory
 
@@ -232,6 +235,135 @@ class TestGetEdxApiData(CatalogIntegrationMixin, CredentialsApiConfigMixin, Cach
         # Verify that only two requests were made, not four.
         self._assert_num_requests(2)
 
+    @waffle.testutils.override_switch("populate-multitenant-programs", True)
+    def test_get_paginated_data_concurrently(self):
+        """Verify that the remaining pages are fetched concurrently when the count of results is known."""
+        catalog_integration = self.create_catalog_integration()
+        api = create_catalog_api_client(self.user)
+
+        expected_collection = ['some', 'test', 'data', 'to', 'fetch']
+        url = CatalogIntegration.current().get_internal_api_url().strip('/') + '/programs/'
+
+        for page in range(1, 4):
+            data = {
+                'count': len(expected_collection),
+                'next': url + '?page={}'.format(page + 1) if page < 3 else None,
+                'results': expected_collection[(page - 1) * 2:page * 2],
+            }
+            httpretty.register_uri(
+                httpretty.GET,
+                url if page == 1 else url + '?page={}'.format(page),
+                body=json.dumps(data),
+                content_type='application/json',
+                match_querystring=True,
+            )
+
+        with mock.patch(UTILITY_MODULE + '.ThreadPool', wraps=ThreadPool) as mock_pool:
+            actual_collection = get_edx_api_data(catalog_integration, 'programs', api=api)
+        self.assertEqual(actual_collection, expected_collection)
+        mock_pool.assert_called_once_with(2)
+        self._assert_num_requests(3)
+
+    @waffle.testutils.override_switch("populate-multitenant-programs", True)
+    def test_get_paginated_data_with_stale_count(self):
+        """Verify that the next pages are followed when the count of results fits in the first page."""
+        catalog_integration = self.create_catalog_integration()
+        api = create_catalog_api_client(self.user)
+
+        expected_collection = ['some', 'test', 'data']
+        url = CatalogIntegration.current().get_internal_api_url().strip('/') + '/programs/'
+
+        for page in range(1, 3):
+            data = {
+                'count': 2,
+                'next': url + '?page=2' if page == 1 else None,
+                'results': expected_collection[:2] if page == 1 else expected_collection[2:],
+            }
+            httpretty.register_uri(
+                httpretty.GET,
+                url if page == 1 else url + '?page=2',
+                body=json.dumps(data),
+                content_type='application/json',
+                match_querystring=True,
+            )
+
+        with mock.patch(UTILITY_MODULE + '.ThreadPool', wraps=ThreadPool) as mock_pool:
+            actual_collection = get_edx_api_data(catalog_integration, 'programs', api=api)
+        self.assertEqual(actual_collection, expected_collection)
+        self.assertFalse(mock_pool.called)
+        self._assert_num_requests(2)
+
+    def _cache_entry(self, cache_key, data, fresh_for):
+        """Caches `data` under `cache_key`, fresh for `fresh_for` seconds."""
+        cache.set(cache_key + '.swr.zpickled', zpickle((time.time() + fresh_for, data)))
+
+    def _mock_programs(self, data):
+        """Mocks the programs list endpoint of the Catalog API."""
+        self._mock_catalog_api(
+            [httpretty.Response(body=json.dumps({'next': None, 'results': data}), content_type='application/json')]
+        )
+
+    @waffle.testutils.override_switch("populate-multitenant-programs", True)
+    @mock.patch(UTILITY_MODULE + '._run_in_background', lambda func, *args: func(*args))
+    def test_stale_data_served_while_refreshed(self):
+        """Verify that stale cached data is served while being refreshed."""
+        catalog_integration = self.create_catalog_integration(cache_ttl=5)
+        api = create_catalog_api_client(self.user)
+        cache_key = CatalogIntegration.current().CACHE_KEY
+        self._cache_entry(cache_key, ['stale'], fresh_for=-1)
+        self._mock_programs(['fresh'])
+
+        self.assertEqual(get_edx_api_data(catalog_integration, 'programs', api=api, cache_key=cache_key), ['stale'])
+        self.assertEqual(get_edx_api_data(catalog_integration, 'programs', api=api, cache_key=cache_key), ['fresh'])
+        self._assert_num_requests(1)
+
+    @waffle.testutils.override_switch("populate-multitenant-programs", True)
+    @mock.patch(UTILITY_MODULE + '._run_in_background')
+    def test_stale_data_refreshed_once(self, mock_run_in_background):
+        """Verify that stale cached data is only refreshed by one request at a time."""
+        catalog_integration = self.create_catalog_integration(cache_ttl=5)
+        api = create_catalog_api_client(self.user)
+        cache_key = CatalogIntegration.current().CACHE_KEY
+        self._cache_entry(cache_key, ['stale'], fresh_for=-1)
+
+        for _ in range(3):
+            self.assertEqual(
+                get_edx_api_data(catalog_integration, 'programs', api=api, cache_key=cache_key), ['stale']
+            )
+        self.assertEqual(mock_run_in_background.call_count, 1)
+        self._assert_num_requests(0)
+
+    @waffle.testutils.override_switch("populate-multitenant-programs", True)
+    def test_waits_for_data_being_fetched(self):
+        """Verify that requests wait for data being fetched by another request instead of fetching it too."""
+        catalog_integration = self.create_catalog_integration(cache_ttl=5)
+        api = create_catalog_api_client(self.user)
+        cache_key = CatalogIntegration.current().CACHE_KEY
+        cache.add(cache_key + '.swr.zpickled.refreshing', True)
+
+        def fetched_elsewhere(_seconds):
+            self._cache_entry(cache_key, ['fetched elsewhere'], fresh_for=5)
+
+        with mock.patch(UTILITY_MODULE + '.time.sleep', side_effect=fetched_elsewhere):
+            actual = get_edx_api_data(catalog_integration, 'programs', api=api, cache_key=cache_key)
+        self.assertEqual(actual, ['fetched elsewhere'])
+        self._assert_num_requests(0)
+
+    @waffle.testutils.override_switch("populate-multitenant-programs", True)
+    @mock.patch(UTILITY_MODULE + '.time.sleep', mock.Mock())
+    def test_fetches_when_other_fetch_failed(self):
+        """Verify that data is fetched if the request which was fetching it gave up."""
+        catalog_integration = self.create_catalog_integration(cache_ttl=5)
+        api = create_catalog_api_client(self.user)
+        cache_key = CatalogIntegration.current().CACHE_KEY
+        cache.add(cache_key + '.swr.zpickled.refreshing', True)
+        self._mock_programs(['fresh'])
+
+        with mock.patch(UTILITY_MODULE + '._wait_for_cache_entry', return_value=None):
+            actual = get_edx_api_data(catalog_integration, 'programs', api=api, cache_key=cache_key)
+        self.assertEqual(actual, ['fresh'])
+        self._assert_num_requests(1)
+
     @mock.patch(UTILITY_MODULE + '.log.warning')
     def test_api_config_disabled(self, mock_warning):
         """Verify that no data is retrieved if the provided config model is disabled."""
@@ -8,7 +8,7 @@ import logging
 
 from collections import defaultdict, OrderedDict
 
-from grades.scores import possibly_scored
+from grades.context import graded_blocks_by_format
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from xmodule import block_metadata_utils
 
@@ -53,38 +53,18 @@ class VerticalGrading(object):
             the descriptor tree again.
 
         """
-        all_graded_blocks = []
-        all_graded_verticals_by_type = OrderedDict()
-
-        for chapter_key in course_structure.get_children(course_structure.root_block_usage_key):
-            for subsection_key in course_structure.get_children(chapter_key):
-                for vertical_key in course_structure.get_children(subsection_key):
-                    vertical = course_structure[vertical_key]
-                    scored_descendants_of_vertical = []
-                    if vertical.graded:
-                        for descendant_key in course_structure.post_order_traversal(
-                            filter_func=possibly_scored,
-                            start_node=vertical_key
-                        ):
-                            scored_descendants_of_vertical.append(
-                                course_structure[descendant_key],
-                            )
-
-                        # include only those blocks that have scores, not if they are just a parent
-                        vertical_info = {
-                            'vertical_block': vertical,
-                            'scored_descendants': [
-                                child for child in scored_descendants_of_vertical
-                                if getattr(child, 'has_score', None)
-                            ]
-                        }
-                        vertical_format = getattr(vertical, 'format', '')
-                        if vertical_format not in all_graded_verticals_by_type:
-                            all_graded_verticals_by_type[vertical_format] = []
-                        all_graded_verticals_by_type[vertical_format].append(vertical_info)
-                        all_graded_blocks.extend(scored_descendants_of_vertical)
+        graded_verticals_by_type, all_graded_blocks = graded_blocks_by_format(course_structure, 'vertical')
         return {
-            'all_graded_verticals_by_type': all_graded_verticals_by_type,
+            'all_graded_verticals_by_type': OrderedDict(
+                (
+                    vertical_format,
+                    [
+                        {'vertical_block': vertical, 'scored_descendants': scored_descendants}
+                        for vertical, scored_descendants in verticals
+                    ],
+                )
+                for vertical_format, verticals in graded_verticals_by_type.iteritems()
+            ),
             'all_graded_blocks': all_graded_blocks,
         }
 
@@ -162,10 +142,11 @@ class VerticalGrading(object):
         to the headers for this report.
         """
         grade_results = []
+        graded_verticals_by_format = VerticalGrading.graded_elements_by_format(course_grade.chapter_grades)
         for assignment_type, assignment_info in graded_assignments.iteritems():
             for vertical_location in assignment_info['vertical_headers']:
                 try:
-                    vertical_grade = VerticalGrading.graded_elements_by_format(course_grade.chapter_grades)[assignment_type][vertical_location]
+                    vertical_grade = graded_verticals_by_format[assignment_type][vertical_location]
                 except KeyError:
                     grade_result = u'Not Available'
                 else: